@@ -5,3 +5,6 @@ class AcoesPngiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'acoes_pngi'
     verbose_name = 'Ações PNGI'
+
+    def ready(self):
+        from . import signals  # noqa: F401
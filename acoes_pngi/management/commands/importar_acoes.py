@@ -0,0 +1,58 @@
+"""
+Importa ações PNGI em lote a partir de planilha CSV/XLSX.
+
+Uso:
+    python manage.py importar_acoes acoes.csv --vigencia 3 --dry-run
+"""
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from acoes_pngi.models import VigenciaPNGI
+from acoes_pngi.services import AcoesImportService, ImportacaoAcoesError, ler_arquivo
+
+
+class Command(BaseCommand):
+    help = 'Importa ações PNGI (com prazos, destaques e responsáveis) de planilha CSV/XLSX'
+
+    def add_arguments(self, parser):
+        parser.add_argument('arquivo', help='Caminho da planilha CSV ou XLSX')
+        parser.add_argument('--vigencia', type=int, required=True, help='ID da VigenciaPNGI de destino')
+        parser.add_argument('--dry-run', action='store_true', help='Apenas valida, sem gravar')
+        parser.add_argument('--batch-size', type=int, default=500, help='Linhas por lote')
+        parser.add_argument('--relatorio', help='Arquivo JSON para gravar o relatório completo')
+
+    def handle(self, *args, **options):
+        try:
+            vigencia = VigenciaPNGI.objects.get(pk=options['vigencia'])
+        except VigenciaPNGI.DoesNotExist:
+            raise CommandError(f"Vigência {options['vigencia']} não encontrada")
+
+        service = AcoesImportService(
+            vigencia,
+            dry_run=options['dry_run'],
+            batch_size=options['batch_size'],
+        )
+
+        try:
+            with open(options['arquivo'], 'rb') as arquivo:
+                relatorio = service.importar(ler_arquivo(arquivo, options['arquivo']))
+        except (OSError, ImportacaoAcoesError) as e:
+            raise CommandError(str(e))
+
+        if options['relatorio']:
+            with open(options['relatorio'], 'w', encoding='utf-8') as saida:
+                json.dump(relatorio, saida, ensure_ascii=False, indent=2)
+
+        for erro in relatorio['erros'][:50]:
+            self.stdout.write(self.style.WARNING(
+                f"Linha {erro['linha']} ({erro['strapelido']}): {'; '.join(erro['erros'])}"
+            ))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{relatorio['total_linhas']} linhas lidas, "
+            f"{relatorio['linhas_validas']} válidas, "
+            f"{relatorio['acoes_importadas']} ações importadas"
+            + (' (dry-run)' if relatorio['dry_run'] else '')
+        ))
@@ -0,0 +1,32 @@
+"""
+Varre os prazos de entrega das ações e atualiza o digest por responsável.
+
+Uso (agendado, ex.: cron a cada 15 minutos):
+    python manage.py varrer_prazos
+    python manage.py varrer_prazos --completa
+"""
+
+from django.core.management.base import BaseCommand
+
+from acoes_pngi.services.varredura_prazos import varrer_prazos
+
+
+class Command(BaseCommand):
+    help = 'Atualiza os digests de prazos (atrasadas e a vencer) por usuário responsável'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--completa',
+            action='store_true',
+            help='Reavalia todos os responsáveis, ignorando a última varredura',
+        )
+
+    def handle(self, *args, **options):
+        varredura = varrer_prazos(completa=options['completa'])
+        duracao = (varredura.datfim - varredura.datinicio).total_seconds()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Varredura {'completa' if varredura.iscompleta else 'incremental'}: "
+            f"{varredura.intdigestsatualizados} digests atualizados, "
+            f"{varredura.intacoesavaliadas} ações no horizonte ({duracao:.2f}s)"
+        ))
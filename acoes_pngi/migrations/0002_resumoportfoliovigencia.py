@@ -0,0 +1,29 @@
+# Generated by Django 6.0.1 on 2026-10-19 15:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('acoes_pngi', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumoPortfolioVigencia',
+            fields=[
+                ('idvigenciapngi', models.OneToOneField(db_column='idvigenciapngi', on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='resumo_portfolio', serialize=False, to='acoes_pngi.vigenciapngi')),
+                ('jsresumo', models.JSONField(db_column='jsresumo')),
+                ('isdesatualizado', models.BooleanField(db_column='isdesatualizado', default=False)),
+                ('datatualizacao', models.DateTimeField(db_column='datatualizacao')),
+            ],
+            options={
+                'verbose_name': 'Resumo da Carteira por Vigência',
+                'verbose_name_plural': 'Resumos da Carteira por Vigência',
+                'db_table': 'tblresumoportfoliovigencia',
+                'managed': True,
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 6.0.1 on 2026-10-19 15:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('acoes_pngi', '0002_resumoportfoliovigencia'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='acaoanotacaoalinhamento',
+            index=models.Index(fields=['datdataanotacaoalinhamento', 'idacaoanotacaoalinhamento'], include=('idacao', 'idtipoanotacaoalinhamento'), name='idxacaoanotacaodata'),
+        ),
+        migrations.AddIndex(
+            model_name='acaodestaque',
+            index=models.Index(fields=['datdatadestaque', 'idacaodestaque'], include=('idacao',), name='idxacaodestaquedata'),
+        ),
+    ]
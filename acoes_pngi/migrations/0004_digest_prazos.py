@@ -0,0 +1,65 @@
+# Generated by Django 6.0.1 on 2026-10-19 15:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('acoes_pngi', '0003_indices_timeline'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DigestPrazoResponsavel',
+            fields=[
+                ('idusuarioresponsavel', models.OneToOneField(db_column='idusuarioresponsavel', on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='digest_prazos', serialize=False, to='acoes_pngi.usuarioresponsavel')),
+                ('jsacoes', models.JSONField(db_column='jsacoes', default=list)),
+                ('intatrasadas', models.IntegerField(db_column='intatrasadas', default=0)),
+                ('intavencer', models.IntegerField(db_column='intavencer', default=0)),
+                ('isdesatualizado', models.BooleanField(db_column='isdesatualizado', default=False)),
+                ('datatualizacao', models.DateTimeField(db_column='datatualizacao')),
+            ],
+            options={
+                'verbose_name': 'Digest de Prazos do Responsável',
+                'verbose_name_plural': 'Digests de Prazos dos Responsáveis',
+                'db_table': 'tbldigestprazoresponsavel',
+                'managed': True,
+            },
+        ),
+        migrations.CreateModel(
+            name='VarreduraPrazos',
+            fields=[
+                ('idvarreduraprazos', models.AutoField(db_column='idvarreduraprazos', primary_key=True, serialize=False)),
+                ('datinicio', models.DateTimeField(db_column='datinicio')),
+                ('datfim', models.DateTimeField(blank=True, db_column='datfim', null=True)),
+                ('iscompleta', models.BooleanField(db_column='iscompleta', default=False)),
+                ('intacoesavaliadas', models.IntegerField(db_column='intacoesavaliadas', default=0)),
+                ('intdigestsatualizados', models.IntegerField(db_column='intdigestsatualizados', default=0)),
+            ],
+            options={
+                'verbose_name': 'Varredura de Prazos',
+                'verbose_name_plural': 'Varreduras de Prazos',
+                'db_table': 'tblvarreduraprazos',
+                'ordering': ['-datinicio'],
+                'managed': True,
+            },
+        ),
+        migrations.AddIndex(
+            model_name='acaoprazo',
+            index=models.Index(fields=['updated_at'], name='idxacaoprazoupdatedat'),
+        ),
+        migrations.AddIndex(
+            model_name='acoes',
+            index=models.Index(fields=['datdataentrega'], name='idxacoesdataentrega'),
+        ),
+        migrations.AddIndex(
+            model_name='acoes',
+            index=models.Index(fields=['updated_at'], name='idxacoesupdatedat'),
+        ),
+        migrations.AddIndex(
+            model_name='relacaoacaousuarioresponsavel',
+            index=models.Index(fields=['updated_at'], name='idxrelacaoacaousuarioupdatedat'),
+        ),
+    ]
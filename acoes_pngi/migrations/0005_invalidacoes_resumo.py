@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-19 19:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('acoes_pngi', '0004_digest_prazos'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resumoportfoliovigencia',
+            name='intinvalidacoes',
+            field=models.BigIntegerField(db_column='intinvalidacoes', default=0),
+        ),
+    ]
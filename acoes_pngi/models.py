@@ -170,6 +170,11 @@ class Acoes(models.Model):
         verbose_name = 'Ação'
         verbose_name_plural = 'Ações'
         ordering = ['strapelido']
+        indexes = [
+            # Varredura de prazos: faixa de data de entrega e alterações incrementais
+            models.Index(fields=['datdataentrega'], name='idxacoesdataentrega'),
+            models.Index(fields=['updated_at'], name='idxacoesupdatedat'),
+        ]
 
     def __str__(self):
         return f'{self.strapelido} - {self.strdescricaoacao[:50]}'
@@ -205,6 +210,9 @@ class AcaoPrazo(models.Model):
                 name='idxacaoprazoativo'
             )
         ]
+        indexes = [
+            models.Index(fields=['updated_at'], name='idxacaoprazoupdatedat'),
+        ]
 
     def __str__(self):
         status = 'Ativo' if self.isacaoprazoativo else 'Inativo'
@@ -258,6 +266,14 @@ class AcaoDestaque(models.Model):
                 name='idxacaodestaque'
             )
         ]
+        indexes = [
+            # Timeline por período: varredura por faixa de data com desempate por id
+            models.Index(
+                fields=['datdatadestaque', 'idacaodestaque'],
+                include=['idacao'],
+                name='idxacaodestaquedata'
+            )
+        ]
 
     def __str__(self):
         return f'{self.idacao.strapelido} - {self.datdatadestaque.strftime("%d/%m/%Y")}'
@@ -344,6 +360,14 @@ class AcaoAnotacaoAlinhamento(models.Model):
                 name='idxacaoanotacaoalinhamento'
             )
         ]
+        indexes = [
+            # Timeline por período: varredura por faixa de data com desempate por id
+            models.Index(
+                fields=['datdataanotacaoalinhamento', 'idacaoanotacaoalinhamento'],
+                include=['idacao', 'idtipoanotacaoalinhamento'],
+                name='idxacaoanotacaodata'
+            )
+        ]
 
     def __str__(self):
         return f'{self.idacao.strapelido} - {self.idtipoanotacaoalinhamento} - {self.datdataanotacaoalinhamento.strftime("%d/%m/%Y")}'
@@ -411,6 +435,93 @@ class RelacaoAcaoUsuarioResponsavel(models.Model):
                 name='idxrelacaoacaousuarioresponsavel'
             )
         ]
+        indexes = [
+            models.Index(fields=['updated_at'], name='idxrelacaoacaousuarioupdatedat'),
+        ]
 
     def __str__(self):
         return f'{self.idacao.strapelido} - {self.idusuarioresponsavel.idusuario.name}'
+
+
+class ResumoPortfolioVigencia(models.Model):
+    """
+    Resumo pré-calculado da carteira de ações por vigência (tabela de resumo).
+    Recalculado sob demanda quando marcado como desatualizado por alterações em
+    Acoes, AcaoPrazo ou RelacaoAcaoUsuarioResponsavel.
+    Ver acoes_pngi.services.resumo_portfolio para o limite de defasagem.
+    """
+    idvigenciapngi = models.OneToOneField(
+        VigenciaPNGI,
+        on_delete=models.CASCADE,
+        db_column='idvigenciapngi',
+        primary_key=True,
+        related_name='resumo_portfolio'
+    )
+    jsresumo = models.JSONField(db_column='jsresumo')
+    isdesatualizado = models.BooleanField(default=False, db_column='isdesatualizado')
+    # Incrementado a cada invalidação: o recálculo só limpa isdesatualizado se
+    # nenhuma invalidação ocorreu depois da leitura dos dados
+    intinvalidacoes = models.BigIntegerField(default=0, db_column='intinvalidacoes')
+    datatualizacao = models.DateTimeField(db_column='datatualizacao')
+
+    class Meta:
+        db_table = 'tblresumoportfoliovigencia'
+        managed = True
+        verbose_name = 'Resumo da Carteira por Vigência'
+        verbose_name_plural = 'Resumos da Carteira por Vigência'
+
+    def __str__(self):
+        return f'Resumo {self.idvigenciapngi_id} ({self.datatualizacao:%d/%m/%Y %H:%M})'
+
+
+class DigestPrazoResponsavel(models.Model):
+    """
+    Digest de prazos por usuário responsável: ações atrasadas ou com entrega
+    dentro do horizonte da varredura, para leitura por chave primária.
+    Mantido pela varredura de prazos (ver acoes_pngi.services.varredura_prazos).
+    """
+    idusuarioresponsavel = models.OneToOneField(
+        UsuarioResponsavel,
+        on_delete=models.CASCADE,
+        db_column='idusuarioresponsavel',
+        primary_key=True,
+        related_name='digest_prazos'
+    )
+    jsacoes = models.JSONField(default=list, db_column='jsacoes')
+    intatrasadas = models.IntegerField(default=0, db_column='intatrasadas')
+    intavencer = models.IntegerField(default=0, db_column='intavencer')
+    isdesatualizado = models.BooleanField(default=False, db_column='isdesatualizado')
+    datatualizacao = models.DateTimeField(db_column='datatualizacao')
+
+    class Meta:
+        db_table = 'tbldigestprazoresponsavel'
+        managed = True
+        verbose_name = 'Digest de Prazos do Responsável'
+        verbose_name_plural = 'Digests de Prazos dos Responsáveis'
+
+    def __str__(self):
+        return f'Prazos {self.idusuarioresponsavel_id}: {self.intatrasadas} atrasadas, {self.intavencer} a vencer'
+
+
+class VarreduraPrazos(models.Model):
+    """
+    Registro de execuções da varredura de prazos.
+    O início da última execução concluída é o ponto de partida da próxima
+    varredura incremental.
+    """
+    idvarreduraprazos = models.AutoField(primary_key=True, db_column='idvarreduraprazos')
+    datinicio = models.DateTimeField(db_column='datinicio')
+    datfim = models.DateTimeField(null=True, blank=True, db_column='datfim')
+    iscompleta = models.BooleanField(default=False, db_column='iscompleta')
+    intacoesavaliadas = models.IntegerField(default=0, db_column='intacoesavaliadas')
+    intdigestsatualizados = models.IntegerField(default=0, db_column='intdigestsatualizados')
+
+    class Meta:
+        db_table = 'tblvarreduraprazos'
+        managed = True
+        verbose_name = 'Varredura de Prazos'
+        verbose_name_plural = 'Varreduras de Prazos'
+        ordering = ['-datinicio']
+
+    def __str__(self):
+        return f'Varredura {self.datinicio:%d/%m/%Y %H:%M}' + (' (completa)' if self.iscompleta else '')
@@ -1,6 +1,22 @@
 """
 Serviços da aplicação Ações PNGI
 """
-#from .portal_auth import PortalAuthService
+from .importacao_acoes import (
+    AcoesImportService,
+    ImportacaoAcoesError,
+    ler_arquivo,
+)
+from .resumo_portfolio import (
+    obter_resumos,
+    atualizar_resumos,
+    marcar_resumos_desatualizados,
+)
 
-#__all__ = ['PortalAuthService']s
\ No newline at end of file
+__all__ = [
+    'AcoesImportService',
+    'ImportacaoAcoesError',
+    'ler_arquivo',
+    'obter_resumos',
+    'atualizar_resumos',
+    'marcar_resumos_desatualizados',
+]
@@ -0,0 +1,126 @@
+"""
+Carteira de ações por usuário responsável e carga de trabalho por órgão.
+
+Substitui o padrão de buscar as relações e depois o detalhe de cada ação:
+o prazo ativo e o último destaque de cada ação entram como subconsultas
+correlacionadas (LIMIT 1, equivalentes a um LATERAL JOIN) na mesma consulta
+das relações. O total de consultas é fixo (três), independente da quantidade
+de responsáveis ou ações.
+"""
+
+from datetime import timedelta
+from typing import Dict, Iterable, List, Optional
+
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.utils import timezone
+
+from ..models import (
+    AcaoDestaque,
+    AcaoPrazo,
+    RelacaoAcaoUsuarioResponsavel,
+    UsuarioResponsavel,
+)
+from .resumo_portfolio import DIAS_A_VENCER
+
+
+def carteira_responsaveis(
+    responsavel_ids: Iterable[int],
+    vigencia_id: Optional[int] = None,
+) -> List[Dict]:
+    """
+    Retorna os responsáveis informados com suas ações, cada uma com o prazo
+    ativo e a data do último destaque.
+    """
+    responsavel_ids = list(responsavel_ids)
+    responsaveis = UsuarioResponsavel.objects.filter(
+        idusuario__in=responsavel_ids
+    ).values(
+        'idusuario', 'idusuario__name', 'idusuario__email', 'strorgao', 'strtelefone'
+    ).order_by('idusuario__name')
+
+    carteira = {
+        r['idusuario']: {
+            'idusuarioresponsavel': r['idusuario'],
+            'nome': r['idusuario__name'],
+            'email': r['idusuario__email'],
+            'strorgao': r['strorgao'],
+            'strtelefone': r['strtelefone'],
+            'acoes': [],
+        }
+        for r in responsaveis
+    }
+    if not carteira:
+        return []
+
+    prazo_ativo = AcaoPrazo.objects.filter(
+        idacao=OuterRef('idacao'), isacaoprazoativo=True
+    ).values('strprazo')[:1]
+    ultimo_destaque = AcaoDestaque.objects.filter(
+        idacao=OuterRef('idacao')
+    ).order_by('-datdatadestaque').values('datdatadestaque')[:1]
+
+    relacoes = RelacaoAcaoUsuarioResponsavel.objects.filter(
+        idusuarioresponsavel__in=list(carteira)
+    )
+    if vigencia_id:
+        relacoes = relacoes.filter(idacao__idvigenciapngi=vigencia_id)
+
+    relacoes = relacoes.annotate(
+        prazo_ativo=Subquery(prazo_ativo),
+        ultimo_destaque=Subquery(ultimo_destaque),
+    ).values(
+        'idusuarioresponsavel',
+        'idacao',
+        'idacao__strapelido',
+        'idacao__strdescricaoacao',
+        'idacao__idvigenciapngi',
+        'idacao__datdataentrega',
+        'idacao__idtipoentravealerta__strdescricaotipoentravealerta',
+        'prazo_ativo',
+        'ultimo_destaque',
+    ).order_by('idusuarioresponsavel', 'idacao__datdataentrega', 'idacao')
+
+    for r in relacoes:
+        carteira[r['idusuarioresponsavel']]['acoes'].append({
+            'idacao': r['idacao'],
+            'strapelido': r['idacao__strapelido'],
+            'strdescricaoacao': r['idacao__strdescricaoacao'],
+            'idvigenciapngi': r['idacao__idvigenciapngi'],
+            'datdataentrega': r['idacao__datdataentrega'],
+            'tipo_entrave_alerta': r['idacao__idtipoentravealerta__strdescricaotipoentravealerta'],
+            'prazo_ativo': r['prazo_ativo'],
+            'ultimo_destaque': r['ultimo_destaque'],
+        })
+
+    return list(carteira.values())
+
+
+def carga_por_orgao(vigencia_id: Optional[int] = None) -> List[Dict]:
+    """
+    Carga de trabalho por órgão: responsáveis, ações distintas e situação de
+    prazo, para apoiar a distribuição de novas ações.
+    """
+    agora = timezone.now()
+    filtro_acoes = Q()
+    if vigencia_id:
+        filtro_acoes = Q(acoes__idacao__idvigenciapngi=vigencia_id)
+
+    linhas = UsuarioResponsavel.objects.values('strorgao').annotate(
+        responsaveis=Count('idusuario', distinct=True),
+        total_acoes=Count('acoes__idacao', filter=filtro_acoes, distinct=True),
+        atrasadas=Count('acoes__idacao', distinct=True, filter=filtro_acoes & Q(
+            acoes__idacao__datdataentrega__lt=agora
+        )),
+        a_vencer_30_dias=Count('acoes__idacao', distinct=True, filter=filtro_acoes & Q(
+            acoes__idacao__datdataentrega__gte=agora,
+            acoes__idacao__datdataentrega__lt=agora + timedelta(days=DIAS_A_VENCER),
+        )),
+    ).order_by('-total_acoes', 'strorgao')
+
+    return [
+        {
+            **linha,
+            'media_acoes_por_responsavel': round(linha['total_acoes'] / linha['responsaveis'], 2),
+        }
+        for linha in linhas
+    ]
@@ -0,0 +1,332 @@
+"""
+Importação em lote de Ações PNGI a partir de planilhas CSV/XLSX.
+
+O arquivo é lido de forma incremental (linha a linha) e processado em lotes:
+cada lote é validado contra dicionários pré-carregados de referências
+(tipos de entrave/alerta, responsáveis e apelidos já existentes na vigência)
+e gravado com ``bulk_create``. Linhas inválidas não interrompem a carga:
+são devolvidas no relatório de erros por linha.
+
+Colunas reconhecidas (cabeçalho na primeira linha):
+- strapelido (obrigatória)
+- strdescricaoacao (obrigatória)
+- strdescricaoentrega (obrigatória)
+- tipoentravealerta: descrição do tipo de entrave/alerta
+- datdataentrega: data de entrega (AAAA-MM-DD ou DD/MM/AAAA)
+- strprazo: prazo ativo da ação
+- datdatadestaque: datas de destaque separadas por ';'
+- responsaveis: e-mails dos responsáveis separados por ';'
+"""
+
+import csv
+import io
+import logging
+from datetime import date, datetime, time
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import (
+    Acoes,
+    AcaoPrazo,
+    AcaoDestaque,
+    TipoEntraveAlerta,
+    UsuarioResponsavel,
+    RelacaoAcaoUsuarioResponsavel,
+    VigenciaPNGI,
+)
+
+from .resumo_portfolio import marcar_resumos_desatualizados
+
+logger = logging.getLogger(__name__)
+
+
+COLUNAS_OBRIGATORIAS = ('strapelido', 'strdescricaoacao', 'strdescricaoentrega')
+
+TAMANHOS_MAXIMOS = {
+    'strapelido': 50,
+    'strdescricaoacao': 350,
+    'strdescricaoentrega': 20,
+    'strprazo': 20,
+}
+
+FORMATOS_DATA = ('%Y-%m-%d', '%d/%m/%Y')
+
+SEPARADOR_MULTIVALOR = ';'
+
+
+class ImportacaoAcoesError(Exception):
+    """Erro que impede a importação como um todo (arquivo ou vigência inválidos)."""
+
+
+def _normalizar(valor) -> str:
+    if valor is None:
+        return ''
+    return str(valor).strip()
+
+
+def _parse_data(valor) -> Optional[date]:
+    """Converte o valor da célula em date; levanta ValueError se inválido."""
+    if valor in (None, ''):
+        return None
+    if isinstance(valor, datetime):
+        return valor.date()
+    if isinstance(valor, date):
+        return valor
+    texto = _normalizar(valor)
+    if not texto:
+        return None
+    for formato in FORMATOS_DATA:
+        try:
+            return datetime.strptime(texto, formato).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Data inválida: '{texto}'")
+
+
+def _para_datetime(valor: date) -> datetime:
+    """Datas de planilha viram datetime à meia-noite no fuso configurado."""
+    return timezone.make_aware(datetime.combine(valor, time.min))
+
+
+def ler_csv(arquivo, encoding: str = 'utf-8-sig') -> Iterator[Tuple[int, Dict[str, str]]]:
+    """
+    Lê um CSV linha a linha, detectando ';' ou ',' como delimitador.
+    Aceita arquivo binário (upload) ou texto. Produz (número da linha, valores).
+    """
+    if isinstance(arquivo, io.TextIOBase):
+        texto = arquivo
+    else:
+        # UploadedFile do Django expõe o arquivo binário real em .file
+        texto = io.TextIOWrapper(getattr(arquivo, 'file', arquivo), encoding=encoding, newline='')
+
+    cabecalho = texto.readline()
+    delimitador = ';' if cabecalho.count(';') > cabecalho.count(',') else ','
+    colunas = [c.strip().lower() for c in next(csv.reader([cabecalho], delimiter=delimitador))]
+
+    leitor = csv.reader(texto, delimiter=delimitador)
+    for valores in leitor:
+        if not any(v.strip() for v in valores):
+            continue
+        # line_num não conta o cabeçalho, já consumido acima
+        yield leitor.line_num + 1, dict(zip(colunas, valores))
+
+
+def ler_xlsx(arquivo) -> Iterator[Tuple[int, Dict[str, object]]]:
+    """
+    Lê a primeira planilha de um XLSX em modo read-only (sem carregar tudo em memória).
+    Requer openpyxl instalado.
+    """
+    try:
+        from openpyxl import load_workbook
+    except ImportError as exc:
+        raise ImportacaoAcoesError(
+            'Importação de XLSX requer o pacote openpyxl. Envie o arquivo em CSV.'
+        ) from exc
+
+    workbook = load_workbook(arquivo, read_only=True, data_only=True)
+    try:
+        linhas = workbook.worksheets[0].iter_rows(values_only=True)
+        cabecalho = next(linhas, None)
+        if not cabecalho:
+            return
+        colunas = [_normalizar(c).lower() for c in cabecalho]
+        for numero, valores in enumerate(linhas, start=2):
+            if not any(_normalizar(v) for v in valores):
+                continue
+            yield numero, dict(zip(colunas, valores))
+    finally:
+        workbook.close()
+
+
+def ler_arquivo(arquivo, nome_arquivo: str = '') -> Iterator[Tuple[int, Dict]]:
+    """Escolhe o leitor pela extensão do arquivo enviado."""
+    nome = (nome_arquivo or getattr(arquivo, 'name', '') or '').lower()
+    if nome.endswith('.xlsx'):
+        return ler_xlsx(arquivo)
+    if nome.endswith('.csv') or not nome:
+        return ler_csv(arquivo)
+    raise ImportacaoAcoesError('Formato não suportado. Use CSV ou XLSX.')
+
+
+class AcoesImportService:
+    """
+    Pipeline de importação de ações para uma vigência.
+
+    Uso:
+        service = AcoesImportService(vigencia, dry_run=True)
+        relatorio = service.importar(ler_arquivo(arquivo))
+    """
+
+    def __init__(self, vigencia: VigenciaPNGI, dry_run: bool = False, batch_size: int = 500):
+        self.vigencia = vigencia
+        self.dry_run = dry_run
+        self.batch_size = batch_size
+        self._carregar_referencias()
+
+    def _carregar_referencias(self):
+        """Pré-carrega as referências para resolver cada linha sem queries adicionais."""
+        self.tipos_entrave = {
+            descricao.strip().lower(): pk
+            for pk, descricao in TipoEntraveAlerta.objects.values_list(
+                'idtipoentravealerta', 'strdescricaotipoentravealerta'
+            )
+        }
+        self.responsaveis = {
+            email.strip().lower(): pk
+            for pk, email in UsuarioResponsavel.objects.values_list(
+                'idusuario_id', 'idusuario__email'
+            )
+        }
+        self.apelidos = {
+            apelido.strip().lower()
+            for apelido in Acoes.objects.filter(
+                idvigenciapngi=self.vigencia
+            ).values_list('strapelido', flat=True)
+        }
+
+    def importar(self, linhas: Iterable[Tuple[int, Dict]]) -> Dict:
+        """
+        Processa as linhas (número, valores) em lotes e retorna o relatório.
+
+        Returns:
+            dict com total de linhas, válidas, importadas e erros por linha
+        """
+        relatorio = {
+            'vigencia_id': self.vigencia.idvigenciapngi,
+            'dry_run': self.dry_run,
+            'total_linhas': 0,
+            'linhas_validas': 0,
+            'acoes_importadas': 0,
+            'erros': [],
+        }
+
+        linhas = iter(linhas)
+        while True:
+            lote = list(islice(linhas, self.batch_size))
+            if not lote:
+                break
+
+            validas, erros = self._validar_lote(lote)
+            relatorio['total_linhas'] += len(lote)
+            relatorio['linhas_validas'] += len(validas)
+            relatorio['erros'].extend(erros)
+
+            if validas and not self.dry_run:
+                relatorio['acoes_importadas'] += self._gravar_lote(validas)
+
+        logger.info(
+            f"Importação de ações (vigência {self.vigencia.idvigenciapngi}, "
+            f"dry_run={self.dry_run}): {relatorio['total_linhas']} linhas, "
+            f"{len(relatorio['erros'])} com erro"
+        )
+        return relatorio
+
+    def _validar_lote(self, lote: List[Tuple[int, Dict]]) -> Tuple[List[Dict], List[Dict]]:
+        validas, erros = [], []
+        for numero, linha in lote:
+            registro, mensagens = self._validar_linha(linha)
+            if mensagens:
+                erros.append({
+                    'linha': numero,
+                    'strapelido': _normalizar(linha.get('strapelido')),
+                    'erros': mensagens,
+                })
+                continue
+            # Reserva o apelido para detectar duplicidade dentro do próprio arquivo
+            self.apelidos.add(registro['strapelido'].lower())
+            validas.append(registro)
+        return validas, erros
+
+    def _validar_linha(self, linha: Dict) -> Tuple[Dict, List[str]]:
+        mensagens = []
+        registro = {campo: _normalizar(linha.get(campo)) for campo in (
+            'strapelido', 'strdescricaoacao', 'strdescricaoentrega', 'strprazo'
+        )}
+
+        for campo in COLUNAS_OBRIGATORIAS:
+            if not registro[campo]:
+                mensagens.append(f'{campo}: campo obrigatório')
+
+        for campo, tamanho in TAMANHOS_MAXIMOS.items():
+            if len(registro[campo]) > tamanho:
+                mensagens.append(f'{campo}: máximo de {tamanho} caracteres')
+
+        if registro['strapelido'] and registro['strapelido'].lower() in self.apelidos:
+            mensagens.append('strapelido: já existe ação com este apelido na vigência')
+
+        tipo = _normalizar(linha.get('tipoentravealerta'))
+        registro['idtipoentravealerta_id'] = None
+        if tipo:
+            registro['idtipoentravealerta_id'] = self.tipos_entrave.get(tipo.lower())
+            if registro['idtipoentravealerta_id'] is None:
+                mensagens.append(f"tipoentravealerta: '{tipo}' não encontrado")
+
+        try:
+            registro['datdataentrega'] = _parse_data(linha.get('datdataentrega'))
+        except ValueError as e:
+            mensagens.append(f'datdataentrega: {e}')
+
+        registro['destaques'] = set()
+        for valor in self._multivalor(linha.get('datdatadestaque')):
+            try:
+                registro['destaques'].add(_parse_data(valor))
+            except ValueError as e:
+                mensagens.append(f'datdatadestaque: {e}')
+
+        registro['responsaveis'] = []
+        for email in self._multivalor(linha.get('responsaveis')):
+            responsavel_id = self.responsaveis.get(email.lower())
+            if responsavel_id is None:
+                mensagens.append(f"responsaveis: '{email}' não é um usuário responsável")
+            elif responsavel_id not in registro['responsaveis']:
+                registro['responsaveis'].append(responsavel_id)
+
+        return registro, mensagens
+
+    @staticmethod
+    def _multivalor(valor) -> List:
+        if isinstance(valor, (date, datetime)):
+            return [valor]
+        return [v.strip() for v in _normalizar(valor).split(SEPARADOR_MULTIVALOR) if v.strip()]
+
+    def _gravar_lote(self, registros: List[Dict]) -> int:
+        """Grava ações e dependentes do lote em uma única transação."""
+        with transaction.atomic():
+            acoes = Acoes.objects.bulk_create([
+                Acoes(
+                    strapelido=r['strapelido'],
+                    strdescricaoacao=r['strdescricaoacao'],
+                    strdescricaoentrega=r['strdescricaoentrega'],
+                    idvigenciapngi=self.vigencia,
+                    idtipoentravealerta_id=r['idtipoentravealerta_id'],
+                    datdataentrega=_para_datetime(r['datdataentrega']) if r['datdataentrega'] else None,
+                )
+                for r in registros
+            ], batch_size=self.batch_size)
+
+            prazos, destaques, relacoes = [], [], []
+            for acao, r in zip(acoes, registros):
+                if r['strprazo']:
+                    prazos.append(AcaoPrazo(
+                        idacao=acao, strprazo=r['strprazo'], isacaoprazoativo=True
+                    ))
+                destaques.extend(
+                    AcaoDestaque(idacao=acao, datdatadestaque=_para_datetime(d))
+                    for d in sorted(r['destaques'])
+                )
+                relacoes.extend(
+                    RelacaoAcaoUsuarioResponsavel(idacao=acao, idusuarioresponsavel_id=pk)
+                    for pk in r['responsaveis']
+                )
+
+            AcaoPrazo.objects.bulk_create(prazos, batch_size=self.batch_size)
+            AcaoDestaque.objects.bulk_create(destaques, batch_size=self.batch_size)
+            RelacaoAcaoUsuarioResponsavel.objects.bulk_create(relacoes, batch_size=self.batch_size)
+
+            # bulk_create não dispara signals: invalida o resumo da carteira explicitamente
+            marcar_resumos_desatualizados()
+
+        return len(acoes)
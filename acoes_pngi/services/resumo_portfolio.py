@@ -0,0 +1,233 @@
+"""
+Resumo pré-calculado da carteira de ações PNGI (dashboard).
+
+Os agregados de cada vigência ficam em ResumoPortfolioVigencia, uma linha por
+vigência com todas as quebras do dashboard em JSON, lidas por chave primária.
+
+Atualização e limite de defasagem:
+- Qualquer alteração em Acoes, AcaoPrazo ou RelacaoAcaoUsuarioResponsavel
+  (signals) marca os resumos como desatualizados, na mesma transação, e
+  incrementa intinvalidacoes. O recálculo só grava o resumo como atualizado
+  se o contador não mudou desde o início da leitura; uma invalidação
+  concorrente ao cálculo não se perde.
+- Na leitura, um resumo desatualizado é recalculado se tiver sido gerado há
+  mais de ACOES_PNGI_RESUMO_INTERVALO_MINIMO segundos (padrão 30), o que evita
+  recálculos em rajadas de edição.
+- Independente de alterações, um resumo com mais de
+  ACOES_PNGI_RESUMO_IDADE_MAXIMA segundos (padrão 900) é recalculado, pois a
+  situação de prazo (atrasada, a vencer) depende da data atual.
+
+Assim, alterações aparecem no resumo em no máximo INTERVALO_MINIMO segundos e
+a classificação por prazo tem defasagem máxima de IDADE_MAXIMA segundos.
+"""
+
+import logging
+from datetime import timedelta
+from typing import Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Exists, F, OuterRef, Q
+from django.utils import timezone
+
+from ..models import (
+    Acoes,
+    AcaoPrazo,
+    RelacaoAcaoUsuarioResponsavel,
+    ResumoPortfolioVigencia,
+    VigenciaPNGI,
+)
+
+logger = logging.getLogger(__name__)
+
+
+DIAS_A_VENCER = 30
+
+
+def intervalo_minimo() -> int:
+    return getattr(settings, 'ACOES_PNGI_RESUMO_INTERVALO_MINIMO', 30)
+
+
+def idade_maxima() -> int:
+    return getattr(settings, 'ACOES_PNGI_RESUMO_IDADE_MAXIMA', 900)
+
+
+def marcar_resumos_desatualizados() -> int:
+    """
+    Marca todos os resumos como desatualizados.
+    O número de vigências é pequeno, então uma única UPDATE cobre inclusive
+    ações que mudaram de vigência. Atualiza também os já desatualizados, para
+    o contador acusar invalidações durante um recálculo em andamento.
+    """
+    return ResumoPortfolioVigencia.objects.update(
+        isdesatualizado=True, intinvalidacoes=F('intinvalidacoes') + 1
+    )
+
+
+def calcular_resumos(vigencia_ids: Iterable[int]) -> Dict[int, Dict]:
+    """
+    Calcula as quebras do dashboard para as vigências informadas.
+    Executa um número fixo de consultas agrupadas, independente da quantidade
+    de ações ou vigências.
+    """
+    vigencia_ids = list(vigencia_ids)
+    agora = timezone.now()
+    limite_a_vencer = agora + timedelta(days=DIAS_A_VENCER)
+
+    resumos = {
+        vid: {
+            'total_acoes': 0,
+            'por_tipo_entrave': [],
+            'por_situacao_prazo': {
+                'atrasadas': 0,
+                'a_vencer_30_dias': 0,
+                'no_prazo': 0,
+                'sem_data_entrega': 0,
+                'com_prazo_ativo': 0,
+                'sem_prazo_ativo': 0,
+            },
+            'por_responsavel': [],
+            'sem_responsavel': 0,
+        }
+        for vid in vigencia_ids
+    }
+    if not vigencia_ids:
+        return resumos
+
+    acoes = Acoes.objects.filter(idvigenciapngi__in=vigencia_ids).order_by()
+
+    totais = acoes.annotate(
+        tem_prazo_ativo=Exists(
+            AcaoPrazo.objects.filter(idacao=OuterRef('pk'), isacaoprazoativo=True)
+        ),
+        tem_responsavel=Exists(
+            RelacaoAcaoUsuarioResponsavel.objects.filter(idacao=OuterRef('pk'))
+        ),
+    ).values('idvigenciapngi').annotate(
+        total=Count('idacao'),
+        atrasadas=Count('idacao', filter=Q(datdataentrega__lt=agora)),
+        a_vencer=Count('idacao', filter=Q(
+            datdataentrega__gte=agora, datdataentrega__lt=limite_a_vencer
+        )),
+        no_prazo=Count('idacao', filter=Q(datdataentrega__gte=limite_a_vencer)),
+        sem_data=Count('idacao', filter=Q(datdataentrega__isnull=True)),
+        com_prazo_ativo=Count('idacao', filter=Q(tem_prazo_ativo=True)),
+        sem_responsavel=Count('idacao', filter=Q(tem_responsavel=False)),
+    )
+    for linha in totais:
+        resumo = resumos[linha['idvigenciapngi']]
+        resumo['total_acoes'] = linha['total']
+        resumo['sem_responsavel'] = linha['sem_responsavel']
+        resumo['por_situacao_prazo'] = {
+            'atrasadas': linha['atrasadas'],
+            'a_vencer_30_dias': linha['a_vencer'],
+            'no_prazo': linha['no_prazo'],
+            'sem_data_entrega': linha['sem_data'],
+            'com_prazo_ativo': linha['com_prazo_ativo'],
+            'sem_prazo_ativo': linha['total'] - linha['com_prazo_ativo'],
+        }
+
+    por_tipo = acoes.values(
+        'idvigenciapngi',
+        'idtipoentravealerta',
+        'idtipoentravealerta__strdescricaotipoentravealerta',
+    ).annotate(total=Count('idacao')).order_by('-total')
+    for linha in por_tipo:
+        resumos[linha['idvigenciapngi']]['por_tipo_entrave'].append({
+            'idtipoentravealerta': linha['idtipoentravealerta'],
+            'descricao': linha['idtipoentravealerta__strdescricaotipoentravealerta'] or 'Sem entrave/alerta',
+            'total': linha['total'],
+        })
+
+    por_responsavel = RelacaoAcaoUsuarioResponsavel.objects.filter(
+        idacao__idvigenciapngi__in=vigencia_ids
+    ).values(
+        'idacao__idvigenciapngi',
+        'idusuarioresponsavel',
+        'idusuarioresponsavel__idusuario__name',
+        'idusuarioresponsavel__strorgao',
+    ).annotate(total=Count('idacao')).order_by('-total')
+    for linha in por_responsavel:
+        resumos[linha['idacao__idvigenciapngi']]['por_responsavel'].append({
+            'idusuarioresponsavel': linha['idusuarioresponsavel'],
+            'nome': linha['idusuarioresponsavel__idusuario__name'],
+            'strorgao': linha['idusuarioresponsavel__strorgao'],
+            'total': linha['total'],
+        })
+
+    return resumos
+
+
+def atualizar_resumos(vigencia_ids: Iterable[int]) -> List[ResumoPortfolioVigencia]:
+    """Recalcula e grava (upsert) os resumos das vigências informadas."""
+    vigencia_ids = list(vigencia_ids)
+    agora = timezone.now()
+    invalidacoes = dict(ResumoPortfolioVigencia.objects.filter(
+        pk__in=vigencia_ids
+    ).values_list('pk', 'intinvalidacoes'))
+    resumos = calcular_resumos(vigencia_ids)
+    objetos = [
+        ResumoPortfolioVigencia(
+            idvigenciapngi_id=vid,
+            jsresumo=resumo,
+            isdesatualizado=False,
+            datatualizacao=agora,
+        )
+        for vid, resumo in resumos.items()
+    ]
+    # Invalidado depois da leitura: continua desatualizado (mesma transação,
+    # ninguém vê o resumo marcado como atualizado no meio)
+    invalidados = Q()
+    for vid in resumos:
+        invalidados |= Q(pk=vid) & ~Q(intinvalidacoes=invalidacoes.get(vid, 0))
+    with transaction.atomic():
+        ResumoPortfolioVigencia.objects.bulk_create(
+            objetos,
+            update_conflicts=True,
+            unique_fields=['idvigenciapngi'],
+            update_fields=['jsresumo', 'isdesatualizado', 'datatualizacao'],
+        )
+        if invalidados:
+            ResumoPortfolioVigencia.objects.filter(invalidados).update(isdesatualizado=True)
+    logger.info(f"Resumo da carteira PNGI atualizado para vigências {list(resumos)}")
+    return objetos
+
+
+def _precisa_atualizar(resumo: Optional[ResumoPortfolioVigencia], agora) -> bool:
+    if resumo is None:
+        return True
+    idade = (agora - resumo.datatualizacao).total_seconds()
+    if idade >= idade_maxima():
+        return True
+    return resumo.isdesatualizado and idade >= intervalo_minimo()
+
+
+def obter_resumos(vigencia_ids: Optional[Iterable[int]] = None) -> List[Dict]:
+    """
+    Retorna os resumos das vigências (todas, se não informadas), recalculando
+    apenas os que ultrapassaram o limite de defasagem.
+    """
+    vigencias = VigenciaPNGI.objects.order_by('-datiniciovigencia')
+    if vigencia_ids is not None:
+        vigencias = vigencias.filter(idvigenciapngi__in=list(vigencia_ids))
+    vigencias = list(vigencias.values('idvigenciapngi', 'strdescricaovigenciapngi', 'isvigenciaativa'))
+
+    ids = [v['idvigenciapngi'] for v in vigencias]
+    existentes = ResumoPortfolioVigencia.objects.in_bulk(ids)
+
+    agora = timezone.now()
+    pendentes = [vid for vid in ids if _precisa_atualizar(existentes.get(vid), agora)]
+    if pendentes:
+        for resumo in atualizar_resumos(pendentes):
+            existentes[resumo.idvigenciapngi_id] = resumo
+
+    return [
+        {
+            'idvigenciapngi': v['idvigenciapngi'],
+            'strdescricaovigenciapngi': v['strdescricaovigenciapngi'],
+            'isvigenciaativa': v['isvigenciaativa'],
+            'atualizado_em': existentes[v['idvigenciapngi']].datatualizacao,
+            **existentes[v['idvigenciapngi']].jsresumo,
+        }
+        for v in vigencias
+    ]
@@ -0,0 +1,142 @@
+"""
+Timeline unificada de destaques e anotações de alinhamento por período.
+
+Os dois tipos de evento são combinados com UNION ALL e ordenados por
+(data, tipo, id). A paginação é por chave (keyset): o cursor guarda a última
+tupla entregue e cada ramo do UNION filtra a partir dela, de modo que o custo
+de cada página depende apenas do tamanho da página, e não da posição no
+histórico. Cada ramo percorre o índice composto (data, id) do seu modelo
+(idxacaodestaquedata / idxacaoanotacaodata) e já é limitado antes do UNION.
+"""
+
+import base64
+from datetime import datetime, date, time, timedelta
+from typing import Optional, Tuple
+
+from django.db.models import CharField, F, IntegerField, Q, Value
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from ..models import AcaoDestaque, AcaoAnotacaoAlinhamento
+
+
+TIPO_ANOTACAO = 'anotacao'
+TIPO_DESTAQUE = 'destaque'
+TIPOS = (TIPO_ANOTACAO, TIPO_DESTAQUE)
+
+CAMPOS = (
+    'tipo', 'id', 'idacao', 'strapelido', 'data',
+    'idtipoanotacaoalinhamento', 'descricao', 'link', 'strnumeromonitoramento',
+)
+
+Cursor = Tuple[datetime, str, int]
+
+
+class CursorInvalidoError(ValueError):
+    """Cursor de paginação malformado."""
+
+
+def codificar_cursor(data: datetime, tipo: str, pk: int) -> str:
+    bruto = f'{data.isoformat()}|{tipo}|{pk}'.encode()
+    return base64.urlsafe_b64encode(bruto).decode()
+
+
+def decodificar_cursor(cursor: str) -> Cursor:
+    try:
+        data, tipo, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        data = parse_datetime(data)
+        if data is None or tipo not in TIPOS:
+            raise ValueError
+        return data, tipo, int(pk)
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise CursorInvalidoError('Cursor inválido') from exc
+
+
+def _inicio_do_dia(dia: date) -> datetime:
+    return timezone.make_aware(datetime.combine(dia, time.min))
+
+
+def _filtro_cursor(campo_data: str, campo_id: str, tipo: str, cursor: Optional[Cursor]) -> Q:
+    """
+    Traduz (data, tipo, id) > cursor para o ramo de um tipo específico,
+    mantendo a condição em termos de (data, id) para usar o índice composto.
+    """
+    if cursor is None:
+        return Q()
+    data, tipo_cursor, pk = cursor
+    if tipo > tipo_cursor:
+        return Q(**{f'{campo_data}__gte': data})
+    if tipo < tipo_cursor:
+        return Q(**{f'{campo_data}__gt': data})
+    return Q(**{f'{campo_data}__gt': data}) | Q(**{campo_data: data, f'{campo_id}__gt': pk})
+
+
+def consultar_timeline(
+    inicio: Optional[date] = None,
+    fim: Optional[date] = None,
+    cursor: Optional[Cursor] = None,
+    limite: int = 100,
+    tipos=TIPOS,
+    idacao: Optional[int] = None,
+):
+    """
+    Monta a consulta da timeline entre as datas informadas (inclusive).
+
+    Returns:
+        QuerySet de tuplas na ordem de CAMPOS, ordenado por (data, tipo, id),
+        limitado a ``limite`` linhas.
+    """
+    texto = CharField()
+    inteiro = IntegerField()
+    fim_exclusivo = _inicio_do_dia(fim + timedelta(days=1)) if fim else None
+
+    ramos = []
+    if TIPO_DESTAQUE in tipos:
+        destaques = AcaoDestaque.objects.filter(
+            _filtro_cursor('datdatadestaque', 'idacaodestaque', TIPO_DESTAQUE, cursor)
+        )
+        if inicio:
+            destaques = destaques.filter(datdatadestaque__gte=_inicio_do_dia(inicio))
+        if fim_exclusivo:
+            destaques = destaques.filter(datdatadestaque__lt=fim_exclusivo)
+        if idacao:
+            destaques = destaques.filter(idacao=idacao)
+        ramos.append(
+            destaques.order_by('datdatadestaque', 'idacaodestaque').annotate(
+                tipo=Value(TIPO_DESTAQUE, output_field=texto),
+                id=F('idacaodestaque'),
+                strapelido=F('idacao__strapelido'),
+                data=F('datdatadestaque'),
+                idtipoanotacaoalinhamento=Value(None, output_field=inteiro),
+                descricao=Value(None, output_field=texto),
+                link=Value(None, output_field=texto),
+                strnumeromonitoramento=Value(None, output_field=texto),
+            ).values_list(*CAMPOS)[:limite]
+        )
+
+    if TIPO_ANOTACAO in tipos:
+        anotacoes = AcaoAnotacaoAlinhamento.objects.filter(
+            _filtro_cursor(
+                'datdataanotacaoalinhamento', 'idacaoanotacaoalinhamento', TIPO_ANOTACAO, cursor
+            )
+        )
+        if inicio:
+            anotacoes = anotacoes.filter(datdataanotacaoalinhamento__gte=_inicio_do_dia(inicio))
+        if fim_exclusivo:
+            anotacoes = anotacoes.filter(datdataanotacaoalinhamento__lt=fim_exclusivo)
+        if idacao:
+            anotacoes = anotacoes.filter(idacao=idacao)
+        ramos.append(
+            anotacoes.order_by('datdataanotacaoalinhamento', 'idacaoanotacaoalinhamento').annotate(
+                tipo=Value(TIPO_ANOTACAO, output_field=texto),
+                id=F('idacaoanotacaoalinhamento'),
+                strapelido=F('idacao__strapelido'),
+                data=F('datdataanotacaoalinhamento'),
+                descricao=F('strdescricaoanotacaoalinhamento'),
+                link=F('strlinkanotacaoalinhamento'),
+            ).values_list(*CAMPOS)[:limite]
+        )
+
+    if len(ramos) == 1:
+        return ramos[0]
+    return ramos[0].union(ramos[1], all=True).order_by('data', 'tipo', 'id')[:limite]
@@ -0,0 +1,184 @@
+"""
+Varredura de prazos de entrega das ações PNGI.
+
+Grava em DigestPrazoResponsavel, para cada usuário responsável, as ações
+atrasadas ou com entrega dentro do horizonte (ACOES_PNGI_PRAZO_HORIZONTE_DIAS,
+padrão 30), com o prazo ativo de cada uma. O widget de prazos passa a ser uma
+leitura por chave primária.
+
+Varredura incremental: partindo do início da última varredura concluída,
+reavalia apenas os responsáveis de ações que
+- tiveram Acoes, AcaoPrazo ou a relação com o responsável alterados
+  (updated_at), ou
+- entraram no horizonte desde então (datdataentrega), ou
+- tiveram o digest marcado como desatualizado por exclusões (signals).
+Todas as seleções usam os índices de datdataentrega e updated_at.
+"""
+
+import logging
+from datetime import timedelta
+from typing import Dict, Iterable, List, Optional, Set
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import OuterRef, Q, Subquery
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from ..models import (
+    Acoes,
+    AcaoPrazo,
+    DigestPrazoResponsavel,
+    RelacaoAcaoUsuarioResponsavel,
+    UsuarioResponsavel,
+    VarreduraPrazos,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def horizonte() -> timedelta:
+    return timedelta(days=getattr(settings, 'ACOES_PNGI_PRAZO_HORIZONTE_DIAS', 30))
+
+
+def marcar_digests_desatualizados(responsavel_ids: Iterable[int]) -> int:
+    """Marca os digests dos responsáveis para reavaliação na próxima varredura."""
+    return DigestPrazoResponsavel.objects.filter(
+        idusuarioresponsavel__in=list(responsavel_ids), isdesatualizado=False
+    ).update(isdesatualizado=True)
+
+
+def _responsaveis_afetados(desde, agora) -> Set[int]:
+    """Responsáveis cujo digest pode ter mudado desde a última varredura."""
+    limite = agora + horizonte()
+    acoes_alteradas = Acoes.objects.filter(
+        Q(updated_at__gte=desde)
+        | Q(datdataentrega__gte=desde + horizonte(), datdataentrega__lt=limite)
+    ).values('idacao')
+    prazos_alterados = AcaoPrazo.objects.filter(updated_at__gte=desde).values('idacao')
+
+    afetados = set(
+        RelacaoAcaoUsuarioResponsavel.objects.filter(
+            Q(idacao__in=acoes_alteradas)
+            | Q(idacao__in=prazos_alterados)
+            | Q(updated_at__gte=desde)
+        ).values_list('idusuarioresponsavel', flat=True).distinct()
+    )
+    afetados.update(
+        DigestPrazoResponsavel.objects.filter(
+            isdesatualizado=True
+        ).values_list('idusuarioresponsavel', flat=True)
+    )
+    return afetados
+
+
+def calcular_digests(responsavel_ids: Iterable[int], agora=None) -> Dict[int, Dict]:
+    """
+    Calcula os digests dos responsáveis informados em uma única consulta.
+    """
+    agora = agora or timezone.now()
+    limite = agora + horizonte()
+    digests = {
+        rid: {'jsacoes': [], 'intatrasadas': 0, 'intavencer': 0}
+        for rid in responsavel_ids
+    }
+    if not digests:
+        return digests
+
+    prazo_ativo = AcaoPrazo.objects.filter(
+        idacao=OuterRef('idacao'), isacaoprazoativo=True
+    ).values('strprazo')[:1]
+
+    relacoes = RelacaoAcaoUsuarioResponsavel.objects.filter(
+        idusuarioresponsavel__in=list(digests),
+        idacao__datdataentrega__lt=limite,
+    ).annotate(
+        prazo_ativo=Subquery(prazo_ativo),
+    ).values_list(
+        'idusuarioresponsavel', 'idacao', 'idacao__strapelido',
+        'idacao__datdataentrega', 'prazo_ativo',
+    ).order_by('idusuarioresponsavel', 'idacao__datdataentrega', 'idacao')
+
+    for rid, idacao, apelido, entrega, prazo in relacoes:
+        digest = digests[rid]
+        digest['jsacoes'].append({
+            'idacao': idacao,
+            'strapelido': apelido,
+            'datdataentrega': entrega.isoformat(),
+            'strprazo': prazo,
+        })
+        if entrega < agora:
+            digest['intatrasadas'] += 1
+        else:
+            digest['intavencer'] += 1
+    return digests
+
+
+def varrer_prazos(completa: bool = False) -> VarreduraPrazos:
+    """
+    Executa a varredura e grava os digests. Sem varredura anterior concluída,
+    a execução é sempre completa.
+    """
+    agora = timezone.now()
+    anterior = VarreduraPrazos.objects.filter(datfim__isnull=False).first()
+    completa = completa or anterior is None
+
+    if completa:
+        responsavel_ids = set(UsuarioResponsavel.objects.values_list('idusuario', flat=True))
+    else:
+        responsavel_ids = _responsaveis_afetados(anterior.datinicio, agora)
+
+    digests = calcular_digests(responsavel_ids, agora)
+    with transaction.atomic():
+        DigestPrazoResponsavel.objects.bulk_create(
+            [
+                DigestPrazoResponsavel(
+                    idusuarioresponsavel_id=rid,
+                    isdesatualizado=False,
+                    datatualizacao=agora,
+                    **digest,
+                )
+                for rid, digest in digests.items()
+            ],
+            update_conflicts=True,
+            unique_fields=['idusuarioresponsavel'],
+            update_fields=['jsacoes', 'intatrasadas', 'intavencer', 'isdesatualizado', 'datatualizacao'],
+            batch_size=500,
+        )
+        varredura = VarreduraPrazos.objects.create(
+            datinicio=agora,
+            datfim=timezone.now(),
+            iscompleta=completa,
+            intacoesavaliadas=sum(len(d['jsacoes']) for d in digests.values()),
+            intdigestsatualizados=len(digests),
+        )
+
+    logger.info(
+        f"Varredura de prazos {'completa' if completa else 'incremental'}: "
+        f"{varredura.intdigestsatualizados} digests atualizados"
+    )
+    return varredura
+
+
+def obter_digest(responsavel_id: int) -> Optional[Dict]:
+    """
+    Lê o digest do responsável e reclassifica as ações pela data atual,
+    já que o digest pode ter sido gerado antes de alguma entrega vencer.
+    """
+    digest = DigestPrazoResponsavel.objects.filter(pk=responsavel_id).first()
+    if digest is None:
+        return None
+
+    agora = timezone.now()
+    atrasadas: List[Dict] = []
+    a_vencer: List[Dict] = []
+    for acao in digest.jsacoes:
+        (atrasadas if parse_datetime(acao['datdataentrega']) < agora else a_vencer).append(acao)
+
+    return {
+        'idusuarioresponsavel': responsavel_id,
+        'atualizado_em': digest.datatualizacao,
+        'desatualizado': digest.isdesatualizado,
+        'atrasadas': atrasadas,
+        'a_vencer': a_vencer,
+    }
@@ -0,0 +1,40 @@
+"""
+Signals da aplicação Ações PNGI.
+Mantém o resumo pré-calculado da carteira (ResumoPortfolioVigencia) sincronizado
+e marca digests de prazos afetados por exclusões (DigestPrazoResponsavel).
+"""
+
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import Acoes, AcaoPrazo, RelacaoAcaoUsuarioResponsavel
+
+
+@receiver(post_save, sender=Acoes)
+@receiver(post_delete, sender=Acoes)
+@receiver(post_save, sender=AcaoPrazo)
+@receiver(post_delete, sender=AcaoPrazo)
+@receiver(post_save, sender=RelacaoAcaoUsuarioResponsavel)
+@receiver(post_delete, sender=RelacaoAcaoUsuarioResponsavel)
+def invalidar_resumo_portfolio(sender, **kwargs):
+    """Marca os resumos da carteira como desatualizados após alterações."""
+    from .services.resumo_portfolio import marcar_resumos_desatualizados
+    marcar_resumos_desatualizados()
+
+
+@receiver(post_delete, sender=AcaoPrazo)
+@receiver(post_delete, sender=RelacaoAcaoUsuarioResponsavel)
+def invalidar_digest_prazos(sender, instance, **kwargs):
+    """
+    Exclusões não alteram updated_at; marca os digests dos responsáveis da
+    ação para a próxima varredura incremental.
+    """
+    from .services.varredura_prazos import marcar_digests_desatualizados
+    if sender is RelacaoAcaoUsuarioResponsavel:
+        marcar_digests_desatualizados([instance.idusuarioresponsavel_id])
+    else:
+        marcar_digests_desatualizados(
+            RelacaoAcaoUsuarioResponsavel.objects.filter(
+                idacao=instance.idacao_id
+            ).values_list('idusuarioresponsavel', flat=True)
+        )
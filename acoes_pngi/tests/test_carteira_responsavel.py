@@ -0,0 +1,93 @@
+"""
+Testes da carteira de ações por responsável e da carga por órgão.
+"""
+
+from datetime import date, timedelta
+
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from acoes_pngi.models import (
+    Acoes, AcaoPrazo, AcaoDestaque, VigenciaPNGI,
+    UsuarioResponsavel, RelacaoAcaoUsuarioResponsavel,
+)
+from acoes_pngi.services.carteira_responsavel import carteira_responsaveis, carga_por_orgao
+
+User = get_user_model()
+
+
+class CarteiraResponsavelTest(TestCase):
+    """Testes da carteira por responsável"""
+
+    databases = {'default', 'gpp_plataform_db'}
+
+    @classmethod
+    def setUpTestData(cls):
+        vigencia = VigenciaPNGI.objects.create(
+            strdescricaovigenciapngi='PNGI 2026',
+            datiniciovigencia=date(2026, 1, 1),
+            datfinalvigencia=date(2026, 12, 31),
+        )
+        cls.responsaveis = []
+        for n, orgao in enumerate(['SEGER', 'SEGER', 'SEFAZ']):
+            user = User.objects.create_user(email=f'resp{n}@example.com', password='x', name=f'Resp {n}')
+            cls.responsaveis.append(UsuarioResponsavel.objects.create(
+                idusuario=user, strtelefone='2799999999', strorgao=orgao
+            ))
+        cls.user = cls.responsaveis[0].idusuario
+
+        agora = timezone.now()
+        for n in range(4):
+            acao = Acoes.objects.create(
+                strapelido=f'A{n}', strdescricaoacao=f'Ação {n}', strdescricaoentrega='X',
+                idvigenciapngi=vigencia, datdataentrega=agora + timedelta(days=10 * n - 5),
+            )
+            AcaoPrazo.objects.create(idacao=acao, strprazo=f'T{n}')
+            AcaoPrazo.objects.create(idacao=acao, strprazo='Antigo', isacaoprazoativo=False)
+            AcaoDestaque.objects.create(idacao=acao, datdatadestaque=agora - timedelta(days=30))
+            AcaoDestaque.objects.create(idacao=acao, datdatadestaque=agora - timedelta(days=n))
+            # Resp 0 e Resp 1 (SEGER) dividem as ações pares; Resp 2 (SEFAZ) fica com as ímpares
+            donos = cls.responsaveis[:2] if n % 2 == 0 else cls.responsaveis[2:]
+            for responsavel in donos:
+                RelacaoAcaoUsuarioResponsavel.objects.create(
+                    idacao=acao, idusuarioresponsavel=responsavel
+                )
+
+    def test_carteira_com_prazo_ativo_e_ultimo_destaque(self):
+        """Cada ação traz o prazo ativo e o destaque mais recente"""
+        ids = [r.pk for r in self.responsaveis]
+        with self.assertNumQueries(2):
+            carteira = carteira_responsaveis(ids)
+
+        resp2 = next(r for r in carteira if r['strorgao'] == 'SEFAZ')
+        self.assertEqual([a['strapelido'] for a in resp2['acoes']], ['A1', 'A3'])
+        self.assertEqual(resp2['acoes'][0]['prazo_ativo'], 'T1')
+        destaque_a1 = AcaoDestaque.objects.filter(idacao__strapelido='A1').latest('datdatadestaque')
+        self.assertEqual(resp2['acoes'][0]['ultimo_destaque'], destaque_a1.datdatadestaque)
+
+    def test_carga_por_orgao(self):
+        """Ações compartilhadas no mesmo órgão contam uma vez"""
+        carga = {linha['strorgao']: linha for linha in carga_por_orgao()}
+
+        self.assertEqual(carga['SEGER']['responsaveis'], 2)
+        self.assertEqual(carga['SEGER']['total_acoes'], 2)
+        self.assertEqual(carga['SEGER']['atrasadas'], 1)
+        self.assertEqual(carga['SEFAZ']['total_acoes'], 2)
+        self.assertEqual(carga['SEFAZ']['a_vencer_30_dias'], 2)
+
+    def test_endpoint_carteira(self):
+        """GET /usuarios-responsaveis/carteira/ retorna carteira e carga"""
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+
+        response = client.get(
+            '/api/v1/acoes_pngi/usuarios-responsaveis/carteira/',
+            {'idusuarioresponsavel': self.responsaveis[0].pk}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['responsaveis']), 1)
+        self.assertEqual(len(response.data['responsaveis'][0]['acoes']), 2)
+        self.assertEqual(len(response.data['carga_por_orgao']), 2)
@@ -0,0 +1,115 @@
+"""
+Testes da importação em lote de ações (AcoesImportService).
+"""
+
+import io
+from datetime import date
+
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from rest_framework.test import APIClient
+
+from acoes_pngi.models import (
+    Acoes, AcaoPrazo, AcaoDestaque, VigenciaPNGI, TipoEntraveAlerta,
+    UsuarioResponsavel, RelacaoAcaoUsuarioResponsavel,
+)
+from acoes_pngi.services import AcoesImportService, ler_arquivo
+
+User = get_user_model()
+
+
+CSV_ACOES = (
+    'strapelido;strdescricaoacao;strdescricaoentrega;tipoentravealerta;'
+    'datdataentrega;strprazo;datdatadestaque;responsaveis\n'
+    'ACAO-1;Primeira ação;Relatório;Atraso;31/12/2026;2026-T4;01/03/2026;resp@example.com\n'
+    'ACAO-2;Segunda ação;Sistema;;2026-06-30;;;\n'
+    ';Sem apelido;Sistema;;;;;\n'
+    'ACAO-3;Tipo inexistente;Sistema;Inexistente;;;;\n'
+    'ACAO-1;Apelido repetido;Sistema;;;;;\n'
+    'ACAO-4;Data ruim;Sistema;;32/13/2026;;;desconhecido@example.com\n'
+)
+
+
+class AcoesImportServiceTest(TestCase):
+    """Testes do pipeline de importação de ações"""
+
+    databases = {'default', 'gpp_plataform_db'}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.vigencia = VigenciaPNGI.objects.create(
+            strdescricaovigenciapngi='PNGI 2026',
+            datiniciovigencia=date(2026, 1, 1),
+            datfinalvigencia=date(2026, 12, 31),
+        )
+        cls.tipo = TipoEntraveAlerta.objects.create(strdescricaotipoentravealerta='Atraso')
+        cls.user = User.objects.create_user(
+            email='resp@example.com', password='testpass123', name='Responsável'
+        )
+        cls.responsavel = UsuarioResponsavel.objects.create(
+            idusuario=cls.user, strtelefone='2799999999', strorgao='SEGER'
+        )
+
+    def _importar(self, dry_run=False, batch_size=2):
+        service = AcoesImportService(self.vigencia, dry_run=dry_run, batch_size=batch_size)
+        return service.importar(ler_arquivo(io.BytesIO(CSV_ACOES.encode('utf-8')), 'acoes.csv'))
+
+    def test_dry_run_nao_grava(self):
+        """Dry-run valida todas as linhas sem gravar"""
+        relatorio = self._importar(dry_run=True)
+
+        self.assertTrue(relatorio['dry_run'])
+        self.assertEqual(relatorio['total_linhas'], 6)
+        self.assertEqual(relatorio['linhas_validas'], 2)
+        self.assertEqual(relatorio['acoes_importadas'], 0)
+        self.assertFalse(Acoes.objects.exists())
+
+    def test_importa_linhas_validas_com_dependentes(self):
+        """Linhas válidas geram ação, prazo ativo, destaque e responsável"""
+        relatorio = self._importar()
+
+        self.assertEqual(relatorio['acoes_importadas'], 2)
+        acao = Acoes.objects.get(strapelido='ACAO-1')
+        self.assertEqual(acao.idtipoentravealerta, self.tipo)
+        self.assertEqual(acao.datdataentrega.date(), date(2026, 12, 31))
+        self.assertTrue(AcaoPrazo.objects.filter(idacao=acao, isacaoprazoativo=True).exists())
+        self.assertEqual(AcaoDestaque.objects.filter(idacao=acao).count(), 1)
+        self.assertTrue(RelacaoAcaoUsuarioResponsavel.objects.filter(
+            idacao=acao, idusuarioresponsavel=self.responsavel
+        ).exists())
+
+    def test_relatorio_de_erros_por_linha(self):
+        """Cada linha inválida aparece no relatório com seu número"""
+        relatorio = self._importar()
+        erros = {erro['linha']: erro['erros'] for erro in relatorio['erros']}
+
+        self.assertEqual(sorted(erros), [4, 5, 6, 7])
+        self.assertTrue(any('obrigatório' in e for e in erros[4]))
+        self.assertTrue(any('tipoentravealerta' in e for e in erros[5]))
+        self.assertTrue(any('já existe' in e for e in erros[6]))
+        self.assertEqual(len(erros[7]), 2)
+
+    def test_reimportacao_rejeita_apelidos_existentes(self):
+        """Apelidos já cadastrados na vigência são rejeitados"""
+        self._importar()
+        relatorio = self._importar()
+
+        self.assertEqual(relatorio['acoes_importadas'], 0)
+        self.assertEqual(Acoes.objects.count(), 2)
+
+    def test_endpoint_importar(self):
+        """POST /acoes/importar/ executa a importação"""
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        arquivo = SimpleUploadedFile('acoes.csv', CSV_ACOES.encode('utf-8'), content_type='text/csv')
+
+        response = client.post('/api/v1/acoes_pngi/acoes/importar/', {
+            'arquivo': arquivo,
+            'idvigenciapngi': self.vigencia.idvigenciapngi,
+            'dry_run': 'true',
+        }, format='multipart')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['linhas_validas'], 2)
+        self.assertFalse(Acoes.objects.exists())
@@ -0,0 +1,130 @@
+"""
+Testes do resumo pré-calculado da carteira de ações (ResumoPortfolioVigencia).
+"""
+
+from datetime import date, timedelta
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from acoes_pngi.models import (
+    Acoes, AcaoPrazo, VigenciaPNGI, TipoEntraveAlerta,
+    UsuarioResponsavel, RelacaoAcaoUsuarioResponsavel, ResumoPortfolioVigencia,
+)
+from acoes_pngi.services import atualizar_resumos, obter_resumos
+from acoes_pngi.services import resumo_portfolio
+
+User = get_user_model()
+
+
+@override_settings(ACOES_PNGI_RESUMO_INTERVALO_MINIMO=0)
+class ResumoPortfolioTest(TestCase):
+    """Testes do cálculo e da atualização do resumo"""
+
+    databases = {'default', 'gpp_plataform_db'}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.vigencia = VigenciaPNGI.objects.create(
+            strdescricaovigenciapngi='PNGI 2026',
+            datiniciovigencia=date(2026, 1, 1),
+            datfinalvigencia=date(2026, 12, 31),
+        )
+        cls.tipo = TipoEntraveAlerta.objects.create(strdescricaotipoentravealerta='Atraso')
+        cls.user = User.objects.create_user(email='resp@example.com', password='x', name='Resp')
+        cls.responsavel = UsuarioResponsavel.objects.create(
+            idusuario=cls.user, strtelefone='2799999999', strorgao='SEGER'
+        )
+        agora = timezone.now()
+        cls.atrasada = Acoes.objects.create(
+            strapelido='A1', strdescricaoacao='Atrasada', strdescricaoentrega='X',
+            idvigenciapngi=cls.vigencia, idtipoentravealerta=cls.tipo,
+            datdataentrega=agora - timedelta(days=5),
+        )
+        Acoes.objects.create(
+            strapelido='A2', strdescricaoacao='A vencer', strdescricaoentrega='X',
+            idvigenciapngi=cls.vigencia, datdataentrega=agora + timedelta(days=10),
+        )
+        Acoes.objects.create(
+            strapelido='A3', strdescricaoacao='Sem data', strdescricaoentrega='X',
+            idvigenciapngi=cls.vigencia,
+        )
+        AcaoPrazo.objects.create(idacao=cls.atrasada, strprazo='T1')
+        RelacaoAcaoUsuarioResponsavel.objects.create(
+            idacao=cls.atrasada, idusuarioresponsavel=cls.responsavel
+        )
+
+    def test_quebras_do_resumo(self):
+        """Resumo traz todas as quebras do dashboard"""
+        resumo = obter_resumos([self.vigencia.pk])[0]
+
+        self.assertEqual(resumo['total_acoes'], 3)
+        self.assertEqual(resumo['sem_responsavel'], 2)
+        prazo = resumo['por_situacao_prazo']
+        self.assertEqual(prazo['atrasadas'], 1)
+        self.assertEqual(prazo['a_vencer_30_dias'], 1)
+        self.assertEqual(prazo['sem_data_entrega'], 1)
+        self.assertEqual(prazo['com_prazo_ativo'], 1)
+        tipos = {t['descricao']: t['total'] for t in resumo['por_tipo_entrave']}
+        self.assertEqual(tipos, {'Atraso': 1, 'Sem entrave/alerta': 2})
+        self.assertEqual(resumo['por_responsavel'][0]['strorgao'], 'SEGER')
+
+    def test_alteracao_invalida_resumo(self):
+        """Criar ação marca o resumo como desatualizado e ele é recalculado"""
+        obter_resumos([self.vigencia.pk])
+        Acoes.objects.create(
+            strapelido='A4', strdescricaoacao='Nova', strdescricaoentrega='X',
+            idvigenciapngi=self.vigencia,
+        )
+        self.assertTrue(ResumoPortfolioVigencia.objects.get(pk=self.vigencia.pk).isdesatualizado)
+
+        resumo = obter_resumos([self.vigencia.pk])[0]
+        self.assertEqual(resumo['total_acoes'], 4)
+
+    def test_invalidacao_durante_o_calculo_nao_se_perde(self):
+        """Alteração entre a leitura e a gravação mantém o resumo desatualizado"""
+        obter_resumos([self.vigencia.pk])
+        calcular = resumo_portfolio.calcular_resumos
+
+        def calcular_com_alteracao(vigencia_ids):
+            resumos = calcular(vigencia_ids)
+            Acoes.objects.create(
+                strapelido='A4', strdescricaoacao='Nova', strdescricaoentrega='X',
+                idvigenciapngi=self.vigencia,
+            )
+            return resumos
+
+        with mock.patch.object(resumo_portfolio, 'calcular_resumos', calcular_com_alteracao):
+            atualizar_resumos([self.vigencia.pk])
+        self.assertTrue(ResumoPortfolioVigencia.objects.get(pk=self.vigencia.pk).isdesatualizado)
+
+        atualizar_resumos([self.vigencia.pk])
+        resumo = ResumoPortfolioVigencia.objects.get(pk=self.vigencia.pk)
+        self.assertFalse(resumo.isdesatualizado)
+        self.assertEqual(resumo.jsresumo['total_acoes'], 4)
+
+    @override_settings(ACOES_PNGI_RESUMO_INTERVALO_MINIMO=3600)
+    def test_resumo_recente_nao_e_recalculado(self):
+        """Dentro do intervalo mínimo, o resumo gravado é servido sem recálculo"""
+        obter_resumos([self.vigencia.pk])
+        Acoes.objects.create(
+            strapelido='A4', strdescricaoacao='Nova', strdescricaoentrega='X',
+            idvigenciapngi=self.vigencia,
+        )
+        with self.assertNumQueries(2):
+            resumo = obter_resumos([self.vigencia.pk])[0]
+        self.assertEqual(resumo['total_acoes'], 3)
+
+    def test_endpoint_resumo(self):
+        """GET /acoes/resumo/ retorna resumos e limite de defasagem"""
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+
+        response = client.get(f'/api/v1/acoes_pngi/acoes/resumo/?idvigenciapngi={self.vigencia.pk}')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('limite_defasagem_segundos', response.data)
+        self.assertEqual(response.data['vigencias'][0]['total_acoes'], 3)
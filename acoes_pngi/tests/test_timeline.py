@@ -0,0 +1,103 @@
+"""
+Testes da timeline de destaques e anotações de alinhamento.
+"""
+
+import json
+from datetime import date, datetime
+
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from acoes_pngi.models import (
+    Acoes, AcaoDestaque, AcaoAnotacaoAlinhamento, TipoAnotacaoAlinhamento, VigenciaPNGI,
+)
+
+User = get_user_model()
+
+
+def _data(dia, hora=12):
+    return timezone.make_aware(datetime(2026, 3, dia, hora))
+
+
+class TimelineAcoesTest(TestCase):
+    """Testes do endpoint /timeline/"""
+
+    databases = {'default', 'gpp_plataform_db'}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='timeline@example.com', password='x', name='Timeline')
+        vigencia = VigenciaPNGI.objects.create(
+            strdescricaovigenciapngi='PNGI 2026',
+            datiniciovigencia=date(2026, 1, 1),
+            datfinalvigencia=date(2026, 12, 31),
+        )
+        cls.acao = Acoes.objects.create(
+            strapelido='A1', strdescricaoacao='Ação', strdescricaoentrega='X',
+            idvigenciapngi=vigencia,
+        )
+        tipo = TipoAnotacaoAlinhamento.objects.create(strdescricaotipoanotacaoalinhamento='Reunião')
+
+        AcaoDestaque.objects.create(idacao=cls.acao, datdatadestaque=_data(1))
+        AcaoDestaque.objects.create(idacao=cls.acao, datdatadestaque=_data(3))
+        AcaoDestaque.objects.create(idacao=cls.acao, datdatadestaque=_data(20))
+        for dia in (2, 3, 5):
+            AcaoAnotacaoAlinhamento.objects.create(
+                idacao=cls.acao, idtipoanotacaoalinhamento=tipo,
+                datdataanotacaoalinhamento=_data(dia),
+                strdescricaoanotacaoalinhamento=f'Anotação dia {dia}',
+            )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _get(self, **params):
+        response = self.client.get('/api/v1/acoes_pngi/timeline/', params)
+        self.assertEqual(response.status_code, 200)
+        return json.loads(b''.join(response.streaming_content))
+
+    def test_intercala_por_data_no_periodo(self):
+        """Eventos dos dois tipos vêm intercalados por data, dentro do período"""
+        pagina = self._get(inicio='2026-03-01', fim='2026-03-05')
+        eventos = [(r['tipo'], r['data'][:10]) for r in pagina['results']]
+
+        self.assertEqual(eventos, [
+            ('destaque', '2026-03-01'),
+            ('anotacao', '2026-03-02'),
+            ('anotacao', '2026-03-03'),
+            ('destaque', '2026-03-03'),
+            ('anotacao', '2026-03-05'),
+        ])
+        self.assertIsNone(pagina['next_cursor'])
+        self.assertEqual(pagina['results'][1]['descricao'], 'Anotação dia 2')
+        self.assertEqual(pagina['results'][0]['strapelido'], 'A1')
+
+    def test_paginacao_por_cursor(self):
+        """Percorrer as páginas pelo cursor entrega todos os eventos uma única vez"""
+        vistos = []
+        params = {'page_size': 2}
+        while True:
+            pagina = self._get(**params)
+            vistos.extend((r['tipo'], r['id']) for r in pagina['results'])
+            if not pagina['next_cursor']:
+                break
+            params['cursor'] = pagina['next_cursor']
+
+        self.assertEqual(len(vistos), 6)
+        self.assertEqual(len(set(vistos)), 6)
+
+    def test_filtro_por_tipo(self):
+        """tipo=destaque retorna apenas destaques"""
+        pagina = self._get(tipo='destaque')
+
+        self.assertEqual({r['tipo'] for r in pagina['results']}, {'destaque'})
+        self.assertEqual(len(pagina['results']), 3)
+
+    def test_parametros_invalidos(self):
+        """Datas, tipo e cursor inválidos retornam 400"""
+        for params in ({'inicio': '01/03/2026'}, {'tipo': 'outro'}, {'cursor': 'xyz'}):
+            response = self.client.get('/api/v1/acoes_pngi/timeline/', params)
+            self.assertEqual(response.status_code, 400)
@@ -0,0 +1,107 @@
+"""
+Testes da varredura de prazos e do digest por responsável.
+"""
+
+from datetime import date, timedelta
+
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from acoes_pngi.models import (
+    Acoes, AcaoPrazo, VigenciaPNGI, UsuarioResponsavel,
+    RelacaoAcaoUsuarioResponsavel, DigestPrazoResponsavel,
+)
+from acoes_pngi.services.varredura_prazos import varrer_prazos, obter_digest
+
+User = get_user_model()
+
+
+class VarreduraPrazosTest(TestCase):
+    """Testes da varredura completa e incremental"""
+
+    databases = {'default', 'gpp_plataform_db'}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.vigencia = VigenciaPNGI.objects.create(
+            strdescricaovigenciapngi='PNGI 2026',
+            datiniciovigencia=date(2026, 1, 1),
+            datfinalvigencia=date(2026, 12, 31),
+        )
+        cls.responsaveis = []
+        for n in range(2):
+            user = User.objects.create_user(email=f'prazo{n}@example.com', password='x', name=f'Resp {n}')
+            cls.responsaveis.append(UsuarioResponsavel.objects.create(
+                idusuario=user, strtelefone='2799999999', strorgao='SEGER'
+            ))
+        cls.user = cls.responsaveis[0].idusuario
+
+        agora = timezone.now()
+        cls.atrasada = cls._criar_acao('A1', agora - timedelta(days=2), cls.responsaveis[0])
+        cls.a_vencer = cls._criar_acao('A2', agora + timedelta(days=5), cls.responsaveis[0])
+        cls.distante = cls._criar_acao('A3', agora + timedelta(days=90), cls.responsaveis[1])
+        AcaoPrazo.objects.create(idacao=cls.a_vencer, strprazo='T2')
+
+    @classmethod
+    def _criar_acao(cls, apelido, entrega, responsavel):
+        acao = Acoes.objects.create(
+            strapelido=apelido, strdescricaoacao=apelido, strdescricaoentrega='X',
+            idvigenciapngi=cls.vigencia, datdataentrega=entrega,
+        )
+        RelacaoAcaoUsuarioResponsavel.objects.create(idacao=acao, idusuarioresponsavel=responsavel)
+        return acao
+
+    def test_varredura_completa_gera_digests(self):
+        """Primeira varredura é completa e classifica as ações no horizonte"""
+        varredura = varrer_prazos()
+
+        self.assertTrue(varredura.iscompleta)
+        digest = DigestPrazoResponsavel.objects.get(pk=self.responsaveis[0].pk)
+        self.assertEqual((digest.intatrasadas, digest.intavencer), (1, 1))
+        self.assertEqual(digest.jsacoes[1]['strprazo'], 'T2')
+        self.assertEqual(DigestPrazoResponsavel.objects.get(pk=self.responsaveis[1].pk).jsacoes, [])
+
+    def test_incremental_reavalia_apenas_afetados(self):
+        """Alterar uma ação só reavalia os responsáveis dela"""
+        passado = timezone.now() - timedelta(hours=1)
+        for modelo in (Acoes, AcaoPrazo, RelacaoAcaoUsuarioResponsavel):
+            modelo.objects.update(updated_at=passado)
+        varrer_prazos()
+        Acoes.objects.filter(pk=self.distante.pk).update(
+            datdataentrega=timezone.now() + timedelta(days=3),
+            updated_at=timezone.now(),
+        )
+
+        varredura = varrer_prazos()
+
+        self.assertFalse(varredura.iscompleta)
+        self.assertEqual(varredura.intdigestsatualizados, 1)
+        self.assertEqual(DigestPrazoResponsavel.objects.get(pk=self.responsaveis[1].pk).intavencer, 1)
+
+    def test_exclusao_de_relacao_marca_digest(self):
+        """Excluir a relação marca o digest e a varredura seguinte remove a ação"""
+        varrer_prazos()
+        RelacaoAcaoUsuarioResponsavel.objects.get(idacao=self.atrasada).delete()
+        self.assertTrue(DigestPrazoResponsavel.objects.get(pk=self.responsaveis[0].pk).isdesatualizado)
+
+        varrer_prazos()
+
+        digest = obter_digest(self.responsaveis[0].pk)
+        self.assertEqual(digest['atrasadas'], [])
+        self.assertEqual(len(digest['a_vencer']), 1)
+
+    def test_comando_e_endpoint(self):
+        """varrer_prazos via comando e leitura por /usuarios-responsaveis/{id}/prazos/"""
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        url = f'/api/v1/acoes_pngi/usuarios-responsaveis/{self.responsaveis[0].pk}/prazos/'
+        self.assertEqual(client.get(url).status_code, 404)
+
+        call_command('varrer_prazos', stdout=open('/dev/null', 'w'))
+        response = client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['atrasadas'][0]['strapelido'], 'A1')
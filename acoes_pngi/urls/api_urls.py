@@ -19,7 +19,8 @@ from ..views.api_views import (
     TipoAnotacaoAlinhamentoViewSet,
     AcaoAnotacaoAlinhamentoViewSet,
     UsuarioResponsavelViewSet,
-    RelacaoAcaoUsuarioResponsavelViewSet
+    RelacaoAcaoUsuarioResponsavelViewSet,
+    timeline_acoes
 )
 
 app_name = 'acoes_pngi_api'
@@ -46,6 +47,9 @@ urlpatterns = [
     # Autenticação via portal
     path('auth/portal/', portal_auth, name='portal_auth'),
     
+    # Timeline de destaques e anotações
+    path('timeline/', timeline_acoes, name='timeline'),
+    
     # Rotas do router
     path('', include(router.urls)),
 ]
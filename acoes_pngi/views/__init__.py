@@ -34,6 +34,9 @@ from .api_views import (
     # Responsavel
     UsuarioResponsavelViewSet,
     RelacaoAcaoUsuarioResponsavelViewSet,
+    
+    # Timeline
+    timeline_acoes,
 )
 
 # Importa todas as Web views
@@ -97,6 +100,9 @@ __all__ = [
     'UsuarioResponsavelViewSet',
     'RelacaoAcaoUsuarioResponsavelViewSet',
     
+    # API Timeline
+    'timeline_acoes',
+    
     # Web Core
     'EixoListView', 'EixoDetailView', 'EixoCreateView', 'EixoUpdateView', 'EixoDeleteView',
     'SituacaoAcaoListView', 'SituacaoAcaoDetailView', 'SituacaoAcaoCreateView',
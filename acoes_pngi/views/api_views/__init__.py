@@ -37,6 +37,9 @@ from .responsavel_views import (
     RelacaoAcaoUsuarioResponsavelViewSet
 )
 
+# Timeline Views
+from .timeline_views import timeline_acoes
+
 
 __all__ = [
     # Auth
@@ -62,4 +65,7 @@ __all__ = [
     # Responsavel
     'UsuarioResponsavelViewSet',
     'RelacaoAcaoUsuarioResponsavelViewSet',
+    
+    # Timeline
+    'timeline_acoes',
 ]
@@ -4,12 +4,13 @@ Inclui: Acoes, AcaoPrazo, AcaoDestaque.
 """
 
 import logging
-from rest_framework import viewsets, filters
+from rest_framework import viewsets, filters, status
 from rest_framework.decorators import action
+from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 
-from ...models import Acoes, AcaoPrazo, AcaoDestaque
+from ...models import Acoes, AcaoPrazo, AcaoDestaque, VigenciaPNGI
 from ...serializers import (
     AcoesSerializer, AcoesListSerializer,
     AcaoPrazoSerializer,
@@ -65,6 +66,77 @@ class AcoesViewSet(viewsets.ModelViewSet):
         serializer = RelacaoAcaoUsuarioResponsavelSerializer(relacoes, many=True)
         return Response(serializer.data)
 
+    @action(detail=False, methods=['get'])
+    def resumo(self, request):
+        """
+        GET /api/v1/acoes_pngi/acoes/resumo/?idvigenciapngi=1
+
+        Retorna, em uma única chamada, as quebras do dashboard por vigência:
+        tipo de entrave, situação de prazo e responsável.
+        Servido a partir do resumo pré-calculado (ver services.resumo_portfolio).
+        """
+        from ...services.resumo_portfolio import obter_resumos, intervalo_minimo, idade_maxima
+
+        vigencia_ids = None
+        if request.query_params.get('idvigenciapngi'):
+            try:
+                vigencia_ids = [
+                    int(v) for v in request.query_params.get('idvigenciapngi').split(',')
+                ]
+            except ValueError:
+                return Response(
+                    {'detail': 'idvigenciapngi inválido'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+        return Response({
+            'limite_defasagem_segundos': {
+                'alteracoes': intervalo_minimo(),
+                'situacao_prazo': idade_maxima(),
+            },
+            'vigencias': obter_resumos(vigencia_ids),
+        })
+
+    @action(detail=False, methods=['post'], parser_classes=[MultiPartParser, FormParser])
+    def importar(self, request):
+        """
+        POST /api/v1/acoes_pngi/acoes/importar/
+
+        Importa ações em lote a partir de planilha CSV/XLSX.
+
+        Body (multipart/form-data):
+            - arquivo: planilha CSV ou XLSX
+            - idvigenciapngi: vigência que receberá as ações
+            - dry_run: true/false (apenas valida, sem gravar)
+        """
+        from ...services import AcoesImportService, ImportacaoAcoesError, ler_arquivo
+
+        arquivo = request.FILES.get('arquivo')
+        idvigenciapngi = request.data.get('idvigenciapngi')
+        dry_run = str(request.data.get('dry_run', 'false')).lower() == 'true'
+
+        if not arquivo or not idvigenciapngi:
+            return Response(
+                {'detail': 'arquivo e idvigenciapngi são obrigatórios'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            vigencia = VigenciaPNGI.objects.get(pk=idvigenciapngi)
+        except (VigenciaPNGI.DoesNotExist, ValueError):
+            return Response(
+                {'detail': 'Vigência não encontrada'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        try:
+            service = AcoesImportService(vigencia, dry_run=dry_run)
+            relatorio = service.importar(ler_arquivo(arquivo, arquivo.name))
+        except ImportacaoAcoesError as e:
+            return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(relatorio)
+
 
 class AcaoPrazoViewSet(viewsets.ModelViewSet):
     """
@@ -4,7 +4,9 @@ Inclui: UsuarioResponsavel, RelacaoAcaoUsuarioResponsavel.
 """
 
 import logging
-from rest_framework import viewsets, filters
+from rest_framework import viewsets, filters, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 
 from ...models import UsuarioResponsavel, RelacaoAcaoUsuarioResponsavel
@@ -35,6 +37,58 @@ class UsuarioResponsavelViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(strorgao__icontains=self.request.query_params.get('strorgao'))
         return queryset
 
+    @action(detail=False, methods=['get'])
+    def carteira(self, request):
+        """
+        GET /api/v1/acoes_pngi/usuarios-responsaveis/carteira/?idusuarioresponsavel=1,2
+
+        Retorna as ações de cada responsável com prazo ativo e último destaque,
+        e a carga de trabalho por órgão. Filtro opcional: idvigenciapngi.
+        Sem idusuarioresponsavel, considera os responsáveis do filtro strorgao.
+        """
+        from ...services.carteira_responsavel import carteira_responsaveis, carga_por_orgao
+
+        try:
+            vigencia_id = request.query_params.get('idvigenciapngi')
+            vigencia_id = int(vigencia_id) if vigencia_id else None
+            if request.query_params.get('idusuarioresponsavel'):
+                responsavel_ids = [
+                    int(r) for r in request.query_params.get('idusuarioresponsavel').split(',')
+                ]
+            else:
+                responsavel_ids = list(
+                    self.get_queryset().order_by().values_list('idusuario', flat=True)
+                )
+        except ValueError:
+            return Response(
+                {'detail': 'idusuarioresponsavel e idvigenciapngi devem ser inteiros'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return Response({
+            'responsaveis': carteira_responsaveis(responsavel_ids, vigencia_id),
+            'carga_por_orgao': carga_por_orgao(vigencia_id),
+        })
+
+    @action(detail=True, methods=['get'])
+    def prazos(self, request, pk=None):
+        """
+        GET /api/v1/acoes_pngi/usuarios-responsaveis/{id}/prazos/
+
+        Ações atrasadas e a vencer do responsável, lidas do digest gerado pela
+        varredura de prazos (python manage.py varrer_prazos).
+        """
+        from ...services.varredura_prazos import obter_digest
+
+        responsavel = self.get_object()
+        digest = obter_digest(responsavel.pk)
+        if digest is None:
+            return Response(
+                {'detail': 'Digest de prazos ainda não gerado para este responsável'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        return Response(digest)
+
 
 class RelacaoAcaoUsuarioResponsavelViewSet(viewsets.ModelViewSet):
     """
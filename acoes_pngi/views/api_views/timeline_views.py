@@ -0,0 +1,117 @@
+"""
+Timeline de destaques e anotações de alinhamento.
+"""
+
+import json
+import logging
+from datetime import date
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
+
+from ...services.timeline import (
+    CAMPOS,
+    TIPOS,
+    CursorInvalidoError,
+    codificar_cursor,
+    consultar_timeline,
+    decodificar_cursor,
+)
+
+logger = logging.getLogger(__name__)
+
+
+PAGE_SIZE_PADRAO = 100
+PAGE_SIZE_MAXIMO = 1000
+
+
+def _gerar_pagina(linhas, page_size):
+    """
+    Emite a página em JSON à medida que as linhas chegam do banco.
+    A consulta traz page_size + 1 linhas; a excedente só indica que há
+    próxima página e não é enviada.
+    """
+    encoder = DjangoJSONEncoder()
+    ultima = None
+    yield '{"results": ['
+    for posicao, linha in enumerate(linhas):
+        if posicao == page_size:
+            break
+        registro = dict(zip(CAMPOS, linha))
+        yield (',' if posicao else '') + encoder.encode(registro)
+        ultima = registro
+    else:
+        # Sem linha excedente: esta é a última página
+        ultima = None
+
+    proximo = None
+    if ultima is not None:
+        proximo = codificar_cursor(ultima['data'], ultima['tipo'], ultima['id'])
+    yield '], "next_cursor": ' + json.dumps(proximo) + '}'
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def timeline_acoes(request):
+    """
+    Timeline cronológica de destaques e anotações de alinhamento.
+
+    GET /api/v1/acoes_pngi/timeline/?inicio=2026-01-01&fim=2026-03-31
+    Query params:
+        inicio, fim: período (AAAA-MM-DD, inclusive)
+        tipo: destaque ou anotacao (padrão: ambos)
+        idacao: filtra por ação
+        page_size: itens por página (padrão 100, máximo 1000)
+        cursor: valor de next_cursor da página anterior
+    """
+    try:
+        inicio = request.query_params.get('inicio')
+        inicio = date.fromisoformat(inicio) if inicio else None
+        fim = request.query_params.get('fim')
+        fim = date.fromisoformat(fim) if fim else None
+    except ValueError:
+        return Response(
+            {'detail': 'inicio e fim devem estar no formato AAAA-MM-DD'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    tipo = request.query_params.get('tipo')
+    if tipo and tipo not in TIPOS:
+        return Response(
+            {'detail': f"tipo deve ser um de: {', '.join(TIPOS)}"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    try:
+        page_size = int(request.query_params.get('page_size', PAGE_SIZE_PADRAO))
+        idacao = request.query_params.get('idacao')
+        idacao = int(idacao) if idacao else None
+    except ValueError:
+        return Response(
+            {'detail': 'page_size e idacao devem ser inteiros'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    page_size = max(1, min(page_size, PAGE_SIZE_MAXIMO))
+
+    cursor = request.query_params.get('cursor')
+    try:
+        cursor = decodificar_cursor(cursor) if cursor else None
+    except CursorInvalidoError as e:
+        return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    linhas = consultar_timeline(
+        inicio=inicio,
+        fim=fim,
+        cursor=cursor,
+        limite=page_size + 1,
+        tipos=(tipo,) if tipo else TIPOS,
+        idacao=idacao,
+    )
+    return StreamingHttpResponse(
+        _gerar_pagina(linhas.iterator(), page_size),
+        content_type='application/json'
+    )
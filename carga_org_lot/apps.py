@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class CargaOrgLotConfig(AppConfig):
     name = 'carga_org_lot'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,120 @@
+"""
+Envia à API externa os JSONs de organograma e de lotação (services.envio_api).
+
+Uso:
+    python manage.py enviar_cargas --patriarca SEGER
+    python manage.py enviar_cargas --lotacao-versao 12 --workers 16
+    python manage.py enviar_cargas --organograma-versao 3 --forcar
+    python manage.py enviar_cargas --patriarca SEGER --stub --stub-latencia 0.2 --stub-taxa-erro 0.1
+    python manage.py enviar_cargas --pendentes
+
+--patriarca envia o organograma e a lotação das versões ativas do patriarca.
+--pendentes envia a fila (registros PENDENTE, ver enviar_em_lote); agendado
+em cron, é o worker da fila. Execuções sobrepostas não repetem registros, e
+os que falham voltam à fila até CARGA_ORG_LOT_FILA_EXECUCOES.
+--stub envia para um receptor local (services.receptor_stub), sem a API real.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from carga_org_lot.models import (
+    TblLotacaoJsonOrgao,
+    TblLotacaoVersao,
+    TblOrganogramaJson,
+    TblOrganogramaVersao,
+    TblPatriarca,
+)
+from carga_org_lot.services import ConfigEnvio, EnvioApiError, enviar_jsons
+from carga_org_lot.services.envio_api import registros_pendentes
+from carga_org_lot.services.receptor_stub import ReceptorStub
+
+
+class Command(BaseCommand):
+    help = 'Envia os JSONs de organograma e lotação à API externa'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--patriarca', help='Sigla do patriarca (versões ativas)')
+        parser.add_argument('--organograma-versao', type=int)
+        parser.add_argument('--lotacao-versao', type=int)
+        parser.add_argument('--pendentes', action='store_true', help='Envia a fila de envio')
+        parser.add_argument('--forcar', action='store_true', help='Reenvia conteúdos já recebidos')
+        parser.add_argument('--workers', type=int, help='Envios simultâneos (padrão: settings)')
+        parser.add_argument('--stub', action='store_true', help='Envia para um receptor local')
+        parser.add_argument('--stub-latencia', type=float, default=0.0, help='Segundos por requisição')
+        parser.add_argument('--stub-taxa-erro', type=float, default=0.0, help='Fração de respostas 503')
+
+    def handle(self, *args, **options):
+        registros = self._registros(options)
+        if not registros:
+            self.stdout.write('Nenhum JSON para enviar.')
+            return
+
+        if options['stub']:
+            receptor = ReceptorStub(
+                latencia=options['stub_latencia'], taxa_erro=options['stub_taxa_erro']
+            ).iniciar()
+            self.stdout.write(f'Receptor local em {receptor.url}')
+        else:
+            receptor = None
+        try:
+            config = ConfigEnvio.do_settings(
+                url=receptor.url if receptor else None, workers=options['workers']
+            )
+            inicio = time.perf_counter()
+            # Da fila sai tudo: o filtro do que o receptor já tem foi feito
+            # ao enfileirar
+            resultados = enviar_jsons(
+                registros, forcar=options['forcar'] or options['pendentes'], config=config
+            )
+            duracao = time.perf_counter() - inicio
+        except EnvioApiError as e:
+            raise CommandError(str(e))
+        finally:
+            if receptor is not None:
+                receptor.parar()
+
+        erros = [r for r in resultados if not (r.enviado or r.dispensado)]
+        for resultado in erros:
+            registro = resultado.registro
+            self.stdout.write(self.style.ERROR(
+                f'{type(registro).__name__} {registro.pk}: {resultado.mensagem}'
+            ))
+        self.stdout.write(self.style.SUCCESS(
+            f'{sum(r.enviado for r in resultados)} enviados, '
+            f'{sum(r.dispensado for r in resultados)} dispensados, {len(erros)} com erro, '
+            f'{sum(r.tentativas for r in resultados)} tentativas em {duracao:.1f}s'
+        ))
+
+    def _registros(self, options):
+        if options['pendentes']:
+            return registros_pendentes()
+        organogramas, lotacoes = options['organograma_versao'], options['lotacao_versao']
+        if options['patriarca']:
+            patriarca = TblPatriarca.objects.filter(
+                str_sigla_patriarca=options['patriarca']
+            ).first()
+            if patriarca is None:
+                raise CommandError(f"Patriarca {options['patriarca']} não encontrado")
+            organogramas = TblOrganogramaVersao.objects.filter(
+                id_patriarca=patriarca, flg_ativo=True
+            ).values_list('pk', flat=True).first()
+            lotacoes = TblLotacaoVersao.objects.filter(
+                id_patriarca=patriarca, flg_ativo=True
+            ).values_list('pk', flat=True).first()
+        elif organogramas is None and lotacoes is None:
+            raise CommandError(
+                'Informe --patriarca, --organograma-versao, --lotacao-versao ou --pendentes'
+            )
+
+        registros = []
+        if organogramas is not None:
+            registros += TblOrganogramaJson.objects.filter(
+                id_organograma_versao=organogramas
+            ).select_related('id_organograma_versao__id_patriarca').defer('js_conteudo')
+        if lotacoes is not None:
+            registros += TblLotacaoJsonOrgao.objects.filter(
+                id_lotacao_versao=lotacoes
+            ).select_related('id_patriarca').defer('js_conteudo').order_by('id_lotacao_json_orgao')
+        return registros
@@ -0,0 +1,61 @@
+"""
+Expurga as versões de organograma e de lotação fora da retenção
+(services.retencao).
+
+Uso:
+    python manage.py expurgar_versoes --simular
+    python manage.py expurgar_versoes --manter 5 --patriarca SEGER
+    python manage.py expurgar_versoes --arquivar /var/backups/carga --lote 2000 --pausa 1
+
+--arquivar exporta as linhas de cada versão (CSV com gzip) antes de apagá-las.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from carga_org_lot.models import TblPatriarca
+from carga_org_lot.services import expurgar_versoes
+
+
+class Command(BaseCommand):
+    help = 'Expurga, em lotes, as versões de organograma e lotação fora da retenção'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--manter', type=int, help='Versões mantidas por patriarca (padrão: settings)')
+        parser.add_argument('--patriarca', help='Sigla do patriarca (padrão: todos)')
+        parser.add_argument('--arquivar', metavar='DIRETORIO', help='Exporta as versões antes de apagar')
+        parser.add_argument('--lote', type=int, help='Linhas por DELETE (padrão: settings)')
+        parser.add_argument('--pausa', type=float, help='Segundos entre os lotes (padrão: settings)')
+        parser.add_argument('--simular', action='store_true', help='Só lista as versões a expurgar')
+
+    def handle(self, *args, **options):
+        if options['manter'] is not None and options['manter'] < 1:
+            raise CommandError('--manter deve ser pelo menos 1')
+        id_patriarca = None
+        if options['patriarca']:
+            id_patriarca = TblPatriarca.objects.filter(
+                str_sigla_patriarca=options['patriarca']
+            ).values_list('pk', flat=True).first()
+            if id_patriarca is None:
+                raise CommandError(f"Patriarca {options['patriarca']} não encontrado")
+
+        resultado = expurgar_versoes(
+            manter=options['manter'],
+            id_patriarca=id_patriarca,
+            diretorio=options['arquivar'],
+            lote=options['lote'],
+            pausa=options['pausa'],
+            simular=options['simular'],
+            progresso=None if options['simular'] else self.stdout.write,
+        )
+
+        if options['simular']:
+            self.stdout.write(f'Versões de lotação a expurgar: {resultado.versoes_lotacao or "nenhuma"}')
+            self.stdout.write(f'Versões de organograma a expurgar: {resultado.versoes_organograma or "nenhuma"}')
+            return
+        linhas = ', '.join(f'{tabela}: {total}' for tabela, total in resultado.linhas.items())
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(resultado.versoes_lotacao)} versões de lotação e '
+            f'{len(resultado.versoes_organograma)} de organograma expurgadas em '
+            f'{resultado.duracao_ms / 1000:.1f}s ({linhas or "nenhuma linha"}); '
+            f'{len(resultado.arquivos)} arquivos'
+        ))
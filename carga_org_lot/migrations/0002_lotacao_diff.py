@@ -0,0 +1,84 @@
+# Generated by Django 6.0.1 on 2026-10-19 16:05
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('carga_org_lot', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TblLotacaoDiff',
+            fields=[
+                ('id_lotacao_diff', models.BigAutoField(db_column='idlotacaodiff', primary_key=True, serialize=False)),
+                ('int_admissoes', models.IntegerField(db_column='intadmissoes', default=0)),
+                ('int_desligamentos', models.IntegerField(db_column='intdesligamentos', default=0)),
+                ('int_movimentacoes', models.IntegerField(db_column='intmovimentacoes', default=0)),
+                ('int_mudancas_cargo', models.IntegerField(db_column='intmudancascargo', default=0)),
+                ('int_inalterados', models.IntegerField(db_column='intinalterados', default=0)),
+                ('int_duracao_ms', models.IntegerField(db_column='intduracaoms', default=0)),
+                ('dat_calculo', models.DateTimeField(db_column='datcalculo')),
+            ],
+            options={
+                'verbose_name': 'Diff de Lotação',
+                'verbose_name_plural': 'Diffs de Lotação',
+                'db_table': '"carga_org_lot"."tbllotacaodiff"',
+                'managed': True,
+            },
+        ),
+        migrations.CreateModel(
+            name='TblLotacaoDiffItem',
+            fields=[
+                ('id_lotacao_diff_item', models.BigAutoField(db_column='idlotacaodiffitem', primary_key=True, serialize=False)),
+                ('str_cpf', models.CharField(db_column='strcpf', max_length=14)),
+                ('str_tipo', models.CharField(db_column='strtipo', max_length=20)),
+                ('flg_movido', models.BooleanField(db_column='flgmovido', default=False)),
+                ('flg_cargo_alterado', models.BooleanField(db_column='flgcargoalterado', default=False)),
+                ('str_orgao_base', models.CharField(blank=True, db_column='strorgaobase', max_length=50, null=True)),
+                ('str_unidade_base', models.CharField(blank=True, db_column='strunidadebase', max_length=50, null=True)),
+                ('str_cargo_base', models.CharField(blank=True, db_column='strcargobase', max_length=255, null=True)),
+                ('str_orgao_novo', models.CharField(blank=True, db_column='strorgaonovo', max_length=50, null=True)),
+                ('str_unidade_novo', models.CharField(blank=True, db_column='strunidadenovo', max_length=50, null=True)),
+                ('str_cargo_novo', models.CharField(blank=True, db_column='strcargonovo', max_length=255, null=True)),
+            ],
+            options={
+                'verbose_name': 'Item de Diff de Lotação',
+                'verbose_name_plural': 'Itens de Diff de Lotação',
+                'db_table': '"carga_org_lot"."tbllotacaodiffitem"',
+                'managed': True,
+            },
+        ),
+        migrations.AddIndex(
+            model_name='tbllotacao',
+            index=models.Index(fields=['id_lotacao_versao', 'str_cpf'], name='idx_lotacao_versao_cpf'),
+        ),
+        migrations.AddField(
+            model_name='tbllotacaodiff',
+            name='id_lotacao_versao_base',
+            field=models.ForeignKey(db_column='idlotacaoversaobase', on_delete=django.db.models.deletion.CASCADE, related_name='diffs_como_base', to='carga_org_lot.tbllotacaoversao'),
+        ),
+        migrations.AddField(
+            model_name='tbllotacaodiff',
+            name='id_lotacao_versao_nova',
+            field=models.ForeignKey(db_column='idlotacaoversaonova', on_delete=django.db.models.deletion.CASCADE, related_name='diffs_como_nova', to='carga_org_lot.tbllotacaoversao'),
+        ),
+        migrations.AddField(
+            model_name='tbllotacaodiffitem',
+            name='id_lotacao_diff',
+            field=models.ForeignKey(db_column='idlotacaodiff', on_delete=django.db.models.deletion.CASCADE, related_name='itens', to='carga_org_lot.tbllotacaodiff'),
+        ),
+        migrations.AddConstraint(
+            model_name='tbllotacaodiff',
+            constraint=models.UniqueConstraint(fields=('id_lotacao_versao_base', 'id_lotacao_versao_nova'), name='uq_lotacao_diff_versoes'),
+        ),
+        migrations.AddIndex(
+            model_name='tbllotacaodiffitem',
+            index=models.Index(fields=['id_lotacao_diff', 'str_cpf'], name='idx_lotacao_diff_item_cpf'),
+        ),
+    ]
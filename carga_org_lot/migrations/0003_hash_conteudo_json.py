@@ -0,0 +1,33 @@
+# Generated by Django 6.0.1 on 2026-10-19 16:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('carga_org_lot', '0002_lotacao_diff'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tbllotacaojsonorgao',
+            name='str_hash_conteudo',
+            field=models.CharField(blank=True, db_column='strhashconteudo', max_length=64, null=True),
+        ),
+        migrations.AddField(
+            model_name='tbllotacaojsonorgao',
+            name='str_hash_enviado',
+            field=models.CharField(blank=True, db_column='strhashenviado', max_length=64, null=True),
+        ),
+        migrations.AddField(
+            model_name='tblorganogramajson',
+            name='str_hash_conteudo',
+            field=models.CharField(blank=True, db_column='strhashconteudo', max_length=64, null=True),
+        ),
+        migrations.AddField(
+            model_name='tblorganogramajson',
+            name='str_hash_enviado',
+            field=models.CharField(blank=True, db_column='strhashenviado', max_length=64, null=True),
+        ),
+    ]
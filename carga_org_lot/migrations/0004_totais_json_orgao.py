@@ -0,0 +1,34 @@
+# Generated by Django 6.0.1 on 2026-10-19 16:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('carga_org_lot', '0003_hash_conteudo_json'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tbllotacaojsonorgao',
+            name='int_tamanho_bytes',
+            field=models.BigIntegerField(db_column='inttamanhobytes', default=0),
+        ),
+        migrations.AddField(
+            model_name='tbllotacaojsonorgao',
+            name='int_total_servidores',
+            field=models.IntegerField(db_column='inttotalservidores', default=0),
+        ),
+        # Preenche os registros existentes no próprio banco
+        migrations.RunSQL(
+            sql="""
+                UPDATE "carga_org_lot"."tbllotacaojsonorgao" SET
+                    inttotalservidores = CASE
+                        WHEN jsonb_typeof(jsconteudo -> 'servidores') = 'array'
+                        THEN jsonb_array_length(jsconteudo -> 'servidores') ELSE 0 END,
+                    inttamanhobytes = octet_length(jsconteudo::text)
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
@@ -0,0 +1,152 @@
+# Generated by Django 6.0.1 on 2026-10-19 18:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+SCHEMA = 'carga_org_lot'
+
+# (tabela, coluna da PK); a inconsistência depende da lotação e vem depois
+TABELAS = (
+    ('tbllotacao', 'idlotacao'),
+    ('tbllotacaoinconsistencia', 'idinconsistencia'),
+)
+
+FK_COMPOSTA = 'tbllotacaoinconsistencia_lotacao_fk'
+FK_SIMPLES = 'tbllotacaoinconsiste_idlotacao_3aaec310_fk_tbllotaca'
+
+
+def _definicoes(cursor, tabela):
+    """Índices (menos o da PK) e FKs da tabela, para recriar na nova."""
+    cursor.execute(
+        """
+        SELECT indexdef FROM pg_indexes
+        WHERE schemaname = %s AND tablename = %s AND indexname <> %s
+        """,
+        [SCHEMA, tabela, f'{tabela}_pkey']
+    )
+    indices = [indexdef.replace(' ON ONLY ', ' ON ') for indexdef, in cursor.fetchall()]
+    cursor.execute(
+        """
+        SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint
+        WHERE conrelid = %s::regclass AND contype = 'f'
+        """,
+        [f'"{SCHEMA}"."{tabela}"']
+    )
+    return indices, cursor.fetchall()
+
+
+def _reconstruir(cursor, tabela, pk, particionar):
+    """
+    Recria a tabela (particionada por idlotacaoversao ou não) com as mesmas
+    colunas, identidade, índices e FKs, copiando as linhas.
+    """
+    indices, fks = _definicoes(cursor, tabela)
+    antiga = f'{tabela}_antiga'
+    cursor.execute(f'ALTER TABLE "{SCHEMA}"."{tabela}" RENAME TO "{antiga}"')
+    cursor.execute(
+        f'CREATE TABLE "{SCHEMA}"."{tabela}" '
+        f'(LIKE "{SCHEMA}"."{antiga}" INCLUDING DEFAULTS INCLUDING IDENTITY)'
+        + (' PARTITION BY LIST (idlotacaoversao)' if particionar else '')
+    )
+    if particionar:
+        cursor.execute(f'SELECT idlotacaoversao FROM "{SCHEMA}"."tbllotacaoversao"')
+        for id_versao, in cursor.fetchall():
+            cursor.execute(
+                f'CREATE TABLE "{SCHEMA}"."{tabela}_v{id_versao}" '
+                f'PARTITION OF "{SCHEMA}"."{tabela}" FOR VALUES IN ({id_versao})'
+            )
+    cursor.execute(f'INSERT INTO "{SCHEMA}"."{tabela}" SELECT * FROM "{SCHEMA}"."{antiga}"')
+    cursor.execute(f'DROP TABLE "{SCHEMA}"."{antiga}"')
+
+    colunas_pk = f'{pk}, idlotacaoversao' if particionar else pk
+    cursor.execute(
+        f'ALTER TABLE "{SCHEMA}"."{tabela}" ADD CONSTRAINT "{tabela}_pkey" PRIMARY KEY ({colunas_pk})'
+    )
+    for indexdef in indices:
+        cursor.execute(indexdef)
+    for nome, definicao in fks:
+        cursor.execute(f'ALTER TABLE "{SCHEMA}"."{tabela}" ADD CONSTRAINT "{nome}" {definicao}')
+
+    # A identidade da nova tabela tem sequência própria: continua da antiga e
+    # herda o nome dela
+    cursor.execute('SELECT pg_get_serial_sequence(%s, %s)', [f'"{SCHEMA}"."{tabela}"', pk])
+    sequencia, = cursor.fetchone()
+    cursor.execute(
+        f'SELECT setval(%s, COALESCE((SELECT max({pk}) FROM "{SCHEMA}"."{tabela}"), 0) + 1, false)',
+        [sequencia]
+    )
+    if sequencia.split('.')[-1].strip('"') != f'{tabela}_{pk}_seq':
+        cursor.execute(f'ALTER SEQUENCE {sequencia} RENAME TO "{tabela}_{pk}_seq"')
+
+
+def particionar(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            f'ALTER TABLE "{SCHEMA}"."tbllotacaoinconsistencia" DROP CONSTRAINT IF EXISTS "{FK_SIMPLES}"'
+        )
+        for tabela, pk in TABELAS:
+            _reconstruir(cursor, tabela, pk, particionar=True)
+        cursor.execute(
+            f'ALTER TABLE "{SCHEMA}"."tbllotacaoinconsistencia" ADD CONSTRAINT "{FK_COMPOSTA}" '
+            f'FOREIGN KEY (idlotacao, idlotacaoversao) '
+            f'REFERENCES "{SCHEMA}"."tbllotacao" (idlotacao, idlotacaoversao) '
+            f'ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED'
+        )
+
+
+def desparticionar(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            f'ALTER TABLE "{SCHEMA}"."tbllotacaoinconsistencia" DROP CONSTRAINT "{FK_COMPOSTA}"'
+        )
+        for tabela, pk in TABELAS:
+            _reconstruir(cursor, tabela, pk, particionar=False)
+        cursor.execute(
+            f'ALTER TABLE "{SCHEMA}"."tbllotacaoinconsistencia" ADD CONSTRAINT "{FK_SIMPLES}" '
+            f'FOREIGN KEY (idlotacao) REFERENCES "{SCHEMA}"."tbllotacao" (idlotacao) '
+            f'DEFERRABLE INITIALLY DEFERRED'
+        )
+
+
+class Migration(migrations.Migration):
+
+    # DDL e cópia das linhas na mesma transação
+    atomic = True
+
+    dependencies = [
+        ('carga_org_lot', '0004_totais_json_orgao'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tbllotacaoinconsistencia',
+            name='id_lotacao_versao',
+            field=models.ForeignKey(db_column='idlotacaoversao', null=True, on_delete=django.db.models.deletion.CASCADE, to='carga_org_lot.tbllotacaoversao'),
+        ),
+        migrations.RunSQL(
+            sql="""
+                UPDATE "carga_org_lot"."tbllotacaoinconsistencia" AS i
+                SET idlotacaoversao = l.idlotacaoversao
+                FROM "carga_org_lot"."tbllotacao" AS l
+                WHERE l.idlotacao = i.idlotacao
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AlterField(
+            model_name='tbllotacaoinconsistencia',
+            name='id_lotacao_versao',
+            field=models.ForeignKey(db_column='idlotacaoversao', on_delete=django.db.models.deletion.CASCADE, to='carga_org_lot.tbllotacaoversao'),
+        ),
+        # A FK simples dá lugar à composta, criada em particionar
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='tbllotacaoinconsistencia',
+                    name='id_lotacao',
+                    field=models.ForeignKey(db_column='idlotacao', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, to='carga_org_lot.tbllotacao'),
+                ),
+            ],
+        ),
+        migrations.RunPython(particionar, desparticionar),
+    ]
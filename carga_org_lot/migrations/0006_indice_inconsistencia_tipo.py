@@ -0,0 +1,17 @@
+# Generated by Django 6.0.1 on 2026-10-19 18:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('carga_org_lot', '0005_particionar_lotacao'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='tbllotacaoinconsistencia',
+            index=models.Index(fields=['id_lotacao_versao', 'str_tipo', 'id_inconsistencia'], name='idx_inconsistencia_versao_tipo'),
+        ),
+    ]
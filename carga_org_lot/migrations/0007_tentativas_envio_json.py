@@ -0,0 +1,23 @@
+# Generated by Django 6.0.1 on 2026-10-19 19:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('carga_org_lot', '0006_indice_inconsistencia_tipo'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tbllotacaojsonorgao',
+            name='int_tentativas_envio',
+            field=models.IntegerField(db_column='inttentativasenvio', default=0),
+        ),
+        migrations.AddField(
+            model_name='tblorganogramajson',
+            name='int_tentativas_envio',
+            field=models.IntegerField(db_column='inttentativasenvio', default=0),
+        ),
+    ]
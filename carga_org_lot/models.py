@@ -148,10 +148,15 @@ class TblOrganogramaJson(models.Model):
         db_column='idorganogramaversao'
     )
     js_conteudo = models.JSONField(db_column='jsconteudo')
+    # Hash canônico do conteúdo (services.conteudo_json) e o do último envio
+    str_hash_conteudo = models.CharField(max_length=64, null=True, blank=True, db_column='strhashconteudo')
+    str_hash_enviado = models.CharField(max_length=64, null=True, blank=True, db_column='strhashenviado')
     dat_criacao = models.DateTimeField(db_column='datcriacao')
     dat_envio_api = models.DateTimeField(null=True, blank=True, db_column='datenvioapi')
     str_status_envio = models.CharField(max_length=30, null=True, blank=True, db_column='strstatusenvio')
     str_mensagem_retorno = models.TextField(null=True, blank=True, db_column='strmensagemretorno')
+    # Execuções da fila de envio que já pegaram o registro (services.envio_api)
+    int_tentativas_envio = models.IntegerField(default=0, db_column='inttentativasenvio')
 
     class Meta:
         db_table = '"carga_org_lot"."tblorganogramajson"'
@@ -252,15 +257,98 @@ class TblLotacao(models.Model):
     )
 
     class Meta:
+        # Particionada por versão (LIST idlotacaoversao), com uma partição por
+        # TblLotacaoVersao (services.particoes); no banco a PK é
+        # (idlotacao, idlotacaoversao)
         db_table = '"carga_org_lot"."tbllotacao"'
         managed = True
         verbose_name = 'Lotação'
         verbose_name_plural = 'Lotações'
+        indexes = [
+            # Diff entre versões por CPF (services.diff_lotacao)
+            models.Index(fields=['id_lotacao_versao', 'str_cpf'], name='idx_lotacao_versao_cpf'),
+        ]
 
     def __str__(self):
         return f"Lotação {self.str_cpf} - {self.id_orgao_lotacao.str_sigla}"
 
 
+class TblLotacaoDiff(models.Model):
+    """Comparação entre duas versões de lotação (resumo)"""
+    id_lotacao_diff = models.BigAutoField(primary_key=True, db_column='idlotacaodiff')
+    id_lotacao_versao_base = models.ForeignKey(
+        TblLotacaoVersao,
+        on_delete=models.CASCADE,
+        related_name='diffs_como_base',
+        db_column='idlotacaoversaobase'
+    )
+    id_lotacao_versao_nova = models.ForeignKey(
+        TblLotacaoVersao,
+        on_delete=models.CASCADE,
+        related_name='diffs_como_nova',
+        db_column='idlotacaoversaonova'
+    )
+    int_admissoes = models.IntegerField(default=0, db_column='intadmissoes')
+    int_desligamentos = models.IntegerField(default=0, db_column='intdesligamentos')
+    int_movimentacoes = models.IntegerField(default=0, db_column='intmovimentacoes')
+    int_mudancas_cargo = models.IntegerField(default=0, db_column='intmudancascargo')
+    int_inalterados = models.IntegerField(default=0, db_column='intinalterados')
+    int_duracao_ms = models.IntegerField(default=0, db_column='intduracaoms')
+    dat_calculo = models.DateTimeField(db_column='datcalculo')
+
+    class Meta:
+        db_table = '"carga_org_lot"."tbllotacaodiff"'
+        managed = True
+        verbose_name = 'Diff de Lotação'
+        verbose_name_plural = 'Diffs de Lotação'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['id_lotacao_versao_base', 'id_lotacao_versao_nova'],
+                name='uq_lotacao_diff_versoes',
+            ),
+        ]
+
+    def __str__(self):
+        return f"Diff lotação v{self.id_lotacao_versao_base_id} -> v{self.id_lotacao_versao_nova_id}"
+
+
+class TblLotacaoDiffItem(models.Model):
+    """Servidor admitido, desligado ou alterado entre duas versões de lotação"""
+    TIPO_ADMISSAO = 'ADMISSAO'
+    TIPO_DESLIGAMENTO = 'DESLIGAMENTO'
+    TIPO_ALTERACAO = 'ALTERACAO'
+
+    id_lotacao_diff_item = models.BigAutoField(primary_key=True, db_column='idlotacaodiffitem')
+    id_lotacao_diff = models.ForeignKey(
+        TblLotacaoDiff,
+        on_delete=models.CASCADE,
+        related_name='itens',
+        db_column='idlotacaodiff'
+    )
+    str_cpf = models.CharField(max_length=14, db_column='strcpf')
+    str_tipo = models.CharField(max_length=20, db_column='strtipo')
+    flg_movido = models.BooleanField(default=False, db_column='flgmovido')
+    flg_cargo_alterado = models.BooleanField(default=False, db_column='flgcargoalterado')
+    str_orgao_base = models.CharField(max_length=50, null=True, blank=True, db_column='strorgaobase')
+    str_unidade_base = models.CharField(max_length=50, null=True, blank=True, db_column='strunidadebase')
+    str_cargo_base = models.CharField(max_length=255, null=True, blank=True, db_column='strcargobase')
+    str_orgao_novo = models.CharField(max_length=50, null=True, blank=True, db_column='strorgaonovo')
+    str_unidade_novo = models.CharField(max_length=50, null=True, blank=True, db_column='strunidadenovo')
+    str_cargo_novo = models.CharField(max_length=255, null=True, blank=True, db_column='strcargonovo')
+
+    class Meta:
+        db_table = '"carga_org_lot"."tbllotacaodiffitem"'
+        managed = True
+        verbose_name = 'Item de Diff de Lotação'
+        verbose_name_plural = 'Itens de Diff de Lotação'
+        indexes = [
+            models.Index(fields=['id_lotacao_diff', 'str_cpf'], name='idx_lotacao_diff_item_cpf'),
+        ]
+
+    def __str__(self):
+        return f"{self.str_tipo} - {self.str_cpf}"
+
+
 class TblLotacaoJsonOrgao(models.Model):
     """JSON de lotação por órgão para envio à API"""
     id_lotacao_json_orgao = models.BigAutoField(primary_key=True, db_column='idlotacaojsonorgao')
@@ -285,10 +373,18 @@ class TblLotacaoJsonOrgao(models.Model):
         db_column='idorgaolotacao'
     )
     js_conteudo = models.JSONField(db_column='jsconteudo')
+    # Hash canônico do conteúdo (services.conteudo_json) e o do último envio
+    str_hash_conteudo = models.CharField(max_length=64, null=True, blank=True, db_column='strhashconteudo')
+    str_hash_enviado = models.CharField(max_length=64, null=True, blank=True, db_column='strhashenviado')
+    # Guardados na geração para a listagem não carregar o js_conteudo
+    int_total_servidores = models.IntegerField(default=0, db_column='inttotalservidores')
+    int_tamanho_bytes = models.BigIntegerField(default=0, db_column='inttamanhobytes')
     dat_criacao = models.DateTimeField(db_column='datcriacao')
     dat_envio_api = models.DateTimeField(null=True, blank=True, db_column='datenvioapi')
     str_status_envio = models.CharField(max_length=30, null=True, blank=True, db_column='strstatusenvio')
     str_mensagem_retorno = models.TextField(null=True, blank=True, db_column='strmensagemretorno')
+    # Execuções da fila de envio que já pegaram o registro (services.envio_api)
+    int_tentativas_envio = models.IntegerField(default=0, db_column='inttentativasenvio')
 
     class Meta:
         db_table = '"carga_org_lot"."tbllotacaojsonorgao"'
@@ -302,25 +398,54 @@ class TblLotacaoJsonOrgao(models.Model):
 
 class TblLotacaoInconsistencia(models.Model):
     """Inconsistências encontradas na lotação"""
+    TIPO_CPF_INVALIDO = 'CPF_INVALIDO'
+    TIPO_CPF_DUPLICADO = 'CPF_DUPLICADO'
+    TIPO_ORGAO_DESCONHECIDO = 'ORGAO_DESCONHECIDO'
+    TIPO_UNIDADE_DESCONHECIDA = 'UNIDADE_DESCONHECIDA'
+    TIPO_CARGO_AUSENTE = 'CARGO_AUSENTE'
+
     id_inconsistencia = models.BigAutoField(primary_key=True, db_column='idinconsistencia')
+    # No banco a FK é composta (idlotacao, idlotacaoversao) com ON DELETE
+    # CASCADE, exigida pelo particionamento de tbllotacao; a cascata fica com
+    # o banco para as lotações serem apagadas em lote (fast delete)
     id_lotacao = models.ForeignKey(
         TblLotacao,
+        on_delete=models.DO_NOTHING,
+        db_column='idlotacao',
+        db_constraint=False
+    )
+    id_lotacao_versao = models.ForeignKey(
+        TblLotacaoVersao,
         on_delete=models.CASCADE,
-        db_column='idlotacao'
+        db_column='idlotacaoversao'
     )
     str_tipo = models.CharField(max_length=100, db_column='strtipo')
     str_detalhe = models.TextField(db_column='strdetalhe')
     dat_registro = models.DateTimeField(db_column='datregistro')
 
     class Meta:
+        # Particionada por versão, como tbllotacao
         db_table = '"carga_org_lot"."tbllotacaoinconsistencia"'
         managed = True
         verbose_name = 'Inconsistência de Lotação'
         verbose_name_plural = 'Inconsistências de Lotação'
+        indexes = [
+            # Detalhe por tipo, paginado por id (lotacao/{id}/inconsistencias/)
+            models.Index(
+                fields=['id_lotacao_versao', 'str_tipo', 'id_inconsistencia'],
+                name='idx_inconsistencia_versao_tipo',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.str_tipo} - Lotação {self.id_lotacao_id}"
 
+    def save(self, *args, **kwargs):
+        # A versão (chave de partição) acompanha a da lotação
+        if self.id_lotacao_versao_id is None and self.id_lotacao_id is not None:
+            self.id_lotacao_versao_id = self.id_lotacao.id_lotacao_versao_id
+        super().save(*args, **kwargs)
+
 
 class TblStatusTokenEnvioCarga(models.Model):
     """Status do token de envio de carga"""
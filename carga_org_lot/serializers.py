@@ -100,7 +100,7 @@ class TblOrganogramaJsonSerializer(serializers.ModelSerializer):
     class Meta:
         model = TblOrganogramaJson
         fields = '__all__'
-        read_only_fields = ('id_organograma_json', 'dat_criacao')
+        read_only_fields = ('id_organograma_json', 'dat_criacao', 'str_hash_conteudo', 'str_hash_enviado')
 
 
 class TblLotacaoVersaoSerializer(serializers.ModelSerializer):
@@ -133,22 +133,24 @@ class TblLotacaoJsonOrgaoSerializer(serializers.ModelSerializer):
     orgao_sigla = serializers.CharField(source='id_orgao_lotacao.str_sigla', read_only=True)
     orgao_nome = serializers.CharField(source='id_orgao_lotacao.str_nome', read_only=True)
     
-    # Estatísticas do JSON (calculadas)
-    total_servidores = serializers.SerializerMethodField()
+    # Gravado na geração (services.conteudo_json.atualizar_totais)
+    total_servidores = serializers.IntegerField(source='int_total_servidores', read_only=True)
     
     class Meta:
         model = TblLotacaoJsonOrgao
         fields = '__all__'
-        read_only_fields = ('id_lotacao_json_orgao', 'dat_criacao')
+        read_only_fields = (
+            'id_lotacao_json_orgao', 'dat_criacao', 'str_hash_conteudo', 'str_hash_enviado',
+            'int_total_servidores', 'int_tamanho_bytes',
+        )
+
+
+class TblLotacaoJsonOrgaoListSerializer(TblLotacaoJsonOrgaoSerializer):
+    """Listagem de JSON Lotação por Órgão: sem o js_conteudo"""
     
-    def get_total_servidores(self, obj):
-        """Extrai total de servidores do JSON"""
-        try:
-            if obj.js_conteudo and isinstance(obj.js_conteudo, dict):
-                return len(obj.js_conteudo.get('servidores', []))
-        except:
-            pass
-        return 0
+    class Meta(TblLotacaoJsonOrgaoSerializer.Meta):
+        fields = None
+        exclude = ('js_conteudo',)
 
 
 class TblLotacaoInconsistenciaSerializer(serializers.ModelSerializer):
@@ -158,7 +160,7 @@ class TblLotacaoInconsistenciaSerializer(serializers.ModelSerializer):
     class Meta:
         model = TblLotacaoInconsistencia
         fields = '__all__'
-        read_only_fields = ('id_inconsistencia', 'dat_registro')
+        read_only_fields = ('id_inconsistencia', 'id_lotacao_versao', 'dat_registro')
 
 
 class TblTokenEnvioCargaSerializer(serializers.ModelSerializer):
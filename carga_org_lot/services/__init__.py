@@ -0,0 +1,86 @@
+"""
+Serviços da aplicação Carga Org/Lot
+"""
+from .conteudo_json import (
+    atualizar_totais,
+    contar_servidores,
+    garantir_hash,
+    hash_conteudo,
+    ler_conteudo_bruto,
+    receptor_tem_conteudo,
+    regenerar_json_orgao,
+)
+from .diff_lotacao import (
+    DiffLotacaoError,
+    calcular_diff_lotacao,
+    diff_lotacao,
+)
+from .diff_organograma import (
+    calcular_diff,
+    diff_organograma,
+    filtro_lotacoes_afetadas,
+    invalidar_versao,
+)
+from .envio_api import (
+    ConfigEnvio,
+    EnvioApiError,
+    ResultadoEnvio,
+    enfileirar_envio,
+    enviar_jsons,
+)
+from .normalizacao_cargo import (
+    NormalizadorCargos,
+    ResultadoNormalizacao,
+    normalizar_cargos_lotacao,
+)
+from .particoes import (
+    criar_particoes,
+    descartar_particoes,
+    listar_particoes,
+)
+from .retencao import (
+    ResultadoExpurgo,
+    expurgar_versoes,
+    versoes_expiradas,
+)
+from .validacao_lotacao import (
+    ResultadoValidacao,
+    cpfs_validos,
+    resumo_inconsistencias,
+    validar_lotacao,
+)
+
+__all__ = [
+    'atualizar_totais',
+    'contar_servidores',
+    'garantir_hash',
+    'hash_conteudo',
+    'ler_conteudo_bruto',
+    'receptor_tem_conteudo',
+    'regenerar_json_orgao',
+    'DiffLotacaoError',
+    'calcular_diff_lotacao',
+    'diff_lotacao',
+    'calcular_diff',
+    'diff_organograma',
+    'filtro_lotacoes_afetadas',
+    'invalidar_versao',
+    'ConfigEnvio',
+    'EnvioApiError',
+    'ResultadoEnvio',
+    'enfileirar_envio',
+    'enviar_jsons',
+    'NormalizadorCargos',
+    'ResultadoNormalizacao',
+    'normalizar_cargos_lotacao',
+    'criar_particoes',
+    'descartar_particoes',
+    'listar_particoes',
+    'ResultadoExpurgo',
+    'expurgar_versoes',
+    'versoes_expiradas',
+    'ResultadoValidacao',
+    'cpfs_validos',
+    'resumo_inconsistencias',
+    'validar_lotacao',
+]
@@ -0,0 +1,175 @@
+"""
+Geração e hash canônico dos JSONs de envio (TblLotacaoJsonOrgao e
+TblOrganogramaJson).
+
+O hash é o SHA-256 da serialização canônica do conteúdo (chaves ordenadas,
+sem espaços, UTF-8), sem os campos que mudam a cada geração
+(CAMPOS_VOLATEIS, ex.: data_geracao). A serialização é consumida aos pedaços
+(JSONEncoder.iterencode), sem montar a string inteira em memória.
+
+Com o hash gravado em str_hash_conteudo:
+- regenerar_json_orgao só grava quando o conteúdo mudou
+- o envio compara com str_hash_enviado (o que o receptor já tem) e pula
+  conteúdos idênticos
+- a API usa o hash como ETag (If-None-Match devolve 304)
+
+A cada gravação do conteúdo, os signals da aplicação recalculam o hash e,
+na lotação, guardam o total de servidores e o tamanho em bytes
+(int_total_servidores, int_tamanho_bytes),
+para a listagem não precisar carregar o js_conteudo. O tamanho é o do texto
+do jsonb no PostgreSQL, o mesmo servido por ler_conteudo_bruto (com
+intervalos de bytes).
+"""
+
+import hashlib
+import json
+import logging
+from typing import Dict, Optional, Tuple
+
+from django.db import connections, router
+from django.db.models.expressions import RawSQL
+from django.utils import timezone
+
+from ..models import TblLotacao, TblLotacaoJsonOrgao
+
+logger = logging.getLogger(__name__)
+
+
+CAMPOS_VOLATEIS = ('data_geracao',)
+
+_encoder_canonico = json.JSONEncoder(
+    sort_keys=True, separators=(',', ':'), ensure_ascii=False
+)
+
+
+def hash_conteudo(conteudo) -> str:
+    """SHA-256 (hex) da forma canônica do conteúdo, sem os campos voláteis."""
+    if isinstance(conteudo, dict):
+        conteudo = {k: v for k, v in conteudo.items() if k not in CAMPOS_VOLATEIS}
+    sha = hashlib.sha256()
+    for pedaco in _encoder_canonico.iterencode(conteudo):
+        sha.update(pedaco.encode('utf-8'))
+    return sha.hexdigest()
+
+
+def garantir_hash(json_envio) -> str:
+    """
+    Hash do registro, calculado e gravado se ainda não existir (registros
+    anteriores ao hash ou gravados por update() direto no js_conteudo).
+    """
+    if not json_envio.str_hash_conteudo:
+        json_envio.str_hash_conteudo = hash_conteudo(json_envio.js_conteudo)
+        type(json_envio).objects.filter(pk=json_envio.pk).update(
+            str_hash_conteudo=json_envio.str_hash_conteudo
+        )
+    return json_envio.str_hash_conteudo
+
+
+def gerar_conteudo_orgao(json_orgao) -> Dict:
+    """Conteúdo do JSON de lotação do órgão a partir das lotações válidas."""
+    lotacoes = TblLotacao.objects.filter(
+        id_lotacao_versao=json_orgao.id_lotacao_versao_id,
+        id_orgao_lotacao=json_orgao.id_orgao_lotacao_id,
+        flg_valido=True
+    ).select_related(
+        'id_orgao_lotacao',
+        'id_unidade_lotacao'
+    ).order_by('str_cpf', 'id_lotacao')  # ordem estável: mesmo conteúdo, mesmo hash
+
+    servidores = []
+    for lotacao in lotacoes.iterator(chunk_size=2000):
+        servidor = {
+            'cpf': lotacao.str_cpf,
+            'orgao': {
+                'sigla': lotacao.id_orgao_lotacao.str_sigla,
+                'nome': lotacao.id_orgao_lotacao.str_nome
+            },
+            'cargo': lotacao.str_cargo_normalizado or lotacao.str_cargo_original,
+            'data_referencia': lotacao.dat_referencia.isoformat() if lotacao.dat_referencia else None
+        }
+        if lotacao.id_unidade_lotacao:
+            servidor['unidade'] = {
+                'sigla': lotacao.id_unidade_lotacao.str_sigla,
+                'nome': lotacao.id_unidade_lotacao.str_nome
+            }
+        servidores.append(servidor)
+
+    return {
+        'orgao': {
+            'id': json_orgao.id_orgao_lotacao.id_orgao_unidade,
+            'sigla': json_orgao.id_orgao_lotacao.str_sigla,
+            'nome': json_orgao.id_orgao_lotacao.str_nome
+        },
+        'patriarca': json_orgao.id_patriarca.str_sigla_patriarca,
+        'total_servidores': len(servidores),
+        'servidores': servidores,
+        'data_geracao': timezone.now().isoformat()
+    }
+
+
+def regenerar_json_orgao(json_orgao) -> bool:
+    """
+    Regera o conteúdo do órgão; grava só se o hash mudou.
+    Retorna True quando o registro foi atualizado.
+    """
+    conteudo = gerar_conteudo_orgao(json_orgao)
+    novo_hash = hash_conteudo(conteudo)
+    if novo_hash == garantir_hash(json_orgao):
+        logger.info(f"JSON de lotação {json_orgao.pk} inalterado ({novo_hash[:12]})")
+        return False
+
+    json_orgao.js_conteudo = conteudo
+    json_orgao.str_hash_conteudo = novo_hash
+    json_orgao.save(update_fields=['js_conteudo', 'str_hash_conteudo'])
+    return True
+
+
+def contar_servidores(conteudo) -> int:
+    servidores = conteudo.get('servidores') if isinstance(conteudo, dict) else None
+    return len(servidores) if isinstance(servidores, list) else 0
+
+
+def atualizar_totais(json_orgao) -> None:
+    """
+    Grava o total de servidores e o tamanho do conteúdo (texto do jsonb no
+    banco) em um UPDATE.
+    """
+    json_orgao.int_total_servidores = contar_servidores(json_orgao.js_conteudo)
+    TblLotacaoJsonOrgao.objects.filter(pk=json_orgao.pk).update(
+        int_total_servidores=json_orgao.int_total_servidores,
+        int_tamanho_bytes=RawSQL('octet_length(jsconteudo::text)', []),
+    )
+    json_orgao.refresh_from_db(fields=['int_tamanho_bytes'])
+
+
+SQL_CONTEUDO_BRUTO = """
+    SELECT octet_length(t.texto), substring(convert_to(t.texto, 'UTF8') FROM %s FOR %s)
+    FROM (SELECT jsconteudo::text AS texto FROM {tabela} WHERE idlotacaojsonorgao = %s) t
+"""
+
+
+def ler_conteudo_bruto(
+    id_json_orgao: int,
+    inicio: int = 0,
+    tamanho: Optional[int] = None,
+) -> Optional[Tuple[int, bytes]]:
+    """
+    (tamanho total, bytes) do conteúdo como texto JSON, a partir do byte
+    `inicio` (0-based). O recorte é feito no banco: só os bytes pedidos
+    trafegam. None se o registro não existe.
+    """
+    using = router.db_for_read(TblLotacaoJsonOrgao)
+    sql = SQL_CONTEUDO_BRUTO.format(tabela=TblLotacaoJsonOrgao._meta.db_table)
+    with connections[using].cursor() as cursor:
+        cursor.execute(sql, [inicio + 1, tamanho if tamanho is not None else 2 ** 31 - 1, id_json_orgao])
+        linha = cursor.fetchone()
+    if linha is None:
+        return None
+    return linha[0], bytes(linha[1])
+
+
+def receptor_tem_conteudo(json_envio) -> bool:
+    """O receptor já recebeu exatamente o conteúdo atual?"""
+    return bool(json_envio.str_hash_enviado) and (
+        json_envio.str_hash_enviado == garantir_hash(json_envio)
+    )
@@ -0,0 +1,174 @@
+"""
+Diferença entre duas versões de lotação, por CPF.
+
+As duas versões são comparadas no banco, em um único comando: um FULL OUTER
+JOIN por str_cpf (índice idx_lotacao_versao_cpf) cujo resultado é gravado
+direto em TblLotacaoDiffItem (INSERT ... SELECT), sem trazer as versões para
+o Python. Cada CPF vira no máximo uma linha:
+- ADMISSAO: só está na versão nova
+- DESLIGAMENTO: só está na versão base
+- ALTERACAO: está nas duas, mas mudou de órgão/unidade (flg_movido) e/ou de
+  cargo (flg_cargo_alterado)
+
+Órgão e unidade são comparados pela sigla, já que as versões de lotação podem
+apontar para versões de organograma diferentes (ids diferentes para a mesma
+unidade). O cargo comparado é o normalizado ou, na falta dele, o original.
+Se um CPF aparece mais de uma vez na mesma versão, vale a primeira lotação.
+
+O resumo (contagens e duração) fica em TblLotacaoDiff, uma linha por par de
+versões; os itens podem ser paginados por CPF e exportados.
+"""
+
+import logging
+import time
+from typing import Optional
+
+from django.db import connections, router, transaction
+from django.utils import timezone
+
+from ..models import (
+    TblLotacao,
+    TblLotacaoDiff,
+    TblLotacaoDiffItem,
+    TblLotacaoVersao,
+    TblOrgaoUnidade,
+)
+
+logger = logging.getLogger(__name__)
+
+
+SQL_DIFF = """
+    WITH base AS (
+        SELECT DISTINCT ON (l.strcpf)
+               l.strcpf AS cpf, o.strsigla AS orgao, u.strsigla AS unidade,
+               COALESCE(l.strcargonormalizado, l.strcargooriginal) AS cargo
+        FROM {lotacao} l
+        JOIN {unidade} o ON o.idorgaounidade = l.idorgaolotacao
+        LEFT JOIN {unidade} u ON u.idorgaounidade = l.idunidadelotacao
+        WHERE l.idlotacaoversao = %(base)s
+        ORDER BY l.strcpf, l.idlotacao
+    ),
+    nova AS (
+        SELECT DISTINCT ON (l.strcpf)
+               l.strcpf AS cpf, o.strsigla AS orgao, u.strsigla AS unidade,
+               COALESCE(l.strcargonormalizado, l.strcargooriginal) AS cargo
+        FROM {lotacao} l
+        JOIN {unidade} o ON o.idorgaounidade = l.idorgaolotacao
+        LEFT JOIN {unidade} u ON u.idorgaounidade = l.idunidadelotacao
+        WHERE l.idlotacaoversao = %(nova)s
+        ORDER BY l.strcpf, l.idlotacao
+    ),
+    comparacao AS (
+        SELECT COALESCE(n.cpf, b.cpf) AS cpf,
+               b.cpf IS NOT NULL AS na_base, n.cpf IS NOT NULL AS na_nova,
+               b.cpf IS NOT NULL AND n.cpf IS NOT NULL
+                   AND (b.orgao IS DISTINCT FROM n.orgao
+                        OR b.unidade IS DISTINCT FROM n.unidade) AS movido,
+               b.cpf IS NOT NULL AND n.cpf IS NOT NULL
+                   AND b.cargo IS DISTINCT FROM n.cargo AS cargo_alterado,
+               b.orgao AS orgao_base, b.unidade AS unidade_base, b.cargo AS cargo_base,
+               n.orgao AS orgao_novo, n.unidade AS unidade_novo, n.cargo AS cargo_novo
+        FROM base b
+        FULL OUTER JOIN nova n ON n.cpf = b.cpf
+    ),
+    inseridos AS (
+        INSERT INTO {item} (
+            idlotacaodiff, strcpf, strtipo, flgmovido, flgcargoalterado,
+            strorgaobase, strunidadebase, strcargobase,
+            strorgaonovo, strunidadenovo, strcargonovo
+        )
+        SELECT %(diff)s, cpf,
+               CASE WHEN NOT na_base THEN %(admissao)s
+                    WHEN NOT na_nova THEN %(desligamento)s
+                    ELSE %(alteracao)s END,
+               movido, cargo_alterado,
+               orgao_base, unidade_base, cargo_base,
+               orgao_novo, unidade_novo, cargo_novo
+        FROM comparacao
+        WHERE NOT na_base OR NOT na_nova OR movido OR cargo_alterado
+        RETURNING strtipo, flgmovido, flgcargoalterado
+    )
+    SELECT
+        (SELECT COUNT(*) FROM inseridos WHERE strtipo = %(admissao)s),
+        (SELECT COUNT(*) FROM inseridos WHERE strtipo = %(desligamento)s),
+        (SELECT COUNT(*) FROM inseridos WHERE flgmovido),
+        (SELECT COUNT(*) FROM inseridos WHERE flgcargoalterado),
+        (SELECT COUNT(*) FROM comparacao
+         WHERE na_base AND na_nova AND NOT movido AND NOT cargo_alterado)
+"""
+
+
+class DiffLotacaoError(Exception):
+    """Versões de lotação que não podem ser comparadas"""
+    pass
+
+
+def diff_lotacao(
+    versao_base: TblLotacaoVersao,
+    versao_nova: TblLotacaoVersao,
+    recalcular: bool = False,
+) -> TblLotacaoDiff:
+    """
+    Resumo do diff entre as versões, calculado e gravado na primeira chamada
+    (ou quando recalcular=True).
+    """
+    if versao_base.id_patriarca_id != versao_nova.id_patriarca_id:
+        raise DiffLotacaoError('As versões pertencem a patriarcas diferentes')
+    if versao_base.pk == versao_nova.pk:
+        raise DiffLotacaoError('A versão base deve ser diferente da versão nova')
+
+    if not recalcular:
+        existente = TblLotacaoDiff.objects.filter(
+            id_lotacao_versao_base=versao_base, id_lotacao_versao_nova=versao_nova
+        ).first()
+        if existente is not None:
+            return existente
+    return calcular_diff_lotacao(versao_base, versao_nova)
+
+
+def calcular_diff_lotacao(
+    versao_base: TblLotacaoVersao,
+    versao_nova: TblLotacaoVersao,
+    using: Optional[str] = None,
+) -> TblLotacaoDiff:
+    """Recalcula o diff, substituindo os itens gravados para o par de versões."""
+    using = using or router.db_for_write(TblLotacaoDiff)
+    sql = SQL_DIFF.format(
+        lotacao=TblLotacao._meta.db_table,
+        unidade=TblOrgaoUnidade._meta.db_table,
+        item=TblLotacaoDiffItem._meta.db_table,
+    )
+
+    inicio = time.perf_counter()
+    with transaction.atomic(using=using):
+        diff, _ = TblLotacaoDiff.objects.using(using).select_for_update().get_or_create(
+            id_lotacao_versao_base=versao_base,
+            id_lotacao_versao_nova=versao_nova,
+            defaults={'dat_calculo': timezone.now()},
+        )
+        TblLotacaoDiffItem.objects.using(using).filter(id_lotacao_diff=diff).delete()
+
+        with connections[using].cursor() as cursor:
+            cursor.execute(sql, {
+                'base': versao_base.pk,
+                'nova': versao_nova.pk,
+                'diff': diff.pk,
+                'admissao': TblLotacaoDiffItem.TIPO_ADMISSAO,
+                'desligamento': TblLotacaoDiffItem.TIPO_DESLIGAMENTO,
+                'alteracao': TblLotacaoDiffItem.TIPO_ALTERACAO,
+            })
+            (
+                diff.int_admissoes, diff.int_desligamentos, diff.int_movimentacoes,
+                diff.int_mudancas_cargo, diff.int_inalterados,
+            ) = cursor.fetchone()
+
+        diff.int_duracao_ms = int((time.perf_counter() - inicio) * 1000)
+        diff.dat_calculo = timezone.now()
+        diff.save(using=using)
+
+    logger.info(
+        f"Diff de lotação {versao_base.pk} -> {versao_nova.pk} em {diff.int_duracao_ms}ms: "
+        f"{diff.int_admissoes} admissões, {diff.int_desligamentos} desligamentos, "
+        f"{diff.int_movimentacoes} movimentações, {diff.int_mudancas_cargo} mudanças de cargo"
+    )
+    return diff
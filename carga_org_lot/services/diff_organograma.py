@@ -0,0 +1,217 @@
+"""
+Diferença entre duas versões de organograma.
+
+As unidades das duas versões são pareadas em uma única consulta no banco
+(hash join do PostgreSQL), em duas etapas:
+1. pela sigla; siglas repetidas na mesma versão são pareadas pela ordem do
+   número de hierarquia
+2. as que sobraram, pelo número de hierarquia (unidade que trocou de sigla)
+
+Unidades sem par na versão nova foram removidas; sem par na versão base,
+adicionadas. Entre as pareadas, a consulta só devolve as que mudaram:
+- 'sigla': sigla alterada (pareada pelo número de hierarquia)
+- 'nome': renomeada
+- 'pai': movida para outra unidade superior (sigla e número do pai mudaram)
+
+O resultado é um conjunto de mudanças compacto, guardado no cache por par de
+versões. A chave inclui uma geração por versão, trocada pelos signals da
+aplicação quando a versão ou suas unidades mudam. ids_afetados permite
+restringir a revalidação de lotações às unidades alteradas
+(filtro_lotacoes_afetadas).
+
+Configurações:
+- CARGA_ORG_LOT_DIFF_CACHE_TIMEOUT: segundos no cache (padrão 86400)
+"""
+
+import logging
+import uuid
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, router
+from django.db.models import Q
+
+from ..models import TblOrgaoUnidade
+
+logger = logging.getLogger(__name__)
+
+
+PREFIXO_GERACAO = 'carga:organograma-geracao'
+PREFIXO_DIFF = 'carga:organograma-diff'
+
+
+def cache_timeout() -> int:
+    return getattr(settings, 'CARGA_ORG_LOT_DIFF_CACHE_TIMEOUT', 86400)
+
+
+SQL_DIFF = """
+    WITH base AS (
+        SELECT o.idorgaounidade AS id, o.strsigla AS sigla, o.strnome AS nome,
+               o.strnumerohierarquia AS numero, p.strsigla AS sigla_pai,
+               p.strnumerohierarquia AS numero_pai,
+               ROW_NUMBER() OVER (
+                   PARTITION BY o.strsigla ORDER BY o.strnumerohierarquia, o.idorgaounidade
+               ) AS ordem
+        FROM {tabela} o
+        LEFT JOIN {tabela} p ON p.idorgaounidade = o.idorgaounidadepai
+        WHERE o.idorganogramaversao = %(base)s
+    ),
+    nova AS (
+        SELECT o.idorgaounidade AS id, o.strsigla AS sigla, o.strnome AS nome,
+               o.strnumerohierarquia AS numero, p.strsigla AS sigla_pai,
+               p.strnumerohierarquia AS numero_pai,
+               ROW_NUMBER() OVER (
+                   PARTITION BY o.strsigla ORDER BY o.strnumerohierarquia, o.idorgaounidade
+               ) AS ordem
+        FROM {tabela} o
+        LEFT JOIN {tabela} p ON p.idorgaounidade = o.idorgaounidadepai
+        WHERE o.idorganogramaversao = %(nova)s
+    ),
+    por_sigla AS (
+        SELECT b.id AS id_base, n.id AS id_novo
+        FROM base b JOIN nova n ON n.sigla = b.sigla AND n.ordem = b.ordem
+    ),
+    sobra_base AS (
+        SELECT b.*, ROW_NUMBER() OVER (PARTITION BY b.numero ORDER BY b.id) AS ordem_numero
+        FROM base b
+        WHERE b.numero IS NOT NULL
+          AND NOT EXISTS (SELECT 1 FROM por_sigla s WHERE s.id_base = b.id)
+    ),
+    sobra_nova AS (
+        SELECT n.*, ROW_NUMBER() OVER (PARTITION BY n.numero ORDER BY n.id) AS ordem_numero
+        FROM nova n
+        WHERE n.numero IS NOT NULL
+          AND NOT EXISTS (SELECT 1 FROM por_sigla s WHERE s.id_novo = n.id)
+    ),
+    pares AS (
+        SELECT id_base, id_novo FROM por_sigla
+        UNION ALL
+        SELECT b.id, n.id
+        FROM sobra_base b
+        JOIN sobra_nova n ON n.numero = b.numero AND n.ordem_numero = b.ordem_numero
+    )
+    SELECT 'alterado', b.id, b.sigla, b.nome, b.numero, b.sigla_pai,
+           n.id, n.sigla, n.nome, n.numero, n.sigla_pai,
+           (b.sigla_pai IS DISTINCT FROM n.sigla_pai
+            AND b.numero_pai IS DISTINCT FROM n.numero_pai) AS movido
+    FROM pares p
+    JOIN base b ON b.id = p.id_base
+    JOIN nova n ON n.id = p.id_novo
+    WHERE b.sigla IS DISTINCT FROM n.sigla
+       OR b.nome IS DISTINCT FROM n.nome
+       OR (b.sigla_pai IS DISTINCT FROM n.sigla_pai
+           AND b.numero_pai IS DISTINCT FROM n.numero_pai)
+    UNION ALL
+    SELECT 'removido', b.id, b.sigla, b.nome, b.numero, b.sigla_pai,
+           NULL, NULL, NULL, NULL, NULL, NULL
+    FROM base b
+    WHERE NOT EXISTS (SELECT 1 FROM pares p WHERE p.id_base = b.id)
+    UNION ALL
+    SELECT 'adicionado', NULL, NULL, NULL, NULL, NULL,
+           n.id, n.sigla, n.nome, n.numero, n.sigla_pai, NULL
+    FROM nova n
+    WHERE NOT EXISTS (SELECT 1 FROM pares p WHERE p.id_novo = n.id)
+    UNION ALL
+    SELECT 'pareados', (SELECT COUNT(*) FROM pares), NULL, NULL, NULL, NULL,
+           NULL, NULL, NULL, NULL, NULL, NULL
+"""
+
+
+def _unidade(id_unidade, sigla, nome, numero, sigla_pai) -> Dict:
+    return {'id': id_unidade, 'sigla': sigla, 'nome': nome, 'numero': numero, 'pai': sigla_pai}
+
+
+def calcular_diff(id_versao_base: int, id_versao_nova: int, using: Optional[str] = None) -> Dict:
+    """Conjunto de mudanças da versão base para a nova (sem cache)."""
+    using = using or router.db_for_read(TblOrgaoUnidade)
+    sql = SQL_DIFF.format(tabela=TblOrgaoUnidade._meta.db_table)
+    with connections[using].cursor() as cursor:
+        cursor.execute(sql, {'base': id_versao_base, 'nova': id_versao_nova})
+        linhas = cursor.fetchall()
+
+    adicionados: List[Dict] = []
+    removidos: List[Dict] = []
+    alterados: List[Dict] = []
+    resumo = {'adicionados': 0, 'removidos': 0, 'sigla_alterada': 0,
+              'renomeados': 0, 'movidos': 0, 'inalterados': 0}
+    pareados = 0
+
+    for tipo, *base, id_novo, sigla, nome, numero, sigla_pai, movido in linhas:
+        if tipo == 'pareados':
+            pareados = base[0]
+        elif tipo == 'removido':
+            removidos.append(_unidade(*base))
+        elif tipo == 'adicionado':
+            adicionados.append(_unidade(id_novo, sigla, nome, numero, sigla_pai))
+        else:
+            id_base, sigla_base, nome_base, _, sigla_pai_base = base
+            mudancas = {}
+            if sigla_base != sigla:
+                mudancas['sigla'] = [sigla_base, sigla]
+                resumo['sigla_alterada'] += 1
+            if nome_base != nome:
+                mudancas['nome'] = [nome_base, nome]
+                resumo['renomeados'] += 1
+            if movido:
+                mudancas['pai'] = [sigla_pai_base, sigla_pai]
+                resumo['movidos'] += 1
+            alterados.append({
+                'id_base': id_base, 'id': id_novo, 'sigla': sigla, 'mudancas': mudancas,
+            })
+
+    for lista in (adicionados, removidos, alterados):
+        lista.sort(key=lambda u: (u['sigla'] or '', u['id'] or 0))
+    resumo['adicionados'] = len(adicionados)
+    resumo['removidos'] = len(removidos)
+    resumo['inalterados'] = pareados - len(alterados)
+
+    logger.info(
+        f"Diff de organograma {id_versao_base} -> {id_versao_nova}: "
+        f"{len(adicionados)} adicionadas, {len(removidos)} removidas, {len(alterados)} alteradas"
+    )
+    return {
+        'versao_base': id_versao_base,
+        'versao_nova': id_versao_nova,
+        'resumo': resumo,
+        'adicionados': adicionados,
+        'removidos': removidos,
+        'alterados': alterados,
+        'ids_afetados': {
+            'base': sorted([u['id'] for u in removidos] + [u['id_base'] for u in alterados]),
+            'nova': sorted([u['id'] for u in adicionados] + [u['id'] for u in alterados]),
+        },
+    }
+
+
+def _nova_geracao() -> str:
+    return uuid.uuid4().hex[:12]
+
+
+def _geracao(id_versao: int) -> str:
+    return cache.get_or_set(f'{PREFIXO_GERACAO}:{id_versao}', _nova_geracao, None)
+
+
+def invalidar_versao(id_versao: int) -> None:
+    """Descarta os diffs em cache que envolvem a versão (troca a geração)."""
+    cache.set(f'{PREFIXO_GERACAO}:{id_versao}', _nova_geracao(), None)
+
+
+def diff_organograma(id_versao_base: int, id_versao_nova: int) -> Dict:
+    """Conjunto de mudanças entre duas versões, guardado no cache por par."""
+    chave = (
+        f'{PREFIXO_DIFF}:{id_versao_base}.{_geracao(id_versao_base)}'
+        f':{id_versao_nova}.{_geracao(id_versao_nova)}'
+    )
+    return cache.get_or_set(
+        chave, lambda: calcular_diff(id_versao_base, id_versao_nova), cache_timeout()
+    )
+
+
+def filtro_lotacoes_afetadas(diff: Dict, versao: str = 'base') -> Q:
+    """
+    Filtro de TblLotacao restrito às lotações em unidades afetadas pelo diff
+    ('base' para lotações ligadas à versão base, 'nova' para a versão nova).
+    """
+    ids = diff['ids_afetados'][versao]
+    return Q(id_orgao_lotacao__in=ids) | Q(id_unidade_lotacao__in=ids)
@@ -0,0 +1,655 @@
+"""
+Envio dos JSONs de carga (TblOrganogramaJson e TblLotacaoJsonOrgao) à API
+externa.
+
+Contrato do receptor (API_EXTERNA_URL):
+- POST /auth/token {client_id, client_secret, patriarca}
+  -> {access_token, expires_in}
+- POST /organogramas e POST /lotacoes com o JSON do registro, Authorization
+  Bearer e Idempotency-Key ({tipo}-{id}-{hash do conteúdo}): repetir o mesmo
+  conteúdo não duplica a carga no receptor
+
+Execução:
+- o banco só é usado pela thread que chama enviar_jsons: ela lê cada
+  conteúdo já como texto (jsonb::text) logo antes de entregá-lo a um worker,
+  então no máximo CARGA_ORG_LOT_ENVIO_WORKERS conteúdos ficam em memória
+- os workers (ThreadPoolExecutor) só fazem o HTTP, com uma requests.Session
+  por thread (conexões keep-alive reaproveitadas entre os envios) e no
+  máximo CARGA_ORG_LOT_ENVIO_POR_HOST requisições simultâneas por host no
+  processo, somando todas as chamadas em andamento
+- erros de conexão, timeouts, 429 e 5xx são repetidos com backoff
+  exponencial com jitter (ou o Retry-After do receptor), até
+  CARGA_ORG_LOT_ENVIO_TENTATIVAS
+- 401 marca o token como expirado; um novo é pedido e o item é reenviado
+  uma vez
+
+Registro:
+- TblTokenEnvioCarga: tokens por patriarca (Ativo até a validade, Expirado
+  quando o receptor recusa, Erro quando não foi possível obter)
+- TblCargaPatriarca: uma por patriarca e tipo de carga em cada chamada
+- TblDetalheStatusCarga: uma linha por tentativa
+- no registro JSON: dat_envio_api, str_status_envio (ENVIADO/ERRO),
+  str_mensagem_retorno e, no sucesso, str_hash_enviado
+
+Fila: a API não envia lotes na requisição. enfileirar_envio marca os
+registros com str_status_envio PENDENTE e o comando
+`manage.py enviar_cargas --pendentes` (agendado, ex.: cron) envia os
+pendentes:
+- registros_pendentes reserva a fila (PENDENTE -> EM_ENVIO, com
+  select_for_update(skip_locked)), então execuções sobrepostas não enviam
+  o mesmo registro duas vezes
+- um registro da fila que falha volta a PENDENTE e é repetido na próxima
+  execução; só vira ERRO depois de CARGA_ORG_LOT_FILA_EXECUCOES execuções
+  (int_tentativas_envio)
+- EM_ENVIO há mais de CARGA_ORG_LOT_FILA_EXPIRACAO segundos é de uma
+  execução interrompida e volta a ser reservado
+
+Conteúdo que o receptor já tem (mesmo hash) não é reenviado, salvo com
+forcar=True. services.receptor_stub imita o receptor para testes.
+
+Configurações: API_EXTERNA_URL, API_EXTERNA_CLIENT_ID,
+API_EXTERNA_CLIENT_SECRET e CARGA_ORG_LOT_ENVIO_* (ver settings.py)
+"""
+
+import dataclasses
+import json
+import logging
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.db import IntegrityError, router, transaction
+from django.db.models import F, Max, Q, TextField
+from django.db.models.functions import Cast
+from django.utils import timezone
+
+from ..models import (
+    TblCargaPatriarca,
+    TblDetalheStatusCarga,
+    TblLotacaoJsonOrgao,
+    TblOrganogramaJson,
+    TblStatusCarga,
+    TblStatusTokenEnvioCarga,
+    TblTipoCarga,
+    TblTokenEnvioCarga,
+)
+from .conteudo_json import garantir_hash, receptor_tem_conteudo
+
+logger = logging.getLogger(__name__)
+
+
+STATUS_ENVIADO = 'ENVIADO'
+STATUS_ERRO = 'ERRO'
+# Na fila: enfileirar_envio marca, `manage.py enviar_cargas --pendentes` envia
+STATUS_PENDENTE = 'PENDENTE'
+STATUS_EM_ENVIO = 'EM_ENVIO'
+
+# Domínios, identificados pela descrição (str_descricao); os ids são os do
+# banco, resolvidos (e criados se faltarem) por garantir_dominios
+TOKEN_ATIVO, TOKEN_EXPIRADO, TOKEN_ERRO = 'Ativo', 'Expirado', 'Erro'
+CARGA_EM_ENVIO, CARGA_ENVIADA, CARGA_ERRO, CARGA_TENTATIVA_FALHOU = (
+    'Em envio', 'Enviada', 'Erro', 'Tentativa falhou'
+)
+TIPO_ORGANOGRAMA, TIPO_LOTACAO = 'Organograma', 'Lotação'
+
+STATUS_TOKEN = (TOKEN_ATIVO, TOKEN_EXPIRADO, TOKEN_ERRO)
+# descrição -> flg_sucesso
+STATUS_CARGA = {CARGA_EM_ENVIO: 0, CARGA_ENVIADA: 1, CARGA_ERRO: 0, CARGA_TENTATIVA_FALHOU: 0}
+TIPOS_CARGA = (TIPO_ORGANOGRAMA, TIPO_LOTACAO)
+
+# modelo -> (tipo de carga, caminho no receptor, prefixo da Idempotency-Key)
+DESTINOS = {
+    TblOrganogramaJson: (TIPO_ORGANOGRAMA, '/organogramas', 'organograma'),
+    TblLotacaoJsonOrgao: (TIPO_LOTACAO, '/lotacoes', 'lotacao'),
+}
+
+REPETIR_STATUS = frozenset({408, 425, 429, 500, 502, 503, 504})
+MARGEM_VALIDADE_TOKEN = timedelta(seconds=60)
+TAMANHO_MENSAGEM = 500
+
+
+class EnvioApiError(Exception):
+    """API externa não configurada"""
+    pass
+
+
+@dataclass(frozen=True)
+class ConfigEnvio:
+    url: str
+    client_id: str = ''
+    client_secret: str = ''
+    workers: int = 8
+    por_host: int = 4
+    tentativas: int = 4
+    backoff_base: float = 0.5
+    backoff_max: float = 30.0
+    timeout: float = 30.0
+    execucoes_fila: int = 5
+
+    @classmethod
+    def do_settings(cls, **alteracoes) -> 'ConfigEnvio':
+        """Configuração dos settings, com alterações pontuais (ex.: workers)."""
+        config = cls(
+            url=getattr(settings, 'API_EXTERNA_URL', '') or '',
+            client_id=getattr(settings, 'API_EXTERNA_CLIENT_ID', ''),
+            client_secret=getattr(settings, 'API_EXTERNA_CLIENT_SECRET', ''),
+            workers=getattr(settings, 'CARGA_ORG_LOT_ENVIO_WORKERS', 8),
+            por_host=getattr(settings, 'CARGA_ORG_LOT_ENVIO_POR_HOST', 4),
+            tentativas=getattr(settings, 'CARGA_ORG_LOT_ENVIO_TENTATIVAS', 4),
+            backoff_base=getattr(settings, 'CARGA_ORG_LOT_ENVIO_BACKOFF_BASE', 0.5),
+            backoff_max=getattr(settings, 'CARGA_ORG_LOT_ENVIO_BACKOFF_MAX', 30),
+            timeout=getattr(settings, 'CARGA_ORG_LOT_ENVIO_TIMEOUT', 30),
+            execucoes_fila=getattr(settings, 'CARGA_ORG_LOT_FILA_EXECUCOES', 5),
+        )
+        config = dataclasses.replace(config, **{k: v for k, v in alteracoes.items() if v is not None})
+        if not config.url:
+            raise EnvioApiError('API externa não configurada (API_EXTERNA_URL)')
+        return dataclasses.replace(config, url=config.url.rstrip('/'))
+
+
+@dataclass
+class ResultadoEnvio:
+    registro: object
+    enviado: bool = False
+    dispensado: bool = False
+    status_http: Optional[int] = None
+    tentativas: int = 0
+    mensagem: str = ''
+
+
+# ----------------------------------------------------------------------
+# HTTP (workers)
+# ----------------------------------------------------------------------
+
+@dataclass
+class _Tentativa:
+    inicio: datetime
+    duracao_ms: int
+    status_http: Optional[int]
+    erro: str = ''
+
+
+@dataclass
+class _Resposta:
+    status_http: Optional[int]       # None: todas as tentativas sem resposta
+    corpo: str
+    tentativas: List[_Tentativa]
+
+
+_local = threading.local()
+_semaforos: Dict[Tuple[str, int], threading.BoundedSemaphore] = {}
+_trava_semaforos = threading.Lock()
+
+
+def _sessao():
+    """requests.Session da thread: mantém as conexões abertas entre envios."""
+    sessao = getattr(_local, 'sessao', None)
+    if sessao is None:
+        # requests só é importado no envio (custa dezenas de ms no boot)
+        import requests
+        sessao = _local.sessao = requests.Session()
+    return sessao
+
+
+def _semaforo(url: str, limite: int) -> threading.BoundedSemaphore:
+    chave = (urlsplit(url).netloc, limite)
+    with _trava_semaforos:
+        if chave not in _semaforos:
+            _semaforos[chave] = threading.BoundedSemaphore(limite)
+        return _semaforos[chave]
+
+
+def _retry_after(valor: Optional[str]) -> Optional[float]:
+    try:
+        return max(0.0, float(valor)) if valor else None
+    except ValueError:
+        return None                  # data HTTP: usa o backoff
+
+
+def espera_backoff(tentativa: int, config: ConfigEnvio, retry_after: Optional[float] = None) -> float:
+    """
+    Segundos até a próxima tentativa: o Retry-After do receptor ou um valor
+    aleatório até base * 2^(tentativa-1) ("full jitter"), limitado ao máximo.
+    """
+    if retry_after is not None:
+        return min(retry_after, config.backoff_max)
+    return random.uniform(0, min(config.backoff_max, config.backoff_base * 2 ** (tentativa - 1)))
+
+
+def _postar(
+    config: ConfigEnvio,
+    caminho: str,
+    corpo: bytes,
+    cabecalhos: Dict[str, str],
+    dormir: Callable[[float], None],
+) -> _Resposta:
+    """POST com repetição dos erros transitórios. Não usa o banco."""
+    import requests
+
+    sessao = _sessao()
+    semaforo = _semaforo(config.url, config.por_host)
+    tentativas: List[_Tentativa] = []
+    status_http, texto = None, ''
+    for numero in range(1, config.tentativas + 1):
+        inicio, t0 = timezone.now(), time.perf_counter()
+        status_http, texto, erro, retry_after = None, '', '', None
+        with semaforo:
+            try:
+                resposta = sessao.post(
+                    config.url + caminho, data=corpo, headers=cabecalhos, timeout=config.timeout
+                )
+                status_http, texto = resposta.status_code, resposta.text
+                retry_after = _retry_after(resposta.headers.get('Retry-After'))
+            except requests.RequestException as e:
+                erro = f'{type(e).__name__}: {e}'
+        tentativas.append(_Tentativa(
+            inicio, int((time.perf_counter() - t0) * 1000), status_http, erro[:TAMANHO_MENSAGEM]
+        ))
+        _metrica(caminho, status_http)
+
+        if (status_http is not None and status_http not in REPETIR_STATUS) or numero == config.tentativas:
+            break
+        dormir(espera_backoff(numero, config, retry_after))
+    return _Resposta(status_http, texto, tentativas)
+
+
+def _metrica(caminho: str, status_http: Optional[int]) -> None:
+    from common.services.metrics import metrics_enabled, registry
+    if metrics_enabled():
+        registry.incrementar('gpp_carga_envio_tentativas_total', (
+            ('destino', caminho.strip('/')), ('status', str(status_http or 'sem_resposta')),
+        ))
+
+
+# ----------------------------------------------------------------------
+# Orquestração (thread que chamou)
+# ----------------------------------------------------------------------
+
+@dataclass
+class Dominios:
+    """Ids do banco por descrição: token[TOKEN_ATIVO], carga[...], tipo[...]."""
+    token: Dict[str, int]
+    carga: Dict[str, int]
+    tipo: Dict[str, int]
+
+
+def _ids_por_descricao(model, descricoes: Dict[str, dict]) -> Dict[str, int]:
+    """
+    Id de cada descrição; as que faltam são criadas com o próximo id livre.
+    Outro processo criando ao mesmo tempo causa IntegrityError: relê e tenta
+    de novo.
+    """
+    pk = model._meta.pk.name
+    for tentativa in range(3):
+        ids = dict(model.objects.filter(
+            str_descricao__in=descricoes
+        ).values_list('str_descricao', pk))
+        faltantes = [descricao for descricao in descricoes if descricao not in ids]
+        if not faltantes:
+            return ids
+        proximo = (model.objects.aggregate(maximo=Max(pk))['maximo'] or 0) + 1
+        try:
+            with transaction.atomic(using=router.db_for_write(model)):
+                for numero, descricao in enumerate(faltantes, start=proximo):
+                    model.objects.create(
+                        **{pk: numero, 'str_descricao': descricao}, **descricoes[descricao]
+                    )
+                    ids[descricao] = numero
+        except IntegrityError:
+            if tentativa == 2:
+                raise
+            continue
+        logger.info(f"{model.__name__}: domínios criados: {', '.join(faltantes)}")
+        return ids
+
+
+def garantir_dominios() -> Dominios:
+    """Status de token, status e tipos de carga usados pelo envio."""
+    return Dominios(
+        token=_ids_por_descricao(
+            TblStatusTokenEnvioCarga, {descricao: {} for descricao in STATUS_TOKEN}
+        ),
+        carga=_ids_por_descricao(TblStatusCarga, {
+            descricao: {'flg_sucesso': sucesso} for descricao, sucesso in STATUS_CARGA.items()
+        }),
+        tipo=_ids_por_descricao(TblTipoCarga, {descricao: {} for descricao in TIPOS_CARGA}),
+    )
+
+
+def patriarca_do_registro(registro):
+    if isinstance(registro, TblOrganogramaJson):
+        return registro.id_organograma_versao.id_patriarca
+    return registro.id_patriarca
+
+
+@dataclass
+class _Item:
+    resultado: ResultadoEnvio
+    tipo: str
+    caminho: str
+    rotulo: str
+    chave: str
+    patriarca: object
+    token: Optional[TblTokenEnvioCarga] = None
+    reenviado: bool = False
+
+
+@dataclass
+class _Carga:
+    registro: TblCargaPatriarca
+    enviados: int = 0
+    erros: int = 0
+    detalhes: List[TblDetalheStatusCarga] = field(default_factory=list)
+
+
+class _Envio:
+
+    def __init__(
+        self, config: ConfigEnvio, forcar: bool, dormir: Callable[[float], None], dominios: Dominios
+    ):
+        self.config = config
+        self.dominios = dominios
+        self.forcar = forcar
+        self.dormir = dormir
+        self.tokens: Dict[int, TblTokenEnvioCarga] = {}
+        self.cargas: Dict[Tuple[int, str], _Carga] = {}
+
+    def executar(self, registros: List) -> List[ResultadoEnvio]:
+        resultados = [ResultadoEnvio(registro) for registro in registros]
+        fila = deque()
+        for resultado in resultados:
+            registro = resultado.registro
+            if not self.forcar and receptor_tem_conteudo(registro):
+                resultado.dispensado = True
+                resultado.mensagem = 'Receptor já possui este conteúdo'
+                continue
+            tipo, caminho, prefixo = DESTINOS[type(registro)]
+            fila.append(_Item(
+                resultado, tipo, caminho,
+                rotulo=f'{prefixo} {registro.pk}',
+                chave=f'{prefixo}-{registro.pk}-{garantir_hash(registro)}',
+                patriarca=patriarca_do_registro(registro),
+            ))
+
+        if fila:
+            with ThreadPoolExecutor(
+                max_workers=self.config.workers, thread_name_prefix='envio-carga'
+            ) as pool:
+                em_andamento = {}
+                while fila or em_andamento:
+                    while fila and len(em_andamento) < self.config.workers:
+                        item = fila.popleft()
+                        futuro = self._submeter(pool, item)
+                        if futuro is not None:
+                            em_andamento[futuro] = item
+                    if not em_andamento:
+                        continue
+                    prontos, _ = wait(em_andamento, return_when=FIRST_COMPLETED)
+                    for futuro in prontos:
+                        self._concluir(em_andamento.pop(futuro), futuro.result(), fila)
+            self._finalizar_cargas()
+        return resultados
+
+    # -- token ----------------------------------------------------------
+
+    def _token(self, patriarca) -> TblTokenEnvioCarga:
+        token = self.tokens.get(patriarca.pk)
+        if token is None:
+            token = TblTokenEnvioCarga.objects.filter(
+                id_patriarca=patriarca,
+                id_status_token_envio_carga=self.dominios.token[TOKEN_ATIVO],
+                dat_data_hora_fim__gt=timezone.now() + MARGEM_VALIDADE_TOKEN,
+            ).order_by('-dat_data_hora_inicio').first() or self._novo_token(patriarca)
+            self.tokens[patriarca.pk] = token
+        return token
+
+    def _novo_token(self, patriarca) -> TblTokenEnvioCarga:
+        corpo = json.dumps({
+            'client_id': self.config.client_id,
+            'client_secret': self.config.client_secret,
+            'patriarca': patriarca.str_sigla_patriarca,
+        }).encode('utf-8')
+        resposta = _postar(
+            self.config, '/auth/token', corpo, {'Content-Type': 'application/json'}, self.dormir
+        )
+        inicio = resposta.tentativas[0].inicio
+        try:
+            dados = json.loads(resposta.corpo) if resposta.status_http == 200 else {}
+            acesso, validade = dados['access_token'], int(dados.get('expires_in', 3600))
+        except (AttributeError, KeyError, TypeError, ValueError):
+            logger.error(
+                f"Token da API externa não obtido para {patriarca.str_sigla_patriarca}: "
+                f"{_descrever(resposta.status_http, resposta.corpo, resposta.tentativas[-1].erro)}"
+            )
+            return TblTokenEnvioCarga.objects.create(
+                id_patriarca=patriarca,
+                id_status_token_envio_carga_id=self.dominios.token[TOKEN_ERRO],
+                str_token_retorno='',
+                dat_data_hora_inicio=inicio,
+                dat_data_hora_fim=timezone.now(),
+            )
+        return TblTokenEnvioCarga.objects.create(
+            id_patriarca=patriarca,
+            id_status_token_envio_carga_id=self.dominios.token[TOKEN_ATIVO],
+            str_token_retorno=acesso,
+            dat_data_hora_inicio=inicio,
+            dat_data_hora_fim=inicio + timedelta(seconds=validade),
+        )
+
+    def _expirar(self, token: TblTokenEnvioCarga) -> None:
+        TblTokenEnvioCarga.objects.filter(pk=token.pk).update(
+            id_status_token_envio_carga=self.dominios.token[TOKEN_EXPIRADO],
+            dat_data_hora_fim=timezone.now()
+        )
+        if self.tokens.get(token.id_patriarca_id) is token:
+            del self.tokens[token.id_patriarca_id]
+
+    # -- itens ----------------------------------------------------------
+
+    def _submeter(self, pool: ThreadPoolExecutor, item: _Item):
+        item.token = self._token(item.patriarca)
+        if item.token.id_status_token_envio_carga_id == self.dominios.token[TOKEN_ERRO]:
+            self._registrar_erro(item, 'Não foi possível obter o token da API externa')
+            return None
+
+        registro = item.resultado.registro
+        texto = type(registro).objects.filter(pk=registro.pk).annotate(
+            texto=Cast('js_conteudo', TextField())
+        ).values_list('texto', flat=True).get()
+        cabecalhos = {
+            'Content-Type': 'application/json; charset=utf-8',
+            'Authorization': f'Bearer {item.token.str_token_retorno}',
+            'Idempotency-Key': item.chave,
+        }
+        return pool.submit(
+            _postar, self.config, item.caminho, texto.encode('utf-8'), cabecalhos, self.dormir
+        )
+
+    def _concluir(self, item: _Item, resposta: _Resposta, fila: deque) -> None:
+        carga = self._carga(item)
+        resultado = item.resultado
+        resultado.tentativas += len(resposta.tentativas)
+        sucesso = resposta.status_http is not None and 200 <= resposta.status_http < 300
+        for numero, tentativa in enumerate(resposta.tentativas, start=1):
+            ultima = numero == len(resposta.tentativas)
+            carga.detalhes.append(TblDetalheStatusCarga(
+                id_carga_patriarca=carga.registro,
+                id_status_carga_id=self.dominios.carga[
+                    CARGA_ENVIADA if sucesso and ultima else CARGA_TENTATIVA_FALHOU
+                ],
+                dat_registro=tentativa.inicio,
+                str_mensagem=(
+                    f'{item.rotulo}: '
+                    f'{_descrever(tentativa.status_http, "", tentativa.erro)} '
+                    f'({tentativa.duracao_ms}ms)'
+                ),
+            ))
+
+        if resposta.status_http == 401 and not item.reenviado:
+            # Token recusado: expira (se ainda é o atual) e reenvia com um novo
+            if self.tokens.get(item.patriarca.pk) is item.token:
+                self._expirar(item.token)
+            item.reenviado = True
+            fila.append(item)
+            return
+
+        resultado.status_http = resposta.status_http
+        mensagem = _descrever(resposta.status_http, resposta.corpo, resposta.tentativas[-1].erro)
+        if sucesso:
+            carga.enviados += 1
+            resultado.enviado = True
+            self._atualizar_registro(item, STATUS_ENVIADO, mensagem)
+        else:
+            carga.erros += 1
+            self._atualizar_registro(item, STATUS_ERRO, mensagem)
+
+    def _registrar_erro(self, item: _Item, mensagem: str) -> None:
+        carga = self._carga(item)
+        carga.erros += 1
+        carga.detalhes.append(TblDetalheStatusCarga(
+            id_carga_patriarca=carga.registro,
+            id_status_carga_id=self.dominios.carga[CARGA_ERRO],
+            dat_registro=timezone.now(),
+            str_mensagem=f'{item.rotulo}: {mensagem}',
+        ))
+        self._atualizar_registro(item, STATUS_ERRO, mensagem)
+
+    def _atualizar_registro(self, item: _Item, status_envio: str, mensagem: str) -> None:
+        registro = item.resultado.registro
+        if (status_envio == STATUS_ERRO
+                and registro.str_status_envio in (STATUS_PENDENTE, STATUS_EM_ENVIO)
+                and registro.int_tentativas_envio < self.config.execucoes_fila):
+            # Da fila: volta para a próxima execução do enviar_cargas --pendentes
+            status_envio = STATUS_PENDENTE
+        campos = {
+            'dat_envio_api': timezone.now(),
+            'str_status_envio': status_envio,
+            'str_mensagem_retorno': mensagem,
+        }
+        if status_envio == STATUS_ENVIADO:
+            campos['str_hash_enviado'] = registro.str_hash_conteudo
+        type(registro).objects.filter(pk=registro.pk).update(**campos)
+        for nome, valor in campos.items():
+            setattr(registro, nome, valor)
+        item.resultado.mensagem = mensagem
+
+    # -- registro das cargas --------------------------------------------
+
+    def _carga(self, item: _Item) -> _Carga:
+        chave = (item.patriarca.pk, item.tipo)
+        carga = self.cargas.get(chave)
+        if carga is None:
+            carga = self.cargas[chave] = _Carga(TblCargaPatriarca.objects.create(
+                id_patriarca=item.patriarca,
+                id_token_envio_carga=item.token,
+                id_status_carga_id=self.dominios.carga[CARGA_EM_ENVIO],
+                id_tipo_carga_id=self.dominios.tipo[item.tipo],
+                dat_data_hora_inicio=timezone.now(),
+            ))
+        return carga
+
+    def _finalizar_cargas(self) -> None:
+        detalhes = []
+        for (id_patriarca, _), carga in self.cargas.items():
+            registro = carga.registro
+            token = self.tokens.get(id_patriarca)
+            if token is not None:
+                registro.id_token_envio_carga = token
+            registro.id_status_carga_id = self.dominios.carga[CARGA_ERRO if carga.erros else CARGA_ENVIADA]
+            registro.str_mensagem_retorno = f'{carga.enviados} enviados, {carga.erros} com erro'
+            registro.dat_data_hora_fim = timezone.now()
+            registro.save(update_fields=[
+                'id_token_envio_carga', 'id_status_carga', 'str_mensagem_retorno', 'dat_data_hora_fim'
+            ])
+            detalhes.extend(carga.detalhes)
+        TblDetalheStatusCarga.objects.bulk_create(detalhes, batch_size=1000)
+
+
+def _descrever(status_http: Optional[int], corpo: str, erro: str) -> str:
+    if status_http is None:
+        return f'Sem resposta: {erro}'
+    corpo = (corpo or '').strip()
+    return f'HTTP {status_http}' + (f': {corpo[:TAMANHO_MENSAGEM]}' if corpo else '')
+
+
+def enviar_jsons(
+    registros: Iterable,
+    forcar: bool = False,
+    config: Optional[ConfigEnvio] = None,
+    dormir: Callable[[float], None] = time.sleep,
+) -> List[ResultadoEnvio]:
+    """
+    Envia os registros (TblOrganogramaJson/TblLotacaoJsonOrgao) à API externa.
+    Um resultado por registro, na mesma ordem. EnvioApiError se a API não
+    está configurada.
+    """
+    config = config or ConfigEnvio.do_settings()
+    registros = list(registros)
+    dominios = garantir_dominios()
+
+    inicio = time.perf_counter()
+    resultados = _Envio(config, forcar, dormir, dominios).executar(registros)
+    enviados = sum(r.enviado for r in resultados)
+    dispensados = sum(r.dispensado for r in resultados)
+    logger.info(
+        f"Envio à API externa: {enviados} enviados, {dispensados} dispensados, "
+        f"{len(resultados) - enviados - dispensados} com erro "
+        f"em {time.perf_counter() - inicio:.1f}s"
+    )
+    return resultados
+
+
+def enfileirar_envio(registros, forcar: bool = False) -> int:
+    """
+    Marca os registros do queryset como pendentes de envio; sem forcar, os
+    que o receptor já tem (mesmo hash) ficam de fora. Devolve quantos
+    entraram na fila.
+    """
+    registros = registros.exclude(str_status_envio=STATUS_EM_ENVIO)
+    if not forcar:
+        registros = registros.exclude(
+            str_hash_enviado__isnull=False, str_hash_enviado=F('str_hash_conteudo')
+        )
+    total = registros.update(str_status_envio=STATUS_PENDENTE, int_tentativas_envio=0)
+    logger.info(f"{total} JSONs ({registros.model.__name__}) na fila de envio")
+    return total
+
+
+def registros_pendentes() -> List:
+    """
+    Reserva a fila de envio para esta execução e devolve os registros:
+    organogramas primeiro, depois lotações. Os PENDENTE (e os EM_ENVIO de
+    execuções interrompidas) passam a EM_ENVIO e contam uma execução;
+    skip_locked deixa de fora o que outra execução está reservando.
+    """
+    expirados = timezone.now() - timedelta(
+        seconds=getattr(settings, 'CARGA_ORG_LOT_FILA_EXPIRACAO', 3600)
+    )
+    registros = []
+    for model, relacionados in (
+        (TblOrganogramaJson, 'id_organograma_versao__id_patriarca'),
+        (TblLotacaoJsonOrgao, 'id_patriarca'),
+    ):
+        with transaction.atomic(using=router.db_for_write(model)):
+            ids = list(model.objects.select_for_update(skip_locked=True).filter(
+                Q(str_status_envio=STATUS_PENDENTE)
+                | Q(str_status_envio=STATUS_EM_ENVIO, dat_envio_api__lt=expirados)
+            ).values_list('pk', flat=True))
+            model.objects.filter(pk__in=ids).update(
+                str_status_envio=STATUS_EM_ENVIO,
+                dat_envio_api=timezone.now(),
+                int_tentativas_envio=F('int_tentativas_envio') + 1,
+            )
+        registros += model.objects.filter(pk__in=ids).select_related(
+            relacionados
+        ).defer('js_conteudo').order_by('pk')
+    if registros:
+        logger.info(f"{len(registros)} JSONs reservados da fila de envio")
+    return registros
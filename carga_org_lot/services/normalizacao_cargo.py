@@ -0,0 +1,236 @@
+"""
+Normalização dos cargos das lotações (str_cargo_original ->
+str_cargo_normalizado).
+
+Cada cargo passa por:
+1. dobra de acentos e caixa, pontuação vira espaço ('Assist. Adm.' ->
+   'assist adm')
+2. expansão das abreviações (ABREVIACOES: 'assist' -> 'assistente')
+3. comparação exata com a lista canônica (dobrada do mesmo jeito)
+4. se não houver, busca aproximada: trigramas das palavras, índice
+   trigrama -> cargos canônicos pré-calculado e coeficiente de Dice; vale o
+   melhor acima de CARGA_ORG_LOT_CARGO_SIMILARIDADE_MINIMA
+
+Sem correspondência, o cargo normalizado fica nulo (vale o original) e o
+valor aparece em sem_correspondencia, para completar a lista canônica.
+
+Uma carga repete poucos milhares de cargos distintos em centenas de milhares
+de lotações: normalizar_cargos_lotacao lê só os valores distintos da versão,
+normaliza cada um uma vez (com memo por processo, em NormalizadorCargos) e
+grava tudo em um UPDATE ... FROM unnest(...).
+
+Configurações:
+- CARGA_ORG_LOT_CARGOS_CANONICOS: lista canônica (padrão CARGOS_CANONICOS)
+- CARGA_ORG_LOT_CARGO_SIMILARIDADE_MINIMA: padrão 0.7
+"""
+
+import logging
+import re
+import threading
+import time
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from django.conf import settings
+from django.db import connections, router
+
+from ..models import TblLotacao, TblLotacaoVersao
+
+logger = logging.getLogger(__name__)
+
+
+CARGOS_CANONICOS = (
+    'Agente de Fiscalização',
+    'Analista de Planejamento e Orçamento',
+    'Assessor Técnico',
+    'Assistente Administrativo',
+    'Auditor Fiscal',
+    'Auxiliar Administrativo',
+    'Coordenador',
+    'Diretor',
+    'Especialista em Políticas Públicas',
+    'Gerente',
+    'Secretário',
+    'Subsecretário',
+    'Técnico de Apoio',
+)
+
+ABREVIACOES = {
+    'adm': 'administrativo',
+    'admin': 'administrativo',
+    'ag': 'agente',
+    'anal': 'analista',
+    'assess': 'assessor',
+    'assist': 'assistente',
+    'aud': 'auditor',
+    'aux': 'auxiliar',
+    'coord': 'coordenador',
+    'dir': 'diretor',
+    'esp': 'especialista',
+    'fisc': 'fiscalizacao',
+    'ger': 'gerente',
+    'orc': 'orcamento',
+    'planej': 'planejamento',
+    'pol': 'politicas',
+    'pub': 'publicas',
+    'sec': 'secretario',
+    'subsec': 'subsecretario',
+    'tec': 'tecnico',
+}
+
+MEMO_MAXIMO = 100_000
+
+_NAO_ALFANUMERICO = re.compile(r'[^0-9a-z]+')
+
+
+def dobrar(texto: str) -> str:
+    """Sem acentos, minúsculo, só letras e dígitos separados por um espaço."""
+    sem_acento = unicodedata.normalize('NFKD', texto).encode('ascii', 'ignore').decode('ascii')
+    return _NAO_ALFANUMERICO.sub(' ', sem_acento.casefold()).strip()
+
+
+def chave_cargo(texto: str) -> str:
+    """Forma de comparação: dobrada e com as abreviações expandidas."""
+    return ' '.join(ABREVIACOES.get(palavra, palavra) for palavra in dobrar(texto).split())
+
+
+def trigramas(chave: str) -> Set[str]:
+    """Trigramas das palavras, com bordas (como o pg_trgm)."""
+    resultado = set()
+    for palavra in chave.split():
+        palavra = f'  {palavra} '
+        resultado.update(palavra[i:i + 3] for i in range(len(palavra) - 2))
+    return resultado
+
+
+class NormalizadorCargos:
+    """
+    Lista canônica pré-indexada (chave exata e trigrama -> cargos) com memo
+    dos valores já normalizados.
+    """
+
+    def __init__(self, canonicos: Sequence[str], similaridade_minima: float = 0.7):
+        self.canonicos = list(canonicos)
+        self.similaridade_minima = similaridade_minima
+        self._por_chave: Dict[str, str] = {}
+        self._tamanhos: List[int] = []
+        self._indice: Dict[str, List[int]] = {}
+        for posicao, canonico in enumerate(self.canonicos):
+            chave = chave_cargo(canonico)
+            self._por_chave.setdefault(chave, canonico)
+            grams = trigramas(chave)
+            self._tamanhos.append(len(grams))
+            for gram in grams:
+                self._indice.setdefault(gram, []).append(posicao)
+        self._memo: Dict[str, Optional[str]] = {}
+        self._trava = threading.Lock()
+
+    def normalizar(self, cargo: Optional[str]) -> Optional[str]:
+        """Cargo canônico correspondente, ou None."""
+        if not cargo:
+            return None
+        try:
+            return self._memo[cargo]
+        except KeyError:
+            pass
+        resultado = self._calcular(cargo)
+        with self._trava:
+            if len(self._memo) >= MEMO_MAXIMO:
+                self._memo.clear()
+            self._memo[cargo] = resultado
+        return resultado
+
+    def _calcular(self, cargo: str) -> Optional[str]:
+        chave = chave_cargo(cargo)
+        if not chave:
+            return None
+        exato = self._por_chave.get(chave)
+        if exato is not None:
+            return exato
+
+        grams = trigramas(chave)
+        comuns = Counter(
+            posicao for gram in grams for posicao in self._indice.get(gram, ())
+        )
+        melhor, melhor_similaridade = None, self.similaridade_minima
+        for posicao, quantidade in comuns.items():
+            # Dice: 2|A∩B| / (|A| + |B|)
+            similaridade = 2 * quantidade / (len(grams) + self._tamanhos[posicao])
+            if similaridade >= melhor_similaridade:
+                melhor, melhor_similaridade = self.canonicos[posicao], similaridade
+        return melhor
+
+
+_normalizador: Optional[Tuple[Tuple, NormalizadorCargos]] = None
+_trava_normalizador = threading.Lock()
+
+
+def normalizador() -> NormalizadorCargos:
+    """Normalizador do processo, refeito se a configuração mudar."""
+    global _normalizador
+    config = (
+        tuple(getattr(settings, 'CARGA_ORG_LOT_CARGOS_CANONICOS', CARGOS_CANONICOS)),
+        getattr(settings, 'CARGA_ORG_LOT_CARGO_SIMILARIDADE_MINIMA', 0.7),
+    )
+    with _trava_normalizador:
+        if _normalizador is None or _normalizador[0] != config:
+            _normalizador = (config, NormalizadorCargos(*config))
+        return _normalizador[1]
+
+
+@dataclass
+class ResultadoNormalizacao:
+    distintos: int = 0
+    normalizados: int = 0
+    atualizados: int = 0
+    sem_correspondencia: List[str] = field(default_factory=list)
+    duracao_ms: int = 0
+
+
+SQL_APLICAR = """
+    UPDATE {tabela} AS l
+    SET strcargonormalizado = m.normalizado
+    FROM unnest(%s::text[], %s::text[]) AS m(original, normalizado)
+    WHERE l.idlotacaoversao = %s
+      AND l.strcargooriginal = m.original
+      AND l.strcargonormalizado IS DISTINCT FROM m.normalizado
+"""
+
+
+def normalizar_cargos_lotacao(
+    versao: TblLotacaoVersao,
+    using: Optional[str] = None,
+) -> ResultadoNormalizacao:
+    """Normaliza os cargos da versão: cada valor distinto uma vez, um UPDATE."""
+    using = using or router.db_for_write(TblLotacao)
+    inicio = time.perf_counter()
+    resultado = ResultadoNormalizacao()
+
+    distintos = list(TblLotacao.objects.using(using).filter(
+        id_lotacao_versao=versao, str_cargo_original__isnull=False
+    ).values_list('str_cargo_original', flat=True).distinct())
+    cargos = normalizador()
+    normalizados = [cargos.normalizar(cargo) for cargo in distintos]
+
+    resultado.distintos = len(distintos)
+    resultado.normalizados = sum(1 for n in normalizados if n is not None)
+    resultado.sem_correspondencia = sorted(
+        cargo for cargo, normalizado in zip(distintos, normalizados) if normalizado is None
+    )
+    if distintos:
+        with connections[using].cursor() as cursor:
+            cursor.execute(
+                SQL_APLICAR.format(tabela=TblLotacao._meta.db_table),
+                [distintos, normalizados, versao.pk]
+            )
+            resultado.atualizados = cursor.rowcount
+
+    resultado.duracao_ms = int((time.perf_counter() - inicio) * 1000)
+    logger.info(
+        f"Cargos da lotação {versao.pk} em {resultado.duracao_ms}ms: "
+        f"{resultado.normalizados}/{resultado.distintos} distintos com correspondência, "
+        f"{resultado.atualizados} lotações atualizadas"
+    )
+    return resultado
@@ -0,0 +1,92 @@
+"""
+Partições por versão de tbllotacao e tbllotacaoinconsistencia.
+
+As duas tabelas são particionadas por LIST (idlotacaoversao), com uma
+partição por TblLotacaoVersao (tbllotacao_v<id>,
+tbllotacaoinconsistencia_v<id>):
+- as consultas filtram sempre pela versão e caem em uma partição só
+  (partition pruning), com índices do tamanho de uma carga
+- descartar uma versão é um DROP TABLE das suas partições, e não um DELETE
+  de milhões de linhas
+
+As partições acompanham o ciclo de vida da versão (signals): são criadas
+quando a TblLotacaoVersao é criada, antes da carga das lotações, e
+descartadas antes de a versão ser excluída. A conversão das tabelas existentes
+fica na migração 0005_particionar_lotacao.
+"""
+
+import logging
+from typing import List, Optional, Tuple
+
+from django.db import connections, router
+
+from ..models import TblLotacao, TblLotacaoInconsistencia
+
+logger = logging.getLogger(__name__)
+
+
+# Ordem de criação; o descarte é na ordem inversa (a inconsistência referencia
+# a lotação)
+TABELAS_PARTICIONADAS = (TblLotacao, TblLotacaoInconsistencia)
+
+
+def _schema_tabela(model) -> Tuple[str, str]:
+    schema, tabela = model._meta.db_table.split('.')
+    return schema.strip('"'), tabela.strip('"')
+
+
+def nome_particao(model, id_versao: int) -> str:
+    return f'{_schema_tabela(model)[1]}_v{int(id_versao)}'
+
+
+def criar_particoes(id_versao: int, using: Optional[str] = None):
+    """Cria (se ainda não existirem) as partições da versão."""
+    using = using or router.db_for_write(TblLotacao)
+    with connections[using].cursor() as cursor:
+        for model in TABELAS_PARTICIONADAS:
+            schema, tabela = _schema_tabela(model)
+            cursor.execute(
+                f'CREATE TABLE IF NOT EXISTS "{schema}"."{nome_particao(model, id_versao)}" '
+                f'PARTITION OF "{schema}"."{tabela}" FOR VALUES IN ({int(id_versao)})'
+            )
+    logger.debug(f"Partições da lotação {id_versao} criadas")
+
+
+def descartar_particoes(id_versao: int, using: Optional[str] = None):
+    """Descarta as partições da versão, com todas as suas linhas."""
+    using = using or router.db_for_write(TblLotacao)
+    connection = connections[using]
+    # O DROP não aceita checagens de FK adiadas pendentes na transação
+    connection.check_constraints()
+    with connection.cursor() as cursor:
+        for model in reversed(TABELAS_PARTICIONADAS):
+            schema, tabela = _schema_tabela(model)
+            particao = f'"{schema}"."{nome_particao(model, id_versao)}"'
+            cursor.execute('SELECT to_regclass(%s)', [particao])
+            if cursor.fetchone()[0] is None:
+                continue
+            # A partição referenciada pela FK composta só sai desanexada (o
+            # DETACH confere que nenhuma inconsistência aponta para ela)
+            cursor.execute(f'ALTER TABLE "{schema}"."{tabela}" DETACH PARTITION {particao}')
+            cursor.execute(f'DROP TABLE {particao}')
+    logger.info(f"Partições da lotação {id_versao} descartadas")
+
+
+def listar_particoes(model=TblLotacao, using: Optional[str] = None) -> List[str]:
+    """Partições existentes da tabela, em ordem de nome."""
+    using = using or router.db_for_read(model)
+    schema, tabela = _schema_tabela(model)
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT filha.relname
+            FROM pg_inherits
+            JOIN pg_class filha ON filha.oid = pg_inherits.inhrelid
+            JOIN pg_class mae ON mae.oid = pg_inherits.inhparent
+            JOIN pg_namespace ns ON ns.oid = mae.relnamespace
+            WHERE ns.nspname = %s AND mae.relname = %s
+            ORDER BY filha.relname
+            """,
+            [schema, tabela]
+        )
+        return [nome for nome, in cursor.fetchall()]
@@ -0,0 +1,156 @@
+"""
+Receptor HTTP local que imita a API externa (services.envio_api), para
+testes e para medir o envio sem depender do receptor real.
+
+Pode injetar latência, erros aleatórios e falhas nas primeiras tentativas de
+cada envio, e expirar os tokens emitidos. Guarda os envios recebidos por
+Idempotency-Key (repetições respondem 200 sem duplicar) e o pico de
+requisições simultâneas.
+
+    with ReceptorStub(latencia=0.05, taxa_erro=0.1) as receptor:
+        enviar_jsons(registros, config=ConfigEnvio.do_settings(url=receptor.url))
+"""
+
+import json
+import logging
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'    # keep-alive: o cliente reaproveita a conexão
+
+    def do_POST(self):
+        receptor = self.server.receptor
+        corpo = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        status, resposta, cabecalhos = receptor.atender(self.path, self.headers, corpo)
+        dados = json.dumps(resposta).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(dados)))
+        for nome, valor in cabecalhos.items():
+            self.send_header(nome, valor)
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def log_message(self, format, *args):
+        logger.debug(f"Receptor stub: {format % args}")
+
+
+class ReceptorStub:
+
+    def __init__(
+        self,
+        latencia: float = 0.0,
+        taxa_erro: float = 0.0,
+        falhas_iniciais: int = 0,
+        status_erro: int = 503,
+        retry_after: Optional[float] = None,
+        validade_token: int = 3600,
+        seed: Optional[int] = None,
+    ):
+        self.latencia = latencia
+        self.taxa_erro = taxa_erro
+        self.falhas_iniciais = falhas_iniciais
+        self.status_erro = status_erro
+        self.retry_after = retry_after
+        self.validade_token = validade_token
+        self._aleatorio = random.Random(seed)
+
+        self.tokens_emitidos: List[str] = []
+        self.recebidos: Dict[str, bytes] = {}
+        self.requisicoes: List[Tuple[str, Optional[str], int]] = []   # (caminho, chave, status)
+        self.max_simultaneas = 0
+
+        self._tokens_validos = set()
+        self._falhas: Dict[str, int] = {}
+        self._simultaneas = 0
+        self._trava = threading.Lock()
+        self._servidor: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, porta = self._servidor.server_address[:2]
+        return f'http://{host}:{porta}'
+
+    def iniciar(self) -> 'ReceptorStub':
+        self._servidor = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        self._servidor.daemon_threads = True
+        self._servidor.receptor = self
+        self._thread = threading.Thread(
+            target=self._servidor.serve_forever, name='receptor-stub', daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def parar(self) -> None:
+        if self._servidor is not None:
+            self._servidor.shutdown()
+            self._servidor.server_close()
+            self._servidor = None
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, *exc):
+        self.parar()
+
+    def expirar_tokens(self) -> None:
+        """Os tokens já emitidos passam a receber 401."""
+        with self._trava:
+            self._tokens_validos.clear()
+
+    def atender(self, caminho: str, cabecalhos, corpo: bytes):
+        with self._trava:
+            self._simultaneas += 1
+            self.max_simultaneas = max(self.max_simultaneas, self._simultaneas)
+        try:
+            if self.latencia:
+                time.sleep(self.latencia)
+            chave = cabecalhos.get('Idempotency-Key')
+            status, resposta, extras = self._responder(caminho, cabecalhos, chave, corpo)
+            with self._trava:
+                self.requisicoes.append((caminho, chave, status))
+            return status, resposta, extras
+        finally:
+            with self._trava:
+                self._simultaneas -= 1
+
+    def _responder(self, caminho, cabecalhos, chave, corpo):
+        if caminho == '/auth/token':
+            token = uuid.uuid4().hex
+            with self._trava:
+                self.tokens_emitidos.append(token)
+                self._tokens_validos.add(token)
+            return 200, {'access_token': token, 'expires_in': self.validade_token}, {}
+
+        autorizacao = cabecalhos.get('Authorization', '')
+        with self._trava:
+            autorizado = autorizacao.removeprefix('Bearer ') in self._tokens_validos
+        if not autorizado:
+            return 401, {'erro': 'token inválido ou expirado'}, {}
+        if not chave:
+            return 400, {'erro': 'Idempotency-Key obrigatória'}, {}
+
+        with self._trava:
+            falhas = self._falhas.get(chave, 0)
+            falhar = falhas < self.falhas_iniciais or self._aleatorio.random() < self.taxa_erro
+            if falhar:
+                self._falhas[chave] = falhas + 1
+        if falhar:
+            extras = {'Retry-After': str(self.retry_after)} if self.retry_after is not None else {}
+            return self.status_erro, {'erro': 'falha simulada'}, extras
+
+        with self._trava:
+            duplicado = chave in self.recebidos
+            self.recebidos.setdefault(chave, corpo)
+        if duplicado:
+            return 200, {'id': chave, 'duplicado': True}, {}
+        return 201, {'id': chave}, {}
@@ -0,0 +1,318 @@
+"""
+Retenção das versões de organograma e de lotação.
+
+Cada patriarca mantém as CARGA_ORG_LOT_RETENCAO_VERSOES versões mais recentes
+(por dat_processamento) de organograma e de lotação, e as ativas; as
+demais são expurgadas por expurgar_versoes, sem o DELETE em cascata do ORM:
+- cada tabela é apagada em lotes de CARGA_ORG_LOT_EXPURGO_LOTE linhas, cada
+  lote na sua transação, com CARGA_ORG_LOT_EXPURGO_PAUSA segundos entre os
+  lotes (locks curtos, sem represar a replicação)
+- lotações e inconsistências saem com as partições da versão
+  (services.particoes), sem DELETE
+- uma versão de organograma só sai quando nenhuma versão de lotação restante
+  a usa; as unidades são apagadas das folhas para a raiz
+
+Com diretório de arquivo, as linhas de cada versão são antes exportadas com
+COPY (CSV com cabeçalho, gzip) para
+<diretorio>/<patriarca>/<lotacao|organograma>_v<id>/<tabela>.<execucao>.csv.gz,
+prontas para um COPY FROM. Cada execução grava arquivos próprios (o carimbo
+<execucao>), por um temporário renomeado no fim, e nunca sobrescreve os de
+outra: uma nova execução depois de um expurgo interrompido exporta só as
+linhas que restaram, sem perder as já arquivadas. Com todas as tabelas da
+versão exportadas, concluido.<execucao>.json registra o arquivo completo;
+sem ele, o arquivo daquela execução está incompleto.
+"""
+
+import gzip
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.utils import timezone
+
+from ..models import (
+    TblLotacao,
+    TblLotacaoDiff,
+    TblLotacaoDiffItem,
+    TblLotacaoInconsistencia,
+    TblLotacaoJsonOrgao,
+    TblLotacaoVersao,
+    TblOrganogramaJson,
+    TblOrganogramaVersao,
+    TblOrgaoUnidade,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ResultadoExpurgo:
+    versoes_lotacao: List[int] = field(default_factory=list)
+    versoes_organograma: List[int] = field(default_factory=list)
+    linhas: Dict[str, int] = field(default_factory=dict)
+    arquivos: List[str] = field(default_factory=list)
+    duracao_ms: int = 0
+
+
+def _expiradas(model, manter: int, filtro: dict, using: str) -> List[int]:
+    """Versões além das `manter` mais recentes de cada patriarca, menos as ativas."""
+    expiradas = []
+    posicoes: Dict[int, int] = {}
+    versoes = model.objects.using(using).filter(**filtro).order_by(
+        'id_patriarca', '-dat_processamento', '-pk'
+    ).values_list('pk', 'id_patriarca_id', 'flg_ativo')
+    for pk, id_patriarca, ativo in versoes:
+        posicao = posicoes.get(id_patriarca, 0)
+        posicoes[id_patriarca] = posicao + 1
+        if posicao >= manter and not ativo:
+            expiradas.append(pk)
+    return expiradas
+
+
+def versoes_expiradas(
+    manter: Optional[int] = None,
+    id_patriarca: Optional[int] = None,
+    using: Optional[str] = None,
+) -> Tuple[List[int], List[int]]:
+    """(versões de lotação, versões de organograma) fora da retenção."""
+    if manter is None:
+        manter = getattr(settings, 'CARGA_ORG_LOT_RETENCAO_VERSOES', 3)
+    using = using or router.db_for_read(TblLotacaoVersao)
+    filtro = {'id_patriarca': id_patriarca} if id_patriarca is not None else {}
+
+    lotacoes = _expiradas(TblLotacaoVersao, manter, filtro, using)
+    em_uso = set(TblLotacaoVersao.objects.using(using).exclude(
+        pk__in=lotacoes
+    ).values_list('id_organograma_versao', flat=True))
+    organogramas = [
+        pk for pk in _expiradas(TblOrganogramaVersao, manter, filtro, using) if pk not in em_uso
+    ]
+    return lotacoes, organogramas
+
+
+def _tabela(model) -> str:
+    return model._meta.db_table
+
+
+def _coluna(model, campo: str) -> str:
+    return model._meta.get_field(campo).column
+
+
+class _Expurgo:
+
+    def __init__(self, diretorio, lote, pausa, progresso, dormir, using):
+        self.diretorio = Path(diretorio) if diretorio else None
+        self.lote = lote
+        self.pausa = pausa
+        self.progresso = progresso
+        self.dormir = dormir
+        self.using = using
+        self.connection = connections[using]
+        self.resultado = ResultadoExpurgo()
+        self.execucao = timezone.now().strftime('%Y%m%dT%H%M%S%f')
+
+    def informar(self, mensagem: str):
+        logger.info(mensagem)
+        if self.progresso is not None:
+            self.progresso(mensagem)
+
+    # ------------------------------------------------------------------
+    # Arquivo
+
+    def _gravar(self, caminho: Path, escrever: Callable) -> None:
+        """Grava por um temporário renomeado no fim; nunca sobrescreve."""
+        if caminho.exists():
+            raise FileExistsError(f'Arquivo de expurgo já existe: {caminho}')
+        temporario = caminho.with_name(f'{caminho.name}.tmp')
+        try:
+            escrever(temporario)
+            os.replace(temporario, caminho)
+        finally:
+            temporario.unlink(missing_ok=True)
+
+    def arquivar(self, pasta: Path, model, where: str) -> str:
+        """Exporta as linhas de `model` que atendem `where` (COPY, CSV, gzip)."""
+        nome = _tabela(model).split('.')[-1].strip('"')
+        pasta.mkdir(parents=True, exist_ok=True)
+        caminho = pasta / f'{nome}.{self.execucao}.csv.gz'
+        sql = (
+            f'COPY (SELECT * FROM {_tabela(model)} WHERE {where}) '
+            f'TO STDOUT WITH (FORMAT csv, HEADER)'
+        )
+
+        def escrever(destino):
+            with gzip.open(destino, 'wb') as arquivo, self.connection.cursor() as cursor:
+                bruto = cursor.cursor
+                if hasattr(bruto, 'copy'):
+                    with bruto.copy(sql) as copy:
+                        for bloco in copy:
+                            arquivo.write(bloco)
+                else:
+                    bruto.copy_expert(sql, arquivo)
+
+        self._gravar(caminho, escrever)
+        self.resultado.arquivos.append(str(caminho))
+        return caminho.name
+
+    def concluir_arquivo(self, pasta: Path, versao, arquivos: List[str]) -> None:
+        """Marca o arquivo da versão nesta execução como completo."""
+        conteudo = json.dumps({
+            'versao': versao.pk,
+            'modelo': type(versao).__name__,
+            'execucao': self.execucao,
+            'arquivos': arquivos,
+            'concluido_em': timezone.now().isoformat(),
+        }, indent=2)
+        self._gravar(
+            pasta / f'concluido.{self.execucao}.json',
+            lambda destino: destino.write_text(conteudo, encoding='utf-8'),
+        )
+
+    # ------------------------------------------------------------------
+    # Exclusão em lotes
+
+    def apagar_em_lotes(self, queryset, descricao: str) -> int:
+        """Apaga as linhas do queryset, `lote` por vez, cada lote em uma transação."""
+        model = queryset.model
+        sql = f'DELETE FROM {_tabela(model)} WHERE {model._meta.pk.column} = ANY(%s)'
+        total = 0
+        while True:
+            ids = list(queryset.order_by('pk').values_list('pk', flat=True)[:self.lote])
+            if not ids:
+                break
+            with transaction.atomic(using=self.using), self.connection.cursor() as cursor:
+                cursor.execute(sql, [ids])
+            total += len(ids)
+            self.informar(f'{descricao}: {total} linhas de {model._meta.verbose_name_plural} apagadas')
+            if len(ids) == self.lote:
+                self.dormir(self.pausa)
+        nome = _tabela(model).split('.')[-1].strip('"')
+        self.resultado.linhas[nome] = self.resultado.linhas.get(nome, 0) + total
+        return total
+
+    # ------------------------------------------------------------------
+
+    def lotacao(self, versao: TblLotacaoVersao):
+        descricao = f'Lotação {versao.pk}'
+        diffs = TblLotacaoDiff.objects.using(self.using).filter(
+            id_lotacao_versao_base=versao
+        ) | TblLotacaoDiff.objects.using(self.using).filter(id_lotacao_versao_nova=versao)
+        itens = TblLotacaoDiffItem.objects.using(self.using).filter(id_lotacao_diff__in=diffs)
+
+        if self.diretorio is not None:
+            pasta = self.diretorio / versao.id_patriarca.str_sigla_patriarca / f'lotacao_v{versao.pk}'
+            where_diff = (
+                f'{_coluna(TblLotacaoDiff, "id_lotacao_versao_base")} = {versao.pk} '
+                f'OR {_coluna(TblLotacaoDiff, "id_lotacao_versao_nova")} = {versao.pk}'
+            )
+            arquivos = [self.arquivar(pasta, TblLotacaoVersao, f'{versao._meta.pk.column} = {versao.pk}')]
+            for model in (TblLotacao, TblLotacaoInconsistencia, TblLotacaoJsonOrgao):
+                arquivos.append(self.arquivar(
+                    pasta, model, f'{_coluna(model, "id_lotacao_versao")} = {versao.pk}'
+                ))
+            arquivos.append(self.arquivar(pasta, TblLotacaoDiff, where_diff))
+            arquivos.append(self.arquivar(pasta, TblLotacaoDiffItem, (
+                f'{_coluna(TblLotacaoDiffItem, "id_lotacao_diff")} IN '
+                f'(SELECT {TblLotacaoDiff._meta.pk.column} FROM {_tabela(TblLotacaoDiff)} WHERE {where_diff})'
+            )))
+            self.concluir_arquivo(pasta, versao, arquivos)
+            self.informar(f'{descricao} arquivada em {pasta}')
+
+        self.apagar_em_lotes(itens, descricao)
+        self.apagar_em_lotes(diffs, descricao)
+        self.apagar_em_lotes(
+            TblLotacaoJsonOrgao.objects.using(self.using).filter(id_lotacao_versao=versao), descricao
+        )
+        lotacoes = TblLotacao.objects.using(self.using).filter(id_lotacao_versao=versao).count()
+        # Lotações e inconsistências: o signal de exclusão da versão descarta
+        # as partições
+        id_versao = versao.pk
+        with transaction.atomic(using=self.using):
+            versao.delete(using=self.using)
+        self.resultado.linhas['tbllotacao'] = self.resultado.linhas.get('tbllotacao', 0) + lotacoes
+        self.resultado.versoes_lotacao.append(id_versao)
+        self.informar(f'{descricao} expurgada ({lotacoes} lotações com as partições)')
+
+    def organograma(self, versao: TblOrganogramaVersao):
+        descricao = f'Organograma {versao.pk}'
+        if self.diretorio is not None:
+            pasta = self.diretorio / versao.id_patriarca.str_sigla_patriarca / f'organograma_v{versao.pk}'
+            arquivos = [self.arquivar(pasta, TblOrganogramaVersao, f'{versao._meta.pk.column} = {versao.pk}')]
+            for model in (TblOrgaoUnidade, TblOrganogramaJson):
+                arquivos.append(self.arquivar(
+                    pasta, model, f'{_coluna(model, "id_organograma_versao")} = {versao.pk}'
+                ))
+            self.concluir_arquivo(pasta, versao, arquivos)
+            self.informar(f'{descricao} arquivado em {pasta}')
+
+        self.apagar_em_lotes(
+            TblOrganogramaJson.objects.using(self.using).filter(id_organograma_versao=versao), descricao
+        )
+        # Folhas primeiro: a unidade pai só sai depois das filhas
+        self.apagar_em_lotes(
+            TblOrgaoUnidade.objects.using(self.using).filter(
+                id_organograma_versao=versao, tblorgaounidade__isnull=True
+            ),
+            descricao
+        )
+        id_versao = versao.pk
+        with transaction.atomic(using=self.using):
+            versao.delete(using=self.using)
+        self.resultado.versoes_organograma.append(id_versao)
+        self.informar(f'{descricao} expurgado')
+
+
+def expurgar_versoes(
+    manter: Optional[int] = None,
+    id_patriarca: Optional[int] = None,
+    diretorio: Optional[str] = None,
+    lote: Optional[int] = None,
+    pausa: Optional[float] = None,
+    simular: bool = False,
+    progresso: Optional[Callable[[str], None]] = None,
+    using: Optional[str] = None,
+    dormir: Callable[[float], None] = time.sleep,
+) -> ResultadoExpurgo:
+    """
+    Expurga as versões fora da retenção (lotação antes de organograma).
+    Com simular, só devolve as versões que seriam expurgadas.
+    """
+    using = using or router.db_for_write(TblLotacaoVersao)
+    inicio = time.perf_counter()
+    lotacoes, organogramas = versoes_expiradas(manter, id_patriarca, using)
+    if simular:
+        return ResultadoExpurgo(versoes_lotacao=lotacoes, versoes_organograma=organogramas)
+
+    expurgo = _Expurgo(
+        diretorio,
+        lote or getattr(settings, 'CARGA_ORG_LOT_EXPURGO_LOTE', 5000),
+        getattr(settings, 'CARGA_ORG_LOT_EXPURGO_PAUSA', 0.2) if pausa is None else pausa,
+        progresso,
+        dormir,
+        using,
+    )
+    expurgo.informar(
+        f'{len(lotacoes)} versões de lotação e {len(organogramas)} de organograma a expurgar'
+    )
+    for versao in TblLotacaoVersao.objects.using(using).filter(
+        pk__in=lotacoes
+    ).select_related('id_patriarca').order_by('pk'):
+        expurgo.lotacao(versao)
+    for versao in TblOrganogramaVersao.objects.using(using).filter(
+        pk__in=organogramas
+    ).select_related('id_patriarca').order_by('pk'):
+        expurgo.organograma(versao)
+
+    resultado = expurgo.resultado
+    resultado.duracao_ms = int((time.perf_counter() - inicio) * 1000)
+    logger.info(
+        f"Expurgo em {resultado.duracao_ms}ms: lotações {resultado.versoes_lotacao}, "
+        f"organogramas {resultado.versoes_organograma}, linhas {resultado.linhas}"
+    )
+    return resultado
@@ -0,0 +1,252 @@
+"""
+Validação em lote das lotações de uma versão.
+
+Regras (tipos de TblLotacaoInconsistencia):
+- CPF_INVALIDO: não tem 11 dígitos, dígitos todos iguais ou dígitos
+  verificadores errados (aceita com ou sem pontuação)
+- CPF_DUPLICADO: CPF (só os dígitos) que já apareceu na versão; a primeira
+  lotação do CPF (menor id) não é marcada
+- ORGAO_DESCONHECIDO / UNIDADE_DESCONHECIDA: órgão ou unidade que não
+  pertence à versão de organograma da lotação
+- CARGO_AUSENTE: cargo original vazio
+
+As lotações são lidas em blocos (VALIDACAO_BLOCO) e cada bloco é validado
+por coluna: a coluna de CPFs passa de uma vez pela normalização
+(str.translate) e pela conta dos dígitos verificadores, feita com tabelas
+pré-calculadas por bloco de 3 dígitos (3 consultas em vez de 9
+multiplicações por dígito). Os resultados voltam ao banco em bloco:
+- um UPDATE ... FROM unnest(...) por bloco, só com as lotações cujo
+  flg_valido/str_erros_validacao mudou (filtrado pela versão, para cair na
+  partição dela; ver services.particoes)
+- bulk_create das inconsistências (as anteriores da versão são removidas
+  antes, em um DELETE)
+
+Tudo em uma transação: uma validação interrompida não deixa a versão pela
+metade.
+
+resumo_inconsistencias conta as inconsistências gravadas por tipo e por
+órgão em uma consulta agrupada (GROUPING SETS), para a tela de revisão; o
+detalhe de cada tipo é paginado por chave (idx_inconsistencia_versao_tipo).
+"""
+
+import logging
+import time
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Any, Dict, List, Optional, Sequence
+
+from django.db import connections, router, transaction
+from django.utils import timezone
+
+from ..models import TblLotacao, TblLotacaoInconsistencia, TblLotacaoVersao, TblOrgaoUnidade
+
+logger = logging.getLogger(__name__)
+
+
+VALIDACAO_BLOCO = 20000
+LOTE_INCONSISTENCIAS = 5000
+
+_SEM_PONTUACAO = str.maketrans('', '', '.-/ ')
+
+
+def _tabelas_blocos(pesos: Sequence[int]) -> List[List[int]]:
+    """
+    Para cada bloco de 3 dígitos (posições 1-3, 4-6 e 7-9), a soma ponderada
+    dos dígitos de cada valor de 000 a 999.
+    """
+    tabelas = []
+    for inicio in (0, 3, 6):
+        p1, p2, p3 = pesos[inicio:inicio + 3]
+        tabelas.append([
+            (n // 100) * p1 + (n // 10 % 10) * p2 + (n % 10) * p3 for n in range(1000)
+        ])
+    return tabelas
+
+
+# Pesos dos 9 primeiros dígitos no 1º (10..2) e no 2º (11..3) verificador
+_DV1 = _tabelas_blocos(range(10, 1, -1))
+_DV2 = _tabelas_blocos(range(11, 2, -1))
+
+
+def digitos_cpf(cpfs: Sequence[Optional[str]]) -> List[str]:
+    """Coluna de CPFs só com os dígitos (pontuação removida)."""
+    return [(cpf or '').translate(_SEM_PONTUACAO) for cpf in cpfs]
+
+
+def cpfs_validos(digitos: Sequence[str]) -> List[bool]:
+    """Coluna de CPFs (só dígitos) -> coluna de válidos."""
+    t1a, t1b, t1c = _DV1
+    t2a, t2b, t2c = _DV2
+    validos = []
+    for cpf in digitos:
+        # isdigit() sozinho aceita dígitos Unicode ('²', '٥'), que o int() recusa
+        if len(cpf) != 11 or not (cpf.isascii() and cpf.isdigit()) or cpf == cpf[0] * 11:
+            validos.append(False)
+            continue
+        a, b, c = int(cpf[0:3]), int(cpf[3:6]), int(cpf[6:9])
+        dv1 = (t1a[a] + t1b[b] + t1c[c]) * 10 % 11 % 10
+        dv2 = (t2a[a] + t2b[b] + t2c[c] + dv1 * 2) * 10 % 11 % 10
+        validos.append(int(cpf[9:]) == dv1 * 10 + dv2)
+    return validos
+
+
+@dataclass
+class ResultadoValidacao:
+    total: int = 0
+    validos: int = 0
+    atualizados: int = 0
+    inconsistencias: Dict[str, int] = field(default_factory=dict)
+    duracao_ms: int = 0
+
+    @property
+    def invalidos(self) -> int:
+        return self.total - self.validos
+
+
+SQL_ATUALIZAR = """
+    UPDATE {tabela} AS l
+    SET flgvalido = v.valido, strerrosvalidacao = v.erros
+    FROM unnest(%s::bigint[], %s::boolean[], %s::text[]) AS v(id, valido, erros)
+    WHERE l.idlotacaoversao = %s AND l.idlotacao = v.id
+"""
+
+SQL_RESUMO = """
+    SELECT i.strtipo, o.idorgaounidade, o.strsigla, count(*), GROUPING(i.strtipo)
+    FROM {inconsistencia} AS i
+    JOIN {lotacao} AS l
+      ON l.idlotacaoversao = i.idlotacaoversao AND l.idlotacao = i.idlotacao
+    JOIN {orgao} AS o ON o.idorgaounidade = l.idorgaolotacao
+    WHERE i.idlotacaoversao = %s AND l.idlotacaoversao = %s
+    GROUP BY GROUPING SETS ((i.strtipo), (o.idorgaounidade, o.strsigla), ())
+"""
+
+COLUNAS = (
+    'id_lotacao', 'str_cpf', 'id_orgao_lotacao', 'id_unidade_lotacao',
+    'str_cargo_original', 'flg_valido', 'str_erros_validacao',
+)
+
+
+def _blocos(linhas, tamanho: int):
+    linhas = iter(linhas)
+    while True:
+        bloco = list(islice(linhas, tamanho))
+        if not bloco:
+            return
+        yield bloco
+
+
+def validar_lotacao(
+    versao: TblLotacaoVersao,
+    bloco: int = VALIDACAO_BLOCO,
+    using: Optional[str] = None,
+) -> ResultadoValidacao:
+    """Valida todas as lotações da versão e grava o resultado."""
+    using = using or router.db_for_write(TblLotacao)
+    inicio = time.perf_counter()
+    resultado = ResultadoValidacao()
+    agora = timezone.now()
+
+    unidades = set(TblOrgaoUnidade.objects.using(using).filter(
+        id_organograma_versao=versao.id_organograma_versao_id
+    ).values_list('pk', flat=True))
+    primeira_por_cpf: Dict[str, int] = {}
+    sql = SQL_ATUALIZAR.format(tabela=TblLotacao._meta.db_table)
+
+    with transaction.atomic(using=using):
+        TblLotacaoInconsistencia.objects.using(using).filter(
+            id_lotacao_versao=versao
+        ).delete()
+
+        linhas = TblLotacao.objects.using(using).filter(
+            id_lotacao_versao=versao
+        ).order_by('id_lotacao').values_list(*COLUNAS).iterator(chunk_size=bloco)
+
+        for linhas_bloco in _blocos(linhas, bloco):
+            ids, cpfs, orgaos, unidades_lotacao, cargos, validos_antes, erros_antes = zip(*linhas_bloco)
+            digitos = digitos_cpf(cpfs)
+            cpf_ok = cpfs_validos(digitos)
+            orgao_ok = [orgao in unidades for orgao in orgaos]
+            unidade_ok = [u is None or u in unidades for u in unidades_lotacao]
+            cargo_ok = [bool(cargo and cargo.strip()) for cargo in cargos]
+
+            mudancas = ([], [], [])
+            inconsistencias = []
+            for i, id_lotacao in enumerate(ids):
+                problemas = []
+                if not cpf_ok[i]:
+                    problemas.append((TblLotacaoInconsistencia.TIPO_CPF_INVALIDO, f'CPF inválido: {cpfs[i]}'))
+                if digitos[i]:
+                    primeira = primeira_por_cpf.setdefault(digitos[i], id_lotacao)
+                    if primeira != id_lotacao:
+                        problemas.append((
+                            TblLotacaoInconsistencia.TIPO_CPF_DUPLICADO,
+                            f'CPF {cpfs[i]} também na lotação {primeira}'
+                        ))
+                if not orgao_ok[i]:
+                    problemas.append((
+                        TblLotacaoInconsistencia.TIPO_ORGAO_DESCONHECIDO,
+                        f'Órgão {orgaos[i]} fora do organograma da versão'
+                    ))
+                if not unidade_ok[i]:
+                    problemas.append((
+                        TblLotacaoInconsistencia.TIPO_UNIDADE_DESCONHECIDA,
+                        f'Unidade {unidades_lotacao[i]} fora do organograma da versão'
+                    ))
+                if not cargo_ok[i]:
+                    problemas.append((TblLotacaoInconsistencia.TIPO_CARGO_AUSENTE, 'Cargo não informado'))
+
+                valido = not problemas
+                erros = '; '.join(detalhe for _, detalhe in problemas) or None
+                if valido != validos_antes[i] or erros != erros_antes[i]:
+                    mudancas[0].append(id_lotacao)
+                    mudancas[1].append(valido)
+                    mudancas[2].append(erros)
+                resultado.validos += valido
+                for tipo, detalhe in problemas:
+                    resultado.inconsistencias[tipo] = resultado.inconsistencias.get(tipo, 0) + 1
+                    inconsistencias.append(TblLotacaoInconsistencia(
+                        id_lotacao_id=id_lotacao, id_lotacao_versao_id=versao.pk,
+                        str_tipo=tipo, str_detalhe=detalhe, dat_registro=agora
+                    ))
+
+            resultado.total += len(ids)
+            if mudancas[0]:
+                with connections[using].cursor() as cursor:
+                    cursor.execute(sql, [*mudancas, versao.pk])
+                resultado.atualizados += len(mudancas[0])
+            TblLotacaoInconsistencia.objects.using(using).bulk_create(
+                inconsistencias, batch_size=LOTE_INCONSISTENCIAS
+            )
+
+    resultado.duracao_ms = int((time.perf_counter() - inicio) * 1000)
+    logger.info(
+        f"Validação da lotação {versao.pk} em {resultado.duracao_ms}ms: "
+        f"{resultado.validos}/{resultado.total} válidas, {resultado.atualizados} atualizadas, "
+        f"inconsistências {resultado.inconsistencias}"
+    )
+    return resultado
+
+
+def resumo_inconsistencias(versao: TblLotacaoVersao, using: Optional[str] = None) -> Dict[str, Any]:
+    """Total e contagens por tipo e por órgão das inconsistências da versão."""
+    using = using or router.db_for_read(TblLotacaoInconsistencia)
+    sql = SQL_RESUMO.format(
+        inconsistencia=TblLotacaoInconsistencia._meta.db_table,
+        lotacao=TblLotacao._meta.db_table,
+        orgao=TblOrgaoUnidade._meta.db_table,
+    )
+    with connections[using].cursor() as cursor:
+        cursor.execute(sql, [versao.pk, versao.pk])
+        linhas = cursor.fetchall()
+
+    resumo = {'total': 0, 'por_tipo': [], 'por_orgao': []}
+    for tipo, id_orgao, sigla, total, sem_tipo in linhas:
+        if not sem_tipo:
+            resumo['por_tipo'].append({'tipo': tipo, 'total': total})
+        elif id_orgao is not None:
+            resumo['por_orgao'].append({'id_orgao': id_orgao, 'sigla': sigla, 'total': total})
+        else:
+            resumo['total'] = total
+    resumo['por_tipo'].sort(key=lambda item: (-item['total'], item['tipo']))
+    resumo['por_orgao'].sort(key=lambda item: (-item['total'], item['sigla']))
+    return resumo
@@ -0,0 +1,96 @@
+"""
+Signals da aplicação Carga Org/Lot.
+Invalida as respostas pré-comprimidas (common.utils.precompressao) e os diffs
+em cache (services.diff_organograma) das versões de organograma quando a
+versão, seus órgãos ou o patriarca são alterados.
+
+Também mantém o hash do conteúdo dos JSONs de envio e o total de servidores
+e o tamanho do conteúdo dos JSONs de lotação por órgão
+(services.conteudo_json), e as partições por versão das lotações
+(services.particoes).
+"""
+
+from django.db.models.signals import post_save, post_delete, pre_delete, pre_save
+from django.dispatch import receiver
+
+from common.utils import precompressao
+
+from .models import (
+    TblLotacaoJsonOrgao,
+    TblLotacaoVersao,
+    TblOrganogramaJson,
+    TblOrganogramaVersao,
+    TblOrgaoUnidade,
+    TblPatriarca,
+)
+from .services.conteudo_json import atualizar_totais, hash_conteudo
+from .services.diff_organograma import invalidar_versao
+from .services.particoes import criar_particoes, descartar_particoes
+
+
+RECURSOS_ORGANOGRAMA = ('carga:organograma-hierarquia', 'carga:organograma-orgaos')
+
+
+def invalidar_organograma(id_organograma_versao):
+    for nome in RECURSOS_ORGANOGRAMA:
+        precompressao.invalidar(nome, id_organograma_versao)
+    invalidar_versao(id_organograma_versao)
+
+
+@receiver(post_save, sender=TblOrganogramaVersao)
+@receiver(post_delete, sender=TblOrganogramaVersao)
+def invalidar_versao_organograma(sender, instance, **kwargs):
+    invalidar_organograma(instance.pk)
+
+
+@receiver(post_save, sender=TblOrgaoUnidade)
+@receiver(post_delete, sender=TblOrgaoUnidade)
+def invalidar_orgao_unidade(sender, instance, **kwargs):
+    invalidar_organograma(instance.id_organograma_versao_id)
+
+
+@receiver(post_save, sender=TblPatriarca)
+def invalidar_patriarca(sender, instance, created=False, **kwargs):
+    """A hierarquia inclui a sigla e o nome do patriarca."""
+    if created:
+        return
+    versoes = TblOrganogramaVersao.objects.filter(
+        id_patriarca=instance.pk
+    ).values_list('id_organograma_versao', flat=True)
+    for id_versao in versoes:
+        invalidar_organograma(id_versao)
+
+
+@receiver(pre_save, sender=TblLotacaoJsonOrgao)
+@receiver(pre_save, sender=TblOrganogramaJson)
+def calcular_hash_json(sender, instance, update_fields=None, **kwargs):
+    """O hash (ETag e comparação no envio) acompanha toda gravação do conteúdo."""
+    if update_fields is None:
+        instance.str_hash_conteudo = hash_conteudo(instance.js_conteudo)
+
+
+@receiver(post_save, sender=TblLotacaoJsonOrgao)
+@receiver(post_save, sender=TblOrganogramaJson)
+def gravar_hash_json(sender, instance, update_fields=None, **kwargs):
+    """save(update_fields) com o conteúdo e sem o hash: grava o recalculado."""
+    if update_fields and 'js_conteudo' in update_fields and 'str_hash_conteudo' not in update_fields:
+        instance.str_hash_conteudo = hash_conteudo(instance.js_conteudo)
+        sender.objects.filter(pk=instance.pk).update(str_hash_conteudo=instance.str_hash_conteudo)
+
+
+@receiver(post_save, sender=TblLotacaoJsonOrgao)
+def totalizar_json_orgao(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or 'js_conteudo' in update_fields:
+        atualizar_totais(instance)
+
+
+@receiver(post_save, sender=TblLotacaoVersao)
+def criar_particoes_versao(sender, instance, created=False, using=None, **kwargs):
+    if created:
+        criar_particoes(instance.pk, using=using)
+
+
+@receiver(pre_delete, sender=TblLotacaoVersao)
+def descartar_particoes_versao(sender, instance, using=None, **kwargs):
+    """Antes do DELETE em cascata, que então não encontra mais linhas."""
+    descartar_particoes(instance.pk, using=using)
@@ -0,0 +1,44 @@
+"""
+Testes para LotacaoVersaoViewSet
+"""
+
+import json
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from common.services.dados_sinteticos import EscalaSintetica, GeradorDadosSinteticos
+from ..models import TblLotacao, TblLotacaoVersao
+from ..serializers import TblLotacaoSerializer
+
+
+class LotacaoRegistrosTest(TestCase):
+    """Testes da action registros (resposta em fluxo)"""
+
+    databases = {'default', 'gpp_plataform_db'}
+
+    @classmethod
+    def setUpTestData(cls):
+        GeradorDadosSinteticos(EscalaSintetica(
+            patriarcas=1, profundidade=2, largura=2, lotacoes=25, acoes=1, usuarios=1
+        )).gerar()
+        cls.versao = TblLotacaoVersao.objects.get()
+
+    def test_registros_paginados_em_fluxo(self):
+        """A página emitida em fluxo equivale à serialização do DRF"""
+        client = APIClient()
+        client.force_authenticate(user=self.versao.id_patriarca.id_usuario_criacao)
+
+        response = client.get(
+            f'/api/v1/carga/lotacao/{self.versao.pk}/registros/?page_size=10&page=2'
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        dados = json.loads(b''.join(response.streaming_content))
+        self.assertEqual((dados['total'], dados['page'], dados['page_size']), (25, 2, 10))
+
+        esperado = TblLotacaoSerializer(
+            TblLotacao.objects.filter(id_lotacao_versao=self.versao)[10:20], many=True
+        ).data
+        self.assertEqual(dados['results'], json.loads(json.dumps(esperado, default=str)))
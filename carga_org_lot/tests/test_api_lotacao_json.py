@@ -2,7 +2,13 @@
 Testes para LotacaoJsonOrgaoViewSet
 """
 
-from django.test import TestCase
+import io
+import json
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
 from rest_framework import status
@@ -12,7 +18,10 @@ import uuid
 from ..models import (
     TblPatriarca, TblOrganogramaVersao, TblLotacaoVersao,
     TblOrgaoUnidade, TblLotacaoJsonOrgao, TblLotacao, TblStatusProgresso,
+    TblOrganogramaJson,
 )
+from ..services import hash_conteudo
+from ..services.receptor_stub import ReceptorStub
 
 User = get_user_model()
 
@@ -99,6 +108,42 @@ class LotacaoJsonOrgaoViewSetTest(TestCase):
         response = self.client.get('/api/v1/carga/lotacao-json/')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
     
+    def test_list_sem_conteudo(self):
+        """Listagem usa os totais gravados, sem o js_conteudo"""
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get('/api/v1/carga/lotacao-json/')
+        self.assertFalse(any('jsconteudo' in q['sql'] for q in consultas.captured_queries))
+        item = response.data['results'][0] if 'results' in response.data else response.data[0]
+        self.assertNotIn('js_conteudo', item)
+        self.assertEqual(item['total_servidores'], 1)
+        self.assertGreater(item['int_tamanho_bytes'], 0)
+    
+    def test_conteudo_bruto_com_intervalos(self):
+        """conteudo_bruto devolve o JSON inteiro ou intervalos de bytes"""
+        url = f'/api/v1/carga/lotacao-json/{self.lotacao_json.pk}/conteudo_bruto/'
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        corpo = response.content
+        self.assertEqual(json.loads(corpo), self.lotacao_json.js_conteudo)
+        total = len(corpo)
+        self.lotacao_json.refresh_from_db()
+        self.assertEqual(self.lotacao_json.int_tamanho_bytes, total)
+        
+        parte = self.client.get(url, HTTP_RANGE='bytes=5-14')
+        self.assertEqual(parte.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        self.assertEqual(parte.content, corpo[5:15])
+        self.assertEqual(parte['Content-Range'], f'bytes 5-14/{total}')
+        
+        self.assertEqual(self.client.get(url, HTTP_RANGE='bytes=-4').content, corpo[-4:])
+        self.assertEqual(
+            self.client.get(url, HTTP_RANGE=f'bytes={total}-').status_code,
+            status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE
+        )
+        # If-Range com outro ETag: conteúdo inteiro
+        inteiro = self.client.get(url, HTTP_RANGE='bytes=0-1', HTTP_IF_RANGE='"outro"')
+        self.assertEqual(inteiro.status_code, status.HTTP_200_OK)
+    
     def test_retrieve(self):
         """Testa recuperação"""
         url = f'/api/v1/carga/lotacao-json/{self.lotacao_json.pk}/'
@@ -118,8 +163,129 @@ class LotacaoJsonOrgaoViewSetTest(TestCase):
         response = self.client.post(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
     
+    def test_regenerar_sem_mudanca_nao_grava(self):
+        """Segunda regeneração com os mesmos dados não regrava o registro"""
+        url = f'/api/v1/carga/lotacao-json/{self.lotacao_json.pk}/regenerar/'
+        primeira = self.client.post(url)
+        self.assertTrue(primeira.data['alterado'])
+        self.assertEqual(primeira.data['total_servidores'], 1)
+        
+        segunda = self.client.post(url)
+        self.assertFalse(segunda.data['alterado'])
+        self.assertEqual(segunda.data['hash_conteudo'], primeira.data['hash_conteudo'])
+        
+        self.lotacao.str_cargo_original = 'Gerente'
+        self.lotacao.save()
+        self.assertTrue(self.client.post(url).data['alterado'])
+    
+    def test_conteudo_etag(self):
+        """ETag cobre o hash e os dados de envio; If-None-Match igual responde 304"""
+        url = f'/api/v1/carga/lotacao-json/{self.lotacao_json.pk}/conteudo/'
+        response = self.client.get(url)
+        etag = response['ETag']
+        self.assertTrue(etag.startswith(f'"{hash_conteudo(self.lotacao_json.js_conteudo)}-'))
+        
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=f"W/{etag}")
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        
+        # Mesmo conteúdo, envio registrado: a representação mudou
+        TblLotacaoJsonOrgao.objects.filter(pk=self.lotacao_json.pk).update(
+            dat_envio_api=timezone.now(), str_status_envio='ENVIADO'
+        )
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status_envio'], 'ENVIADO')
+        self.assertNotEqual(response['ETag'], etag)
+    
+    def test_hash_acompanha_o_conteudo(self):
+        """Toda gravação do js_conteudo recalcula o hash, com ou sem update_fields"""
+        organograma_json = TblOrganogramaJson.objects.create(
+            id_organograma_versao=self.organograma,
+            js_conteudo={'patriarca': 'SEGER', 'orgaos': []},
+            dat_criacao=timezone.now(),
+        )
+        for registro in (self.lotacao_json, organograma_json):
+            self.assertEqual(registro.str_hash_conteudo, hash_conteudo(registro.js_conteudo))
+            registro.js_conteudo = {**registro.js_conteudo, 'extra': 1}
+            registro.save(update_fields=['js_conteudo'])
+            registro.refresh_from_db()
+            self.assertEqual(registro.str_hash_conteudo, hash_conteudo(registro.js_conteudo))
+            registro.js_conteudo = {**registro.js_conteudo, 'extra': 2}
+            registro.save()
+            registro.refresh_from_db()
+            self.assertEqual(registro.str_hash_conteudo, hash_conteudo(registro.js_conteudo))
+        
+        url = f'/api/v1/carga/lotacao-json/{self.lotacao_json.pk}/'
+        response = self.client.patch(url, {'js_conteudo': {'servidores': []}}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.lotacao_json.refresh_from_db()
+        self.assertEqual(self.lotacao_json.str_hash_conteudo, hash_conteudo({'servidores': []}))
+    
+    def test_enviar_api_pula_conteudo_ja_enviado(self):
+        """Conteúdo idêntico ao último enviado não é reenviado"""
+        url = f'/api/v1/carga/lotacao-json/{self.lotacao_json.pk}/enviar_api/'
+        with ReceptorStub() as receptor, self.settings(API_EXTERNA_URL=receptor.url):
+            response = self.client.post(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertTrue(response.data['enviado'])
+            response = self.client.post(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertFalse(response.data['enviado'])
+            
+            # Conteúdo mudou: envia de novo sem precisar de force
+            self.client.post(f'/api/v1/carga/lotacao-json/{self.lotacao_json.pk}/regenerar/')
+            response = self.client.post(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertTrue(response.data['enviado'])
+            self.assertEqual(len(receptor.recebidos), 2)
+    
+    def test_enviar_api_falha_e_sem_configuracao(self):
+        """Receptor com erro responde 502; sem API_EXTERNA_URL, 503"""
+        url = f'/api/v1/carga/lotacao-json/{self.lotacao_json.pk}/enviar_api/'
+        with ReceptorStub(falhas_iniciais=10, status_erro=400) as receptor, \
+                self.settings(API_EXTERNA_URL=receptor.url):
+            response = self.client.post(url)
+        self.assertEqual(response.status_code, status.HTTP_502_BAD_GATEWAY)
+        self.assertEqual(response.data['status'], 'ERRO')
+        self.assertEqual(response.data['tentativas'], 1)
+        
+        with self.settings(API_EXTERNA_URL=''):
+            response = self.client.post(url)
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+    
+    def test_enviar_em_lote(self):
+        """Enfileira os órgãos da versão (202); enviar_cargas --pendentes envia a fila"""
+        url = '/api/v1/carga/lotacao-json/enviar_em_lote/'
+        dados = {'lotacao_versao_id': self.lotacao_versao.pk}
+        response = self.client.post(url, dados, format='json')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual((response.data['total'], response.data['enfileirados']), (1, 1))
+        self.lotacao_json.refresh_from_db()
+        self.assertEqual(self.lotacao_json.str_status_envio, 'PENDENTE')
+        
+        saida = io.StringIO()
+        call_command('enviar_cargas', '--pendentes', '--stub', stdout=saida)
+        self.assertIn('1 enviados', saida.getvalue())
+        self.lotacao_json.refresh_from_db()
+        self.assertEqual(self.lotacao_json.str_status_envio, 'ENVIADO')
+        
+        # Já recebido: só volta para a fila com force
+        self.assertEqual(self.client.post(url, dados, format='json').data['enfileirados'], 0)
+        response = self.client.post(url, {**dados, 'force': True}, format='json')
+        self.assertEqual(response.data['enfileirados'], 1)
+    
     def test_estatisticas_action(self):
         """Testa action estatisticas"""
         response = self.client.get('/api/v1/carga/lotacao-json/estatisticas/')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertIn('total', response.data)
+
+
+class HashConteudoTest(SimpleTestCase):
+    """Hash canônico do conteúdo"""
+    
+    def test_ignora_ordem_das_chaves_e_data_geracao(self):
+        a = {'orgao': {'sigla': 'X', 'nome': 'Órgão'}, 'servidores': [], 'data_geracao': '2026-01-01'}
+        b = {'servidores': [], 'orgao': {'nome': 'Órgão', 'sigla': 'X'}, 'data_geracao': '2026-02-01'}
+        self.assertEqual(hash_conteudo(a), hash_conteudo(b))
+        self.assertNotEqual(hash_conteudo(a), hash_conteudo({**a, 'servidores': [{'cpf': '1'}]}))
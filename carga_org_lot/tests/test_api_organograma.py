@@ -0,0 +1,75 @@
+"""
+Testes para OrganogramaVersaoViewSet
+"""
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+import uuid
+
+from ..models import TblPatriarca, TblOrganogramaVersao, TblOrgaoUnidade, TblStatusProgresso
+
+User = get_user_model()
+
+
+class OrganogramaHierarquiaTest(TestCase):
+    """Testes da action hierarquia"""
+
+    databases = {'default', 'gpp_plataform_db'}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='org@example.com', password='testpass123')
+        status_progresso = TblStatusProgresso.objects.get_or_create(
+            id_status_progresso=1,
+            defaults={'str_descricao': 'Em Progresso'}
+        )[0]
+        cls.patriarca = TblPatriarca.objects.create(
+            id_externo_patriarca=uuid.uuid4(),
+            str_sigla_patriarca='SEGER',
+            str_nome='Secretaria de Estado de Gestão',
+            id_status_progresso=status_progresso,
+            dat_criacao=timezone.now(),
+            id_usuario_criacao=cls.user
+        )
+        cls.organograma = TblOrganogramaVersao.objects.create(
+            id_patriarca=cls.patriarca,
+            str_origem='TESTE',
+            dat_processamento=timezone.now(),
+            str_status_processamento='PROCESSADO',
+            flg_ativo=True
+        )
+
+        raiz = cls._orgao('SEGER', None, 1)
+        for n in range(3):
+            filho = cls._orgao(f'SUB{n}', raiz, 2)
+            for m in range(3):
+                cls._orgao(f'SUB{n}-{m}', filho, 3)
+
+    @classmethod
+    def _orgao(cls, sigla, pai, nivel):
+        return TblOrgaoUnidade.objects.create(
+            id_organograma_versao=cls.organograma,
+            id_patriarca=cls.patriarca,
+            str_nome=sigla,
+            str_sigla=sigla,
+            id_orgao_unidade_pai=pai,
+            int_nivel_hierarquia=nivel,
+            flg_ativo=True,
+            dat_criacao=timezone.now(),
+        )
+
+    def test_hierarquia_em_consultas_constantes(self):
+        """Árvore completa montada dentro do orçamento de queries"""
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+
+        response = client.get(f'/api/v1/carga/organograma/{self.organograma.pk}/hierarquia/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        raiz, = response.data['hierarquia']
+        self.assertEqual(raiz['sigla'], 'SEGER')
+        self.assertEqual([f['sigla'] for f in raiz['filhos']], ['SUB0', 'SUB1', 'SUB2'])
+        self.assertEqual(len(raiz['filhos'][2]['filhos']), 3)
@@ -0,0 +1,153 @@
+"""
+Testes do diff entre versões de lotação
+"""
+
+import csv
+import io
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from common.services.dados_sinteticos import EscalaSintetica, GeradorDadosSinteticos
+
+from ..models import TblLotacao, TblLotacaoDiffItem, TblLotacaoVersao, TblOrgaoUnidade
+from ..services import DiffLotacaoError, diff_lotacao
+
+
+class DiffLotacaoTest(TestCase):
+
+    databases = {'default', 'gpp_plataform_db'}
+
+    @classmethod
+    def setUpTestData(cls):
+        GeradorDadosSinteticos(EscalaSintetica(
+            patriarcas=1, profundidade=3, largura=2, lotacoes=200, acoes=1, usuarios=1
+        ), seed=3).gerar()
+        cls.user = User.objects.create_user(email='diff@example.com', password='x', name='Diff')
+        cls.base = TblLotacaoVersao.objects.get()
+        cls.nova = TblLotacaoVersao.objects.create(
+            id_patriarca=cls.base.id_patriarca,
+            id_organograma_versao=cls.base.id_organograma_versao,
+            str_origem='TESTE',
+            dat_processamento=timezone.now(),
+            str_status_processamento='PROCESSADO',
+            flg_ativo=False,
+        )
+
+        # Nova carga: 3 desligados, 2 movidos, 2 com cargo novo, 4 admitidos
+        lotacoes = list(TblLotacao.objects.filter(id_lotacao_versao=cls.base).order_by('str_cpf'))
+        unidades = list(TblOrgaoUnidade.objects.filter(
+            id_organograma_versao=cls.base.id_organograma_versao
+        ).values_list('pk', flat=True))
+        cls.desligados = [l.str_cpf for l in lotacoes[:3]]
+        cls.movidos = [l.str_cpf for l in lotacoes[3:5]]
+        cls.cargo_alterado = [l.str_cpf for l in lotacoes[5:7]]
+        cls.admitidos = [f'000.000.000-0{n}' for n in range(4)]
+
+        copias = []
+        for lotacao in lotacoes[3:]:
+            lotacao.pk = None
+            lotacao.id_lotacao_versao = cls.nova
+            if lotacao.str_cpf in cls.movidos:
+                lotacao.id_unidade_lotacao_id = next(
+                    u for u in unidades if u != lotacao.id_unidade_lotacao_id
+                )
+            if lotacao.str_cpf in cls.cargo_alterado:
+                lotacao.str_cargo_original = 'Cargo Novo'
+            copias.append(lotacao)
+        modelo = copias[-1]
+        for cpf in cls.admitidos:
+            copias.append(TblLotacao(
+                id_lotacao_versao=cls.nova,
+                id_organograma_versao=modelo.id_organograma_versao,
+                id_patriarca=modelo.id_patriarca,
+                id_orgao_lotacao=modelo.id_orgao_lotacao,
+                str_cpf=cpf,
+                str_cargo_original='Analista',
+                flg_valido=True,
+                dat_criacao=timezone.now(),
+            ))
+        TblLotacao.objects.bulk_create(copias)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _cpfs(self, **filtros):
+        return sorted(TblLotacaoDiffItem.objects.filter(**filtros).values_list('str_cpf', flat=True))
+
+    def test_diff_em_uma_consulta(self):
+        with CaptureQueriesContext(connection) as consultas:
+            resumo = diff_lotacao(self.base, self.nova)
+        leituras = [q for q in consultas.captured_queries if '"tbllotacao"' in q['sql']]
+        self.assertEqual(len(leituras), 1)
+
+        self.assertEqual(
+            (resumo.int_admissoes, resumo.int_desligamentos,
+             resumo.int_movimentacoes, resumo.int_mudancas_cargo),
+            (4, 3, 2, 2)
+        )
+        self.assertEqual(resumo.int_inalterados, 200 - 3 - 4)
+        self.assertEqual(self._cpfs(str_tipo='ADMISSAO'), self.admitidos)
+        self.assertEqual(self._cpfs(str_tipo='DESLIGAMENTO'), self.desligados)
+        self.assertEqual(self._cpfs(flg_movido=True), self.movidos)
+        self.assertEqual(self._cpfs(flg_cargo_alterado=True), self.cargo_alterado)
+
+        item = TblLotacaoDiffItem.objects.get(str_cpf=self.cargo_alterado[0])
+        self.assertEqual(item.str_cargo_novo, 'Cargo Novo')
+
+    def test_diff_gravado_e_recalculado(self):
+        primeiro = diff_lotacao(self.base, self.nova)
+        with self.assertNumQueries(1):
+            self.assertEqual(diff_lotacao(self.base, self.nova).pk, primeiro.pk)
+
+        TblLotacao.objects.filter(id_lotacao_versao=self.nova, str_cpf=self.admitidos[0]).delete()
+        recalculado = diff_lotacao(self.base, self.nova, recalcular=True)
+        self.assertEqual(recalculado.pk, primeiro.pk)
+        self.assertEqual(recalculado.int_admissoes, 3)
+        self.assertEqual(TblLotacaoDiffItem.objects.count(), 3 + 3 + 2 + 2)
+
+    def test_mesma_versao(self):
+        with self.assertRaises(DiffLotacaoError):
+            diff_lotacao(self.base, self.base)
+
+    def test_endpoint_paginado_por_cpf(self):
+        url = f'/api/v1/carga/lotacao/{self.nova.pk}/diff/'
+        response = self.client.get(url, {'page_size': 6})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['diff']['versao_base'], self.base.pk)
+        self.assertEqual(len(response.data['results']), 6)
+
+        resto = self.client.get(url, {'page_size': 6, 'cursor': response.data['next_cursor']})
+        self.assertEqual(len(resto.data['results']), 5)
+        self.assertIsNone(resto.data['next_cursor'])
+
+        admissoes = self.client.get(url, {'tipo': 'ADMISSAO'})
+        self.assertEqual([i['str_cpf'] for i in admissoes.data['results']], self.admitidos)
+
+    def test_recalculo_so_por_post(self):
+        url = f'/api/v1/carga/lotacao/{self.nova.pk}/diff/'
+        self.assertEqual(self.client.get(url).data['diff']['admissoes'], 4)
+        TblLotacao.objects.filter(id_lotacao_versao=self.nova, str_cpf=self.admitidos[0]).delete()
+
+        self.assertEqual(self.client.get(url, {'recalcular': 'true'}).data['diff']['admissoes'], 4)
+        response = self.client.post(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['diff']['admissoes'], 3)
+
+    def test_exportacao_csv(self):
+        response = self.client.get(
+            f'/api/v1/carga/lotacao/{self.nova.pk}/diff/',
+            {'base': self.base.pk, 'formato': 'csv', 'movido': 'true'}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        linhas = list(csv.reader(
+            io.StringIO(b''.join(response.streaming_content).decode()), delimiter=';'
+        ))
+        self.assertEqual(linhas[0][0], 'str_cpf')
+        self.assertEqual([linha[0] for linha in linhas[1:]], self.movidos)
@@ -0,0 +1,129 @@
+"""
+Testes do diff entre versões de organograma
+"""
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+import uuid
+
+from ..models import TblPatriarca, TblOrganogramaVersao, TblOrgaoUnidade, TblStatusProgresso
+from ..services import calcular_diff, diff_organograma
+
+User = get_user_model()
+
+
+class DiffOrganogramaTest(TestCase):
+
+    databases = {'default', 'gpp_plataform_db'}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='diff@example.com', password='testpass123')
+        cls.patriarca = cls._patriarca('SEGER')
+
+        cls.ativa = cls._versao(cls.patriarca, ativa=True)
+        raiz = cls._orgao(cls.ativa, 'SEGER', '1', None)
+        sub0 = cls._orgao(cls.ativa, 'SUB0', '1.1', raiz)
+        cls._orgao(cls.ativa, 'SUB1', '1.2', raiz)
+        cls._orgao(cls.ativa, 'SUB2', '1.3', raiz)
+        cls._orgao(cls.ativa, 'SUB0-0', '1.1.1', sub0)
+
+        # Nova carga: SUB0 renomeada, SUB1 vira SUBX, SUB2 sai, NOVA entra e
+        # SUB0-0 passa para baixo de SUBX
+        cls.nova = cls._versao(cls.patriarca, ativa=False)
+        raiz = cls._orgao(cls.nova, 'SEGER', '1', None)
+        cls._orgao(cls.nova, 'SUB0', '1.1', raiz, nome='Subsecretaria Zero')
+        subx = cls._orgao(cls.nova, 'SUBX', '1.2', raiz)
+        cls._orgao(cls.nova, 'NOVA', '1.4', raiz)
+        cls.sub00 = cls._orgao(cls.nova, 'SUB0-0', '1.2.1', subx)
+
+    @classmethod
+    def _patriarca(cls, sigla):
+        status_progresso = TblStatusProgresso.objects.get_or_create(
+            id_status_progresso=1,
+            defaults={'str_descricao': 'Em Progresso'}
+        )[0]
+        return TblPatriarca.objects.create(
+            id_externo_patriarca=uuid.uuid4(),
+            str_sigla_patriarca=sigla,
+            str_nome=sigla,
+            id_status_progresso=status_progresso,
+            dat_criacao=timezone.now(),
+            id_usuario_criacao=cls.user
+        )
+
+    @classmethod
+    def _versao(cls, patriarca, ativa):
+        return TblOrganogramaVersao.objects.create(
+            id_patriarca=patriarca,
+            str_origem='TESTE',
+            dat_processamento=timezone.now(),
+            str_status_processamento='PROCESSADO',
+            flg_ativo=ativa
+        )
+
+    @classmethod
+    def _orgao(cls, versao, sigla, numero, pai, nome=None):
+        return TblOrgaoUnidade.objects.create(
+            id_organograma_versao=versao,
+            id_patriarca=versao.id_patriarca,
+            str_nome=nome or sigla,
+            str_sigla=sigla,
+            str_numero_hierarquia=numero,
+            id_orgao_unidade_pai=pai,
+            int_nivel_hierarquia=numero.count('.') + 1,
+            flg_ativo=True,
+            dat_criacao=timezone.now(),
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_conjunto_de_mudancas(self):
+        with self.assertNumQueries(1):
+            diff = calcular_diff(self.ativa.pk, self.nova.pk)
+
+        self.assertEqual(diff['resumo'], {
+            'adicionados': 1, 'removidos': 1, 'sigla_alterada': 1,
+            'renomeados': 2, 'movidos': 1, 'inalterados': 1,
+        })
+        self.assertEqual([u['sigla'] for u in diff['adicionados']], ['NOVA'])
+        self.assertEqual([u['sigla'] for u in diff['removidos']], ['SUB2'])
+        mudancas = {u['sigla']: u['mudancas'] for u in diff['alterados']}
+        self.assertEqual(mudancas, {
+            'SUB0': {'nome': ['SUB0', 'Subsecretaria Zero']},
+            'SUB0-0': {'pai': ['SUB0', 'SUBX']},
+            'SUBX': {'sigla': ['SUB1', 'SUBX'], 'nome': ['SUB1', 'SUBX']},
+        })
+        self.assertEqual(len(diff['ids_afetados']['base']), 4)
+        self.assertIn(self.sub00.pk, diff['ids_afetados']['nova'])
+
+    def test_endpoint_compara_com_a_versao_ativa_e_usa_cache(self):
+        url = f'/api/v1/carga/organograma/{self.nova.pk}/diff/'
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['versao_base'], self.ativa.pk)
+        self.assertEqual(response.data['resumo']['movidos'], 1)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(diff_organograma(self.ativa.pk, self.nova.pk), response.data)
+
+    def test_alteracao_na_versao_invalida_o_cache(self):
+        diff_organograma(self.ativa.pk, self.nova.pk)
+        self._orgao(self.nova, 'OUTRA', '1.5', None)
+
+        diff = diff_organograma(self.ativa.pk, self.nova.pk)
+        self.assertEqual(diff['resumo']['adicionados'], 2)
+
+    def test_base_de_outro_patriarca(self):
+        outra = self._versao(self._patriarca('SESA'), ativa=True)
+        response = self.client.get(
+            f'/api/v1/carga/organograma/{self.nova.pk}/diff/', {'base': outra.pk}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,211 @@
+"""
+Testes do envio à API externa contra o receptor local
+"""
+
+import io
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from common.services.dados_sinteticos import EscalaSintetica, GeradorDadosSinteticos
+
+from ..models import (
+    TblCargaPatriarca,
+    TblDetalheStatusCarga,
+    TblLotacaoJsonOrgao,
+    TblLotacaoVersao,
+    TblOrganogramaJson,
+    TblOrgaoUnidade,
+    TblStatusCarga,
+    TblTipoCarga,
+    TblTokenEnvioCarga,
+)
+from ..services import ConfigEnvio, EnvioApiError, enviar_jsons
+from ..services.envio_api import (
+    CARGA_ENVIADA,
+    CARGA_ERRO,
+    CARGA_TENTATIVA_FALHOU,
+    TOKEN_ATIVO,
+    TOKEN_EXPIRADO,
+    enfileirar_envio,
+    espera_backoff,
+    garantir_dominios,
+    registros_pendentes,
+)
+from ..services.receptor_stub import ReceptorStub
+
+
+class EnvioApiTest(TestCase):
+
+    databases = {'default', 'gpp_plataform_db'}
+
+    @classmethod
+    def setUpTestData(cls):
+        GeradorDadosSinteticos(EscalaSintetica(
+            patriarcas=1, profundidade=3, largura=2, lotacoes=20, acoes=1, usuarios=1
+        ), seed=5).gerar()
+        versao = TblLotacaoVersao.objects.get()
+        orgaos = TblOrgaoUnidade.objects.filter(
+            id_organograma_versao=versao.id_organograma_versao
+        ).order_by('pk')[:6]
+        for orgao in orgaos:
+            TblLotacaoJsonOrgao.objects.create(
+                id_lotacao_versao=versao,
+                id_organograma_versao=versao.id_organograma_versao,
+                id_patriarca=versao.id_patriarca,
+                id_orgao_lotacao=orgao,
+                js_conteudo={'orgao': {'sigla': orgao.str_sigla}, 'servidores': []},
+                dat_criacao=timezone.now(),
+            )
+        TblOrganogramaJson.objects.create(
+            id_organograma_versao=versao.id_organograma_versao,
+            js_conteudo={'patriarca': versao.id_patriarca.str_sigla_patriarca, 'orgaos': []},
+            dat_criacao=timezone.now(),
+        )
+
+    def setUp(self):
+        self.esperas = []
+
+    def _registros(self):
+        return list(TblLotacaoJsonOrgao.objects.order_by('pk')) + list(TblOrganogramaJson.objects.all())
+
+    def _enviar(self, receptor, forcar=False, **config):
+        config = ConfigEnvio(url=receptor.url, **{'workers': 3, 'por_host': 3, **config})
+        return enviar_jsons(self._registros(), forcar=forcar, config=config, dormir=self.esperas.append)
+
+    def test_envio_com_idempotencia(self):
+        with ReceptorStub() as receptor:
+            resultados = self._enviar(receptor)
+            self.assertTrue(all(r.enviado for r in resultados))
+            self.assertEqual(len(receptor.recebidos), 7)
+            self.assertEqual(
+                sum(1 for caminho, _, _ in receptor.requisicoes if caminho == '/organogramas'), 1
+            )
+
+            # Mesmo conteúdo: dispensado sem requisição; forçado, o receptor não duplica
+            requisicoes = len(receptor.requisicoes)
+            self.assertTrue(all(r.dispensado for r in self._enviar(receptor)))
+            self.assertEqual(len(receptor.requisicoes), requisicoes)
+            self.assertTrue(all(r.enviado for r in self._enviar(receptor, forcar=True)))
+            self.assertEqual(len(receptor.recebidos), 7)
+            self.assertEqual(len(receptor.tokens_emitidos), 1)
+
+        for registro in self._registros():
+            self.assertEqual(registro.str_status_envio, 'ENVIADO')
+            self.assertEqual(registro.str_hash_enviado, registro.str_hash_conteudo)
+        cargas = TblCargaPatriarca.objects.all()
+        self.assertEqual(len(cargas), 4)      # 2 envios x (organograma, lotação)
+        self.assertTrue(all(c.id_status_carga.str_descricao == CARGA_ENVIADA for c in cargas))
+        self.assertEqual(TblDetalheStatusCarga.objects.count(), 14)
+
+    def test_repete_erros_transitorios(self):
+        with ReceptorStub(falhas_iniciais=2, retry_after=0.25) as receptor:
+            resultados = self._enviar(receptor)
+        self.assertTrue(all(r.enviado and r.tentativas == 3 for r in resultados))
+        self.assertEqual(self.esperas, [0.25] * 14)
+        self.assertEqual(
+            TblDetalheStatusCarga.objects.filter(
+                id_status_carga__str_descricao=CARGA_TENTATIVA_FALHOU
+            ).count(),
+            14
+        )
+
+    def test_desiste_apos_as_tentativas(self):
+        with ReceptorStub(falhas_iniciais=10, status_erro=500) as receptor:
+            resultados = self._enviar(receptor, tentativas=3)
+        self.assertFalse(any(r.enviado for r in resultados))
+        self.assertEqual(resultados[0].status_http, 500)
+        registro = TblLotacaoJsonOrgao.objects.order_by('pk').first()
+        self.assertEqual(registro.str_status_envio, 'ERRO')
+        self.assertIsNone(registro.str_hash_enviado)
+        self.assertTrue(all(
+            c.id_status_carga.str_descricao == CARGA_ERRO for c in TblCargaPatriarca.objects.all()
+        ))
+        self.assertEqual(TblDetalheStatusCarga.objects.count(), 7 * 3)
+
+    def test_renova_token_expirado(self):
+        with ReceptorStub() as receptor:
+            self._enviar(receptor)
+            receptor.expirar_tokens()
+            resultados = self._enviar(receptor, forcar=True)
+            self.assertTrue(all(r.enviado for r in resultados))
+            self.assertEqual(len(receptor.tokens_emitidos), 2)
+
+        tokens = TblTokenEnvioCarga.objects.order_by('pk')
+        self.assertEqual(
+            [t.id_status_token_envio_carga.str_descricao for t in tokens], [TOKEN_EXPIRADO, TOKEN_ATIVO]
+        )
+        self.assertEqual(
+            TblCargaPatriarca.objects.order_by('-pk').first().id_token_envio_carga, tokens[1]
+        )
+
+    def test_dominios_pela_descricao(self):
+        """Domínios já cadastrados com outros ids são reaproveitados, não duplicados"""
+        TblTipoCarga.objects.create(id_tipo_carga=1, str_descricao='Outro tipo')
+        TblStatusCarga.objects.create(id_status_carga=7, str_descricao=CARGA_ENVIADA, flg_sucesso=1)
+
+        dominios = garantir_dominios()
+        self.assertEqual(dominios.carga[CARGA_ENVIADA], 7)
+        self.assertNotIn(1, dominios.tipo.values())
+        self.assertEqual(garantir_dominios(), dominios)
+        self.assertEqual(TblStatusCarga.objects.filter(str_descricao=CARGA_ENVIADA).count(), 1)
+        self.assertEqual(TblTipoCarga.objects.get(pk=1).str_descricao, 'Outro tipo')
+
+    def test_limite_por_host(self):
+        with ReceptorStub(latencia=0.05) as receptor:
+            self._enviar(receptor, workers=6, por_host=2)
+        self.assertEqual(receptor.max_simultaneas, 2)
+
+    def test_backoff_exponencial_limitado(self):
+        config = ConfigEnvio(url='http://receptor', backoff_base=1, backoff_max=5)
+        self.assertLessEqual(espera_backoff(2, config), 2)
+        self.assertLessEqual(espera_backoff(10, config), 5)
+        self.assertEqual(espera_backoff(3, config, retry_after=60), 5)
+
+    def test_api_nao_configurada(self):
+        with self.settings(API_EXTERNA_URL=''):
+            with self.assertRaises(EnvioApiError):
+                enviar_jsons(self._registros())
+
+    def _enfileirar(self):
+        enfileirar_envio(TblLotacaoJsonOrgao.objects.all())
+        enfileirar_envio(TblOrganogramaJson.objects.all())
+
+    @override_settings(CARGA_ORG_LOT_ENVIO_TENTATIVAS=1)
+    def test_fila_repete_falhas(self):
+        """Da fila, a falha volta a PENDENTE e a próxima execução envia"""
+        self._enfileirar()
+        saida = io.StringIO()
+        call_command('enviar_cargas', '--pendentes', '--stub', '--stub-taxa-erro', '1', stdout=saida)
+        self.assertIn('7 com erro', saida.getvalue())
+        self.assertEqual(
+            {(r.str_status_envio, r.int_tentativas_envio) for r in self._registros()}, {('PENDENTE', 1)}
+        )
+
+        call_command('enviar_cargas', '--pendentes', '--stub', stdout=saida)
+        self.assertIn('7 enviados', saida.getvalue())
+        self.assertEqual({r.str_status_envio for r in self._registros()}, {'ENVIADO'})
+
+    @override_settings(CARGA_ORG_LOT_ENVIO_TENTATIVAS=1, CARGA_ORG_LOT_FILA_EXECUCOES=2)
+    def test_fila_desiste_apos_as_execucoes(self):
+        self._enfileirar()
+        for _ in range(2):
+            call_command('enviar_cargas', '--pendentes', '--stub', '--stub-taxa-erro', '1',
+                         stdout=io.StringIO())
+        self.assertEqual({r.str_status_envio for r in self._registros()}, {'ERRO'})
+        self.assertEqual(registros_pendentes(), [])
+
+    def test_fila_reservada_por_execucao(self):
+        """Execuções sobrepostas não pegam os mesmos registros; interrompidas expiram"""
+        self._enfileirar()
+        reservados = registros_pendentes()
+        self.assertEqual(len(reservados), 7)
+        self.assertIsInstance(reservados[0], TblOrganogramaJson)
+        self.assertEqual({r.str_status_envio for r in self._registros()}, {'EM_ENVIO'})
+        self.assertEqual(registros_pendentes(), [])
+        self.assertEqual(enfileirar_envio(TblLotacaoJsonOrgao.objects.all()), 0)
+
+        with self.settings(CARGA_ORG_LOT_FILA_EXPIRACAO=-60):
+            self.assertEqual(len(registros_pendentes()), 7)
+        self.assertEqual({r.int_tentativas_envio for r in self._registros()}, {2})
@@ -0,0 +1,73 @@
+"""
+Testes da normalização de cargos
+"""
+
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from common.services.dados_sinteticos import EscalaSintetica, GeradorDadosSinteticos
+
+from ..models import TblLotacao, TblLotacaoVersao
+from ..services import NormalizadorCargos, normalizar_cargos_lotacao
+from ..services.normalizacao_cargo import CARGOS_CANONICOS
+
+
+class NormalizadorCargosTest(SimpleTestCase):
+
+    def setUp(self):
+        self.normalizador = NormalizadorCargos(CARGOS_CANONICOS)
+
+    def test_acentos_caixa_e_abreviacoes(self):
+        for cargo in (
+            'ANALISTA DE PLANEJAMENTO E ORCAMENTO',
+            'Analista de Planej. e Orçamento',
+            'analista  de planejamento e orçamento ',
+        ):
+            self.assertEqual(self.normalizador.normalizar(cargo), 'Analista de Planejamento e Orçamento')
+        self.assertEqual(self.normalizador.normalizar('Assist. Adm.'), 'Assistente Administrativo')
+
+    def test_busca_aproximada(self):
+        self.assertEqual(self.normalizador.normalizar('Agente de Fiscalisacao'), 'Agente de Fiscalização')
+        self.assertEqual(self.normalizador.normalizar('Especialista Politicas Publicas'),
+                         'Especialista em Políticas Públicas')
+        self.assertIsNone(self.normalizador.normalizar('Motorista'))
+        self.assertIsNone(self.normalizador.normalizar('  ...  '))
+
+
+class NormalizacaoLotacaoTest(TestCase):
+
+    databases = {'default', 'gpp_plataform_db'}
+
+    @classmethod
+    def setUpTestData(cls):
+        GeradorDadosSinteticos(EscalaSintetica(
+            patriarcas=1, profundidade=2, largura=2, lotacoes=400, acoes=1, usuarios=1
+        ), seed=9).gerar()
+        cls.user = User.objects.create_user(email='cargo@example.com', password='x', name='Cargo')
+        cls.versao = TblLotacaoVersao.objects.get()
+        cls.motorista = TblLotacao.objects.order_by('pk').first()
+        TblLotacao.objects.filter(pk=cls.motorista.pk).update(str_cargo_original='Motorista')
+
+    def test_um_update_por_versao(self):
+        with CaptureQueriesContext(connection) as consultas:
+            resultado = normalizar_cargos_lotacao(self.versao)
+        self.assertEqual(len(consultas.captured_queries), 2)    # distintos + UPDATE
+        self.assertEqual(resultado.sem_correspondencia, ['Motorista'])
+        self.assertEqual(resultado.atualizados, 399)
+
+        normalizados = set(TblLotacao.objects.values_list('str_cargo_normalizado', flat=True))
+        self.assertLessEqual(normalizados - {None}, set(CARGOS_CANONICOS))
+        self.assertIsNone(TblLotacao.objects.get(pk=self.motorista.pk).str_cargo_normalizado)
+
+        self.assertEqual(normalizar_cargos_lotacao(self.versao).atualizados, 0)
+
+    def test_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        response = client.post(f'/api/v1/carga/lotacao/{self.versao.pk}/normalizar_cargos/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['sem_correspondencia'], ['Motorista'])
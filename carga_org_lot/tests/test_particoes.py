@@ -0,0 +1,58 @@
+"""
+Testes das partições por versão das lotações
+"""
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from common.services.dados_sinteticos import EscalaSintetica, GeradorDadosSinteticos
+
+from ..models import TblLotacao, TblLotacaoInconsistencia, TblLotacaoVersao
+from ..services import listar_particoes, validar_lotacao
+
+
+class ParticoesLotacaoTest(TestCase):
+
+    databases = {'default', 'gpp_plataform_db'}
+
+    @classmethod
+    def setUpTestData(cls):
+        GeradorDadosSinteticos(EscalaSintetica(
+            patriarcas=1, profundidade=2, largura=2, lotacoes=200, acoes=1, usuarios=1
+        ), seed=13).gerar()
+        cls.versao = TblLotacaoVersao.objects.get()
+        cls.outra = TblLotacaoVersao.objects.create(
+            id_patriarca=cls.versao.id_patriarca,
+            id_organograma_versao=cls.versao.id_organograma_versao,
+            str_origem='TESTE',
+            dat_processamento=timezone.now(),
+            str_status_processamento='PROCESSADO',
+            flg_ativo=False,
+        )
+
+    def test_particao_por_versao(self):
+        nomes = {f'tbllotacao_v{self.versao.pk}', f'tbllotacao_v{self.outra.pk}'}
+        self.assertLessEqual(nomes, set(listar_particoes(TblLotacao)))
+        self.assertIn(
+            f'tbllotacaoinconsistencia_v{self.outra.pk}', listar_particoes(TblLotacaoInconsistencia)
+        )
+
+        # A consulta pela versão lê só a partição dela
+        plano = TblLotacao.objects.filter(id_lotacao_versao=self.versao).explain()
+        self.assertIn(f'tbllotacao_v{self.versao.pk}', plano)
+        self.assertNotIn(f'tbllotacao_v{self.outra.pk}', plano)
+
+    def test_excluir_versao_descarta_particoes(self):
+        validar_lotacao(self.versao)
+        self.assertTrue(TblLotacaoInconsistencia.objects.filter(id_lotacao_versao=self.versao).exists())
+
+        with CaptureQueriesContext(connection) as consultas:
+            self.versao.delete()
+        self.assertLess(len(consultas.captured_queries), 20)
+
+        self.assertNotIn(f'tbllotacao_v{self.versao.pk}', listar_particoes(TblLotacao))
+        self.assertFalse(TblLotacao.objects.exists())
+        self.assertFalse(TblLotacaoInconsistencia.objects.exists())
+        self.assertIn(f'tbllotacao_v{self.outra.pk}', listar_particoes(TblLotacao))
@@ -0,0 +1,179 @@
+"""
+Testes da retenção e do expurgo em lotes das versões de carga
+"""
+
+import csv
+import gzip
+import io
+import json
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from common.services.dados_sinteticos import EscalaSintetica, GeradorDadosSinteticos
+
+from ..models import (
+    TblLotacao,
+    TblLotacaoDiff,
+    TblLotacaoDiffItem,
+    TblLotacaoInconsistencia,
+    TblLotacaoJsonOrgao,
+    TblLotacaoVersao,
+    TblOrganogramaVersao,
+    TblOrgaoUnidade,
+)
+from ..services import expurgar_versoes, listar_particoes, versoes_expiradas
+from ..services.retencao import _Expurgo
+
+
+class RetencaoTest(TestCase):
+
+    databases = {'default', 'gpp_plataform_db'}
+
+    @classmethod
+    def setUpTestData(cls):
+        GeradorDadosSinteticos(EscalaSintetica(
+            patriarcas=1, profundidade=2, largura=2, lotacoes=30, acoes=1, usuarios=1
+        ), seed=17).gerar()
+        cls.lotacao_ativa = TblLotacaoVersao.objects.get()
+        cls.patriarca = cls.lotacao_ativa.id_patriarca
+        cls.organograma_ativo = cls.lotacao_ativa.id_organograma_versao
+        agora = timezone.now()
+
+        # Organogramas antigos: o2 (com uma árvore de 3 níveis) e o3
+        cls.o1, cls.o2, cls.o3 = (cls._organograma(agora - timedelta(days=d)) for d in (1, 2, 3))
+        raiz = cls._unidade(cls.o2, None, 'RAIZ')
+        filhos = [cls._unidade(cls.o2, raiz, f'F{i}') for i in range(2)]
+        cls.netos = [cls._unidade(cls.o2, filho, f'N{i}') for i, filho in enumerate(filhos)]
+        cls.unidade_o3 = cls._unidade(cls.o3, None, 'O3')
+
+        # Lotações antigas: l1 (mantida) usa o3; l3 (expurgada) usa o2
+        orgao_ativo = TblOrgaoUnidade.objects.filter(id_organograma_versao=cls.organograma_ativo).first()
+        cls.l1 = cls._lotacao(agora - timedelta(days=1), cls.o3, cls.unidade_o3)
+        cls.l2 = cls._lotacao(agora - timedelta(days=2), cls.organograma_ativo, orgao_ativo)
+        cls.l3 = cls._lotacao(agora - timedelta(days=3), cls.o2, cls.netos[0])
+
+        diff = TblLotacaoDiff.objects.create(
+            id_lotacao_versao_base=cls.l2, id_lotacao_versao_nova=cls.lotacao_ativa, dat_calculo=agora
+        )
+        TblLotacaoDiffItem.objects.bulk_create(
+            TblLotacaoDiffItem(id_lotacao_diff=diff, str_cpf=f'{i:011d}', str_tipo='ADMISSAO')
+            for i in range(5)
+        )
+
+    @classmethod
+    def _organograma(cls, data):
+        return TblOrganogramaVersao.objects.create(
+            id_patriarca=cls.patriarca, str_origem='TESTE', dat_processamento=data,
+            str_status_processamento='PROCESSADO', flg_ativo=False,
+        )
+
+    @classmethod
+    def _unidade(cls, versao, pai, sigla):
+        return TblOrgaoUnidade.objects.create(
+            id_organograma_versao=versao, id_patriarca=cls.patriarca, id_orgao_unidade_pai=pai,
+            str_nome=sigla, str_sigla=sigla, flg_ativo=True, dat_criacao=timezone.now(),
+        )
+
+    @classmethod
+    def _lotacao(cls, data, organograma, orgao):
+        versao = TblLotacaoVersao.objects.create(
+            id_patriarca=cls.patriarca, id_organograma_versao=organograma, str_origem='TESTE',
+            dat_processamento=data, str_status_processamento='PROCESSADO', flg_ativo=False,
+        )
+        for i in range(3):
+            lotacao = TblLotacao.objects.create(
+                id_lotacao_versao=versao, id_organograma_versao=organograma,
+                id_patriarca=cls.patriarca, id_orgao_lotacao=orgao, str_cpf=f'0000000000{i}',
+                flg_valido=False, dat_criacao=data,
+            )
+            TblLotacaoInconsistencia.objects.create(
+                id_lotacao=lotacao, str_tipo='CPF_INVALIDO', str_detalhe='-', dat_registro=data
+            )
+        TblLotacaoJsonOrgao.objects.create(
+            id_lotacao_versao=versao, id_organograma_versao=organograma, id_patriarca=cls.patriarca,
+            id_orgao_lotacao=orgao, js_conteudo={'servidores': []}, dat_criacao=data,
+        )
+        return versao
+
+    def test_versoes_expiradas(self):
+        # o3 está fora da retenção, mas a lotação l1 (mantida) o usa
+        self.assertEqual(versoes_expiradas(manter=2), ([self.l2.pk, self.l3.pk], [self.o2.pk]))
+        self.assertEqual(versoes_expiradas(manter=5), ([], []))
+
+        resultado = expurgar_versoes(manter=2, simular=True)
+        self.assertEqual(resultado.versoes_lotacao, [self.l2.pk, self.l3.pk])
+        self.assertEqual(TblLotacaoVersao.objects.count(), 4)
+
+    def test_expurgo_em_lotes_com_arquivo(self):
+        esperas, mensagens = [], []
+        with tempfile.TemporaryDirectory() as diretorio:
+            resultado = expurgar_versoes(
+                manter=2, diretorio=diretorio, lote=2, pausa=0.5,
+                progresso=mensagens.append, dormir=esperas.append,
+            )
+            pasta = Path(diretorio) / self.patriarca.str_sigla_patriarca / f'lotacao_v{self.l3.pk}'
+            [caminho] = pasta.glob('tbllotacao.*.csv.gz')
+            with gzip.open(caminho, 'rt') as arquivo:
+                linhas = list(csv.DictReader(arquivo))
+            [marca] = pasta.glob('concluido.*.json')
+            concluido = json.loads(marca.read_text())
+            self.assertEqual(len(resultado.arquivos), 2 * 6 + 3)
+            self.assertFalse(list(Path(diretorio).rglob('*.tmp')))
+
+        self.assertEqual(concluido['versao'], self.l3.pk)
+        self.assertIn(caminho.name, concluido['arquivos'])
+        self.assertEqual(len(concluido['arquivos']), 6)
+
+        self.assertEqual(len(linhas), 3)
+        self.assertEqual({l['idlotacaoversao'] for l in linhas}, {str(self.l3.pk)})
+
+        self.assertEqual(resultado.versoes_lotacao, [self.l2.pk, self.l3.pk])
+        self.assertEqual(resultado.versoes_organograma, [self.o2.pk])
+        self.assertEqual(resultado.linhas['tbllotacao'], 6)
+        self.assertEqual(resultado.linhas['tbllotacaodiffitem'], 5)
+        self.assertEqual(resultado.linhas['tblorgaounidade'], 5)
+        self.assertTrue(esperas and set(esperas) == {0.5})
+        self.assertTrue(mensagens)
+
+        self.assertEqual(
+            set(TblLotacaoVersao.objects.values_list('pk', flat=True)), {self.lotacao_ativa.pk, self.l1.pk}
+        )
+        self.assertFalse(TblOrganogramaVersao.objects.filter(pk=self.o2.pk).exists())
+        self.assertTrue(TblOrgaoUnidade.objects.filter(pk=self.unidade_o3.pk).exists())
+        self.assertFalse(TblLotacaoDiff.objects.exists())
+        self.assertFalse(TblLotacaoJsonOrgao.objects.filter(id_lotacao_versao__in=[self.l2, self.l3]).exists())
+        self.assertNotIn(f'tbllotacao_v{self.l3.pk}', listar_particoes(TblLotacao))
+        self.assertEqual(TblLotacaoInconsistencia.objects.count(), 3)
+
+    def test_arquivo_nao_sobrescreve_execucao_anterior(self):
+        """Nova execução (ex.: após expurgo interrompido) grava ao lado, sem sobrescrever"""
+        with tempfile.TemporaryDirectory() as diretorio:
+            pasta = Path(diretorio) / 'l3'
+            primeira = _Expurgo(diretorio, 10, 0, None, lambda _: None, 'default')
+            primeira.arquivar(pasta, TblLotacao, f'idlotacaoversao = {self.l3.pk}')
+            TblLotacao.objects.filter(id_lotacao_versao=self.l3).delete()
+            segunda = _Expurgo(diretorio, 10, 0, None, lambda _: None, 'default')
+            segunda.arquivar(pasta, TblLotacao, f'idlotacaoversao = {self.l3.pk}')
+
+            linhas = []
+            for caminho in sorted(pasta.glob('tbllotacao.*.csv.gz')):
+                with gzip.open(caminho, 'rt') as arquivo:
+                    linhas.append(len(list(csv.DictReader(arquivo))))
+            with self.assertRaises(FileExistsError):
+                segunda.arquivar(pasta, TblLotacao, f'idlotacaoversao = {self.l3.pk}')
+
+        self.assertEqual(linhas, [3, 0])
+
+    def test_comando(self):
+        saida = io.StringIO()
+        call_command('expurgar_versoes', '--manter', '2', '--simular', stdout=saida)
+        self.assertIn(f'[{self.l2.pk}, {self.l3.pk}]', saida.getvalue())
+
+        saida = io.StringIO()
+        call_command('expurgar_versoes', '--manter', '2', '--pausa', '0', stdout=saida)
+        self.assertIn('2 versões de lotação e 1 de organograma expurgadas', saida.getvalue())
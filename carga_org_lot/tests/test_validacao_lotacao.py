@@ -0,0 +1,150 @@
+"""
+Testes da validação em lote das lotações
+"""
+
+import random
+
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from common.services.dados_sinteticos import EscalaSintetica, GeradorDadosSinteticos, gerar_cpf
+
+from ..models import (
+    TblLotacao,
+    TblLotacaoInconsistencia,
+    TblLotacaoVersao,
+    TblOrganogramaVersao,
+    TblOrgaoUnidade,
+)
+from ..services import cpfs_validos, resumo_inconsistencias, validar_lotacao
+from ..services.validacao_lotacao import digitos_cpf
+
+
+class CpfTest(SimpleTestCase):
+
+    def test_digitos_verificadores(self):
+        rng = random.Random(11)
+        validos = [gerar_cpf(rng) for _ in range(500)]
+        invalidos = [gerar_cpf(rng, valido=False) for _ in range(500)]
+        self.assertTrue(all(cpfs_validos(digitos_cpf(validos))))
+        self.assertFalse(any(cpfs_validos(digitos_cpf(invalidos))))
+
+    def test_formatos(self):
+        self.assertEqual(
+            cpfs_validos(digitos_cpf(['529.982.247-25', '52998224725', '111.111.111-11', '5299822472', None, 'abc'])),
+            [True, True, False, False, False, False]
+        )
+
+    def test_digitos_unicode(self):
+        self.assertEqual(cpfs_validos(['1234567890²', '٥٢٩٩٨٢٢٤٧٢٥', '52998224725']), [False, False, True])
+
+
+class ValidacaoLotacaoTest(TestCase):
+
+    databases = {'default', 'gpp_plataform_db'}
+
+    @classmethod
+    def setUpTestData(cls):
+        GeradorDadosSinteticos(EscalaSintetica(
+            patriarcas=1, profundidade=3, largura=2, lotacoes=300, acoes=1, usuarios=1
+        ), seed=7).gerar()
+        cls.user = User.objects.create_user(email='valida@example.com', password='x', name='Valida')
+        cls.versao = TblLotacaoVersao.objects.get()
+        cls.cpfs_invalidos = TblLotacao.objects.filter(flg_valido=False).count()
+
+        outra_versao = TblOrganogramaVersao.objects.create(
+            id_patriarca=cls.versao.id_patriarca,
+            str_origem='TESTE',
+            dat_processamento=timezone.now(),
+            str_status_processamento='PROCESSADO',
+            flg_ativo=False,
+        )
+        fora = TblOrgaoUnidade.objects.create(
+            id_organograma_versao=outra_versao,
+            id_patriarca=cls.versao.id_patriarca,
+            str_nome='Fora',
+            str_sigla='FORA',
+            int_nivel_hierarquia=1,
+            flg_ativo=True,
+            dat_criacao=timezone.now(),
+        )
+
+        validas = list(TblLotacao.objects.filter(flg_valido=True).order_by('id_lotacao')[:4])
+        cls.duplicada, cls.sem_cargo, cls.orgao_fora, cls.unidade_fora = validas
+        primeira = TblLotacao.objects.filter(flg_valido=True).order_by('id_lotacao').first()
+        cls.duplicada.str_cpf = primeira.str_cpf.replace('.', '').replace('-', '')
+        cls.duplicada.id_lotacao = None
+        cls.duplicada.save()
+        TblLotacao.objects.filter(pk=cls.sem_cargo.pk).update(str_cargo_original='  ')
+        TblLotacao.objects.filter(pk=cls.orgao_fora.pk).update(id_orgao_lotacao=fora)
+        TblLotacao.objects.filter(pk=cls.unidade_fora.pk).update(id_unidade_lotacao=fora)
+
+    def test_regras_e_gravacao(self):
+        resultado = validar_lotacao(self.versao, bloco=64)
+        self.assertEqual(resultado.total, 301)
+        self.assertEqual(resultado.inconsistencias, {
+            'CPF_INVALIDO': self.cpfs_invalidos,
+            'CPF_DUPLICADO': 1,
+            'CARGO_AUSENTE': 1,
+            'ORGAO_DESCONHECIDO': 1,
+            'UNIDADE_DESCONHECIDA': 1,
+        })
+        self.assertEqual(resultado.invalidos, self.cpfs_invalidos + 4)
+        self.assertEqual(
+            TblLotacao.objects.filter(id_lotacao_versao=self.versao, flg_valido=False).count(),
+            resultado.invalidos
+        )
+        duplicada = TblLotacao.objects.get(pk=self.duplicada.pk)
+        self.assertFalse(duplicada.flg_valido)
+        self.assertIn('também na lotação', duplicada.str_erros_validacao)
+        self.assertEqual(
+            TblLotacaoInconsistencia.objects.get(id_lotacao=self.unidade_fora.pk).str_tipo,
+            TblLotacaoInconsistencia.TIPO_UNIDADE_DESCONHECIDA
+        )
+
+        # Revalidar não regrava lotações nem duplica inconsistências
+        novamente = validar_lotacao(self.versao)
+        self.assertEqual(novamente.atualizados, 0)
+        self.assertEqual(TblLotacaoInconsistencia.objects.count(), resultado.invalidos)
+
+    def test_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        response = client.post(f'/api/v1/carga/lotacao/{self.versao.pk}/validar/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['total_registros'], 301)
+        self.assertEqual(response.data['inconsistencias']['CPF_DUPLICADO'], 1)
+
+    def test_resumo_e_detalhe_por_tipo(self):
+        resultado = validar_lotacao(self.versao)
+        with self.assertNumQueries(1):
+            resumo = resumo_inconsistencias(self.versao)
+        self.assertEqual(resumo['total'], sum(resultado.inconsistencias.values()))
+        self.assertEqual(
+            {item['tipo']: item['total'] for item in resumo['por_tipo']}, resultado.inconsistencias
+        )
+        self.assertEqual(sum(item['total'] for item in resumo['por_orgao']), resumo['total'])
+
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        url = f'/api/v1/carga/lotacao/{self.versao.pk}/inconsistencias/'
+        self.assertEqual(client.get(url).data['total'], resumo['total'])
+
+        vistos, cursor = [], None
+        while True:
+            parametros = {'tipo': 'CPF_INVALIDO', 'page_size': 2}
+            if cursor:
+                parametros['cursor'] = cursor
+            response = client.get(url, parametros)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            vistos += [item['id_inconsistencia'] for item in response.data['results']]
+            cursor = response.data['next_cursor']
+            if cursor is None:
+                break
+        self.assertEqual(vistos, sorted(TblLotacaoInconsistencia.objects.filter(
+            str_tipo='CPF_INVALIDO'
+        ).values_list('pk', flat=True)))
+        self.assertEqual(client.get(url, {'tipo': 'X', 'cursor': 'a'}).status_code, status.HTTP_400_BAD_REQUEST)
@@ -2,21 +2,67 @@
 API ViewSet para Lotação
 """
 
-from rest_framework import viewsets
+import csv
+
+from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.db.models import Count
+from django.http import StreamingHttpResponse
+
+from common.renderers import StreamingJSONResponse
 
 from ...models import (
     TblLotacaoVersao,
     TblLotacao,
     TblLotacaoInconsistencia,
+    TblLotacaoDiffItem,
 )
 from ...serializers import (
     TblLotacaoVersaoSerializer,
     TblLotacaoSerializer,
 )
+from ...services import (
+    DiffLotacaoError,
+    diff_lotacao,
+    normalizar_cargos_lotacao,
+    resumo_inconsistencias,
+    validar_lotacao,
+)
+
+
+PAGE_SIZE_DIFF_PADRAO = 100
+PAGE_SIZE_DIFF_MAXIMO = 1000
+
+PAGE_SIZE_INCONSISTENCIAS_PADRAO = 100
+PAGE_SIZE_INCONSISTENCIAS_MAXIMO = 1000
+
+CAMPOS_DIFF = (
+    'str_cpf', 'str_tipo', 'flg_movido', 'flg_cargo_alterado',
+    'str_orgao_base', 'str_unidade_base', 'str_cargo_base',
+    'str_orgao_novo', 'str_unidade_novo', 'str_cargo_novo',
+)
+
+
+CAMPOS_INCONSISTENCIA = (
+    'id_inconsistencia', 'str_tipo', 'str_detalhe', 'dat_registro',
+    'id_lotacao', 'id_lotacao__str_cpf', 'id_lotacao__id_orgao_lotacao__str_sigla',
+)
+
+
+class _Eco:
+    """Arquivo falso para o csv.writer: devolve a linha em vez de gravar"""
+
+    def write(self, valor):
+        return valor
+
+
+def _gerar_csv(linhas):
+    escritor = csv.writer(_Eco(), delimiter=';')
+    yield escritor.writerow(CAMPOS_DIFF)
+    for linha in linhas:
+        yield escritor.writerow(linha)
 
 
 class LotacaoVersaoViewSet(viewsets.ModelViewSet):
@@ -48,7 +94,9 @@ class LotacaoVersaoViewSet(viewsets.ModelViewSet):
         """
         GET /api/carga_org_lot/lotacoes/{id}/registros/
         
-        Lista registros de lotação (servidores).
+        Lista registros de lotação (servidores). A página é emitida em fluxo,
+        à medida que as linhas chegam do banco, para suportar page_size grande
+        (exportações) sem montar a lista inteira em memória.
         """
         versao = self.get_object()
         
@@ -78,40 +126,58 @@ class LotacaoVersaoViewSet(viewsets.ModelViewSet):
             'id_unidade_lotacao'
         )[offset:offset+page_size]
         
-        serializer = TblLotacaoSerializer(lotacoes, many=True)
-        
-        return Response({
-            'total': total,
-            'page': page,
-            'page_size': page_size,
-            'results': serializer.data
-        })
+        return StreamingJSONResponse(
+            lotacoes.iterator(chunk_size=2000),
+            envelope={
+                'total': total,
+                'page': page,
+                'page_size': page_size,
+            },
+            serializar=TblLotacaoSerializer().to_representation,
+        )
     
     @action(detail=True, methods=['get'])
     def inconsistencias(self, request, pk=None):
         """
         GET /api/carga_org_lot/lotacoes/{id}/inconsistencias/
         
-        Lista inconsistências encontradas na lotação.
+        Sem tipo: total e contagens por tipo e por órgão (uma consulta
+        agrupada). Com tipo: as inconsistências do tipo, paginadas por chave.
+        
+        Query params:
+            tipo: str_tipo a detalhar (ex.: CPF_INVALIDO)
+            cursor: next_cursor da página anterior (id da inconsistência)
+            page_size: itens por página (padrão 100, máximo 1000)
         """
         versao = self.get_object()
         
-        inconsistencias = TblLotacaoInconsistencia.objects.filter(
-            id_lotacao__id_lotacao_versao=versao
-        ).select_related('id_lotacao').order_by('-dat_registro')
-        
-        data = inconsistencias.values(
-            'id_inconsistencia',
-            'str_tipo',
-            'str_detalhe',
-            'dat_registro',
-            'id_lotacao__str_cpf',
-            'id_lotacao__id_orgao_lotacao__str_sigla'
-        )
+        tipo = request.query_params.get('tipo')
+        if not tipo:
+            return Response(resumo_inconsistencias(versao))
+        
+        try:
+            page_size = int(request.query_params.get('page_size', PAGE_SIZE_INCONSISTENCIAS_PADRAO))
+            cursor = int(request.query_params.get('cursor', 0))
+        except ValueError:
+            return Response(
+                {'detail': 'page_size e cursor devem ser inteiros'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        page_size = max(1, min(page_size, PAGE_SIZE_INCONSISTENCIAS_MAXIMO))
+        
+        # A lotação também filtrada pela versão: o JOIN cai em uma partição
+        pagina = list(TblLotacaoInconsistencia.objects.filter(
+            id_lotacao_versao=versao,
+            str_tipo=tipo,
+            id_inconsistencia__gt=cursor,
+            id_lotacao__id_lotacao_versao=versao,
+        ).order_by('id_inconsistencia').values(*CAMPOS_INCONSISTENCIA)[:page_size + 1])
+        proximo = pagina[page_size - 1]['id_inconsistencia'] if len(pagina) > page_size else None
         
         return Response({
-            'total': inconsistencias.count(),
-            'inconsistencias': list(data)
+            'tipo': tipo,
+            'results': pagina[:page_size],
+            'next_cursor': proximo,
         })
     
     @action(detail=True, methods=['get'])
@@ -130,7 +196,7 @@ class LotacaoVersaoViewSet(viewsets.ModelViewSet):
             'validos': lotacoes.filter(flg_valido=True).count(),
             'invalidos': lotacoes.filter(flg_valido=False).count(),
             'total_inconsistencias': TblLotacaoInconsistencia.objects.filter(
-                id_lotacao__id_lotacao_versao=versao
+                id_lotacao_versao=versao
             ).count(),
             'por_orgao': list(
                 lotacoes.values('id_orgao_lotacao__str_sigla')
@@ -140,3 +206,154 @@ class LotacaoVersaoViewSet(viewsets.ModelViewSet):
         }
         
         return Response(stats)
+    
+    @action(detail=True, methods=['post'])
+    def validar(self, request, pk=None):
+        """
+        POST /api/carga_org_lot/lotacoes/{id}/validar/
+        
+        Valida todas as lotações da versão (CPF, CPF duplicado, órgão/unidade
+        fora do organograma e cargo ausente), atualizando flg_valido,
+        str_erros_validacao e as inconsistências.
+        """
+        versao = self.get_object()
+        resultado = validar_lotacao(versao)
+        
+        return Response({
+            'total_registros': resultado.total,
+            'validos': resultado.validos,
+            'invalidos': resultado.invalidos,
+            'atualizados': resultado.atualizados,
+            'inconsistencias': resultado.inconsistencias,
+            'duracao_ms': resultado.duracao_ms
+        })
+    
+    @action(detail=True, methods=['post'])
+    def normalizar_cargos(self, request, pk=None):
+        """
+        POST /api/carga_org_lot/lotacoes/{id}/normalizar_cargos/
+        
+        Preenche str_cargo_normalizado a partir do cargo original (lista
+        canônica, abreviações e busca aproximada). Cargos sem correspondência
+        ficam nulos e são listados na resposta.
+        """
+        versao = self.get_object()
+        resultado = normalizar_cargos_lotacao(versao)
+        
+        return Response({
+            'cargos_distintos': resultado.distintos,
+            'cargos_normalizados': resultado.normalizados,
+            'lotacoes_atualizadas': resultado.atualizados,
+            'sem_correspondencia': resultado.sem_correspondencia,
+            'duracao_ms': resultado.duracao_ms
+        })
+    
+    @action(detail=True, methods=['get', 'post'])
+    def diff(self, request, pk=None):
+        """
+        GET /api/carga_org_lot/lotacoes/{id}/diff/?base={id_base}
+        POST /api/carga_org_lot/lotacoes/{id}/diff/?base={id_base}
+        
+        Admissões, desligamentos, movimentações e mudanças de cargo por CPF em
+        relação à versão base (padrão: a versão ativa do mesmo patriarca).
+        O diff é calculado no banco na primeira consulta e fica gravado; o
+        POST refaz o diff e devolve a primeira página.
+        
+        Query params:
+            tipo: ADMISSAO, DESLIGAMENTO ou ALTERACAO
+            movido, cargo: 'true' para só movimentações / mudanças de cargo
+            cursor: next_cursor da página anterior (CPF)
+            page_size: itens por página (padrão 100, máximo 1000)
+            formato: 'csv' exporta todos os itens filtrados
+        """
+        versao = self.get_object()
+        
+        id_base = request.query_params.get('base')
+        if id_base:
+            if not id_base.isdigit():
+                return Response(
+                    {'detail': 'Parâmetro base deve ser o id de uma versão'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            base = TblLotacaoVersao.objects.filter(pk=id_base).first()
+            if base is None:
+                return Response(
+                    {'detail': 'Versão base não encontrada'},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+        else:
+            base = TblLotacaoVersao.objects.filter(
+                id_patriarca=versao.id_patriarca_id, flg_ativo=True
+            ).exclude(pk=versao.pk).order_by('-dat_processamento').first()
+            if base is None:
+                return Response(
+                    {'detail': 'Nenhuma versão ativa para comparar; informe o parâmetro base'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        
+        tipo = request.query_params.get('tipo')
+        tipos = (
+            TblLotacaoDiffItem.TIPO_ADMISSAO,
+            TblLotacaoDiffItem.TIPO_DESLIGAMENTO,
+            TblLotacaoDiffItem.TIPO_ALTERACAO,
+        )
+        if tipo and tipo not in tipos:
+            return Response(
+                {'detail': f"tipo deve ser um de: {', '.join(tipos)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            page_size = int(request.query_params.get('page_size', PAGE_SIZE_DIFF_PADRAO))
+        except ValueError:
+            return Response(
+                {'detail': 'page_size deve ser inteiro'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        page_size = max(1, min(page_size, PAGE_SIZE_DIFF_MAXIMO))
+        
+        try:
+            resumo = diff_lotacao(base, versao, recalcular=request.method == 'POST')
+        except DiffLotacaoError as e:
+            return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        itens = TblLotacaoDiffItem.objects.filter(id_lotacao_diff=resumo)
+        if tipo:
+            itens = itens.filter(str_tipo=tipo)
+        if request.query_params.get('movido') == 'true':
+            itens = itens.filter(flg_movido=True)
+        if request.query_params.get('cargo') == 'true':
+            itens = itens.filter(flg_cargo_alterado=True)
+        itens = itens.order_by('str_cpf').values_list(*CAMPOS_DIFF)
+        
+        if request.query_params.get('formato') == 'csv':
+            response = StreamingHttpResponse(
+                _gerar_csv(itens.iterator(chunk_size=2000)),
+                content_type='text/csv; charset=utf-8'
+            )
+            response['Content-Disposition'] = (
+                f'attachment; filename="diff_lotacao_{base.pk}_{versao.pk}.csv"'
+            )
+            return response
+        
+        cursor = request.query_params.get('cursor')
+        if cursor:
+            itens = itens.filter(str_cpf__gt=cursor)
+        pagina = [dict(zip(CAMPOS_DIFF, linha)) for linha in itens[:page_size + 1]]
+        proximo = pagina[page_size - 1]['str_cpf'] if len(pagina) > page_size else None
+        
+        return Response({
+            'diff': {
+                'id': resumo.id_lotacao_diff,
+                'versao_base': base.pk,
+                'versao_nova': versao.pk,
+                'admissoes': resumo.int_admissoes,
+                'desligamentos': resumo.int_desligamentos,
+                'movimentacoes': resumo.int_movimentacoes,
+                'mudancas_cargo': resumo.int_mudancas_cargo,
+                'inalterados': resumo.int_inalterados,
+                'duracao_ms': resumo.int_duracao_ms,
+                'data_calculo': resumo.dat_calculo,
+            },
+            'results': pagina[:page_size],
+            'next_cursor': proximo,
+        })
@@ -2,19 +2,79 @@
 API ViewSet para JSON de Lotação por Órgão
 """
 
+import hashlib
+import json
+import re
+
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db.models import Count, Q
-from django.utils import timezone
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
 
 from ...models import (
     TblLotacaoJsonOrgao,
     TblLotacao,
     TblOrgaoUnidade,
 )
-from ...serializers import TblLotacaoJsonOrgaoSerializer
+from ...serializers import TblLotacaoJsonOrgaoSerializer, TblLotacaoJsonOrgaoListSerializer
+from ...services import (
+    EnvioApiError,
+    enfileirar_envio,
+    enviar_jsons,
+    garantir_hash,
+    ler_conteudo_bruto,
+    receptor_tem_conteudo,
+    regenerar_json_orgao,
+)
+from ...services.envio_api import STATUS_ERRO, STATUS_PENDENTE
+
+
+RE_RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def intervalo_pedido(cabecalho, total):
+    """
+    (início, fim) inclusivos do cabeçalho Range (um único intervalo de
+    bytes). None quando não há Range utilizável (responde o conteúdo todo);
+    ValueError quando o intervalo não pode ser atendido (416).
+    """
+    correspondencia = RE_RANGE.match((cabecalho or '').strip())
+    if not correspondencia or correspondencia.groups() == ('', ''):
+        return None
+    inicio, fim = correspondencia.groups()
+    if inicio == '':
+        # Sufixo: os últimos N bytes
+        inicio, fim = max(total - int(fim), 0), total - 1
+    else:
+        inicio = int(inicio)
+        fim = min(int(fim), total - 1) if fim else total - 1
+    if inicio >= total or inicio > fim:
+        raise ValueError(cabecalho)
+    return inicio, fim
+
+
+def responder_com_etag(request, hash_conteudo, dados):
+    """
+    Response com ETag da representação inteira: o hash do conteúdo mais um
+    hash dos metadados do envelope (datas e status de envio), sem serializar
+    o conteúdo de novo. 304 se o cliente já a tem.
+    """
+    metadados = json.dumps(
+        {chave: valor for chave, valor in dados.items() if chave != 'conteudo'},
+        cls=DjangoJSONEncoder, sort_keys=True
+    )
+    etag = quote_etag(f'{hash_conteudo}-{hashlib.sha256(metadados.encode()).hexdigest()[:16]}')
+    nao_modificado = get_conditional_response(request, etag=etag)
+    if nao_modificado is not None:
+        return nao_modificado
+    response = Response(dados)
+    response['ETag'] = etag
+    return response
 
 
 class LotacaoJsonOrgaoViewSet(viewsets.ModelViewSet):
@@ -40,6 +100,14 @@ class LotacaoJsonOrgaoViewSet(viewsets.ModelViewSet):
     serializer_class = TblLotacaoJsonOrgaoSerializer
     permission_classes = [IsAuthenticated]
     
+    # Ações que não precisam do js_conteudo carregado
+    ACOES_SEM_CONTEUDO = ('list', 'conteudo_bruto')
+    
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return TblLotacaoJsonOrgaoListSerializer
+        return super().get_serializer_class()
+    
     def get_queryset(self):
         """Permite filtros via query params"""
         queryset = super().get_queryset()
@@ -69,6 +137,9 @@ class LotacaoJsonOrgaoViewSet(viewsets.ModelViewSet):
         if nao_enviados == 'true':
             queryset = queryset.filter(dat_envio_api__isnull=True)
         
+        if self.action in self.ACOES_SEM_CONTEUDO:
+            queryset = queryset.defer('js_conteudo')
+        
         return queryset.order_by('-dat_criacao')
     
     @action(detail=True, methods=['get'])
@@ -76,11 +147,13 @@ class LotacaoJsonOrgaoViewSet(viewsets.ModelViewSet):
         """
         GET /api/carga_org_lot/lotacao-json-orgao/{id}/conteudo/
         
-        Retorna o conteúdo JSON completo formatado.
+        Retorna o conteúdo JSON completo formatado. O ETag combina o hash do
+        conteúdo e os dados de envio: com If-None-Match igual, responde 304
+        sem corpo.
         """
         json_orgao = self.get_object()
         
-        return Response({
+        return responder_com_etag(request, garantir_hash(json_orgao), {
             'id': json_orgao.id_lotacao_json_orgao,
             'orgao': {
                 'id': json_orgao.id_orgao_lotacao.id_orgao_unidade,
@@ -91,71 +164,74 @@ class LotacaoJsonOrgaoViewSet(viewsets.ModelViewSet):
             'lotacao_versao_id': json_orgao.id_lotacao_versao_id,
             'organograma_versao_id': json_orgao.id_organograma_versao_id,
             'conteudo': json_orgao.js_conteudo,
+            'hash_conteudo': json_orgao.str_hash_conteudo,
             'data_criacao': json_orgao.dat_criacao,
             'data_envio': json_orgao.dat_envio_api,
             'status_envio': json_orgao.str_status_envio,
             'mensagem_retorno': json_orgao.str_mensagem_retorno
         })
     
+    @action(detail=True, methods=['get'])
+    def conteudo_bruto(self, request, pk=None):
+        """
+        GET /api/carga_org_lot/lotacao-json-orgao/{id}/conteudo_bruto/
+        
+        Somente o js_conteudo, como JSON, lido e recortado no banco. Aceita
+        Range de bytes (206, para downloads em partes ou retomados), If-Range
+        e If-None-Match com o ETag (hash do conteúdo).
+        """
+        json_orgao = self.get_object()
+        etag = quote_etag(garantir_hash(json_orgao))
+        nao_modificado = get_conditional_response(request, etag=etag)
+        if nao_modificado is not None:
+            return nao_modificado
+        
+        total = json_orgao.int_tamanho_bytes
+        cabecalho_range = request.META.get('HTTP_RANGE')
+        if_range = request.META.get('HTTP_IF_RANGE')
+        if if_range and if_range != etag:
+            cabecalho_range = None  # conteúdo mudou: manda inteiro
+        try:
+            intervalo = intervalo_pedido(cabecalho_range, total)
+        except ValueError:
+            response = HttpResponse(status=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+            response['Content-Range'] = f'bytes */{total}'
+            return response
+        
+        if intervalo is None:
+            total, corpo = ler_conteudo_bruto(json_orgao.pk)
+            response = HttpResponse(corpo, content_type='application/json')
+        else:
+            inicio, fim = intervalo
+            total, corpo = ler_conteudo_bruto(json_orgao.pk, inicio, fim - inicio + 1)
+            response = HttpResponse(
+                corpo, content_type='application/json',
+                status=status.HTTP_206_PARTIAL_CONTENT
+            )
+            response['Content-Range'] = f'bytes {inicio}-{inicio + len(corpo) - 1}/{total}'
+        
+        response['ETag'] = etag
+        response['Accept-Ranges'] = 'bytes'
+        # Intervalos se referem aos bytes sem compressão
+        response['Cache-Control'] = 'no-transform'
+        return response
+    
     @action(detail=True, methods=['post'])
     def regenerar(self, request, pk=None):
         """
         POST /api/carga_org_lot/lotacao-json-orgao/{id}/regenerar/
         
         Regenera o JSON a partir dos dados atuais de lotação do banco.
+        O registro só é regravado se o conteúdo mudou (hash canônico).
         """
         json_orgao = self.get_object()
-        
-        # Buscar lotações válidas do órgão
-        lotacoes = TblLotacao.objects.filter(
-            id_lotacao_versao=json_orgao.id_lotacao_versao,
-            id_orgao_lotacao=json_orgao.id_orgao_lotacao,
-            flg_valido=True
-        ).select_related(
-            'id_orgao_lotacao',
-            'id_unidade_lotacao'
-        )
-        
-        # Construir JSON
-        servidores = []
-        for lotacao in lotacoes:
-            servidor = {
-                'cpf': lotacao.str_cpf,
-                'orgao': {
-                    'sigla': lotacao.id_orgao_lotacao.str_sigla,
-                    'nome': lotacao.id_orgao_lotacao.str_nome
-                },
-                'cargo': lotacao.str_cargo_normalizado or lotacao.str_cargo_original,
-                'data_referencia': lotacao.dat_referencia.isoformat() if lotacao.dat_referencia else None
-            }
-            
-            if lotacao.id_unidade_lotacao:
-                servidor['unidade'] = {
-                    'sigla': lotacao.id_unidade_lotacao.str_sigla,
-                    'nome': lotacao.id_unidade_lotacao.str_nome
-                }
-            
-            servidores.append(servidor)
-        
-        novo_conteudo = {
-            'orgao': {
-                'id': json_orgao.id_orgao_lotacao.id_orgao_unidade,
-                'sigla': json_orgao.id_orgao_lotacao.str_sigla,
-                'nome': json_orgao.id_orgao_lotacao.str_nome
-            },
-            'patriarca': json_orgao.id_patriarca.str_sigla_patriarca,
-            'total_servidores': len(servidores),
-            'servidores': servidores,
-            'data_geracao': timezone.now().isoformat()
-        }
-        
-        # Atualizar registro
-        json_orgao.js_conteudo = novo_conteudo
-        json_orgao.save()
+        alterado = regenerar_json_orgao(json_orgao)
         
         return Response({
-            'message': 'JSON regenerado com sucesso',
-            'total_servidores': len(servidores)
+            'message': 'JSON regenerado com sucesso' if alterado else 'JSON inalterado',
+            'alterado': alterado,
+            'hash_conteudo': json_orgao.str_hash_conteudo,
+            'total_servidores': json_orgao.js_conteudo.get('total_servidores', 0)
         })
     
     @action(detail=True, methods=['post'])
@@ -167,12 +243,24 @@ class LotacaoJsonOrgaoViewSet(viewsets.ModelViewSet):
         
         Body (opcional):
             - force: true/false (força reenvio mesmo se já foi enviado)
+        
+        Conteúdo idêntico ao último enviado (mesmo hash) não é reenviado.
+        Falha no envio responde 502; API externa não configurada, 503.
         """
         json_orgao = self.get_object()
         force = request.data.get('force', False)
         
-        # Verifica se já foi enviado
-        if json_orgao.dat_envio_api and not force:
+        if receptor_tem_conteudo(json_orgao) and not force:
+            return Response({
+                'message': 'Receptor já possui este conteúdo; envio dispensado',
+                'enviado': False,
+                'hash_conteudo': json_orgao.str_hash_conteudo,
+                'data_envio': json_orgao.dat_envio_api
+            })
+        
+        # Já enviado antes do registro de hash: exige force (envio com erro não conta)
+        if (json_orgao.dat_envio_api and not json_orgao.str_hash_enviado
+                and json_orgao.str_status_envio != STATUS_ERRO and not force):
             return Response(
                 {
                     'error': 'JSON já foi enviado. Use force=true para reenviar.',
@@ -182,18 +270,60 @@ class LotacaoJsonOrgaoViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # TODO: Implementar integração com API externa
-        # Por enquanto, simula envio
+        try:
+            resultado = enviar_jsons([json_orgao], forcar=True)[0]
+        except EnvioApiError as e:
+            return Response({'error': str(e)}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
         
-        json_orgao.dat_envio_api = timezone.now()
-        json_orgao.str_status_envio = 'PENDENTE'  # Deve ser atualizado após resposta da API
-        json_orgao.str_mensagem_retorno = 'Envio em desenvolvimento'
-        json_orgao.save()
+        dados = {
+            'enviado': resultado.enviado,
+            'status': json_orgao.str_status_envio,
+            'mensagem': resultado.mensagem,
+            'tentativas': resultado.tentativas,
+            'hash_conteudo': json_orgao.str_hash_conteudo,
+            'data_envio': json_orgao.dat_envio_api
+        }
+        if not resultado.enviado:
+            return Response(dados, status=status.HTTP_502_BAD_GATEWAY)
+        return Response({'message': 'JSON enviado à API externa', **dados})
+    
+    @action(detail=False, methods=['post'])
+    def enviar_em_lote(self, request):
+        """
+        POST /api/carga_org_lot/lotacao-json-orgao/enviar_em_lote/
+        
+        Coloca na fila de envio os JSONs de todos os órgãos de uma versão de
+        lotação e responde 202: o envio de uma versão inteira não cabe no
+        tempo de uma requisição. A fila é enviada por
+        `manage.py enviar_cargas --pendentes` (ver services.envio_api); o
+        andamento aparece em status_envio (PENDENTE, EM_ENVIO, ENVIADO, ERRO).
         
+        Body:
+            - lotacao_versao_id: ID da versão de lotação
+            - force: true/false (enfileira mesmo os conteúdos já recebidos)
+        """
+        lotacao_versao_id = request.data.get('lotacao_versao_id')
+        force = request.data.get('force', False)
+        
+        if not lotacao_versao_id:
+            return Response(
+                {'error': 'lotacao_versao_id é obrigatório'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        registros = TblLotacaoJsonOrgao.objects.filter(id_lotacao_versao_id=lotacao_versao_id)
+        total = registros.count()
+        enfileirados = enfileirar_envio(registros, forcar=force)
         return Response({
-            'message': 'Envio para API em desenvolvimento',
-            'data_envio': json_orgao.dat_envio_api
-        }, status=status.HTTP_501_NOT_IMPLEMENTED)
+            'message': 'JSONs na fila de envio',
+            'total': total,
+            'enfileirados': enfileirados,
+            'dispensados': total - enfileirados,
+            'acompanhamento': (
+                f'/api/v1/carga/lotacao-json/?lotacao_versao={lotacao_versao_id}'
+                f'&status_envio={STATUS_PENDENTE}'
+            ),
+        }, status=status.HTTP_202_ACCEPTED)
     
     @action(detail=False, methods=['get'])
     def estatisticas(self, request):
@@ -2,6 +2,8 @@
 API ViewSet para Organograma
 """
 
+from collections import defaultdict
+
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
@@ -16,6 +18,14 @@ from ...serializers import (
     TblOrganogramaVersaoSerializer,
     TblOrgaoUnidadeSerializer,
 )
+from ...services import diff_organograma, garantir_hash
+from .lotacao_json_api import responder_com_etag
+from common.utils.precompressao import precomprimido
+from common.utils.query_budget import query_budget
+
+
+# Versões processadas não mudam: respostas guardadas já comprimidas
+STATUS_PROCESSADO = 'PROCESSADO'
 
 
 class OrganogramaVersaoViewSet(viewsets.ModelViewSet):
@@ -46,6 +56,7 @@ class OrganogramaVersaoViewSet(viewsets.ModelViewSet):
         return queryset.order_by('-dat_processamento')
     
     @action(detail=True, methods=['get'])
+    @precomprimido('carga:organograma-orgaos')
     def orgaos(self, request, pk=None):
         """
         GET /api/carga_org_lot/organogramas/{id}/orgaos/
@@ -53,6 +64,7 @@ class OrganogramaVersaoViewSet(viewsets.ModelViewSet):
         Lista órgãos/unidades do organograma (hierarquia completa).
         """
         organograma = self.get_object()
+        request.recurso_imutavel = organograma.str_status_processamento == STATUS_PROCESSADO
         orgaos = TblOrgaoUnidade.objects.filter(
             id_organograma_versao=organograma
         ).select_related('id_orgao_unidade_pai').order_by('str_numero_hierarquia')
@@ -61,6 +73,8 @@ class OrganogramaVersaoViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
     
     @action(detail=True, methods=['get'])
+    @precomprimido('carga:organograma-hierarquia')
+    @query_budget(max_queries=2, nome='carga:organograma-hierarquia')
     def hierarquia(self, request, pk=None):
         """
         GET /api/carga_org_lot/organogramas/{id}/hierarquia/
@@ -68,25 +82,32 @@ class OrganogramaVersaoViewSet(viewsets.ModelViewSet):
         Retorna estrutura hierárquica em árvore (JSON aninhado).
         """
         organograma = self.get_object()
+        request.recurso_imutavel = organograma.str_status_processamento == STATUS_PROCESSADO
         
-        # Buscar órgãos raiz (sem pai)
-        orgaos_raiz = TblOrgaoUnidade.objects.filter(
-            id_organograma_versao=organograma,
-            id_orgao_unidade_pai__isnull=True
-        ).prefetch_related('tblorgaounidade_set')
+        # Uma única consulta com todos os órgãos da versão; a árvore é montada
+        # em memória (antes era uma consulta por nó)
+        orgaos = TblOrgaoUnidade.objects.filter(
+            id_organograma_versao=organograma
+        ).order_by('id_orgao_unidade').values(
+            'id_orgao_unidade', 'id_orgao_unidade_pai',
+            'str_sigla', 'str_nome', 'int_nivel_hierarquia',
+        )
+        
+        filhos_por_pai = defaultdict(list)
+        for orgao in orgaos:
+            filhos_por_pai[orgao['id_orgao_unidade_pai']].append(orgao)
         
         def build_tree(orgao):
             """Constrói árvore recursivamente"""
-            children = TblOrgaoUnidade.objects.filter(id_orgao_unidade_pai=orgao)
             return {
-                'id': orgao.id_orgao_unidade,
-                'sigla': orgao.str_sigla,
-                'nome': orgao.str_nome,
-                'nivel': orgao.int_nivel_hierarquia,
-                'filhos': [build_tree(child) for child in children]
+                'id': orgao['id_orgao_unidade'],
+                'sigla': orgao['str_sigla'],
+                'nome': orgao['str_nome'],
+                'nivel': orgao['int_nivel_hierarquia'],
+                'filhos': [build_tree(filho) for filho in filhos_por_pai[orgao['id_orgao_unidade']]]
             }
         
-        hierarquia = [build_tree(orgao) for orgao in orgaos_raiz]
+        hierarquia = [build_tree(orgao) for orgao in filhos_por_pai[None]]
         
         return Response({
             'organograma_id': organograma.id_organograma_versao,
@@ -94,19 +115,63 @@ class OrganogramaVersaoViewSet(viewsets.ModelViewSet):
             'hierarquia': hierarquia
         })
     
+    @action(detail=True, methods=['get'])
+    def diff(self, request, pk=None):
+        """
+        GET /api/carga_org_lot/organogramas/{id}/diff/?base={id_base}
+        
+        Unidades adicionadas, removidas, renomeadas e movidas em relação à
+        versão base (padrão: a versão ativa do mesmo patriarca).
+        """
+        organograma = self.get_object()
+        
+        id_base = request.query_params.get('base')
+        if id_base:
+            if not id_base.isdigit():
+                return Response(
+                    {'detail': 'Parâmetro base deve ser o id de uma versão'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            base = TblOrganogramaVersao.objects.filter(pk=id_base).first()
+            if base is None:
+                return Response(
+                    {'detail': 'Versão base não encontrada'},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+            if base.id_patriarca_id != organograma.id_patriarca_id:
+                return Response(
+                    {'detail': 'As versões pertencem a patriarcas diferentes'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        else:
+            base = TblOrganogramaVersao.objects.filter(
+                id_patriarca=organograma.id_patriarca_id, flg_ativo=True
+            ).exclude(
+                pk=organograma.pk
+            ).order_by('-dat_processamento').first()
+            if base is None:
+                return Response(
+                    {'detail': 'Nenhuma versão ativa para comparar; informe o parâmetro base'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        
+        return Response(diff_organograma(base.pk, organograma.pk))
+    
     @action(detail=True, methods=['get'])
     def json_envio(self, request, pk=None):
         """
         GET /api/carga_org_lot/organogramas/{id}/json_envio/
         
-        Retorna JSON formatado para envio à API externa.
+        Retorna JSON formatado para envio à API externa, com ETag do hash do
+        conteúdo e dos dados de envio.
         """
         organograma = self.get_object()
         
         try:
             json_org = TblOrganogramaJson.objects.get(id_organograma_versao=organograma)
-            return Response({
+            return responder_com_etag(request, garantir_hash(json_org), {
                 'conteudo': json_org.js_conteudo,
+                'hash_conteudo': json_org.str_hash_conteudo,
                 'data_criacao': json_org.dat_criacao,
                 'data_envio': json_org.dat_envio_api,
                 'status_envio': json_org.str_status_envio,
@@ -99,7 +99,7 @@ def lotacao_detail(request, lotacao_versao_id):
             flg_valido=False
         ).count(),
         'inconsistencias': TblLotacaoInconsistencia.objects.filter(
-            id_lotacao__id_lotacao_versao=lotacao_versao
+            id_lotacao_versao=lotacao_versao
         ).count()
     }
     
@@ -124,7 +124,7 @@ def lotacao_inconsistencias(request, lotacao_versao_id):
     lotacao_versao = get_object_or_404(TblLotacaoVersao, id_lotacao_versao=lotacao_versao_id)
     
     inconsistencias = TblLotacaoInconsistencia.objects.filter(
-        id_lotacao__id_lotacao_versao=lotacao_versao
+        id_lotacao_versao=lotacao_versao
     ).select_related('id_lotacao', 'id_lotacao__id_orgao_lotacao').order_by('-dat_registro')
     
     # Paginação
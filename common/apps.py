@@ -14,3 +14,14 @@ class CommonConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'common'
     verbose_name = 'Common Utilities'
+
+    def ready(self):
+        import atexit
+
+        from django.db.backends.signals import connection_created
+        from .services.consultas_lentas import gravar_ao_sair, instalar
+
+        # Log de queries lentas em toda conexão aberta (ver consultas_lentas)
+        connection_created.connect(instalar, dispatch_uid='gpp_consultas_lentas')
+        # Fora de requisições (comandos) só a saída do processo grava a tabela
+        atexit.register(gravar_ao_sair)
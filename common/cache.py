@@ -0,0 +1,496 @@
+"""
+Cache em dois níveis.
+
+Nível 1: LRU em memória, por processo, com TTL e limites de entradas e de
+bytes. Nível 2: um backend compartilhado entre os workers (tabela de cache no
+PostgreSQL ou arquivos). Leituras tentam o nível 1, depois o 2 (e preenchem o
+1); escritas vão para os dois.
+
+Como cada worker tem o seu nível 1, escritas e exclusões são avisadas aos
+outros processos com NOTIFY no canal configurado; cada processo mantém uma
+thread com LISTEN que remove as chaves avisadas do seu LRU. Se a conexão do
+ouvinte cair, o nível 1 é esvaziado (avisos podem ter sido perdidos). Sem
+NOTIFY_DATABASE, a defasagem entre workers fica limitada a LOCAL_TIMEOUT.
+
+get_or_set() tem proteção contra estouro de cache (single-flight): um só
+cálculo por chave no processo (trava por chave) e entre processos (trava com
+add() no backend compartilhado); os demais aguardam o valor.
+
+    CACHES = {
+        'default': {
+            'BACKEND': 'common.cache.TwoTierCache',
+            'LOCATION': 'default',
+            'TIMEOUT': 3600,
+            'OPTIONS': {
+                'COMPARTILHADO': 'compartilhado',  # alias em CACHES
+                'LOCAL_MAX_ENTRIES': 5000,
+                'LOCAL_MAX_BYTES': 64 * 2**20,
+                'LOCAL_TIMEOUT': 60,
+                'NOTIFY_DATABASE': 'default',      # None desliga LISTEN/NOTIFY
+                'NOTIFY_CHANNEL': 'gpp_cache',
+                'SINGLE_FLIGHT_TIMEOUT': 30,
+            },
+        },
+        'compartilhado': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'gpp_cache',
+        },
+    }
+
+Acertos, faltas, invalidações e cálculos do single-flight são contados em
+common.services.metrics (expostos em /metrics).
+"""
+
+import logging
+import os
+import pickle
+import select
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+_AUSENTE = object()
+
+# Identifica este processo nos avisos, para ignorar os próprios
+ORIGEM = uuid.uuid4().hex
+
+SUFIXO_TRAVA = ':__single_flight__'
+ESPERA_SINGLE_FLIGHT = 0.05      # segundos entre consultas enquanto outro calcula
+INTERVALO_OUVINTE = 1.0          # segundos entre verificações de parada
+ESPERA_RECONEXAO = 5.0
+
+
+def _metrica(nome: str, cache: str, **labels) -> None:
+    from common.services.metrics import metrics_enabled, registry
+    if metrics_enabled():
+        registry.incrementar(nome, (('cache', cache),) + tuple(sorted(labels.items())))
+
+
+# ----------------------------------------------------------------------
+# Nível 1
+# ----------------------------------------------------------------------
+
+class LRULocal:
+    """
+    LRU com TTL, limitado em entradas e em bytes. Os valores ficam
+    serializados (pickle), como no LocMemCache, para que quem lê não altere
+    o objeto guardado.
+    """
+
+    def __init__(self, max_entradas: int = 1000, max_bytes: int = 64 * 2**20):
+        self.max_entradas = max_entradas
+        self.max_bytes = max_bytes
+        self._dados: 'OrderedDict[str, Tuple[float, bytes]]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, chave: str):
+        with self._lock:
+            item = self._dados.get(chave)
+            if item is None:
+                return _AUSENTE
+            expira_em, dados = item
+            if expira_em <= time.monotonic():
+                self._remover(chave)
+                return _AUSENTE
+            self._dados.move_to_end(chave)
+        return pickle.loads(dados)
+
+    def set(self, chave: str, valor, ttl: float) -> None:
+        if ttl <= 0:
+            self.delete(chave)
+            return
+        dados = pickle.dumps(valor, pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._remover(chave)
+            if len(dados) > self.max_bytes:
+                return
+            self._dados[chave] = (time.monotonic() + ttl, dados)
+            self._bytes += len(dados)
+            while len(self._dados) > self.max_entradas or self._bytes > self.max_bytes:
+                self._remover(next(iter(self._dados)))
+
+    def delete(self, chave: str) -> bool:
+        with self._lock:
+            return self._remover(chave)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._dados.clear()
+            self._bytes = 0
+
+    def _remover(self, chave: str) -> bool:
+        item = self._dados.pop(chave, None)
+        if item is None:
+            return False
+        self._bytes -= len(item[1])
+        return True
+
+    def __len__(self) -> int:
+        return len(self._dados)
+
+    @property
+    def bytes(self) -> int:
+        return self._bytes
+
+
+# Os backends de cache são instanciados por thread; o LRU, as travas do
+# single-flight e o ouvinte são do processo, compartilhados por nome (como o
+# LocMemCache faz)
+_lrus: Dict[str, LRULocal] = {}
+_travas: Dict[str, List[threading.Lock]] = {}
+_ouvintes: Dict[Tuple[str, str], 'OuvinteInvalidacao'] = {}
+_registro_lock = threading.Lock()
+
+
+def _apos_fork() -> None:
+    """No processo filho (ex.: gunicorn --preload) as threads não existem."""
+    global ORIGEM, _registro_lock
+    ORIGEM = uuid.uuid4().hex
+    _registro_lock = threading.Lock()
+    _ouvintes.clear()
+    for lru in _lrus.values():
+        lru._lock = threading.Lock()
+        lru.clear()
+    # Trocadas no lugar: os backends já criados guardam a mesma lista
+    for travas in _travas.values():
+        travas[:] = [threading.Lock() for _ in travas]
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_apos_fork)
+
+
+# ----------------------------------------------------------------------
+# Invalidação entre processos
+# ----------------------------------------------------------------------
+
+class OuvinteInvalidacao(threading.Thread):
+    """
+    Thread com LISTEN em `canal`, em conexão própria (autocommit). Cada aviso
+    traz "<origem>|<chave>" (ou "*" para esvaziar) e é aplicado aos LRUs
+    registrados no canal.
+    """
+
+    def __init__(self, banco: str, canal: str):
+        super().__init__(name=f'cache-listen-{canal}', daemon=True)
+        self.banco = banco
+        self.canal = canal
+        self.lrus: Dict[str, LRULocal] = {}
+        self.pronto = threading.Event()
+        self._parar = threading.Event()
+
+    def parar(self, timeout: Optional[float] = None) -> None:
+        self._parar.set()
+        self.join(timeout)
+
+    def run(self):
+        while not self._parar.is_set():
+            conexao = None
+            try:
+                conexao = self._conectar()
+                # Avisos anteriores à conexão podem ter sido perdidos
+                self._esvaziar()
+                self.pronto.set()
+                self._escutar(conexao)
+            except Exception as e:
+                self.pronto.clear()
+                self._esvaziar()
+                logger.warning(f"Ouvinte de invalidação do cache ({self.canal}) desconectado: {e}")
+                self._parar.wait(ESPERA_RECONEXAO)
+            finally:
+                if conexao is not None:
+                    try:
+                        conexao.close()
+                    except Exception:
+                        pass
+
+    def _conectar(self):
+        wrapper = connections[self.banco]
+        conexao = wrapper.get_new_connection(wrapper.get_connection_params())
+        conexao.autocommit = True
+        with conexao.cursor() as cursor:
+            cursor.execute(f'LISTEN {wrapper.ops.quote_name(self.canal)}')
+        logger.info(f"Ouvinte de invalidação do cache escutando '{self.canal}' (pid {os.getpid()})")
+        return conexao
+
+    def _escutar(self, conexao) -> None:
+        if hasattr(conexao, 'poll'):  # psycopg2
+            while not self._parar.is_set():
+                if select.select([conexao], [], [], INTERVALO_OUVINTE) == ([], [], []):
+                    continue
+                conexao.poll()
+                while conexao.notifies:
+                    self.processar(conexao.notifies.pop(0).payload)
+        else:  # psycopg 3
+            while not self._parar.is_set():
+                for aviso in conexao.notifies(timeout=INTERVALO_OUVINTE):
+                    self.processar(aviso.payload)
+
+    def processar(self, payload: str) -> None:
+        origem, _, chave = payload.partition('|')
+        if origem == ORIGEM:
+            return
+        for nome, lru in list(self.lrus.items()):
+            if chave == '*':
+                lru.clear()
+            else:
+                lru.delete(chave)
+            _metrica('gpp_cache_invalidacoes_total', nome, origem='remota')
+
+    def _esvaziar(self) -> None:
+        for lru in list(self.lrus.values()):
+            lru.clear()
+
+
+def parar_ouvintes(timeout: Optional[float] = 5) -> None:
+    """Encerra as threads de LISTEN do processo (testes, desligamento)."""
+    with _registro_lock:
+        ouvintes = list(_ouvintes.values())
+        _ouvintes.clear()
+    for ouvinte in ouvintes:
+        ouvinte.parar(timeout)
+
+
+# ----------------------------------------------------------------------
+# Backend
+# ----------------------------------------------------------------------
+
+class TwoTierCache(BaseCache):
+    """Backend Django: LRU local na frente do cache `COMPARTILHADO`."""
+
+    NUM_TRAVAS = 64
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        opcoes = params.get('OPTIONS', {})
+        self.nome = location or 'default'
+        self.alias_compartilhado = opcoes['COMPARTILHADO']
+        self.local_timeout = opcoes.get('LOCAL_TIMEOUT', 60)
+        self.banco_notify = opcoes.get('NOTIFY_DATABASE')
+        self.canal = opcoes.get('NOTIFY_CHANNEL', 'gpp_cache')
+        self.single_flight_timeout = opcoes.get('SINGLE_FLIGHT_TIMEOUT', 30)
+
+        with _registro_lock:
+            self.local = _lrus.get(self.nome)
+            if self.local is None:
+                self.local = _lrus[self.nome] = LRULocal(
+                    opcoes.get('LOCAL_MAX_ENTRIES', 1000),
+                    opcoes.get('LOCAL_MAX_BYTES', 64 * 2**20),
+                )
+            self._travas = _travas.get(self.nome)
+            if self._travas is None:
+                self._travas = _travas[self.nome] = [
+                    threading.Lock() for _ in range(self.NUM_TRAVAS)
+                ]
+        self._notify_ativo = self.banco_notify is not None
+
+    @property
+    def compartilhado(self) -> BaseCache:
+        return caches[self.alias_compartilhado]
+
+    # ------------------------------------------------------------------
+    # Invalidação
+    # ------------------------------------------------------------------
+
+    def _garantir_ouvinte(self) -> None:
+        """Inicia o LISTEN do processo no primeiro uso (nunca no boot)."""
+        if not self._notify_ativo:
+            return
+        identificador = (self.banco_notify, self.canal)
+        ouvinte = _ouvintes.get(identificador)
+        if ouvinte is not None and self.nome in ouvinte.lrus:
+            return
+        with _registro_lock:
+            ouvinte = _ouvintes.get(identificador)
+            if ouvinte is None:
+                ouvinte = _ouvintes[identificador] = OuvinteInvalidacao(*identificador)
+                ouvinte.lrus[self.nome] = self.local
+                ouvinte.start()
+            else:
+                ouvinte.lrus[self.nome] = self.local
+
+    def _avisar(self, chaves: List[str]) -> None:
+        """NOTIFY para os outros processos (entregue no commit, se houver transação)."""
+        if not self._notify_ativo or not chaves:
+            return
+        for chave in chaves:
+            _metrica('gpp_cache_invalidacoes_total', self.nome, origem='local')
+        try:
+            with connections[self.banco_notify].cursor() as cursor:
+                for chave in chaves:
+                    cursor.execute('SELECT pg_notify(%s, %s)', [self.canal, f'{ORIGEM}|{chave}'])
+        except Exception as e:
+            logger.warning(f"Falha ao avisar invalidação do cache '{self.nome}': {e}")
+
+    def _ttl_local(self, timeout) -> float:
+        if timeout is None:
+            return self.local_timeout
+        return min(timeout, self.local_timeout)
+
+    def _timeout(self, timeout):
+        return self.default_timeout if timeout is DEFAULT_TIMEOUT else timeout
+
+    # ------------------------------------------------------------------
+    # API do Django
+    # ------------------------------------------------------------------
+
+    def get(self, key, default=None, version=None):
+        self._garantir_ouvinte()
+        chave = self.make_and_validate_key(key, version)
+        valor = self.local.get(chave)
+        if valor is not _AUSENTE:
+            _metrica('gpp_cache_operacoes_total', self.nome, resultado='hit_local')
+            return valor
+
+        valor = self.compartilhado.get(key, _AUSENTE, version)
+        if valor is _AUSENTE:
+            _metrica('gpp_cache_operacoes_total', self.nome, resultado='miss')
+            return default
+        _metrica('gpp_cache_operacoes_total', self.nome, resultado='hit_compartilhado')
+        self.local.set(chave, valor, self.local_timeout)
+        return valor
+
+    def get_many(self, keys, version=None):
+        self._garantir_ouvinte()
+        encontrados, faltantes = {}, []
+        for key in keys:
+            valor = self.local.get(self.make_and_validate_key(key, version))
+            if valor is _AUSENTE:
+                faltantes.append(key)
+            else:
+                encontrados[key] = valor
+        if faltantes:
+            for key, valor in self.compartilhado.get_many(faltantes, version).items():
+                encontrados[key] = valor
+                self.local.set(self.make_and_validate_key(key, version), valor, self.local_timeout)
+        return encontrados
+
+    def has_key(self, key, version=None):
+        self._garantir_ouvinte()
+        if self.local.get(self.make_and_validate_key(key, version)) is not _AUSENTE:
+            return True
+        return self.compartilhado.has_key(key, version)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self._garantir_ouvinte()
+        timeout = self._timeout(timeout)
+        chave = self.make_and_validate_key(key, version)
+        self.compartilhado.set(key, value, timeout, version)
+        self.local.set(chave, value, self._ttl_local(timeout))
+        self._avisar([chave])
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self._garantir_ouvinte()
+        timeout = self._timeout(timeout)
+        chave = self.make_and_validate_key(key, version)
+        if not self.compartilhado.add(key, value, timeout, version):
+            return False
+        self.local.set(chave, value, self._ttl_local(timeout))
+        self._avisar([chave])
+        return True
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        self._garantir_ouvinte()
+        timeout = self._timeout(timeout)
+        falhas = self.compartilhado.set_many(data, timeout, version) or []
+        chaves = []
+        for key, value in data.items():
+            chave = self.make_and_validate_key(key, version)
+            if key in falhas:
+                self.local.delete(chave)
+            else:
+                self.local.set(chave, value, self._ttl_local(timeout))
+            chaves.append(chave)
+        self._avisar(chaves)
+        return falhas
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.compartilhado.touch(key, self._timeout(timeout), version)
+
+    def incr(self, key, delta=1, version=None):
+        chave = self.make_and_validate_key(key, version)
+        valor = self.compartilhado.incr(key, delta, version)
+        self.local.delete(chave)
+        self._avisar([chave])
+        return valor
+
+    def delete(self, key, version=None):
+        self._garantir_ouvinte()
+        chave = self.make_and_validate_key(key, version)
+        removido = self.compartilhado.delete(key, version)
+        self.local.delete(chave)
+        self._avisar([chave])
+        return removido
+
+    def delete_many(self, keys, version=None):
+        self._garantir_ouvinte()
+        keys = list(keys)
+        self.compartilhado.delete_many(keys, version)
+        chaves = [self.make_and_validate_key(key, version) for key in keys]
+        for chave in chaves:
+            self.local.delete(chave)
+        self._avisar(chaves)
+
+    def clear(self):
+        self.compartilhado.clear()
+        self.local.clear()
+        self._avisar(['*'])
+
+    # ------------------------------------------------------------------
+    # Single-flight
+    # ------------------------------------------------------------------
+
+    def get_or_set(self, key, default, timeout=DEFAULT_TIMEOUT, version=None):
+        """
+        Como o do Django, mas com um só cálculo de `default` por chave
+        enquanto o valor não existe. Quem não calcula aguarda até
+        SINGLE_FLIGHT_TIMEOUT e, se o valor não aparecer, calcula também.
+        """
+        valor = self.get(key, _AUSENTE, version)
+        if valor is not _AUSENTE:
+            return valor
+
+        chave = self.make_and_validate_key(key, version)
+        with self._travas[hash(chave) % self.NUM_TRAVAS]:
+            valor = self.get(key, _AUSENTE, version)
+            if valor is not _AUSENTE:
+                _metrica('gpp_cache_single_flight_total', self.nome, resultado='aguardado')
+                return valor
+
+            trava = f'{key}{SUFIXO_TRAVA}'
+            adquirida = self.compartilhado.add(trava, ORIGEM, self.single_flight_timeout, version)
+            if not adquirida:
+                valor = self._aguardar(key, version)
+                if valor is not _AUSENTE:
+                    _metrica('gpp_cache_single_flight_total', self.nome, resultado='aguardado')
+                    return valor
+                _metrica('gpp_cache_single_flight_total', self.nome, resultado='expirado')
+
+            try:
+                valor = default() if callable(default) else default
+                self.set(key, valor, timeout, version)
+                _metrica('gpp_cache_single_flight_total', self.nome, resultado='calculado')
+            finally:
+                if adquirida:
+                    self.compartilhado.delete(trava, version)
+            return valor
+
+    def _aguardar(self, key, version):
+        limite = time.monotonic() + self.single_flight_timeout
+        while time.monotonic() < limite:
+            time.sleep(ESPERA_SINGLE_FLIGHT)
+            valor = self.compartilhado.get(key, _AUSENTE, version)
+            if valor is not _AUSENTE:
+                self.local.set(self.make_and_validate_key(key, version), valor, self.local_timeout)
+                return valor
+        return _AUSENTE
@@ -0,0 +1,235 @@
+"""
+Roteamento de leituras para réplicas (base dos routers de carga_org_lot e
+acoes_pngi).
+
+Leituras vão para uma das réplicas de GPP_DB_REPLICAS; escritas sempre para
+'default'. A leitura volta para o primário quando:
+- a requisição ou o processo atual já escreveu no banco (ler o que escreveu);
+- o cliente escreveu há menos de GPP_DB_REPLICA_STICKY_SECONDS (cookie gravado
+  pelo ReplicaRoutingMiddleware);
+- o método HTTP não é seguro (POST, PUT, PATCH, DELETE);
+- a view pediu o primário (@usar_primario ou atributo usar_banco_primario);
+- há uma transação aberta em 'default';
+- todas as réplicas estão fora do ar ou com atraso de replicação acima de
+  GPP_DB_REPLICA_MAX_LAG_SECONDS (medido a cada
+  GPP_DB_REPLICA_LAG_CHECK_INTERVAL segundos por processo).
+
+Sem réplicas configuradas (padrão), tudo continua em 'default'.
+"""
+
+import functools
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+
+PRIMARIO = 'default'
+
+_forcar_primario: ContextVar[bool] = ContextVar('gpp_db_forcar_primario', default=False)
+_escreveu: ContextVar[bool] = ContextVar('gpp_db_escreveu', default=False)
+
+_atrasos: Dict[str, Tuple[float, Optional[float]]] = {}
+_atrasos_lock = threading.Lock()
+
+
+def replicas() -> List[str]:
+    return list(getattr(settings, 'GPP_DB_REPLICAS', []))
+
+
+def sticky_seconds() -> float:
+    return getattr(settings, 'GPP_DB_REPLICA_STICKY_SECONDS', 5)
+
+
+def max_lag_seconds() -> float:
+    return getattr(settings, 'GPP_DB_REPLICA_MAX_LAG_SECONDS', 10)
+
+
+def lag_check_interval() -> float:
+    return getattr(settings, 'GPP_DB_REPLICA_LAG_CHECK_INTERVAL', 5)
+
+
+# ----------------------------------------------------------------------
+# Estado por requisição / contexto
+# ----------------------------------------------------------------------
+
+def marcar_escrita() -> None:
+    if not _escreveu.get():
+        _escreveu.set(True)
+
+
+def houve_escrita() -> bool:
+    return _escreveu.get()
+
+
+def forcar_primario() -> None:
+    _forcar_primario.set(True)
+
+
+def iniciar_requisicao(primario: bool = False):
+    """Zera o estado no início da requisição; devolve os tokens para restaurar."""
+    return _forcar_primario.set(primario), _escreveu.set(False)
+
+
+def encerrar_requisicao(tokens) -> None:
+    token_primario, token_escrita = tokens
+    _forcar_primario.reset(token_primario)
+    _escreveu.reset(token_escrita)
+
+
+@contextmanager
+def primario():
+    """Bloco em que todas as leituras vão para o primário."""
+    token = _forcar_primario.set(True)
+    try:
+        yield
+    finally:
+        _forcar_primario.reset(token)
+
+
+def usar_primario(view):
+    """
+    Marca a view (função, @api_view, método de @action ou classe) para ler
+    sempre do primário. Em funções, aplicar como decorator mais externo.
+    """
+    if isinstance(view, type):
+        view.usar_banco_primario = True
+        return view
+
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        with primario():
+            return view(*args, **kwargs)
+
+    wrapper.usar_banco_primario = True
+    return wrapper
+
+
+def view_usa_primario(view_func, metodo: str) -> bool:
+    """Verifica o opt-out na função da view, na classe e na action do ViewSet."""
+    if getattr(view_func, 'usar_banco_primario', False):
+        return True
+    classe = getattr(view_func, 'cls', None) or getattr(view_func, 'view_class', None)
+    if classe is None:
+        return False
+    if getattr(classe, 'usar_banco_primario', False):
+        return True
+    acoes = getattr(view_func, 'actions', None) or {}
+    acao = getattr(classe, acoes.get(metodo.lower(), ''), None)
+    return bool(getattr(acao, 'usar_banco_primario', False))
+
+
+# ----------------------------------------------------------------------
+# Atraso de replicação
+# ----------------------------------------------------------------------
+
+SQL_ATRASO = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+"""
+
+
+def medir_atraso(alias: str) -> Optional[float]:
+    """
+    Atraso de replicação da réplica em segundos. Um banco que não está em
+    recuperação (ex.: dois bancos locais independentes) tem atraso 0. Retorna
+    None se a réplica não responder.
+    """
+    connection = connections[alias]
+    if connection.vendor != 'postgresql':
+        return 0.0
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(SQL_ATRASO)
+            valor = cursor.fetchone()[0]
+    except DatabaseError as e:
+        logger.warning(f"Réplica {alias} indisponível: {e}")
+        return None
+    return float(valor) if valor is not None else None
+
+
+def replica_saudavel(alias: str) -> bool:
+    """Atraso dentro do limite, com a medição em cache por processo."""
+    agora = time.monotonic()
+    with _atrasos_lock:
+        medido_em, atraso = _atrasos.get(alias, (None, None))
+        expirado = medido_em is None or agora - medido_em >= lag_check_interval()
+        if expirado:
+            # Registra antes de medir para que outras threads não repitam a consulta
+            _atrasos[alias] = (agora, atraso)
+    if expirado:
+        atraso = medir_atraso(alias)
+        with _atrasos_lock:
+            _atrasos[alias] = (agora, atraso)
+        if atraso is None:
+            logger.warning(f"Réplica {alias} ignorada: sem resposta")
+        elif atraso > max_lag_seconds():
+            logger.warning(f"Réplica {alias} ignorada: atraso de {atraso:.1f}s")
+    return atraso is not None and atraso <= max_lag_seconds()
+
+
+def limpar_atrasos() -> None:
+    with _atrasos_lock:
+        _atrasos.clear()
+
+
+# ----------------------------------------------------------------------
+# Escolha do banco
+# ----------------------------------------------------------------------
+
+def _transacao_aberta() -> bool:
+    """Há um atomic() aberto em 'default' (ignorando os criados pelo TestCase)."""
+    return any(
+        not getattr(bloco, '_from_testcase', False)
+        for bloco in connections[PRIMARIO].atomic_blocks
+    )
+
+
+def banco_para_leitura() -> str:
+    aliases = replicas()
+    if not aliases or _forcar_primario.get() or _escreveu.get() or _transacao_aberta():
+        return PRIMARIO
+    saudaveis = [alias for alias in aliases if replica_saudavel(alias)]
+    return random.choice(saudaveis) if saudaveis else PRIMARIO
+
+
+class ReplicaRouterMixin:
+    """
+    Mixin para routers por app: leituras em réplica, escritas no primário.
+    As subclasses definem route_app_labels.
+    """
+
+    route_app_labels = set()
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label not in self.route_app_labels:
+            return None
+        banco = banco_para_leitura()
+        # Relações de um objeto já carregado seguem o banco dele
+        instancia = hints.get('instance')
+        if banco != PRIMARIO and instancia is not None and instancia._state.db:
+            return instancia._state.db
+        return banco
+
+    def db_for_write(self, model, **hints):
+        if model._meta.app_label not in self.route_app_labels:
+            return None
+        marcar_escrita()
+        return PRIMARIO
+
+    def allow_relation(self, obj1, obj2, **hints):
+        mesmo_banco = {PRIMARIO, *replicas()}
+        if obj1._state.db in mesmo_banco and obj2._state.db in mesmo_banco:
+            return True
+        return None
@@ -0,0 +1,82 @@
+"""
+Mede os endpoints principais sobre os dados sintéticos e grava um relatório
+JSON (p50/p95, queries, bytes) que pode ser comparado entre commits.
+
+Uso:
+    python manage.py benchmark_endpoints --saida benchmark/atual.json
+    python manage.py benchmark_endpoints --saida novo.json --comparar base.json
+    python manage.py benchmark_endpoints --comparar base.json --limite-regressao 20
+"""
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from common.services.benchmark import (
+    BenchmarkError,
+    comparar,
+    endpoints_padrao,
+    executar_benchmark,
+)
+
+
+def _pct(valor):
+    return '      -' if valor is None else f'{valor:>+7}%'
+
+
+class Command(BaseCommand):
+    help = 'Benchmark dos endpoints principais (latência p50/p95 e número de queries)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iteracoes', type=int, default=20)
+        parser.add_argument('--aquecimento', type=int, default=2)
+        parser.add_argument('--endpoint', action='append', dest='endpoints',
+                            help='Mede apenas o endpoint informado (pode repetir)')
+        parser.add_argument('--saida', help='Arquivo JSON do relatório')
+        parser.add_argument('--comparar', help='Relatório base para comparação')
+        parser.add_argument('--limite-regressao', type=float, default=None,
+                            help='Falha se o p95 de algum endpoint piorar mais que N%%')
+
+    def handle(self, *args, **options):
+        try:
+            endpoints = endpoints_padrao()
+            if options['endpoints']:
+                endpoints = [e for e in endpoints if e.nome in options['endpoints']]
+            relatorio = executar_benchmark(
+                endpoints, iteracoes=options['iteracoes'], aquecimento=options['aquecimento']
+            )
+        except BenchmarkError as e:
+            raise CommandError(str(e))
+
+        for nome, medida in relatorio['endpoints'].items():
+            self.stdout.write(
+                f"{nome:<40} p50 {medida['p50_ms']:>9.2f}ms  p95 {medida['p95_ms']:>9.2f}ms  "
+                f"queries {medida['queries']:>4}  status {medida['status']}"
+            )
+
+        if options['saida']:
+            with open(options['saida'], 'w') as arquivo:
+                json.dump(relatorio, arquivo, indent=2, ensure_ascii=False)
+            self.stdout.write(self.style.SUCCESS(f"Relatório gravado em {options['saida']}"))
+
+        if options['comparar']:
+            with open(options['comparar']) as arquivo:
+                base = json.load(arquivo)
+            self._comparar(base, relatorio, options['limite_regressao'])
+
+    def _comparar(self, base, relatorio, limite):
+        self.stdout.write(f"\nComparação com {base.get('commit') or 'base'}:")
+        regressoes = []
+        for linha in comparar(base, relatorio):
+            if linha.get('novo'):
+                self.stdout.write(f"{linha['endpoint']:<40} (novo)")
+                continue
+            self.stdout.write(
+                f"{linha['endpoint']:<40} p50 {_pct(linha['p50_var_pct'])}  "
+                f"p95 {_pct(linha['p95_var_pct'])}  queries {linha['queries_dif']:>+4}"
+            )
+            if limite is not None and (linha['p95_var_pct'] or 0) > limite:
+                regressoes.append(linha['endpoint'])
+
+        if regressoes:
+            raise CommandError(f"Regressão de p95 acima de {limite}%: {', '.join(regressoes)}")
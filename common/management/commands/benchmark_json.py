@@ -0,0 +1,42 @@
+"""
+Compara tempo e pico de memória da serialização JSON (DRF x orjson x fluxo)
+sobre um js_conteudo sintético.
+
+Uso:
+    python manage.py benchmark_json
+    python manage.py benchmark_json --tamanho-mb 50 --repeticoes 5 --saida json.json
+"""
+
+import json
+
+from django.core.management.base import BaseCommand
+
+from common.services.benchmark import comparar_serializacao
+
+
+class Command(BaseCommand):
+    help = 'Benchmark de renderização e parsing JSON de um js_conteudo grande'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tamanho-mb', type=float, default=50)
+        parser.add_argument('--repeticoes', type=int, default=3)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--saida', help='Arquivo JSON do relatório')
+
+    def handle(self, *args, **options):
+        relatorio = comparar_serializacao(
+            options['tamanho_mb'], options['repeticoes'], options['seed']
+        )
+        self.stdout.write(
+            f"js_conteudo de {relatorio['tamanho_mb']} MB "
+            f"({relatorio['servidores']} servidores), orjson {relatorio['orjson'] or 'ausente'}"
+        )
+        for nome, medida in relatorio['medidas'].items():
+            self.stdout.write(
+                f"{nome:<18} {medida['tempo_ms']:>10.1f} ms  pico {medida['pico_mb']:>8.1f} MB"
+            )
+
+        if options['saida']:
+            with open(options['saida'], 'w') as arquivo:
+                json.dump(relatorio, arquivo, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Relatório gravado em {options['saida']}"))
@@ -0,0 +1,80 @@
+"""
+Lista as queries lentas que mais pesaram (tblconsultalenta).
+
+Uso:
+    python manage.py consultas_lentas
+    python manage.py consultas_lentas --top 10 --ordenar max --app CARGA_ORG_LOT
+    python manage.py consultas_lentas --dias 1 --pilha
+    python manage.py consultas_lentas --limpar
+"""
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import F
+from django.utils import timezone
+
+from common.models import ConsultaLenta
+from common.services import consultas_lentas
+
+ORDENACOES = {
+    'total': '-flttempototalms',
+    'execucoes': '-intexecucoes',
+    'max': '-flttempomaxms',
+    'media': '-tempo_medio',
+}
+
+
+class Command(BaseCommand):
+    help = 'Queries lentas por fingerprint, view e aplicação'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=20)
+        parser.add_argument('--ordenar', choices=sorted(ORDENACOES), default='total')
+        parser.add_argument('--app', help='Código da aplicação (ex.: ACOES_PNGI)')
+        parser.add_argument('--view', help='Nome da view (contém)')
+        parser.add_argument('--dias', type=float, help='Só ocorrências dos últimos N dias')
+        parser.add_argument('--pilha', action='store_true', help='Mostra a pilha da execução mais lenta')
+        parser.add_argument('--limpar', action='store_true', help='Remove os registros')
+
+    def handle(self, *args, **options):
+        # Agregados ainda em memória neste processo (ex.: shell/comando)
+        consultas_lentas.registro.flush(forcar=True)
+
+        consultas = ConsultaLenta.objects.all()
+        if options['app']:
+            consultas = consultas.filter(strapp=options['app'])
+        if options['view']:
+            consultas = consultas.filter(strview__icontains=options['view'])
+        if options['dias']:
+            consultas = consultas.filter(datultima__gte=timezone.now() - timedelta(days=options['dias']))
+
+        if options['limpar']:
+            removidas, _ = consultas.delete()
+            self.stdout.write(self.style.SUCCESS(f'{removidas} registros removidos'))
+            return
+
+        consultas = consultas.annotate(
+            tempo_medio=F('flttempototalms') / F('intexecucoes')
+        ).order_by(ORDENACOES[options['ordenar']])[:options['top']]
+
+        linhas = list(consultas)
+        if not linhas:
+            self.stdout.write('Nenhuma query lenta registrada.')
+            return
+
+        self.stdout.write(
+            f"{'total ms':>11} {'exec':>7} {'média ms':>9} {'máx ms':>9} {'linhas':>9}  "
+            f"{'fingerprint':<16}  view / app"
+        )
+        for consulta in linhas:
+            self.stdout.write(
+                f'{consulta.flttempototalms:>11.0f} {consulta.intexecucoes:>7} '
+                f'{consulta.tempo_medio_ms:>9.1f} {consulta.flttempomaxms:>9.1f} '
+                f'{consulta.intlinhas:>9}  {consulta.strfingerprint:<16}  '
+                f'{consulta.strview} / {consulta.strapp}'
+            )
+            self.stdout.write(f'    {consulta.strsql[:300]}')
+            if options['pilha'] and consulta.strpilha:
+                for linha in consulta.strpilha.rstrip().splitlines():
+                    self.stdout.write(f'      {linha}')
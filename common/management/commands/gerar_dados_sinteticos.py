@@ -0,0 +1,86 @@
+"""
+Gera o conjunto de dados sintéticos para testes de carga e benchmarks.
+
+Uso:
+    python manage.py gerar_dados_sinteticos
+    python manage.py gerar_dados_sinteticos --seed 7 --lotacoes 200000 --acoes 2000
+    python manage.py gerar_dados_sinteticos --limpar
+
+Só roda com DEBUG ou com --permitir-em-producao: o usuário de benchmark tem
+perfis de coordenação e de gestão de carga. A senha dele vem de
+GPP_SENHA_SINTETICA ou é gerada e exibida uma única vez; o
+benchmark_endpoints lê a mesma variável.
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from common.services.dados_sinteticos import (
+    EMAIL_BENCHMARK,
+    VARIAVEL_SENHA,
+    EscalaSintetica,
+    GeradorDadosSinteticos,
+)
+
+
+class Command(BaseCommand):
+    help = 'Gera dados sintéticos (usuários, patriarcas, organogramas, lotações e ações)'
+
+    def add_arguments(self, parser):
+        padrao = EscalaSintetica()
+        parser.add_argument('--seed', type=int, default=42, help='Semente (padrão 42)')
+        parser.add_argument('--patriarcas', type=int, default=padrao.patriarcas)
+        parser.add_argument('--profundidade', type=int, default=padrao.profundidade,
+                            help='Níveis de cada organograma')
+        parser.add_argument('--largura', type=int, default=padrao.largura,
+                            help='Média de filhos por órgão')
+        parser.add_argument('--lotacoes', type=int, default=padrao.lotacoes,
+                            help='Total de lotações, divididas entre os patriarcas')
+        parser.add_argument('--acoes', type=int, default=padrao.acoes)
+        parser.add_argument('--usuarios', type=int, default=padrao.usuarios)
+        parser.add_argument('--limpar', action='store_true',
+                            help='Remove os dados sintéticos existentes e encerra')
+        parser.add_argument('--substituir', action='store_true',
+                            help='Remove os dados sintéticos existentes antes de gerar')
+        parser.add_argument('--permitir-em-producao', action='store_true',
+                            help='Roda mesmo com DEBUG desligado')
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG and not options['permitir_em_producao']:
+            raise CommandError(
+                'DEBUG desligado: os dados sintéticos criam um usuário com perfis privilegiados. '
+                'Use --permitir-em-producao se este banco for mesmo de testes.'
+            )
+
+        if options['limpar'] or options['substituir']:
+            removidos = GeradorDadosSinteticos.limpar()
+            self.stdout.write(f'Removidos: {removidos}')
+            if options['limpar']:
+                return
+
+        if GeradorDadosSinteticos.existe():
+            raise CommandError(
+                'Já existem dados sintéticos. Use --substituir para gerar novamente.'
+            )
+
+        escala = EscalaSintetica(
+            patriarcas=options['patriarcas'],
+            profundidade=options['profundidade'],
+            largura=options['largura'],
+            lotacoes=options['lotacoes'],
+            acoes=options['acoes'],
+            usuarios=max(1, options['usuarios']),
+        )
+        gerador = GeradorDadosSinteticos(
+            escala, seed=options['seed'], progresso=self.stdout.write
+        )
+        resumo = gerador.gerar()
+
+        self.stdout.write(self.style.SUCCESS(f'Dados sintéticos gerados: {resumo}'))
+        if gerador.senha_gerada:
+            self.stdout.write(
+                f'Usuário de benchmark: {EMAIL_BENCHMARK}, senha {gerador.senha} '
+                f'(exibida só agora; exporte {VARIAVEL_SENHA} para o benchmark_endpoints)'
+            )
+        else:
+            self.stdout.write(f'Usuário de benchmark: {EMAIL_BENCHMARK}, senha de {VARIAVEL_SENHA}')
@@ -0,0 +1,74 @@
+"""
+Mede o boot de um worker: tempo por etapa, tempo de import por módulo e
+pacote, e queries executadas antes da primeira requisição.
+
+Uso:
+    python manage.py perfil_inicializacao
+    python manage.py perfil_inicializacao --top 50 --saida boot.json
+    python manage.py perfil_inicializacao --limite-ms 1500   # falha se o boot passar do limite
+"""
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from common.services.inicializacao import PerfilInicializacaoError, medir_inicializacao
+
+
+class Command(BaseCommand):
+    help = 'Perfil de inicialização: import por módulo e queries durante o boot'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=25, help='Módulos/pacotes listados')
+        parser.add_argument('--saida', help='Arquivo JSON do relatório')
+        parser.add_argument(
+            '--limite-ms', type=float,
+            help='Falha se o boot (setup + URLs + middlewares) passar deste tempo',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            relatorio = medir_inicializacao(top=options['top'])
+        except PerfilInicializacaoError as e:
+            raise CommandError(str(e))
+
+        etapas = relatorio['etapas_ms']
+        self.stdout.write(
+            f"Boot: {etapas['total']} ms (setup {etapas['setup']} ms, URLs {etapas['urls']} ms, "
+            f"middlewares {etapas['middlewares']} ms); imports {relatorio['imports_ms']} ms "
+            f"em {relatorio['modulos_importados']} módulos"
+        )
+
+        self.stdout.write('\nMódulos (tempo acumulado):')
+        for modulo in relatorio['modulos']:
+            marca = '*' if modulo['projeto'] else ' '
+            self.stdout.write(
+                f"{marca} {modulo['acumulado_ms']:>8.1f} ms {modulo['proprio_ms']:>7.1f} ms  {modulo['modulo']}"
+            )
+
+        self.stdout.write('\nPacotes (tempo próprio somado):')
+        for pacote in relatorio['pacotes']:
+            marca = '*' if pacote['projeto'] else ' '
+            self.stdout.write(f"{marca} {pacote['ms']:>8.1f} ms  {pacote['pacote']}")
+        self.stdout.write('(* = pacote do projeto)')
+
+        if relatorio['queries']:
+            self.stdout.write(self.style.WARNING(
+                f"\n{len(relatorio['queries'])} queries durante o boot:"
+            ))
+            for sql in relatorio['queries']:
+                self.stdout.write(f'  {sql}')
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f"\nNenhuma query durante o boot ({relatorio['conexoes']} conexões abertas)"
+            ))
+
+        if options['saida']:
+            with open(options['saida'], 'w') as arquivo:
+                json.dump(relatorio, arquivo, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Relatório gravado em {options['saida']}"))
+
+        if options['limite_ms'] is not None and etapas['total'] > options['limite_ms']:
+            raise CommandError(
+                f"Boot levou {etapas['total']} ms (limite {options['limite_ms']} ms)"
+            )
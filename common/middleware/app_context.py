@@ -4,6 +4,7 @@ Detecta automaticamente qual aplicação está sendo acessada
 baseado na URL da requisição.
 """
 
+import threading
 from typing import Optional
 from django.http import HttpRequest
 from accounts.models import Aplicacao
@@ -42,10 +43,19 @@ class AppContextMiddleware:
     _apps_cache = {}
     
     def __init__(self, get_response):
+        # Sem consultas aqui: o middleware é construído no boot do worker.
+        # O cache é carregado na primeira requisição.
         self.get_response = get_response
-        self._load_apps_cache()
+        self._apps_cache_carregado = False
+        self._apps_cache_lock = threading.Lock()
     
     def __call__(self, request: HttpRequest):
+        if not self._apps_cache_carregado:
+            with self._apps_cache_lock:
+                if not self._apps_cache_carregado:
+                    self._load_apps_cache()
+                    self._apps_cache_carregado = True
+        
         # Detecta e adiciona contexto da aplicação
         self._add_app_context(request)
         
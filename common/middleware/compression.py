@@ -0,0 +1,159 @@
+"""
+Middleware de Compressão
+Comprime com gzip as respostas (inclusive em fluxo) cujo Content-Type está na
+lista permitida e que passam do tamanho mínimo. Os JSONs de carga (órgãos e
+siglas repetidos por servidor) costumam reduzir mais de 90%.
+
+Configurações:
+- GPP_COMPRESSION_ENABLED: liga/desliga (padrão True)
+- GPP_COMPRESSION_MIN_SIZE: bytes mínimos para comprimir (padrão 1024)
+- GPP_COMPRESSION_LEVEL: nível do gzip, 1 a 9 (padrão 6)
+- GPP_COMPRESSION_CONTENT_TYPES: tipos comprimidos (padrão JSON, texto, CSV;
+  HTML fica de fora por causa do BREACH)
+
+Respostas de recursos imutáveis marcadas com @precomprimido (ver
+common.utils.precompressao) têm o corpo comprimido guardado em cache aqui.
+"""
+
+import gzip
+import logging
+import zlib
+from typing import Iterable, Iterator
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+from common.utils import precompressao
+
+logger = logging.getLogger(__name__)
+
+
+# Sem text/html: páginas com token CSRF (API navegável, admin) comprimidas
+# ficam expostas ao BREACH
+CONTENT_TYPES_PADRAO = (
+    'application/json',
+    'text/plain',
+    'text/csv',
+    'text/css',
+    'application/javascript',
+)
+
+
+def compression_enabled() -> bool:
+    return getattr(settings, 'GPP_COMPRESSION_ENABLED', True)
+
+
+def min_size() -> int:
+    return getattr(settings, 'GPP_COMPRESSION_MIN_SIZE', 1024)
+
+
+def nivel() -> int:
+    return getattr(settings, 'GPP_COMPRESSION_LEVEL', 6)
+
+
+def content_types() -> Iterable[str]:
+    return getattr(settings, 'GPP_COMPRESSION_CONTENT_TYPES', CONTENT_TYPES_PADRAO)
+
+
+def aceita_gzip(request) -> bool:
+    """Interpreta Accept-Encoding, respeitando q=0 ('gzip;q=0')."""
+    aceitos = {}
+    for item in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        partes = [p.strip() for p in item.split(';')]
+        if not partes[0]:
+            continue
+        q = 1.0
+        for parametro in partes[1:]:
+            if parametro.startswith('q='):
+                try:
+                    q = float(parametro[2:])
+                except ValueError:
+                    q = 0.0
+        aceitos[partes[0].lower()] = q
+    q_gzip = aceitos.get('gzip', aceitos.get('*', 0.0))
+    return q_gzip > 0
+
+
+def comprimir(conteudo: bytes) -> bytes:
+    # mtime=0: mesmo conteúdo gera os mesmos bytes (e o mesmo ETag)
+    return gzip.compress(conteudo, compresslevel=nivel(), mtime=0)
+
+
+def comprimir_fluxo(conteudo: Iterable[bytes]) -> Iterator[bytes]:
+    """Comprime pedaço a pedaço; cada pedaço é enviado assim que comprimido."""
+    compressor = zlib.compressobj(nivel(), zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for pedaco in conteudo:
+        dados = compressor.compress(pedaco) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if dados:
+            yield dados
+    yield compressor.flush()
+
+
+def _tipo_permitido(response) -> bool:
+    tipo = response.get('Content-Type', '').split(';')[0].strip().lower()
+    return tipo in content_types()
+
+
+def _enfraquecer_etag(response) -> None:
+    etag = response.get('ETag')
+    if etag and etag.startswith('"'):
+        response['ETag'] = 'W/' + etag
+
+
+class CompressionMiddleware:
+    """
+    Deve ficar antes (acima) dos middlewares que alteram o corpo da resposta.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if not compression_enabled():
+            return response
+        if (
+            response.has_header('Content-Encoding')
+            or not _tipo_permitido(response)
+            or 'no-transform' in response.get('Cache-Control', '')
+            or response.status_code == 206
+        ):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if response.streaming:
+            return self._comprimir_fluxo(request, response)
+        return self._comprimir(request, response)
+
+    def _comprimir_fluxo(self, request, response):
+        if getattr(response, 'is_async', False) or not aceita_gzip(request):
+            return response
+        response.streaming_content = comprimir_fluxo(response.streaming_content)
+        response['Content-Encoding'] = 'gzip'
+        del response['Content-Length']
+        _enfraquecer_etag(response)
+        return response
+
+    def _comprimir(self, request, response):
+        # Recursos imutáveis vão para o cache mesmo abaixo do tamanho mínimo:
+        # o ganho ali é não consultar o banco de novo
+        chave = getattr(request, 'chave_precompressao', None)
+        if chave and response.status_code == 200:
+            comprimido = comprimir(response.content)
+            precompressao.guardar(chave, comprimido, response['Content-Type'])
+        elif len(response.content) >= min_size() and aceita_gzip(request):
+            comprimido = comprimir(response.content)
+        else:
+            return response
+
+        if (
+            len(response.content) < min_size()
+            or not aceita_gzip(request)
+            or len(comprimido) >= len(response.content)
+        ):
+            return response
+        response.content = comprimido
+        response['Content-Length'] = str(len(comprimido))
+        response['Content-Encoding'] = 'gzip'
+        _enfraquecer_etag(response)
+        return response
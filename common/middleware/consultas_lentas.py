@@ -0,0 +1,28 @@
+"""
+Middleware de Consultas Lentas
+Marca a requisição em andamento para que as queries lentas registradas pelo
+execute_wrapper de common.services.consultas_lentas sejam atribuídas à view e
+à aplicação, e grava os agregados na tabela ao fim da requisição quando o
+intervalo de gravação tiver passado.
+"""
+
+import logging
+
+from common.services import consultas_lentas
+
+logger = logging.getLogger(__name__)
+
+
+class ConsultasLentasMiddleware:
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = consultas_lentas.iniciar_requisicao(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            consultas_lentas.encerrar_requisicao(token)
+        consultas_lentas.registro.flush()
+        return response
@@ -0,0 +1,83 @@
+"""
+Middleware de Métricas de Requisição
+Registra, por requisição, número de queries, tempo de banco, tempo total e
+tamanho da resposta, rotulados pela view resolvida e pela aplicação
+(request.app_context['code']). Exposto em /metrics (ver common.views).
+"""
+
+import logging
+import time
+from contextlib import ExitStack
+
+from django.db import connections
+
+from common.services.metrics import metrics_enabled, registry
+
+logger = logging.getLogger(__name__)
+
+
+class _ContadorQueries:
+    """execute_wrapper que soma queries e tempo de banco da requisição."""
+
+    __slots__ = ('queries', 'tempo')
+
+    def __init__(self):
+        self.queries = 0
+        self.tempo = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.tempo += time.perf_counter() - inicio
+            self.queries += 1
+
+
+class RequestMetricsMiddleware:
+    """
+    Middleware que mede cada requisição e agrega em histogramas em memória.
+
+    Deve ficar no início de MIDDLEWARE para que o tempo total inclua os
+    demais middlewares. O próprio custo de registro é medido e exposto em
+    gpp_metrics_overhead_seconds.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not metrics_enabled():
+            return self.get_response(request)
+
+        contador = _ContadorQueries()
+        inicio = time.perf_counter()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(contador))
+            response = self.get_response(request)
+        duracao = time.perf_counter() - inicio
+
+        self._registrar(request, response, contador, duracao)
+        return response
+
+    def _registrar(self, request, response, contador, duracao):
+        inicio = time.perf_counter()
+
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else 'nao_resolvida'
+        app_context = getattr(request, 'app_context', None) or {}
+        labels = (('view', view), ('app', app_context.get('code') or 'nenhuma'))
+
+        registry.incrementar(
+            'gpp_http_requests_total',
+            labels + (('method', request.method), ('status', str(response.status_code))),
+        )
+        registry.observar('gpp_http_request_duration_seconds', labels, duracao)
+        registry.observar('gpp_db_queries_per_request', labels, contador.queries)
+        registry.observar('gpp_db_query_duration_seconds', labels, contador.tempo)
+        if not response.streaming:
+            registry.observar('gpp_http_response_size_bytes', labels, len(response.content))
+
+        registry.observar('gpp_metrics_overhead_seconds', (), time.perf_counter() - inicio)
+        registry.flush()
@@ -0,0 +1,88 @@
+"""
+Middleware de Perfilamento sob Demanda
+Perfila requisições de usuários staff que enviam `X-GPP-Profile` (ou
+`?_perfil=`), com a linha do tempo das queries. O relatório fica no cache e
+o id volta em `X-GPP-Profile-Id`; ver common.services.perfilamento.
+"""
+
+import logging
+
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from common.services import perfilamento
+
+logger = logging.getLogger(__name__)
+
+
+def _staff(user) -> bool:
+    return bool(user is not None and user.is_authenticated and user.is_staff)
+
+
+def _usuario(request):
+    """
+    Usuário da sessão ou, sem sessão, o dos autenticadores padrão do DRF
+    (token). Credenciais inválidas contam como anônimo.
+    """
+    usuario = getattr(request, 'user', None)
+    if usuario is not None and usuario.is_authenticated:
+        return usuario
+    drf = Request(request)
+    for classe in api_settings.DEFAULT_AUTHENTICATION_CLASSES:
+        try:
+            resultado = classe().authenticate(drf)
+        except APIException:
+            return None
+        if resultado is not None:
+            return resultado[0]
+    return None
+
+
+class PerfilamentoMiddleware:
+    """
+    Deve ficar depois do AuthenticationMiddleware. Sem sessão, o usuário é
+    autenticado aqui pelos autenticadores do DRF, antes de o perfil começar:
+    anônimos e não staff nunca são perfilados nem gastam o limite por minuto.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        modo = perfilamento.modo_solicitado(request)
+        if modo is None or not perfilamento.profiling_enabled():
+            return self.get_response(request)
+
+        usuario = _usuario(request)
+        if not _staff(usuario):
+            return self.get_response(request)
+
+        if not perfilamento.reservar_execucao():
+            logger.info(f"Perfil recusado (limite por minuto): {request.method} {request.path}")
+            response = self.get_response(request)
+            response[perfilamento.HEADER] = 'limite'
+            return response
+
+        with perfilamento.Perfil(modo) as perfil:
+            response = self.get_response(request)
+
+        relatorio = perfil.relatorio()
+        match = getattr(request, 'resolver_match', None)
+        app_context = getattr(request, 'app_context', None) or {}
+        relatorio.update({
+            'metodo': request.method,
+            'caminho': request.get_full_path(),
+            'view': match.view_name if match else None,
+            'app': app_context.get('code'),
+            'status': response.status_code,
+            'usuario': usuario.get_username(),
+            'streaming': response.streaming,
+        })
+        id_perfil = perfilamento.guardar(relatorio)
+        logger.info(
+            f"Perfil {id_perfil} ({relatorio['modo']}) de {request.method} {request.path}: "
+            f"{relatorio['duracao_ms']:.0f}ms, {relatorio['queries']['total']} queries"
+        )
+        response[f'{perfilamento.HEADER}-Id'] = id_perfil
+        return response
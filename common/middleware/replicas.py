@@ -0,0 +1,66 @@
+"""
+Middleware de Roteamento para Réplicas
+Mantém o estado por requisição usado por common.db_router: leituras no
+primário para métodos não seguros, views marcadas com @usar_primario e
+clientes que escreveram há pouco (cookie com validade de
+GPP_DB_REPLICA_STICKY_SECONDS).
+"""
+
+import logging
+import time
+
+from common import db_router
+
+logger = logging.getLogger(__name__)
+
+
+COOKIE_PRIMARIO = 'gpp_db_primario'
+METODOS_SEGUROS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Sem réplicas configuradas (GPP_DB_REPLICAS vazio), não faz nada.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not db_router.replicas():
+            return self.get_response(request)
+
+        tokens = db_router.iniciar_requisicao(
+            primario=request.method not in METODOS_SEGUROS or self._cookie_valido(request)
+        )
+        try:
+            response = self.get_response(request)
+            escreveu = db_router.houve_escrita()
+        finally:
+            db_router.encerrar_requisicao(tokens)
+
+        if escreveu:
+            sticky = db_router.sticky_seconds()
+            response.set_cookie(
+                COOKIE_PRIMARIO,
+                str(int(time.time() + sticky)),
+                max_age=int(sticky),
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if db_router.replicas() and db_router.view_usa_primario(view_func, request.method):
+            db_router.forcar_primario()
+        return None
+
+    @staticmethod
+    def _cookie_valido(request) -> bool:
+        valor = request.COOKIES.get(COOKIE_PRIMARIO)
+        if not valor:
+            return False
+        try:
+            return float(valor) > time.time()
+        except ValueError:
+            return False
@@ -0,0 +1,39 @@
+# Generated by Django 6.0.1 on 2026-10-19 16:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConsultaLenta',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('strfingerprint', models.CharField(db_column='strfingerprint', max_length=16)),
+                ('strview', models.CharField(db_column='strview', max_length=200)),
+                ('strapp', models.CharField(db_column='strapp', max_length=50)),
+                ('strsql', models.TextField(db_column='strsql')),
+                ('intexecucoes', models.BigIntegerField(db_column='intexecucoes', default=0)),
+                ('flttempototalms', models.FloatField(db_column='flttempototalms', default=0)),
+                ('flttempomaxms', models.FloatField(db_column='flttempomaxms', default=0)),
+                ('intlinhas', models.BigIntegerField(db_column='intlinhas', default=0)),
+                ('strpilha', models.TextField(blank=True, db_column='strpilha', default='')),
+                ('datprimeira', models.DateTimeField(db_column='datprimeira')),
+                ('datultima', models.DateTimeField(db_column='datultima')),
+            ],
+            options={
+                'verbose_name': 'Consulta Lenta',
+                'verbose_name_plural': 'Consultas Lentas',
+                'db_table': 'tblconsultalenta',
+                'managed': True,
+                'indexes': [models.Index(fields=['-flttempototalms'], name='idx_consultalenta_tempo')],
+                'constraints': [models.UniqueConstraint(fields=('strfingerprint', 'strview', 'strapp'), name='uq_consultalenta_fingerprint_view_app')],
+            },
+        ),
+    ]
@@ -1,3 +1,42 @@
 from django.db import models
 
-# Create your models here.
+
+class ConsultaLenta(models.Model):
+    """
+    Queries acima do limite de GPP_SLOW_QUERY_MS, agregadas por fingerprint
+    do SQL, view e aplicação. Alimentada pelos workers em lotes (ver
+    common.services.consultas_lentas) e lida por `manage.py consultas_lentas`.
+    """
+    strfingerprint = models.CharField(max_length=16, db_column='strfingerprint')
+    strview = models.CharField(max_length=200, db_column='strview')
+    strapp = models.CharField(max_length=50, db_column='strapp')
+    strsql = models.TextField(db_column='strsql')
+    intexecucoes = models.BigIntegerField(default=0, db_column='intexecucoes')
+    flttempototalms = models.FloatField(default=0, db_column='flttempototalms')
+    flttempomaxms = models.FloatField(default=0, db_column='flttempomaxms')
+    intlinhas = models.BigIntegerField(default=0, db_column='intlinhas')
+    strpilha = models.TextField(blank=True, default='', db_column='strpilha')
+    datprimeira = models.DateTimeField(db_column='datprimeira')
+    datultima = models.DateTimeField(db_column='datultima')
+
+    class Meta:
+        db_table = 'tblconsultalenta'
+        managed = True
+        verbose_name = 'Consulta Lenta'
+        verbose_name_plural = 'Consultas Lentas'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['strfingerprint', 'strview', 'strapp'],
+                name='uq_consultalenta_fingerprint_view_app',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['-flttempototalms'], name='idx_consultalenta_tempo'),
+        ]
+
+    def __str__(self):
+        return f'{self.strfingerprint} [{self.strview}] {self.intexecucoes}x'
+
+    @property
+    def tempo_medio_ms(self) -> float:
+        return self.flttempototalms / self.intexecucoes if self.intexecucoes else 0.0
@@ -0,0 +1,28 @@
+"""
+Parser JSON rápido para a API (orjson opcional).
+
+Mesmo comportamento do JSONParser do DRF: NaN/Infinity são rejeitados (como
+com STRICT_JSON) e números decimais viram float. Sem orjson, com outro
+charset que não UTF-8 ou com STRICT_JSON = False, usa o parser do DRF.
+"""
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+from .renderers import FastJSONRenderer, orjson
+
+
+class FastJSONParser(JSONParser):
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or not self.strict or encoding.lower().replace('-', '') != 'utf8':
+            return super().parse(stream, media_type, parser_context)
+
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f'JSON parse error - {exc}')
@@ -0,0 +1,137 @@
+"""
+Renderização JSON rápida para a API.
+
+FastJSONRenderer usa orjson quando instalado (opcional; sem ele, cai no
+JSONRenderer do DRF) e produz a mesma saída do DRF (exceto a grafia de floats
+em notação científica, ex.: 1e16 em vez de 1e+16, e NaN/Infinity, que viram
+null em vez de erro):
+- datetime/date/time, Decimal, timedelta e lazy strings passam pelo
+  encoder do DRF (mesmo formato ISO, 'Z' para UTC, milissegundos);
+- UUID sai como string; chaves não-string são convertidas;
+- U+2028/U+2029 são escapados, como no DRF.
+Quando o cliente pede indentação (ex.: ?format=json com indent no Accept) ou
+o payload tem algo que o orjson não suporta (inteiros acima de 64 bits), a
+renderização cai no DRF.
+
+StreamingJSONResponse emite listas item a item (em lotes), sem montar a
+lista inteira em memória — para endpoints que percorrem querysets grandes.
+"""
+
+import logging
+from typing import Callable, Dict, Iterable, Iterator, Optional
+
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dependência opcional
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+
+_encoder_drf = JSONEncoder()
+
+OPCOES_ORJSON = (
+    orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS if orjson else 0
+)
+
+LOTE_STREAMING = 500
+
+
+def _default(obj):
+    return _encoder_drf.default(obj)
+
+
+def _escapar_separadores(conteudo: bytes) -> bytes:
+    # U+2028 e U+2029 são válidos em JSON mas não em JavaScript; o DRF escapa
+    if b'\xe2\x80\xa8' in conteudo or b'\xe2\x80\xa9' in conteudo:
+        conteudo = conteudo.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+    return conteudo
+
+
+def dumps(dados) -> bytes:
+    """Serializa para JSON compacto (UTF-8), com orjson quando disponível."""
+    if orjson is not None:
+        try:
+            return _escapar_separadores(orjson.dumps(dados, default=_default, option=OPCOES_ORJSON))
+        except orjson.JSONEncodeError as e:
+            logger.debug(f"orjson não serializou o payload, usando json: {e}")
+    return JSONRenderer().render(dados)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer com orjson (mesma saída do DRF)."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        renderer_context = renderer_context or {}
+        if orjson is None or self.get_indent(accepted_media_type, renderer_context):
+            return super().render(data, accepted_media_type, renderer_context)
+        return dumps(data)
+
+
+def _itens_em_json(
+    itens: Iterable,
+    serializar: Optional[Callable],
+    lote: int,
+) -> Iterator[bytes]:
+    # Cada lote é serializado de uma vez, como lista, sem os colchetes
+    pendentes = []
+    primeiro = True
+    for item in itens:
+        pendentes.append(serializar(item) if serializar else item)
+        if len(pendentes) >= lote:
+            yield (b'' if primeiro else b',') + dumps(pendentes)[1:-1]
+            primeiro = False
+            pendentes = []
+    if pendentes:
+        yield (b'' if primeiro else b',') + dumps(pendentes)[1:-1]
+
+
+def stream_json_list(
+    itens: Iterable,
+    envelope: Optional[Dict] = None,
+    chave: str = 'results',
+    serializar: Optional[Callable] = None,
+    lote: int = LOTE_STREAMING,
+) -> Iterator[bytes]:
+    """
+    Gera o JSON de uma lista aos pedaços. Com `envelope`, a lista entra como
+    último campo do objeto: {...envelope, chave: [itens]}.
+    """
+    if envelope:
+        cabecalho = dumps({**envelope, chave: []})
+        # Remove o '[]}' final para abrir a lista
+        yield cabecalho[:-3] + b'['
+    else:
+        yield b'['
+    yield from _itens_em_json(itens, serializar, lote)
+    yield b']}' if envelope else b']'
+
+
+class StreamingJSONResponse(StreamingHttpResponse):
+    """
+    Resposta JSON em fluxo para listas grandes.
+
+        return StreamingJSONResponse(
+            queryset.iterator(chunk_size=2000),
+            envelope={'total': total},
+            serializar=serializer.to_representation,
+        )
+    """
+
+    def __init__(
+        self,
+        itens: Iterable,
+        envelope: Optional[Dict] = None,
+        chave: str = 'results',
+        serializar: Optional[Callable] = None,
+        lote: int = LOTE_STREAMING,
+        **kwargs,
+    ):
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(stream_json_list(itens, envelope, chave, serializar, lote), **kwargs)
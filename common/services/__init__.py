@@ -3,8 +3,12 @@ Serviços compartilhados da aplicação Common.
 """
 
 from .portal_auth import get_portal_auth_service, PortalAuthService
+from .metrics import MetricsRegistry, registry as metrics_registry, render_prometheus
 
 __all__ = [
     'get_portal_auth_service',
     'PortalAuthService',
+    'MetricsRegistry',
+    'metrics_registry',
+    'render_prometheus',
 ]
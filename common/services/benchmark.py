@@ -0,0 +1,322 @@
+"""
+Benchmark dos endpoints principais.
+
+Executa as requisições no próprio processo (django.test.Client, passando por
+toda a pilha de middlewares) e registra, por endpoint, latência p50/p95/máx.,
+número de queries e tamanho da resposta. O relatório JSON inclui o commit
+atual e pode ser comparado com o de outro commit (`comparar`).
+
+Os ids usados nos caminhos vêm do conjunto sintético (ver dados_sinteticos),
+de modo que o mesmo banco gerado com a mesma semente produz relatórios
+comparáveis.
+
+`comparar_serializacao` mede à parte a renderização e o parsing JSON de um
+js_conteudo grande (DRF x FastJSONRenderer/FastJSONParser x fluxo).
+"""
+
+import io
+import json
+import logging
+import math
+import os
+import platform
+import random
+import subprocess
+import time
+import tracemalloc
+from contextlib import ExitStack
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+from django.conf import settings
+from django.db import connections
+from django.test import Client
+from django.utils import timezone
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from accounts.models import User
+from acoes_pngi.models import Acoes
+from carga_org_lot.models import TblLotacaoVersao, TblOrganogramaVersao
+
+from ..parsers import FastJSONParser
+from ..renderers import FastJSONRenderer, orjson, stream_json_list
+from .dados_sinteticos import CARGOS, EMAIL_BENCHMARK, MARCADOR, VARIAVEL_SENHA, gerar_cpf
+
+logger = logging.getLogger(__name__)
+
+
+VERSAO_RELATORIO = 1
+
+
+class BenchmarkError(Exception):
+    """Dados necessários ao benchmark ausentes."""
+
+
+@dataclass
+class Endpoint:
+    nome: str
+    caminho: str
+    metodo: str = 'get'
+    corpo: Optional[Dict] = None
+    autenticado: bool = True
+
+
+class _ContadorQueries:
+    """execute_wrapper que apenas conta as queries da requisição."""
+
+    def __init__(self):
+        self.total = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.total += 1
+        return execute(sql, params, many, context)
+
+
+def endpoints_padrao(senha: Optional[str] = None) -> List[Endpoint]:
+    """
+    Endpoints medidos, com ids do conjunto sintético. O login usa `senha` ou
+    a de GPP_SENHA_SINTETICA.
+    """
+    senha = senha or os.getenv(VARIAVEL_SENHA)
+    if not senha:
+        raise BenchmarkError(
+            f'Defina {VARIAVEL_SENHA} com a senha exibida por gerar_dados_sinteticos'
+        )
+    lotacao = TblLotacaoVersao.objects.filter(
+        id_patriarca__str_sigla_patriarca__startswith=MARCADOR
+    ).order_by('id_lotacao_versao').values_list('id_lotacao_versao', flat=True).first()
+    organograma = TblOrganogramaVersao.objects.filter(
+        id_patriarca__str_sigla_patriarca__startswith=MARCADOR
+    ).order_by('id_organograma_versao').values_list('id_organograma_versao', flat=True).first()
+    acao = Acoes.objects.filter(
+        strapelido__startswith=MARCADOR
+    ).order_by('idacao').values_list('idacao', flat=True).first()
+    if lotacao is None or organograma is None or acao is None:
+        raise BenchmarkError(
+            'Dados sintéticos não encontrados. Execute antes: '
+            'python manage.py gerar_dados_sinteticos'
+        )
+
+    return [
+        Endpoint('login', '/api/v1/auth/session/login/', 'post',
+                 {'email': EMAIL_BENCHMARK, 'password': senha}, autenticado=False),
+        Endpoint('carga_dashboard_stats', '/api/v1/carga/dashboard/'),
+        Endpoint('carga_lotacao_registros', f'/api/v1/carga/lotacao/{lotacao}/registros/?page_size=100'),
+        Endpoint('carga_lotacao_registros_pagina_final',
+                 f'/api/v1/carga/lotacao/{lotacao}/registros/?page_size=100&page=500'),
+        Endpoint('carga_organograma_hierarquia', f'/api/v1/carga/organograma/{organograma}/hierarquia/'),
+        Endpoint('acoes_list', '/api/v1/acoes_pngi/acoes/'),
+        Endpoint('acoes_detail', f'/api/v1/acoes_pngi/acoes/{acao}/'),
+    ]
+
+
+def percentil(valores: List[float], p: float) -> float:
+    """Percentil pelo método do posto mais próximo."""
+    ordenados = sorted(valores)
+    posto = max(1, math.ceil(p / 100 * len(ordenados)))
+    return ordenados[posto - 1]
+
+
+def commit_atual() -> Optional[str]:
+    try:
+        resultado = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=settings.BASE_DIR, capture_output=True, text=True, timeout=5,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return resultado.stdout.strip() or None
+
+
+def _requisitar(cliente: Client, endpoint: Endpoint):
+    contador = _ContadorQueries()
+    inicio = time.perf_counter()
+    with ExitStack() as stack:
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(contador))
+        if endpoint.metodo == 'post':
+            response = cliente.post(
+                endpoint.caminho, data=json.dumps(endpoint.corpo or {}),
+                content_type='application/json',
+            )
+        else:
+            response = cliente.get(endpoint.caminho)
+        corpo = (
+            b''.join(response.streaming_content) if response.streaming else response.content
+        )
+    return time.perf_counter() - inicio, contador.total, response.status_code, len(corpo)
+
+
+def executar_benchmark(
+    endpoints: Optional[List[Endpoint]] = None,
+    iteracoes: int = 20,
+    aquecimento: int = 2,
+    usuario: Optional[User] = None,
+    senha: Optional[str] = None,
+) -> Dict:
+    """
+    Mede cada endpoint `iteracoes` vezes, após `aquecimento` requisições
+    descartadas, e retorna o relatório.
+    """
+    endpoints = endpoints if endpoints is not None else endpoints_padrao(senha)
+    usuario = usuario or User.objects.filter(email=EMAIL_BENCHMARK).first()
+    if usuario is None:
+        raise BenchmarkError(f'Usuário {EMAIL_BENCHMARK} não encontrado.')
+
+    autenticado = Client(HTTP_HOST='localhost')
+    autenticado.force_login(usuario)
+    anonimo = Client(HTTP_HOST='localhost')
+
+    resultados = {}
+    for endpoint in endpoints:
+        cliente = autenticado if endpoint.autenticado else anonimo
+        for _ in range(aquecimento):
+            _requisitar(cliente, endpoint)
+
+        tempos, queries, status_codes, tamanho = [], [], set(), 0
+        for _ in range(iteracoes):
+            duracao, total_queries, status_code, tamanho = _requisitar(cliente, endpoint)
+            tempos.append(duracao * 1000)
+            queries.append(total_queries)
+            status_codes.add(status_code)
+
+        resultados[endpoint.nome] = {
+            'metodo': endpoint.metodo.upper(),
+            'caminho': endpoint.caminho,
+            'status': sorted(status_codes),
+            'p50_ms': round(percentil(tempos, 50), 3),
+            'p95_ms': round(percentil(tempos, 95), 3),
+            'max_ms': round(max(tempos), 3),
+            'queries': max(queries),
+            'bytes': tamanho,
+        }
+        logger.info(
+            f"Benchmark {endpoint.nome}: p50={resultados[endpoint.nome]['p50_ms']}ms "
+            f"p95={resultados[endpoint.nome]['p95_ms']}ms queries={max(queries)}"
+        )
+
+    return {
+        'versao': VERSAO_RELATORIO,
+        'gerado_em': timezone.now().isoformat(),
+        'commit': commit_atual(),
+        'python': platform.python_version(),
+        'debug': settings.DEBUG,
+        'iteracoes': iteracoes,
+        'endpoints': resultados,
+    }
+
+
+def comparar(base: Dict, atual: Dict) -> List[Dict]:
+    """
+    Diferença por endpoint entre dois relatórios (variação percentual de
+    p50/p95 e diferença absoluta de queries).
+    """
+    def variacao(antes, depois):
+        if not antes:
+            return None
+        return round((depois - antes) / antes * 100, 1)
+
+    linhas = []
+    for nome, medida in atual['endpoints'].items():
+        anterior = base['endpoints'].get(nome)
+        if anterior is None:
+            linhas.append({'endpoint': nome, 'novo': True, **medida})
+            continue
+        linhas.append({
+            'endpoint': nome,
+            'p50_ms': medida['p50_ms'],
+            'p95_ms': medida['p95_ms'],
+            'queries': medida['queries'],
+            'p50_var_pct': variacao(anterior['p50_ms'], medida['p50_ms']),
+            'p95_var_pct': variacao(anterior['p95_ms'], medida['p95_ms']),
+            'queries_dif': medida['queries'] - anterior['queries'],
+        })
+    return linhas
+
+
+# ----------------------------------------------------------------------
+# Serialização JSON (js_conteudo grande)
+# ----------------------------------------------------------------------
+
+def gerar_conteudo_lotacao(tamanho_bytes: int, seed: int = 42) -> Dict:
+    """
+    js_conteudo sintético no formato de TblLotacaoJsonOrgao, com cerca de
+    `tamanho_bytes` quando serializado (tipos como vêm do jsonb).
+    """
+    rng = random.Random(seed)
+
+    def servidor(n):
+        unidade = rng.randint(1, 300)
+        return {
+            'cpf': gerar_cpf(rng),
+            'nome': f'Servidor Sintético {n:07d}',
+            'cargo': rng.choice(CARGOS),
+            'orgao_sigla': 'SINT_001',
+            'orgao_nome': 'Patriarca Sintético 001',
+            'unidade_sigla': f'SINT_001.1.{unidade}',
+            'unidade_nome': f'Unidade SINT_001 1.{unidade}',
+            'data_referencia': '2026-01-31',
+            'carga_horaria': rng.choice((20, 30, 40)),
+            'ativo': True,
+        }
+
+    tamanho_item = len(json.dumps(servidor(0), ensure_ascii=False).encode()) + 1
+    quantidade = max(1, tamanho_bytes // tamanho_item)
+    return {
+        'orgao': {'sigla': 'SINT_001', 'nome': 'Patriarca Sintético 001'},
+        'total_servidores': quantidade,
+        'servidores': [servidor(n) for n in range(quantidade)],
+    }
+
+
+def _medir(funcao: Callable, repeticoes: int) -> Dict:
+    """Melhor tempo em `repeticoes` execuções e pico de memória (tracemalloc)."""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        tempos.append(time.perf_counter() - inicio)
+        del resultado
+
+    tracemalloc.start()
+    try:
+        resultado = funcao()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del resultado
+    return {'tempo_ms': round(min(tempos) * 1000, 1), 'pico_mb': round(pico / 2**20, 1)}
+
+
+def comparar_serializacao(tamanho_mb: float = 50, repeticoes: int = 3, seed: int = 42) -> Dict:
+    """
+    Compara renderização e parsing de um js_conteudo de `tamanho_mb`:
+    JSONRenderer/JSONParser do DRF, FastJSONRenderer/FastJSONParser e a
+    emissão em fluxo da lista de servidores (pedaços consumidos e descartados,
+    como na escrita para o socket).
+    """
+    conteudo = gerar_conteudo_lotacao(int(tamanho_mb * 2**20), seed)
+    payload = {'id': 1, 'conteudo': conteudo}
+    envelope = {'id': 1, 'orgao': conteudo['orgao'], 'total_servidores': conteudo['total_servidores']}
+    corpo = JSONRenderer().render(payload)
+
+    def streaming():
+        total = 0
+        for pedaco in stream_json_list(conteudo['servidores'], envelope, chave='servidores'):
+            total += len(pedaco)
+        return total
+
+    medidas = {
+        'render_drf': _medir(lambda: JSONRenderer().render(payload), repeticoes),
+        'render_fast': _medir(lambda: FastJSONRenderer().render(payload), repeticoes),
+        'render_streaming': _medir(streaming, repeticoes),
+        'parse_drf': _medir(lambda: JSONParser().parse(io.BytesIO(corpo)), repeticoes),
+        'parse_fast': _medir(lambda: FastJSONParser().parse(io.BytesIO(corpo)), repeticoes),
+    }
+    return {
+        'tamanho_mb': round(len(corpo) / 2**20, 1),
+        'servidores': conteudo['total_servidores'],
+        'orjson': orjson.__version__ if orjson else None,
+        'medidas': medidas,
+    }
@@ -0,0 +1,312 @@
+"""
+Log de queries lentas com atribuição por view e aplicação.
+
+Um execute_wrapper instalado em toda conexão nova (signal connection_created,
+ver CommonConfig.ready) mede cada query. As que passam de
+GPP_SLOW_QUERY_MS são:
+- registradas no log com fingerprint, duração, linhas, view, aplicação e a
+  pilha de chamadas do projeto
+- agregadas em memória por (fingerprint, view, aplicação)
+- gravadas periodicamente na tabela tblconsultalenta (ConsultaLenta), somando
+  às contagens já existentes: ao fim das requisições (middleware) e, para o
+  que sobrar (comandos, o último intervalo de um worker), na saída do
+  processo (gravar_ao_sair, registrado com atexit em CommonConfig.ready)
+
+A view e a aplicação vêm da requisição em andamento, marcada pelo
+ConsultasLentasMiddleware; fora de requisições (comandos, shell) ficam como
+'fora_de_requisicao'. O fingerprint normaliza o SQL (literais, listas IN e
+espaços), de modo que a mesma query com parâmetros diferentes é agrupada.
+
+Configurações:
+- GPP_SLOW_QUERY_ENABLED: liga/desliga (padrão True)
+- GPP_SLOW_QUERY_MS: limite em milissegundos (padrão 500)
+- GPP_SLOW_QUERY_FLUSH_INTERVAL: segundos entre gravações na tabela (padrão 60)
+- GPP_SLOW_QUERY_STACK_DEPTH: quadros da pilha guardados (padrão 8)
+- GPP_SLOW_QUERY_FLUSH_AO_SAIR: grava os agregados na saída (padrão True)
+
+Relatório: python manage.py consultas_lentas
+"""
+
+import contextvars
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+import traceback
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+FORA_DE_REQUISICAO = 'fora_de_requisicao'
+NAO_RESOLVIDA = 'nao_resolvida'
+
+_requisicao_atual: contextvars.ContextVar = contextvars.ContextVar(
+    'gpp_consultas_lentas_requisicao', default=None
+)
+# Desliga o registro durante a própria gravação da tabela
+_gravando: contextvars.ContextVar = contextvars.ContextVar(
+    'gpp_consultas_lentas_gravando', default=False
+)
+
+
+def slow_query_enabled() -> bool:
+    return getattr(settings, 'GPP_SLOW_QUERY_ENABLED', True)
+
+
+def limite_ms() -> float:
+    return getattr(settings, 'GPP_SLOW_QUERY_MS', 500)
+
+
+def flush_interval() -> float:
+    return getattr(settings, 'GPP_SLOW_QUERY_FLUSH_INTERVAL', 60)
+
+
+def profundidade_pilha() -> int:
+    return getattr(settings, 'GPP_SLOW_QUERY_STACK_DEPTH', 8)
+
+
+# ----------------------------------------------------------------------
+# Fingerprint
+# ----------------------------------------------------------------------
+
+_RE_STRING = re.compile(r"'(?:[^']|'')*'")
+_RE_NUMERO = re.compile(r'(?<![\w."])-?\b\d+(?:\.\d+)?\b')
+_RE_LISTA_IN = re.compile(r'\bIN\s*\(\s*(?:\?|%s)(?:\s*,\s*(?:\?|%s))*\s*\)', re.IGNORECASE)
+_RE_VALUES = re.compile(r'\bVALUES\s*\([^()]*\)(?:\s*,\s*\([^()]*\))*', re.IGNORECASE)
+_RE_ESPACOS = re.compile(r'\s+')
+
+
+def normalizar_sql(sql: str) -> str:
+    """
+    SQL sem literais: strings e números viram '?', listas de parâmetros
+    (IN (%s, %s, ...)) e linhas de INSERT (VALUES (...), (...)) viram '(...)'
+    e espaços são colapsados.
+    """
+    sql = _RE_STRING.sub('?', sql)
+    sql = _RE_NUMERO.sub('?', sql)
+    sql = _RE_LISTA_IN.sub('IN (...)', sql)
+    sql = _RE_VALUES.sub('VALUES (...)', sql)
+    return _RE_ESPACOS.sub(' ', sql).strip()
+
+
+def fingerprint(sql_normalizado: str) -> str:
+    return hashlib.sha1(sql_normalizado.encode()).hexdigest()[:16]
+
+
+# ----------------------------------------------------------------------
+# Agregação
+# ----------------------------------------------------------------------
+
+@dataclass
+class Agregado:
+    sql: str
+    execucoes: int = 0
+    tempo_total_ms: float = 0.0
+    tempo_max_ms: float = 0.0
+    linhas: int = 0
+    pilha: str = ''
+    primeira: Optional[datetime] = None
+    ultima: Optional[datetime] = None
+
+    def registrar(self, duracao_ms: float, linhas: int, pilha: str, quando: datetime) -> None:
+        self.execucoes += 1
+        self.tempo_total_ms += duracao_ms
+        self.linhas += max(linhas, 0)
+        if duracao_ms >= self.tempo_max_ms:
+            # Guarda a pilha da execução mais lenta
+            self.tempo_max_ms = duracao_ms
+            self.pilha = pilha
+        self.primeira = self.primeira or quando
+        self.ultima = quando
+
+
+Chave = Tuple[str, str, str]  # (fingerprint, view, app)
+
+
+class RegistroConsultasLentas:
+    """Agregados do processo, gravados na tabela a cada flush_interval()."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.agregados: Dict[Chave, Agregado] = {}
+        self._ultimo_flush = time.monotonic()
+
+    def registrar(self, chave: Chave, sql: str, duracao_ms: float, linhas: int, pilha: str) -> None:
+        with self._lock:
+            agregado = self.agregados.get(chave)
+            if agregado is None:
+                agregado = self.agregados[chave] = Agregado(sql)
+            agregado.registrar(duracao_ms, linhas, pilha, timezone.now())
+
+    def retirar(self) -> Dict[Chave, Agregado]:
+        with self._lock:
+            agregados, self.agregados = self.agregados, {}
+            self._ultimo_flush = time.monotonic()
+        return agregados
+
+    def limpar(self) -> None:
+        self.retirar()
+
+    def flush(self, forcar: bool = False, using: str = 'default') -> int:
+        """Grava os agregados na tabela; retorna o número de linhas gravadas."""
+        if not forcar and (
+            not self.agregados or time.monotonic() - self._ultimo_flush < flush_interval()
+        ):
+            return 0
+        agregados = self.retirar()
+        if not agregados:
+            return 0
+
+        token = _gravando.set(True)
+        try:
+            gravar(agregados, using)
+        except Exception as e:
+            logger.warning(f"Erro ao gravar {len(agregados)} consultas lentas: {e}")
+            return 0
+        finally:
+            _gravando.reset(token)
+        return len(agregados)
+
+
+registro = RegistroConsultasLentas()
+
+
+def gravar_ao_sair() -> None:
+    """atexit: grava os agregados ainda em memória, fora do intervalo."""
+    if getattr(settings, 'GPP_SLOW_QUERY_FLUSH_AO_SAIR', True) and registro.agregados:
+        registro.flush(forcar=True)
+
+
+SQL_UPSERT = """
+    INSERT INTO {tabela} (
+        strfingerprint, strview, strapp, strsql, intexecucoes, flttempototalms,
+        flttempomaxms, intlinhas, strpilha, datprimeira, datultima
+    ) VALUES {valores}
+    ON CONFLICT (strfingerprint, strview, strapp) DO UPDATE SET
+        intexecucoes = {tabela}.intexecucoes + EXCLUDED.intexecucoes,
+        flttempototalms = {tabela}.flttempototalms + EXCLUDED.flttempototalms,
+        intlinhas = {tabela}.intlinhas + EXCLUDED.intlinhas,
+        flttempomaxms = GREATEST({tabela}.flttempomaxms, EXCLUDED.flttempomaxms),
+        strpilha = CASE WHEN EXCLUDED.flttempomaxms >= {tabela}.flttempomaxms
+                        THEN EXCLUDED.strpilha ELSE {tabela}.strpilha END,
+        datultima = GREATEST({tabela}.datultima, EXCLUDED.datultima)
+"""
+
+
+def gravar(agregados: Dict[Chave, Agregado], using: str = 'default') -> None:
+    """Soma os agregados às linhas da tabela (upsert por fingerprint/view/app)."""
+    from common.models import ConsultaLenta
+
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        with transaction.atomic(using=using):
+            for (impressao, view, app), agregado in agregados.items():
+                linha, _ = ConsultaLenta.objects.using(using).select_for_update().get_or_create(
+                    strfingerprint=impressao, strview=view, strapp=app,
+                    defaults={'strsql': agregado.sql, 'datprimeira': agregado.primeira,
+                              'datultima': agregado.ultima},
+                )
+                linha.intexecucoes += agregado.execucoes
+                linha.flttempototalms += agregado.tempo_total_ms
+                linha.intlinhas += agregado.linhas
+                if agregado.tempo_max_ms >= linha.flttempomaxms:
+                    linha.flttempomaxms = agregado.tempo_max_ms
+                    linha.strpilha = agregado.pilha
+                linha.datultima = max(linha.datultima, agregado.ultima)
+                linha.save(using=using)
+        return
+
+    params: List = []
+    for (impressao, view, app), agregado in agregados.items():
+        params.extend([
+            impressao, view, app, agregado.sql, agregado.execucoes,
+            agregado.tempo_total_ms, agregado.tempo_max_ms, agregado.linhas,
+            agregado.pilha, agregado.primeira, agregado.ultima,
+        ])
+    valores = ', '.join(['(' + ', '.join(['%s'] * 11) + ')'] * len(agregados))
+    sql = SQL_UPSERT.format(tabela=ConsultaLenta._meta.db_table, valores=valores)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+
+
+# ----------------------------------------------------------------------
+# Execute wrapper
+# ----------------------------------------------------------------------
+
+def _pilha_do_projeto() -> str:
+    base = str(settings.BASE_DIR)
+    este_arquivo = os.path.abspath(__file__)
+    quadros = [
+        q for q in traceback.extract_stack()[:-2]
+        if q.filename.startswith(base)
+        and 'site-packages' not in q.filename
+        and not q.filename.endswith('manage.py')
+        and os.path.abspath(q.filename) != este_arquivo
+    ]
+    return ''.join(traceback.format_list(quadros[-profundidade_pilha():]))
+
+
+def contexto_atual() -> Tuple[str, str]:
+    """(view, app) da requisição em andamento."""
+    request = _requisicao_atual.get()
+    if request is None:
+        return FORA_DE_REQUISICAO, FORA_DE_REQUISICAO
+    match = getattr(request, 'resolver_match', None)
+    app_context = getattr(request, 'app_context', None) or {}
+    return (match.view_name if match else NAO_RESOLVIDA), (app_context.get('code') or 'nenhuma')
+
+
+def iniciar_requisicao(request):
+    return _requisicao_atual.set(request)
+
+
+def encerrar_requisicao(token) -> None:
+    _requisicao_atual.reset(token)
+
+
+def medir_query(execute, sql, params, many, context):
+    """execute_wrapper: registra a query se passar do limite."""
+    if _gravando.get() or not slow_query_enabled():
+        return execute(sql, params, many, context)
+
+    inicio = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duracao_ms = (time.perf_counter() - inicio) * 1000
+        if duracao_ms >= limite_ms():
+            _registrar(sql, duracao_ms, context)
+
+
+def _registrar(sql: str, duracao_ms: float, context) -> None:
+    cursor = context.get('cursor') if context else None
+    linhas = getattr(cursor, 'rowcount', -1) if cursor is not None else -1
+    sql_normalizado = normalizar_sql(sql)
+    impressao = fingerprint(sql_normalizado)
+    view, app = contexto_atual()
+    pilha = _pilha_do_projeto()
+
+    logger.warning(
+        f"Query lenta {duracao_ms:.1f}ms ({linhas} linhas) [{view} / {app}] "
+        f"{impressao}: {sql_normalizado[:500]}\n{pilha}"
+    )
+    registro.registrar((impressao, view, app), sql_normalizado, duracao_ms, linhas, pilha)
+
+
+def instalar(sender=None, connection=None, **kwargs) -> None:
+    """
+    Receiver de connection_created: adiciona o wrapper à conexão. Entra no
+    início da lista porque a conexão pode ser aberta dentro de um
+    `with connection.execute_wrapper(...)`, que remove o último ao sair.
+    """
+    if connection is not None and medir_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, medir_query)
@@ -0,0 +1,518 @@
+"""
+Gerador de dados sintéticos para testes de carga e benchmarks.
+
+Produz volumes próximos aos de produção a partir de uma semente fixa, de modo
+que duas execuções com os mesmos parâmetros (e a mesma data base) geram o
+mesmo conjunto de dados:
+- usuários com perfis nas aplicações ACOES_PNGI e CARGA_ORG_LOT
+- patriarcas, cada um com um organograma profundo e uma versão de lotação
+- lotações (na casa do milhão), inseridas via COPY
+- ações PNGI com prazos, destaques e responsáveis
+
+Tudo o que é gerado leva o prefixo reservado SINT_ (siglas de patriarca,
+apelidos, vigência) ou o domínio sintetico.gpp.local (e-mails), o que permite
+remover os dados com `limpar()` sem tocar no restante do banco.
+
+Só o usuário de benchmark pode fazer login. A senha dele vem de
+GPP_SENHA_SINTETICA ou é gerada ao acaso (o comando a exibe uma vez); os
+demais usuários ficam sem senha utilizável.
+"""
+
+import io
+import logging
+import os
+import random
+import secrets
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from django.contrib.auth.hashers import make_password
+from django.db import connections, transaction
+from django.utils import timezone
+
+from accounts.models import Aplicacao, Role, User, UserRole
+from acoes_pngi.models import (
+    AcaoDestaque,
+    AcaoPrazo,
+    Acoes,
+    RelacaoAcaoUsuarioResponsavel,
+    TipoEntraveAlerta,
+    UsuarioResponsavel,
+    VigenciaPNGI,
+)
+from carga_org_lot.models import (
+    TblLotacao,
+    TblLotacaoVersao,
+    TblOrganogramaVersao,
+    TblOrgaoUnidade,
+    TblPatriarca,
+    TblStatusProgresso,
+)
+
+logger = logging.getLogger(__name__)
+
+
+# Prefixo reservado: siglas reais não usam '_'
+MARCADOR = 'SINT_'
+DOMINIO_EMAIL = 'sintetico.gpp.local'
+EMAIL_BENCHMARK = f'benchmark@{DOMINIO_EMAIL}'
+# Senha do usuário de benchmark (gerar_dados_sinteticos e benchmark_endpoints)
+VARIAVEL_SENHA = 'GPP_SENHA_SINTETICA'
+
+PERFIS_ACOES = ['COORDENADOR_PNGI', 'GESTOR_PNGI', 'OPERADOR_ACAO', 'CONSULTOR_PNGI']
+PERFIS_CARGA = ['GESTOR_CARGA']
+
+# Cargos com variações de grafia, como chegam nos arquivos de lotação
+CARGOS = [
+    'Analista de Planejamento e Orçamento',
+    'ANALISTA DE PLANEJAMENTO E ORCAMENTO',
+    'Analista de Planej. e Orçamento',
+    'Assistente Administrativo',
+    'ASSISTENTE ADMINISTRATIVO',
+    'Assist. Administrativo',
+    'Agente de Fiscalização',
+    'AGENTE DE FISCALIZACAO',
+    'Auditor Fiscal',
+    'Especialista em Políticas Públicas',
+    'Especialista em Politicas Publicas',
+    'Técnico de Apoio',
+    'Tecnico de Apoio',
+    'Diretor',
+    'Coordenador',
+    'Assessor Técnico',
+]
+
+ORGAOS_RESPONSAVEIS = ['SEGES', 'SEFAZ', 'SEPLAN', 'SGGE', 'CASA CIVIL', 'PGE', 'SECOM', 'SEDUC']
+
+TAMANHO_LOTE = 5000
+TAMANHO_LOTE_COPY = 50000
+
+
+@dataclass
+class EscalaSintetica:
+    """Volumes a gerar. Os padrões aproximam a base de produção."""
+    patriarcas: int = 10
+    profundidade: int = 6
+    largura: int = 3
+    lotacoes: int = 1_000_000
+    acoes: int = 5_000
+    usuarios: int = 2_000
+
+
+# ----------------------------------------------------------------------
+# COPY
+# ----------------------------------------------------------------------
+
+def _valor_copy(valor) -> str:
+    """Formata um valor para o formato texto do COPY do PostgreSQL."""
+    if valor is None:
+        return '\\N'
+    if isinstance(valor, bool):
+        return 't' if valor else 'f'
+    if isinstance(valor, datetime):
+        return valor.isoformat()
+    return (
+        str(valor)
+        .replace('\\', '\\\\')
+        .replace('\t', '\\t')
+        .replace('\n', '\\n')
+        .replace('\r', '\\r')
+    )
+
+
+def copiar_linhas(
+    model,
+    campos: Sequence[str],
+    linhas: Iterable[Sequence],
+    using: str = 'default',
+) -> int:
+    """
+    Insere `linhas` (tuplas na ordem de `campos`) com COPY FROM STDIN.
+
+    Funciona com psycopg 3 (cursor.copy) e psycopg2 (copy_expert, em lotes de
+    TAMANHO_LOTE_COPY linhas). Em bancos que não são PostgreSQL, recorre a
+    bulk_create. Retorna o número de linhas inseridas.
+    """
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        total = 0
+        lote = []
+        for linha in linhas:
+            lote.append(model(**dict(zip(campos, linha))))
+            if len(lote) >= TAMANHO_LOTE:
+                model.objects.using(using).bulk_create(lote)
+                total += len(lote)
+                lote = []
+        model.objects.using(using).bulk_create(lote)
+        return total + len(lote)
+
+    quote = connection.ops.quote_name
+    colunas = ', '.join(quote(model._meta.get_field(campo).column) for campo in campos)
+    sql = f'COPY {quote(model._meta.db_table)} ({colunas}) FROM STDIN'
+
+    total = 0
+    with connection.cursor() as cursor:
+        bruto = cursor.cursor
+        if hasattr(bruto, 'copy'):
+            with bruto.copy(sql) as copy:
+                for linha in linhas:
+                    copy.write_row(linha)
+                    total += 1
+            return total
+
+        buffer = io.StringIO()
+        pendentes = 0
+        for linha in linhas:
+            buffer.write('\t'.join(_valor_copy(v) for v in linha))
+            buffer.write('\n')
+            pendentes += 1
+            if pendentes >= TAMANHO_LOTE_COPY:
+                buffer.seek(0)
+                bruto.copy_expert(sql, buffer)
+                total += pendentes
+                buffer = io.StringIO()
+                pendentes = 0
+        if pendentes:
+            buffer.seek(0)
+            bruto.copy_expert(sql, buffer)
+            total += pendentes
+    return total
+
+
+# ----------------------------------------------------------------------
+# Gerador
+# ----------------------------------------------------------------------
+
+def gerar_cpf(rng: random.Random, valido: bool = True) -> str:
+    """CPF formatado (000.000.000-00) com dígitos verificadores corretos ou não."""
+    base = [rng.randint(0, 9) for _ in range(9)]
+    for tamanho in (9, 10):
+        soma = sum(d * peso for d, peso in zip(base, range(tamanho + 1, 1, -1)))
+        resto = (soma * 10) % 11
+        base.append(0 if resto == 10 else resto)
+    if not valido:
+        base[-1] = (base[-1] + 1) % 10
+    digitos = ''.join(map(str, base))
+    return f'{digitos[:3]}.{digitos[3:6]}.{digitos[6:9]}-{digitos[9:]}'
+
+
+class GeradorDadosSinteticos:
+    """
+    Gera o conjunto sintético. Cada etapa usa bulk_create em lotes (ou COPY,
+    para lotações) e o mesmo `random.Random(seed)`, na mesma ordem.
+    """
+
+    def __init__(
+        self,
+        escala: Optional[EscalaSintetica] = None,
+        seed: int = 42,
+        data_base: Optional[datetime] = None,
+        using: str = 'default',
+        progresso=None,
+        senha: Optional[str] = None,
+    ):
+        self.escala = escala or EscalaSintetica()
+        # Fora da semente: a senha nunca é previsível
+        self.senha_gerada = not (senha or os.getenv(VARIAVEL_SENHA))
+        self.senha = senha or os.getenv(VARIAVEL_SENHA) or secrets.token_urlsafe(18)
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.data_base = data_base or timezone.make_aware(
+            datetime.combine(timezone.localdate(), time.min)
+        )
+        self.using = using
+        self.progresso = progresso or (lambda mensagem: logger.info(mensagem))
+        self.resumo: Dict[str, int] = {}
+
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def existe(cls) -> bool:
+        return User.objects.filter(email=EMAIL_BENCHMARK).exists()
+
+    @classmethod
+    def limpar(cls) -> Dict[str, int]:
+        """Remove os dados sintéticos (identificados pelo marcador)."""
+        removidos = {}
+        patriarcas = list(
+            TblPatriarca.objects.filter(str_sigla_patriarca__startswith=MARCADOR)
+            .values_list('id_patriarca', flat=True)
+        )
+        with transaction.atomic():
+            if patriarcas:
+                # As lotações são a maior parte do volume: saem com as
+                # partições das versões (carga_org_lot.services.particoes),
+                # descartadas ao excluir cada versão.
+                removidos['lotacoes'] = TblLotacao.objects.filter(
+                    id_patriarca__in=patriarcas
+                ).count()
+                TblLotacaoVersao.objects.filter(id_patriarca__in=patriarcas).delete()
+                TblOrgaoUnidade.objects.filter(id_patriarca__in=patriarcas).delete()
+                TblOrganogramaVersao.objects.filter(id_patriarca__in=patriarcas).delete()
+                removidos['patriarcas'] = TblPatriarca.objects.filter(
+                    id_patriarca__in=patriarcas
+                ).delete()[0]
+            removidos['acoes'] = Acoes.objects.filter(
+                strapelido__startswith=MARCADOR
+            ).delete()[0]
+            VigenciaPNGI.objects.filter(
+                strdescricaovigenciapngi__startswith=MARCADOR, acoes__isnull=True
+            ).delete()
+            removidos['usuarios'] = User.objects.filter(
+                email__endswith=f'@{DOMINIO_EMAIL}'
+            ).delete()[0]
+        return removidos
+
+    # ------------------------------------------------------------------
+
+    def gerar(self) -> Dict[str, int]:
+        inicio = timezone.now()
+        with transaction.atomic(using=self.using):
+            usuarios = self._gerar_usuarios()
+            self._gerar_carga(usuarios[0])
+            self._gerar_acoes(usuarios)
+        self.resumo['segundos'] = int((timezone.now() - inicio).total_seconds())
+        return self.resumo
+
+    def _bulk(self, model, objetos: List, **kwargs) -> List:
+        return model.objects.using(self.using).bulk_create(
+            objetos, batch_size=TAMANHO_LOTE, **kwargs
+        )
+
+    # --- usuários e perfis -------------------------------------------------
+
+    def _perfis(self, codigo_app: str, nome_app: str, codigos: List[str]) -> List[Role]:
+        aplicacao, _ = Aplicacao.objects.using(self.using).get_or_create(
+            codigointerno=codigo_app, defaults={'nomeaplicacao': nome_app}
+        )
+        return [
+            Role.objects.using(self.using).get_or_create(
+                aplicacao=aplicacao, codigoperfil=codigo,
+                defaults={'nomeperfil': codigo.replace('_', ' ').title()},
+            )[0]
+            for codigo in codigos
+        ]
+
+    def _gerar_usuarios(self) -> List[User]:
+        perfis_acoes = self._perfis('ACOES_PNGI', 'Ações PNGI', PERFIS_ACOES)
+        perfis_carga = self._perfis('CARGA_ORG_LOT', 'Carga Org/Lot', PERFIS_CARGA)
+        sem_senha = make_password(None)
+
+        usuarios = [
+            User(name='Usuário Benchmark', email=EMAIL_BENCHMARK, password=make_password(self.senha))
+        ]
+        usuarios += [
+            User(
+                name=f'{MARCADOR}Usuário {n:06d}',
+                email=f'usuario{n:06d}@{DOMINIO_EMAIL}',
+                password=sem_senha,
+            )
+            for n in range(1, self.escala.usuarios)
+        ]
+        usuarios = self._bulk(User, usuarios)
+
+        # Benchmark: acesso total; demais: um perfil PNGI e, às vezes, carga
+        vinculos = [
+            UserRole(user=usuarios[0], aplicacao=perfil.aplicacao, role=perfil)
+            for perfil in (perfis_acoes[0], perfis_carga[0])
+        ]
+        for usuario in usuarios[1:]:
+            perfil = self.rng.choice(perfis_acoes)
+            vinculos.append(UserRole(user=usuario, aplicacao=perfil.aplicacao, role=perfil))
+            if self.rng.random() < 0.2:
+                vinculos.append(UserRole(
+                    user=usuario, aplicacao=perfis_carga[0].aplicacao, role=perfis_carga[0]
+                ))
+        self._bulk(UserRole, vinculos)
+
+        self.resumo['usuarios'] = len(usuarios)
+        self.progresso(f'{len(usuarios)} usuários e {len(vinculos)} perfis')
+        return usuarios
+
+    # --- carga: patriarcas, organogramas e lotações ------------------------
+
+    def _gerar_carga(self, criador: User) -> None:
+        status, _ = TblStatusProgresso.objects.using(self.using).get_or_create(
+            id_status_progresso=3, defaults={'str_descricao': 'Concluído'}
+        )
+        patriarcas = self._bulk(TblPatriarca, [
+            TblPatriarca(
+                id_externo_patriarca=uuid.UUID(int=self.rng.getrandbits(128)),
+                str_sigla_patriarca=f'{MARCADOR}{n:03d}',
+                str_nome=f'Patriarca Sintético {n:03d}',
+                id_status_progresso=status,
+                dat_criacao=self.data_base,
+                id_usuario_criacao=criador,
+            )
+            for n in range(1, self.escala.patriarcas + 1)
+        ])
+
+        por_patriarca, resto = divmod(self.escala.lotacoes, max(len(patriarcas), 1))
+        total_orgaos = total_lotacoes = 0
+        for indice, patriarca in enumerate(patriarcas):
+            organograma = TblOrganogramaVersao.objects.using(self.using).create(
+                id_patriarca=patriarca,
+                str_origem='SINTETICO',
+                dat_processamento=self.data_base,
+                str_status_processamento='PROCESSADO',
+                flg_ativo=True,
+            )
+            orgaos = self._gerar_organograma(patriarca, organograma)
+            versao = TblLotacaoVersao.objects.using(self.using).create(
+                id_patriarca=patriarca,
+                id_organograma_versao=organograma,
+                str_origem='SINTETICO',
+                dat_processamento=self.data_base,
+                str_status_processamento='PROCESSADO',
+                flg_ativo=True,
+            )
+            quantidade = por_patriarca + (1 if indice < resto else 0)
+            total_lotacoes += self._gerar_lotacoes(versao, orgaos, quantidade)
+            total_orgaos += len(orgaos)
+            self.progresso(
+                f'{patriarca.str_sigla_patriarca}: {len(orgaos)} órgãos, {quantidade} lotações'
+            )
+
+        self.resumo.update(
+            patriarcas=len(patriarcas), orgaos=total_orgaos, lotacoes=total_lotacoes
+        )
+
+    def _gerar_organograma(self, patriarca, organograma) -> List[Dict]:
+        """
+        Gera a árvore nível a nível (um bulk_create por nível, que devolve os
+        ids para o nível seguinte). Retorna [{'id', 'raiz_id'}] para as
+        lotações: a raiz_id é o órgão de segundo nível ao qual a unidade
+        pertence.
+        """
+        sigla = patriarca.str_sigla_patriarca
+        nivel = [(None, '1', None)]  # (pai, número hierárquico, órgão de 2º nível)
+        orgaos: List[Dict] = []
+        for profundidade in range(1, self.escala.profundidade + 1):
+            criados = self._bulk(TblOrgaoUnidade, [
+                TblOrgaoUnidade(
+                    id_organograma_versao=organograma,
+                    id_patriarca=patriarca,
+                    str_nome=f'Unidade {sigla} {numero}',
+                    str_sigla=f'{sigla}.{numero}'[:50],
+                    id_orgao_unidade_pai_id=pai,
+                    str_numero_hierarquia=numero[:50],
+                    int_nivel_hierarquia=profundidade,
+                    flg_ativo=True,
+                    dat_criacao=self.data_base,
+                )
+                for pai, numero, _ in nivel
+            ])
+            proximo = []
+            for orgao, (_, numero, raiz) in zip(criados, nivel):
+                raiz = raiz or (orgao.pk if profundidade == 2 else None)
+                orgaos.append({'id': orgao.pk, 'raiz_id': raiz or orgao.pk})
+                if profundidade < self.escala.profundidade:
+                    filhos = self.rng.randint(1, 2 * self.escala.largura - 1)
+                    proximo += [
+                        (orgao.pk, f'{numero}.{n}', raiz) for n in range(1, filhos + 1)
+                    ]
+            nivel = proximo
+        return orgaos
+
+    def _gerar_lotacoes(self, versao, orgaos: List[Dict], quantidade: int) -> int:
+        rng = self.rng
+        data = self.data_base
+
+        def linhas():
+            for _ in range(quantidade):
+                orgao = rng.choice(orgaos)
+                valido = rng.random() >= 0.02
+                yield (
+                    versao.pk,
+                    versao.id_organograma_versao_id,
+                    versao.id_patriarca_id,
+                    orgao['raiz_id'],
+                    orgao['id'],
+                    gerar_cpf(rng, valido),
+                    rng.choice(CARGOS),
+                    valido,
+                    None if valido else 'CPF inválido',
+                    data,
+                )
+
+        return copiar_linhas(
+            TblLotacao,
+            [
+                'id_lotacao_versao', 'id_organograma_versao', 'id_patriarca',
+                'id_orgao_lotacao', 'id_unidade_lotacao', 'str_cpf',
+                'str_cargo_original', 'flg_valido', 'str_erros_validacao', 'dat_criacao',
+            ],
+            linhas(),
+            using=self.using,
+        )
+
+    # --- ações PNGI --------------------------------------------------------
+
+    def _gerar_acoes(self, usuarios: List[User]) -> None:
+        rng = self.rng
+        vigencia = VigenciaPNGI.objects.using(self.using).create(
+            strdescricaovigenciapngi=f'{MARCADOR}Vigência {self.seed}',
+            datiniciovigencia=self.data_base.date() - timedelta(days=365),
+            datfinalvigencia=self.data_base.date() + timedelta(days=730),
+            isvigenciaativa=False,
+        )
+        tipos = list(TipoEntraveAlerta.objects.using(self.using).all()) or [
+            TipoEntraveAlerta.objects.using(self.using).create(
+                strdescricaotipoentravealerta=descricao
+            )
+            for descricao in ('Entrave', 'Alerta')
+        ]
+
+        acoes = self._bulk(Acoes, [
+            Acoes(
+                strapelido=f'{MARCADOR}{n:06d}',
+                strdescricaoacao=f'Ação sintética {n:06d} do plano de gestão',
+                strdescricaoentrega=f'Entrega {n % 1000:03d}',
+                idvigenciapngi=vigencia,
+                idtipoentravealerta=rng.choice(tipos) if rng.random() < 0.3 else None,
+                datdataentrega=self.data_base + timedelta(days=rng.randint(-180, 365)),
+            )
+            for n in range(1, self.escala.acoes + 1)
+        ])
+
+        prazos = []
+        destaques = []
+        for acao in acoes:
+            prazos.append(AcaoPrazo(
+                idacao=acao, isacaoprazoativo=True, strprazo=f'{rng.randint(1, 4)}º trim.'
+            ))
+            if rng.random() < 0.3:
+                prazos.append(AcaoPrazo(idacao=acao, isacaoprazoativo=False, strprazo='Original'))
+            for dias in rng.sample(range(1, 180), rng.randint(0, 3)):
+                destaques.append(AcaoDestaque(
+                    idacao=acao, datdatadestaque=self.data_base - timedelta(days=dias)
+                ))
+        self._bulk(AcaoPrazo, prazos)
+        self._bulk(AcaoDestaque, destaques)
+
+        quantidade = max(1, len(usuarios) // 10)
+        responsaveis = self._bulk(UsuarioResponsavel, [
+            UsuarioResponsavel(
+                idusuario=usuario,
+                strtelefone=f'(61) 9{rng.randint(1000, 9999)}-{rng.randint(1000, 9999)}',
+                strorgao=rng.choice(ORGAOS_RESPONSAVEIS),
+            )
+            for usuario in usuarios[:quantidade]
+        ])
+        relacoes = [
+            RelacaoAcaoUsuarioResponsavel(idacao=acao, idusuarioresponsavel=responsavel)
+            for acao in acoes
+            for responsavel in rng.sample(responsaveis, min(len(responsaveis), rng.randint(1, 3)))
+        ]
+        self._bulk(RelacaoAcaoUsuarioResponsavel, relacoes)
+
+        self.resumo.update(
+            acoes=len(acoes), prazos=len(prazos), destaques=len(destaques),
+            responsaveis=len(responsaveis), relacoes=len(relacoes),
+        )
+        self.progresso(
+            f'{len(acoes)} ações, {len(prazos)} prazos, {len(destaques)} destaques, '
+            f'{len(relacoes)} relações com responsáveis'
+        )
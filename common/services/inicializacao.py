@@ -0,0 +1,166 @@
+"""
+Perfil de inicialização (boot) de um worker.
+
+Sobe um processo Python novo com `-X importtime`, que faz o mesmo que um
+worker WSGI antes da primeira requisição (django.setup(), carga das URLs e
+construção dos middlewares), e devolve:
+- tempo de cada etapa
+- tempo de import por módulo (próprio e acumulado) e por pacote
+- conexões abertas e queries executadas durante o boot (o esperado é zero)
+
+O processo novo é necessário porque, neste processo, os módulos já estão
+importados.
+"""
+
+import json
+import logging
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+# Executado no processo filho; o resultado vai para o stdout como JSON e as
+# linhas do importtime para o stderr
+SCRIPT_BOOT = '''
+import json, time
+from django.db.backends.signals import connection_created
+
+estado = {'conexoes': 0, 'queries': []}
+
+def _contar(execute, sql, params, many, context):
+    estado['queries'].append(sql[:200])
+    return execute(sql, params, many, context)
+
+def _conectou(sender, connection, **kwargs):
+    estado['conexoes'] += 1
+    connection.execute_wrappers.append(_contar)
+
+connection_created.connect(_conectou)
+
+inicio = time.perf_counter()
+import django
+django.setup()
+setup = time.perf_counter()
+from django.urls import get_resolver
+get_resolver().url_patterns
+urls = time.perf_counter()
+from django.core.handlers.wsgi import WSGIHandler
+WSGIHandler()
+middlewares = time.perf_counter()
+
+print(json.dumps({
+    'etapas_ms': {
+        'setup': round((setup - inicio) * 1000, 1),
+        'urls': round((urls - setup) * 1000, 1),
+        'middlewares': round((middlewares - urls) * 1000, 1),
+        'total': round((middlewares - inicio) * 1000, 1),
+    },
+    'conexoes': estado['conexoes'],
+    'queries': estado['queries'],
+}))
+'''
+
+
+class PerfilInicializacaoError(Exception):
+    """Falha ao executar o processo de boot."""
+
+
+@dataclass
+class ImportModulo:
+    modulo: str
+    proprio_us: int
+    acumulado_us: int
+    nivel: int
+
+
+def ler_importtime(saida: str) -> List[ImportModulo]:
+    """
+    Interpreta as linhas de `python -X importtime`:
+
+        import time: self [us] | cumulative | imported package
+        import time:       268 |     139469 | django.urls
+    """
+    modulos = []
+    for linha in saida.splitlines():
+        if not linha.startswith('import time:'):
+            continue
+        partes = linha[len('import time:'):].split('|')
+        if len(partes) != 3:
+            continue
+        try:
+            proprio, acumulado = int(partes[0]), int(partes[1])
+        except ValueError:
+            continue  # cabeçalho
+        nome = partes[2].rstrip()
+        nivel = (len(nome) - len(nome.lstrip(' '))) // 2
+        modulos.append(ImportModulo(nome.strip(), proprio, acumulado, nivel))
+    return modulos
+
+
+def agrupar_por_pacote(modulos: List[ImportModulo]) -> Dict[str, int]:
+    """Soma do tempo próprio (us) por pacote de primeiro nível."""
+    pacotes = defaultdict(int)
+    for modulo in modulos:
+        pacotes[modulo.modulo.split('.')[0]] += modulo.proprio_us
+    return dict(sorted(pacotes.items(), key=lambda item: item[1], reverse=True))
+
+
+def _pacotes_do_projeto() -> set:
+    base = str(settings.BASE_DIR)
+    return {
+        nome for nome in os.listdir(base)
+        if os.path.isfile(os.path.join(base, nome, '__init__.py'))
+    }
+
+
+def medir_inicializacao(top: int = 30, timeout: int = 120, python: Optional[str] = None) -> Dict:
+    """Executa o boot em um processo novo e monta o relatório."""
+    env = dict(os.environ)
+    env['DJANGO_SETTINGS_MODULE'] = settings.SETTINGS_MODULE
+    try:
+        resultado = subprocess.run(
+            [python or sys.executable, '-X', 'importtime', '-c', SCRIPT_BOOT],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True, timeout=timeout,
+        )
+    except (OSError, subprocess.SubprocessError) as e:
+        raise PerfilInicializacaoError(f'Erro ao executar o boot: {e}') from e
+
+    if resultado.returncode != 0:
+        erro = [l for l in resultado.stderr.splitlines() if not l.startswith('import time:')]
+        raise PerfilInicializacaoError('\n'.join(erro[-20:]) or 'Boot terminou com erro')
+
+    try:
+        boot = json.loads(resultado.stdout.strip().splitlines()[-1])
+    except (IndexError, ValueError) as e:
+        raise PerfilInicializacaoError(f'Saída inesperada do boot: {resultado.stdout[-500:]}') from e
+
+    modulos = ler_importtime(resultado.stderr)
+    projeto = _pacotes_do_projeto()
+    mais_lentos = sorted(modulos, key=lambda m: m.acumulado_us, reverse=True)[:top]
+    pacotes = agrupar_por_pacote(modulos)
+
+    return {
+        **boot,
+        'imports_ms': round(sum(m.proprio_us for m in modulos) / 1000, 1),
+        'modulos_importados': len(modulos),
+        'modulos': [
+            {
+                'modulo': m.modulo,
+                'proprio_ms': round(m.proprio_us / 1000, 1),
+                'acumulado_ms': round(m.acumulado_us / 1000, 1),
+                'projeto': m.modulo.split('.')[0] in projeto,
+            }
+            for m in mais_lentos
+        ],
+        'pacotes': [
+            {'pacote': nome, 'ms': round(us / 1000, 1), 'projeto': nome in projeto}
+            for nome, us in list(pacotes.items())[:top]
+        ],
+    }
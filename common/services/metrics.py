@@ -0,0 +1,253 @@
+"""
+Métricas de requisições em formato Prometheus.
+
+Cada processo agrega suas observações em memória (histogramas com buckets
+fixos). Com GPP_METRICS_DIR configurado, o processo grava periodicamente um
+snapshot em <dir>/metrics_<pid>_<inicio>.json (escrita atômica por rename) e o
+endpoint /metrics soma os snapshots de todos os workers. Sem o diretório, o
+endpoint expõe apenas o processo que atendeu a requisição.
+
+Configurações:
+- GPP_METRICS_ENABLED: liga/desliga a coleta (padrão True)
+- GPP_METRICS_DIR: diretório compartilhado entre workers (padrão None)
+- GPP_METRICS_FLUSH_INTERVAL: segundos entre gravações do snapshot (padrão 5)
+- GPP_METRICS_SNAPSHOT_TTL: snapshots sem gravação há mais que isso (workers
+  encerrados) são apagados na agregação (padrão 3600 segundos)
+"""
+
+import glob
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+# Buckets por métrica (limites superiores; +Inf é implícito)
+BUCKETS = {
+    'gpp_http_request_duration_seconds': (
+        0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+    ),
+    'gpp_db_query_duration_seconds': (
+        0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+    ),
+    'gpp_db_queries_per_request': (
+        0, 1, 2, 5, 10, 20, 50, 100, 200, 500,
+    ),
+    'gpp_http_response_size_bytes': (
+        256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304,
+    ),
+    'gpp_metrics_overhead_seconds': (
+        0.000005, 0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.001,
+    ),
+}
+
+DESCRICOES = {
+    'gpp_http_request_duration_seconds': 'Tempo total da requisição',
+    'gpp_db_query_duration_seconds': 'Tempo de banco de dados por requisição',
+    'gpp_db_queries_per_request': 'Número de queries SQL por requisição',
+    'gpp_http_response_size_bytes': 'Tamanho do corpo da resposta',
+    'gpp_http_requests_total': 'Requisições atendidas',
+    'gpp_metrics_overhead_seconds': 'Tempo gasto registrando as métricas',
+    'gpp_cache_operacoes_total': 'Leituras do cache em dois níveis por resultado',
+    'gpp_cache_invalidacoes_total': 'Chaves invalidadas no nível local do cache',
+    'gpp_cache_single_flight_total': 'Cálculos de get_or_set com single-flight',
+    'gpp_carga_envio_tentativas_total': 'Tentativas de envio à API externa por destino e status HTTP',
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class MetricsRegistry:
+    """
+    Registro em memória de contadores e histogramas.
+
+    Histograma: lista [contagem por bucket..., +Inf, soma]; contadores são
+    floats. Registrar uma observação é uma busca binária e duas somas, sob
+    um lock sem disputa na maioria dos casos.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.histogramas: Dict[Tuple[str, Labels], List[float]] = {}
+        self.contadores: Dict[Tuple[str, Labels], float] = {}
+        self._ultimo_flush = 0.0
+        self._arquivo: Optional[str] = None
+
+    def observar(self, nome: str, labels: Labels, valor: float) -> None:
+        buckets = BUCKETS[nome]
+        chave = (nome, labels)
+        with self._lock:
+            serie = self.histogramas.get(chave)
+            if serie is None:
+                serie = self.histogramas[chave] = [0.0] * (len(buckets) + 2)
+            serie[bisect_left(buckets, valor)] += 1
+            serie[-1] += valor
+
+    def incrementar(self, nome: str, labels: Labels, valor: float = 1.0) -> None:
+        chave = (nome, labels)
+        with self._lock:
+            self.contadores[chave] = self.contadores.get(chave, 0.0) + valor
+
+    def limpar(self) -> None:
+        with self._lock:
+            self.histogramas.clear()
+            self.contadores.clear()
+
+    # ------------------------------------------------------------------
+    # Snapshot compartilhado entre workers
+    # ------------------------------------------------------------------
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                'histogramas': [[n, list(l), list(s)] for (n, l), s in self.histogramas.items()],
+                'contadores': [[n, list(l), v] for (n, l), v in self.contadores.items()],
+            }
+
+    def _caminho_arquivo(self, diretorio: str) -> str:
+        if self._arquivo is None or not self._arquivo.startswith(diretorio):
+            self._arquivo = os.path.join(
+                diretorio, f'metrics_{os.getpid()}_{int(time.time())}.json'
+            )
+        return self._arquivo
+
+    def flush(self, forcar: bool = False) -> None:
+        """Grava o snapshot do processo se o intervalo mínimo tiver passado."""
+        diretorio = metrics_dir()
+        if not diretorio:
+            return
+        agora = time.monotonic()
+        if not forcar and agora - self._ultimo_flush < flush_interval():
+            return
+        self._ultimo_flush = agora
+
+        caminho = self._caminho_arquivo(diretorio)
+        temporario = f'{caminho}.tmp'
+        try:
+            with open(temporario, 'w') as arquivo:
+                json.dump(self.snapshot(), arquivo)
+            os.replace(temporario, caminho)
+        except OSError as e:
+            logger.warning(f"Erro ao gravar métricas em {caminho}: {e}")
+
+
+registry = MetricsRegistry()
+
+
+def metrics_enabled() -> bool:
+    return getattr(settings, 'GPP_METRICS_ENABLED', True)
+
+
+def metrics_dir() -> Optional[str]:
+    return getattr(settings, 'GPP_METRICS_DIR', None)
+
+
+def flush_interval() -> float:
+    return getattr(settings, 'GPP_METRICS_FLUSH_INTERVAL', 5)
+
+
+def snapshot_ttl() -> float:
+    return getattr(settings, 'GPP_METRICS_SNAPSHOT_TTL', 3600)
+
+
+def _expirado(caminho: str, limite: float) -> bool:
+    """Apaga o snapshot se a última gravação for anterior ao limite."""
+    try:
+        if os.path.getmtime(caminho) >= limite:
+            return False
+        os.remove(caminho)
+        logger.info(f"Snapshot de métricas expirado removido: {caminho}")
+    except OSError:
+        # Outro worker já removeu (ou regravou) o arquivo
+        pass
+    return True
+
+
+def _snapshots() -> Iterable[Dict]:
+    diretorio = metrics_dir()
+    if not diretorio:
+        yield registry.snapshot()
+        return
+
+    registry.flush(forcar=True)
+    limite = time.time() - snapshot_ttl()
+    for caminho in glob.glob(os.path.join(diretorio, 'metrics_*.json')):
+        if caminho != registry._arquivo and _expirado(caminho, limite):
+            continue
+        try:
+            with open(caminho) as arquivo:
+                yield json.load(arquivo)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Snapshot de métricas ignorado ({caminho}): {e}")
+
+
+def coletar() -> MetricsRegistry:
+    """Soma os snapshots de todos os workers em um registro novo."""
+    total = MetricsRegistry()
+    for snapshot in _snapshots():
+        for nome, labels, serie in snapshot['histogramas']:
+            chave = (nome, tuple(tuple(par) for par in labels))
+            atual = total.histogramas.get(chave)
+            if atual is None or len(atual) != len(serie):
+                total.histogramas[chave] = list(serie)
+            else:
+                total.histogramas[chave] = [a + b for a, b in zip(atual, serie)]
+        for nome, labels, valor in snapshot['contadores']:
+            chave = (nome, tuple(tuple(par) for par in labels))
+            total.contadores[chave] = total.contadores.get(chave, 0.0) + valor
+    return total
+
+
+def _formatar_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    pares = list(labels) + ([extra] if extra else [])
+    if not pares:
+        return ''
+    conteudo = ','.join(
+        '{}="{}"'.format(k, str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for k, v in pares
+    )
+    return '{' + conteudo + '}'
+
+
+def _formatar_numero(valor: float) -> str:
+    return str(int(valor)) if float(valor).is_integer() else repr(valor)
+
+
+def render_prometheus(registro: Optional[MetricsRegistry] = None) -> str:
+    """Renderiza o registro no formato de exposição texto do Prometheus."""
+    registro = registro or coletar()
+    linhas: List[str] = []
+
+    por_nome: Dict[str, List] = {}
+    for (nome, labels), serie in sorted(registro.histogramas.items()):
+        por_nome.setdefault(nome, []).append((labels, serie))
+    for nome, series in por_nome.items():
+        linhas.append(f'# HELP {nome} {DESCRICOES.get(nome, nome)}')
+        linhas.append(f'# TYPE {nome} histogram')
+        buckets = BUCKETS.get(nome, ())
+        for labels, serie in series:
+            acumulado = 0.0
+            for limite, contagem in zip(list(buckets) + ['+Inf'], serie[:-1]):
+                acumulado += contagem
+                le = limite if limite == '+Inf' else _formatar_numero(limite)
+                linhas.append(f'{nome}_bucket{_formatar_labels(labels, ("le", le))} {_formatar_numero(acumulado)}')
+            linhas.append(f'{nome}_sum{_formatar_labels(labels)} {_formatar_numero(serie[-1])}')
+            linhas.append(f'{nome}_count{_formatar_labels(labels)} {_formatar_numero(acumulado)}')
+
+    por_nome = {}
+    for (nome, labels), valor in sorted(registro.contadores.items()):
+        por_nome.setdefault(nome, []).append((labels, valor))
+    for nome, series in por_nome.items():
+        linhas.append(f'# HELP {nome} {DESCRICOES.get(nome, nome)}')
+        linhas.append(f'# TYPE {nome} counter')
+        for labels, valor in series:
+            linhas.append(f'{nome}{_formatar_labels(labels)} {_formatar_numero(valor)}')
+
+    return '\n'.join(linhas) + '\n'
@@ -0,0 +1,374 @@
+"""
+Perfilamento sob demanda de requisições (apenas staff).
+
+Uma requisição com o header `X-GPP-Profile: 1` (ou `?_perfil=1`) é executada
+sob um profiler e tem as queries registradas em uma linha do tempo. O
+relatório fica no cache por GPP_PROFILING_TTL segundos e o id volta no
+header `X-GPP-Profile-Id`; a leitura é em /perfil/<id> (também só staff).
+
+Modos:
+- determinístico (`1`, `cprofile`): cProfile; tempos exatos por função, com
+  custo maior
+- amostragem (`amostragem`): uma thread lê a pilha da requisição a cada
+  GPP_PROFILING_SAMPLE_INTERVAL_MS; custo baixo, tempos aproximados
+
+Salvaguardas para deixar ligado em produção:
+- GPP_PROFILING_ENABLED (padrão False)
+- só staff: o middleware autentica antes de perfilar (sessão ou, sem ela,
+  os autenticadores do DRF, ex.: token); anônimos e não staff nunca são
+  perfilados nem gastam o limite por minuto
+- no máximo GPP_PROFILING_MAX_PER_MINUTE perfis por minuto, somando todos os
+  workers (contador no cache compartilhado)
+"""
+
+import cProfile
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+import uuid
+from contextlib import ExitStack
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+HEADER = 'X-GPP-Profile'
+PARAMETRO = '_perfil'
+PREFIXO = 'gpp:perfil'
+
+DETERMINISTICO = 'deterministico'
+AMOSTRAGEM = 'amostragem'
+MODOS = {
+    '1': DETERMINISTICO,
+    'cprofile': DETERMINISTICO,
+    DETERMINISTICO: DETERMINISTICO,
+    AMOSTRAGEM: AMOSTRAGEM,
+    'sampling': AMOSTRAGEM,
+}
+
+FRACAO_MINIMA_ARVORE = 0.01   # nós com menos de 1% do tempo são omitidos
+PROFUNDIDADE_MAXIMA = 40
+TOP_FUNCOES = 30
+
+
+def profiling_enabled() -> bool:
+    return getattr(settings, 'GPP_PROFILING_ENABLED', False)
+
+
+def max_por_minuto() -> int:
+    return getattr(settings, 'GPP_PROFILING_MAX_PER_MINUTE', 10)
+
+
+def ttl() -> int:
+    return getattr(settings, 'GPP_PROFILING_TTL', 3600)
+
+
+def intervalo_amostragem() -> float:
+    return getattr(settings, 'GPP_PROFILING_SAMPLE_INTERVAL_MS', 5) / 1000
+
+
+def max_queries() -> int:
+    return getattr(settings, 'GPP_PROFILING_MAX_QUERIES', 1000)
+
+
+def modo_solicitado(request) -> Optional[str]:
+    valor = request.headers.get(HEADER) or request.GET.get(PARAMETRO)
+    if not valor:
+        return None
+    return MODOS.get(valor.strip().lower())
+
+
+def reservar_execucao() -> bool:
+    """Conta o perfil na janela do minuto atual; False acima do limite."""
+    chave = f'{PREFIXO}:taxa:{int(time.time() // 60)}'
+    cache.add(chave, 0, 120)
+    try:
+        return cache.incr(chave) <= max_por_minuto()
+    except ValueError:  # expirou entre o add e o incr
+        return False
+
+
+def guardar(relatorio: Dict) -> str:
+    relatorio['id'] = uuid.uuid4().hex
+    cache.set(f'{PREFIXO}:relatorio:{relatorio["id"]}', relatorio, ttl())
+    return relatorio['id']
+
+
+def obter(id_perfil: str) -> Optional[Dict]:
+    return cache.get(f'{PREFIXO}:relatorio:{id_perfil}')
+
+
+# ----------------------------------------------------------------------
+# Nomes de funções
+# ----------------------------------------------------------------------
+
+def _arquivo_curto(caminho: str) -> str:
+    base = str(settings.BASE_DIR) + os.sep
+    if caminho.startswith(base):
+        return caminho[len(base):]
+    for marcador in ('site-packages' + os.sep, 'lib' + os.sep + 'python'):
+        if marcador in caminho:
+            return caminho.split(marcador, 1)[1].split(os.sep, 1)[-1]
+    return caminho
+
+
+def _nome_funcao(arquivo: str, linha: int, funcao: str) -> str:
+    if arquivo == '~':  # funções embutidas no cProfile
+        return funcao
+    return f'{_arquivo_curto(arquivo)}:{linha}({funcao})'
+
+
+# ----------------------------------------------------------------------
+# SQL
+# ----------------------------------------------------------------------
+
+class LinhaDoTempoSQL:
+    """execute_wrapper: início (relativo ao perfil), duração e SQL de cada query."""
+
+    def __init__(self, inicio: float):
+        self.inicio = inicio
+        self.queries: List[Dict] = []
+        self.total = 0
+        self.tempo = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duracao = time.perf_counter() - inicio
+            self.total += 1
+            self.tempo += duracao
+            if len(self.queries) < max_queries():
+                self.queries.append({
+                    'inicio_ms': round((inicio - self.inicio) * 1000, 3),
+                    'duracao_ms': round(duracao * 1000, 3),
+                    'banco': context['connection'].alias,
+                    'sql': sql[:2000],
+                })
+
+
+# ----------------------------------------------------------------------
+# Amostragem
+# ----------------------------------------------------------------------
+
+class _No:
+    __slots__ = ('amostras', 'filhos')
+
+    def __init__(self):
+        self.amostras = 0
+        self.filhos: Dict[Tuple, '_No'] = {}
+
+
+class Amostrador(threading.Thread):
+    """Lê periodicamente a pilha da thread alvo e acumula em uma árvore."""
+
+    def __init__(self, thread_alvo: int, quadro_base, intervalo: float):
+        super().__init__(name='gpp-perfil-amostrador', daemon=True)
+        self.thread_alvo = thread_alvo
+        self.quadro_base = quadro_base
+        self.intervalo = intervalo
+        self.raiz = _No()
+        self.proprio: Dict[Tuple, int] = {}
+        self.total = 0
+        self._parar = threading.Event()
+
+    def parar(self) -> None:
+        self._parar.set()
+        self.join()
+
+    def run(self):
+        while not self._parar.wait(self.intervalo):
+            quadro = sys._current_frames().get(self.thread_alvo)
+            if quadro is not None:
+                self._registrar(quadro)
+
+    def _registrar(self, quadro) -> None:
+        pilha = []
+        while quadro is not None and quadro is not self.quadro_base:
+            codigo = quadro.f_code
+            pilha.append((codigo.co_filename, codigo.co_firstlineno, codigo.co_name))
+            quadro = quadro.f_back
+        if quadro is None:
+            return  # a requisição já saiu do trecho perfilado
+        self.total += 1
+        no = self.raiz
+        no.amostras += 1
+        for chave in reversed(pilha):
+            no = no.filhos.setdefault(chave, _No())
+            no.amostras += 1
+        if pilha:
+            self.proprio[pilha[0]] = self.proprio.get(pilha[0], 0) + 1
+
+    def arvore(self) -> List[Dict]:
+        intervalo_ms = self.intervalo * 1000
+        minimo = max(1, self.total * FRACAO_MINIMA_ARVORE)
+
+        def montar(no: _No, profundidade: int) -> List[Dict]:
+            if profundidade >= PROFUNDIDADE_MAXIMA:
+                return []
+            filhos = sorted(no.filhos.items(), key=lambda item: item[1].amostras, reverse=True)
+            return [
+                {
+                    'funcao': _nome_funcao(*chave),
+                    'tempo_ms': round(filho.amostras * intervalo_ms, 1),
+                    'amostras': filho.amostras,
+                    'filhos': montar(filho, profundidade + 1),
+                }
+                for chave, filho in filhos if filho.amostras >= minimo
+            ]
+
+        return montar(self.raiz, 0)
+
+    def top_funcoes(self) -> List[Dict]:
+        intervalo_ms = self.intervalo * 1000
+        acumulado: Dict[Tuple, int] = {}
+
+        def somar(no: _No, caminho: frozenset):
+            for chave, filho in no.filhos.items():
+                # Recursão conta uma vez por amostra
+                if chave not in caminho:
+                    acumulado[chave] = acumulado.get(chave, 0) + filho.amostras
+                somar(filho, caminho | {chave})
+
+        somar(self.raiz, frozenset())
+        ordenadas = sorted(self.proprio.items(), key=lambda item: item[1], reverse=True)[:TOP_FUNCOES]
+        return [
+            {
+                'funcao': _nome_funcao(*chave),
+                'tempo_proprio_ms': round(amostras * intervalo_ms, 1),
+                'tempo_acumulado_ms': round(acumulado.get(chave, amostras) * intervalo_ms, 1),
+            }
+            for chave, amostras in ordenadas
+        ]
+
+
+# ----------------------------------------------------------------------
+# cProfile
+# ----------------------------------------------------------------------
+
+def _top_cprofile(stats: pstats.Stats) -> List[Dict]:
+    ordenadas = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)[:TOP_FUNCOES]
+    return [
+        {
+            'funcao': _nome_funcao(*funcao),
+            'chamadas': nc,
+            'tempo_proprio_ms': round(tt * 1000, 3),
+            'tempo_acumulado_ms': round(ct * 1000, 3),
+        }
+        for funcao, (cc, nc, tt, ct, _callers) in ordenadas
+    ]
+
+
+def _arvore_cprofile(stats: pstats.Stats) -> List[Dict]:
+    """
+    Árvore derivada do grafo chamador -> chamado do cProfile: cada filho
+    recebe o tempo acumulado naquela aresta. Ciclos são cortados.
+    """
+    chamados: Dict[Tuple, Dict[Tuple, float]] = {}
+    for funcao, (_cc, _nc, _tt, _ct, chamadores) in stats.stats.items():
+        for chamador, aresta in chamadores.items():
+            chamados.setdefault(chamador, {})[funcao] = aresta[3]
+
+    raizes = [f for f, dados in stats.stats.items() if not dados[4]]
+    total = sum(stats.stats[f][3] for f in raizes) or 1.0
+    minimo = total * FRACAO_MINIMA_ARVORE
+
+    def montar(funcao, tempo, caminho, profundidade):
+        filhos = []
+        if profundidade < PROFUNDIDADE_MAXIMA:
+            for filho, tempo_filho in sorted(
+                chamados.get(funcao, {}).items(), key=lambda item: item[1], reverse=True
+            ):
+                if tempo_filho >= minimo and filho not in caminho:
+                    filhos.append(montar(filho, tempo_filho, caminho | {filho}, profundidade + 1))
+        return {
+            'funcao': _nome_funcao(*funcao),
+            'tempo_ms': round(tempo * 1000, 3),
+            'filhos': filhos,
+        }
+
+    return [
+        montar(raiz, stats.stats[raiz][3], frozenset({raiz}), 0)
+        for raiz in sorted(raizes, key=lambda f: stats.stats[f][3], reverse=True)
+        if stats.stats[raiz][3] >= minimo
+    ]
+
+
+# ----------------------------------------------------------------------
+# Perfil de uma requisição
+# ----------------------------------------------------------------------
+
+class Perfil:
+    """
+    Context manager que perfila o bloco e monta o relatório.
+
+        with Perfil(AMOSTRAGEM) as perfil:
+            response = get_response(request)
+        relatorio = perfil.relatorio()
+    """
+
+    def __init__(self, modo: str = DETERMINISTICO):
+        self.modo = modo
+        self._stack = ExitStack()
+        self._profiler: Optional[cProfile.Profile] = None
+        self._amostrador: Optional[Amostrador] = None
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        self.sql = LinhaDoTempoSQL(self.inicio)
+        for alias in connections:
+            self._stack.enter_context(connections[alias].execute_wrapper(self.sql))
+
+        if self.modo == DETERMINISTICO:
+            self._profiler = cProfile.Profile()
+            try:
+                self._profiler.enable()
+            except ValueError:
+                # Outro profiler já ativo na thread
+                logger.info('Perfil determinístico indisponível; usando amostragem')
+                self._profiler = None
+                self.modo = AMOSTRAGEM
+        if self.modo == AMOSTRAGEM:
+            self._amostrador = Amostrador(
+                threading.get_ident(), sys._getframe(1), intervalo_amostragem()
+            )
+            self._amostrador.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._profiler is not None:
+            self._profiler.disable()
+        if self._amostrador is not None:
+            self._amostrador.parar()
+        self.duracao = time.perf_counter() - self.inicio
+        self._stack.close()
+        return False
+
+    def relatorio(self) -> Dict:
+        if self._profiler is not None:
+            stats = pstats.Stats(self._profiler)
+            arvore, top = _arvore_cprofile(stats), _top_cprofile(stats)
+        else:
+            arvore, top = self._amostrador.arvore(), self._amostrador.top_funcoes()
+
+        return {
+            'modo': self.modo,
+            'duracao_ms': round(self.duracao * 1000, 3),
+            'amostras': self._amostrador.total if self._amostrador else None,
+            'queries': {
+                'total': self.sql.total,
+                'tempo_ms': round(self.sql.tempo * 1000, 3),
+                'omitidas': self.sql.total - len(self.sql.queries),
+                'linha_do_tempo': self.sql.queries,
+            },
+            'top_funcoes': top,
+            'arvore': arvore,
+        }
@@ -4,7 +4,6 @@ Fornece funcionalidades reutilizáveis para autenticação e sincronização de
 """
 
 import logging
-import requests
 from typing import Optional, Dict, List, Tuple, TYPE_CHECKING
 from django.conf import settings
 from django.db import transaction
@@ -92,6 +91,10 @@ class PortalAuthService:
                 'attributes': {}
             }
         
+        # requests só é importado aqui: só é usado fora do modo desenvolvimento
+        # e custa dezenas de ms no boot de cada worker
+        import requests
+
         try:
             response = requests.post(
                 f"{self.portal_url}/api/auth/validate",
@@ -1,14 +1,91 @@
 # common/test_runner.py
+import unittest
+
 from django.test.runner import DiscoverRunner
 from django.db import connection
 
+from common.utils import query_budget as budget
+
+
+class QueryBudgetTestResult(unittest.TextTestResult):
+    """
+    Resultado que envolve cada teste em um QueryBudget de detecção de N+1.
+    As violações são coletadas e reportadas ao final da execução.
+    Testes que exercitam N+1 de propósito podem definir
+    query_budget_ignorar = True (no método ou na classe).
+    """
+
+    n_mais_1 = budget.N_MAIS_1_PADRAO
+
+    def startTest(self, test):
+        metodo = getattr(test, getattr(test, '_testMethodName', ''), None)
+        ignorar = getattr(metodo, 'query_budget_ignorar', getattr(test, 'query_budget_ignorar', False))
+        self._budget = budget.QueryBudget(
+            n_mais_1=self.n_mais_1, nome=test.id(), modo='off' if ignorar else 'collect'
+        )
+        self._budget.__enter__()
+        super().startTest(test)
+
+    def stopTest(self, test):
+        super().stopTest(test)
+        self._budget.__exit__(None, None, None)
+
 
 class GPPTestRunner(DiscoverRunner):
     """
     Test runner customizado para GPP Platform
     Cria schemas necessários antes de executar migrations
+
+    Orçamento de queries (common.utils.query_budget):
+    - Sempre: orçamentos declarados com @query_budget falham o teste.
+    - --query-budget: também detecta N+1 em cada teste, coleta todas as
+      violações, imprime as pilhas ao final e falha a execução.
+      Requer --parallel 1 (o resultado por teste não atravessa processos).
     """
     
+    def __init__(self, query_budget=False, query_budget_n1=None, **kwargs):
+        super().__init__(**kwargs)
+        self.query_budget = query_budget
+        self.query_budget_n1 = query_budget_n1 or budget.N_MAIS_1_PADRAO
+    
+    @classmethod
+    def add_arguments(cls, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            '--query-budget',
+            action='store_true',
+            help='Detecta N+1 em todos os testes e falha a execução com as pilhas das violações.',
+        )
+        parser.add_argument(
+            '--query-budget-n1',
+            type=int,
+            default=None,
+            help='Repetições do mesmo SELECT que caracterizam N+1 (padrão: %d).' % budget.N_MAIS_1_PADRAO,
+        )
+    
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        budget.violacoes.clear()
+        budget.configurar('collect' if self.query_budget else 'raise')
+    
+    def teardown_test_environment(self, **kwargs):
+        super().teardown_test_environment(**kwargs)
+        budget.configurar(None)
+    
+    def get_resultclass(self):
+        if not self.query_budget:
+            return super().get_resultclass()
+        return type('GPPQueryBudgetResult', (QueryBudgetTestResult,), {'n_mais_1': self.query_budget_n1})
+    
+    def suite_result(self, suite, result, **kwargs):
+        falhas = super().suite_result(suite, result, **kwargs)
+        if self.query_budget and budget.violacoes:
+            self.log(f"\n=== Orçamento de queries: {len(budget.violacoes)} violação(ões) ===")
+            for violacao in budget.violacoes:
+                self.log(violacao.formatar() + "\n")
+            falhas += len(budget.violacoes)
+        return falhas
+    
     def setup_databases(self, **kwargs):
         """
         Configura banco de dados de teste com schemas customizados
@@ -0,0 +1,220 @@
+"""
+Testes do cache em dois níveis (common.cache).
+"""
+
+import threading
+import time
+
+from django.core.cache import cache, caches
+from django.db import connections
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from common import cache as cache_dois_niveis
+from common.cache import SUFIXO_TRAVA, LRULocal, TwoTierCache, parar_ouvintes
+from common.services.metrics import registry
+
+
+CACHES_MEMORIA = {
+    'default': {
+        'BACKEND': 'common.cache.TwoTierCache',
+        'LOCATION': 'teste-memoria',
+        'OPTIONS': {'COMPARTILHADO': 'compartilhado', 'SINGLE_FLIGHT_TIMEOUT': 2},
+    },
+    'compartilhado': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'teste-compartilhado',
+    },
+}
+
+
+class LRULocalTest(SimpleTestCase):
+
+    def test_expira_pelo_ttl(self):
+        lru = LRULocal()
+        lru.set('a', 1, ttl=0.05)
+        self.assertEqual(lru.get('a'), 1)
+        time.sleep(0.06)
+        self.assertIs(lru.get('a'), cache_dois_niveis._AUSENTE)
+
+    def test_remove_o_menos_usado(self):
+        lru = LRULocal(max_entradas=2)
+        lru.set('a', 1, 60)
+        lru.set('b', 2, 60)
+        lru.get('a')
+        lru.set('c', 3, 60)
+        self.assertIs(lru.get('b'), cache_dois_niveis._AUSENTE)
+        self.assertEqual((lru.get('a'), lru.get('c')), (1, 3))
+
+    def test_limite_de_bytes(self):
+        lru = LRULocal(max_bytes=1000)
+        lru.set('grande', b'x' * 2000, 60)
+        lru.set('a', b'x' * 400, 60)
+        lru.set('b', b'x' * 400, 60)
+        lru.set('c', b'x' * 400, 60)
+        self.assertEqual(len(lru), 2)
+        self.assertLessEqual(lru.bytes, 1000)
+        self.assertIs(lru.get('grande'), cache_dois_niveis._AUSENTE)
+
+    def test_valor_isolado(self):
+        lru = LRULocal()
+        valor = {'lista': [1]}
+        lru.set('a', valor, 60)
+        lru.get('a')['lista'].append(2)
+        self.assertEqual(lru.get('a'), {'lista': [1]})
+
+
+class TwoTierCacheTest(TestCase):
+    """Cache padrão: LRU local + tabela de cache no banco"""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_leitura_local_sem_query(self):
+        cache.set('chave', {'valor': 1})
+        with self.assertNumQueries(0):
+            self.assertEqual(cache.get('chave'), {'valor': 1})
+
+    def test_nivel_compartilhado_preenche_o_local(self):
+        cache.set('chave', 'valor')
+        cache.local.clear()  # como em outro worker
+
+        with self.assertNumQueries(1):
+            self.assertEqual(cache.get('chave'), 'valor')
+        with self.assertNumQueries(0):
+            self.assertEqual(cache.get('chave'), 'valor')
+
+    def test_delete_e_get_many(self):
+        cache.set_many({'a': 1, 'b': 2, 'c': 3})
+        cache.local.delete(cache.make_key('b'))
+        cache.delete('c')
+        self.assertEqual(cache.get_many(['a', 'b', 'c']), {'a': 1, 'b': 2})
+        self.assertFalse(cache.has_key('c'))
+
+    def test_incr_invalida_o_local(self):
+        cache.set('contador', 1)
+        self.assertEqual(cache.incr('contador', 2), 3)
+        self.assertEqual(cache.get('contador'), 3)
+
+    def test_metricas(self):
+        registry.limpar()
+        cache.set('chave', 1)
+        cache.get('chave')
+        cache.get('inexistente')
+        contadores = {
+            dict(labels)['resultado']: valor
+            for (nome, labels), valor in registry.contadores.items()
+            if nome == 'gpp_cache_operacoes_total'
+        }
+        self.assertEqual(contadores, {'hit_local': 1, 'miss': 1})
+
+
+class InvalidacaoTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.ouvinte = cache_dois_niveis.OuvinteInvalidacao('default', 'gpp_cache_teste')
+        self.ouvinte.lrus['default'] = cache.local
+
+    def test_aviso_de_outro_processo_remove_a_chave(self):
+        cache.set('chave', 1)
+        self.ouvinte.processar(f"outro|{cache.make_key('chave')}")
+        self.assertIs(cache.local.get(cache.make_key('chave')), cache_dois_niveis._AUSENTE)
+
+    def test_aviso_do_proprio_processo_e_ignorado(self):
+        cache.set('chave', 1)
+        self.ouvinte.processar(f"{cache_dois_niveis.ORIGEM}|{cache.make_key('chave')}")
+        self.assertEqual(cache.local.get(cache.make_key('chave')), 1)
+
+    def test_clear(self):
+        cache.set('chave', 1)
+        self.ouvinte.processar('outro|*')
+        self.assertEqual(len(cache.local), 0)
+
+
+class ListenNotifyTest(TestCase):
+    """Aviso real via NOTIFY, enviado por outra conexão (outro processo)"""
+
+    def setUp(self):
+        self.cache = TwoTierCache('teste-notify', {'OPTIONS': {
+            'COMPARTILHADO': 'compartilhado',
+            'NOTIFY_DATABASE': 'default',
+            'NOTIFY_CHANNEL': 'gpp_cache_teste',
+        }})
+        self.addCleanup(parar_ouvintes)
+
+    def _notify(self, payload):
+        wrapper = connections['default']
+        conexao = wrapper.get_new_connection(wrapper.get_connection_params())
+        try:
+            conexao.autocommit = True
+            with conexao.cursor() as cursor:
+                cursor.execute("SELECT pg_notify('gpp_cache_teste', %s)", [payload])
+        finally:
+            conexao.close()
+
+    def test_notify_remove_do_local(self):
+        self.cache.get('qualquer')  # inicia o ouvinte
+        ouvinte = cache_dois_niveis._ouvintes[('default', 'gpp_cache_teste')]
+        self.assertTrue(ouvinte.pronto.wait(5))
+
+        chave = self.cache.make_key('chave')
+        self.cache.local.set(chave, 'antigo', 60)
+        self._notify(f'outro|{chave}')
+
+        limite = time.monotonic() + 5
+        while self.cache.local.get(chave) is not cache_dois_niveis._AUSENTE and time.monotonic() < limite:
+            time.sleep(0.02)
+        self.assertIs(self.cache.local.get(chave), cache_dois_niveis._AUSENTE)
+
+
+@override_settings(CACHES=CACHES_MEMORIA)
+class SingleFlightTest(SimpleTestCase):
+
+    def setUp(self):
+        caches['default'].clear()
+
+    def test_um_calculo_por_chave(self):
+        chamadas = []
+
+        def calcular():
+            chamadas.append(1)
+            time.sleep(0.1)
+            return 'valor'
+
+        resultados = []
+        threads = [
+            threading.Thread(target=lambda: resultados.append(caches['default'].get_or_set('k', calcular)))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(chamadas), 1)
+        self.assertEqual(resultados, ['valor'] * 8)
+
+    def test_travas_compartilhadas_entre_threads(self):
+        """Backends de threads diferentes usam as mesmas travas por nome"""
+        backends = []
+        thread = threading.Thread(target=lambda: backends.append(caches['default']))
+        thread.start()
+        thread.join()
+
+        self.assertIsNot(backends[0], caches['default'])
+        self.assertIs(backends[0]._travas, caches['default']._travas)
+
+    def test_aguarda_calculo_de_outro_processo(self):
+        compartilhado = caches['compartilhado']
+        compartilhado.add(f'k{SUFIXO_TRAVA}', 'outro', 2)
+        threading.Timer(0.1, lambda: compartilhado.set('k', 'do outro')).start()
+
+        self.assertEqual(caches['default'].get_or_set('k', lambda: 'meu'), 'do outro')
+
+    def test_trava_expirada_calcula(self):
+        caches['compartilhado'].add(f'k{SUFIXO_TRAVA}', 'outro', 2)
+        with self.settings(CACHES={**CACHES_MEMORIA, 'default': {
+            **CACHES_MEMORIA['default'],
+            'OPTIONS': {'COMPARTILHADO': 'compartilhado', 'SINGLE_FLIGHT_TIMEOUT': 0.1},
+        }}):
+            self.assertEqual(caches['default'].get_or_set('k', lambda: 'meu'), 'meu')
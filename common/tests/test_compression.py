@@ -0,0 +1,167 @@
+"""
+Testes do CompressionMiddleware e do cache de respostas pré-comprimidas.
+"""
+
+import gzip
+import json
+
+from django.core.cache import cache
+from django.db import connection
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from carga_org_lot.models import TblOrganogramaVersao, TblOrgaoUnidade
+from common.middleware.compression import CompressionMiddleware, aceita_gzip
+from common.services.dados_sinteticos import EscalaSintetica, GeradorDadosSinteticos
+from common.utils import precompressao
+
+
+CORPO_JSON = json.dumps([{'orgao': 'SEGES', 'cargo': 'Analista'}] * 200).encode()
+
+
+def _middleware(response):
+    return CompressionMiddleware(lambda request: response)
+
+
+class CompressionMiddlewareTest(SimpleTestCase):
+
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def _get(self, accept_encoding='gzip, deflate, br'):
+        return self.factory.get('/', HTTP_ACCEPT_ENCODING=accept_encoding)
+
+    def test_comprime_json_acima_do_minimo(self):
+        response = HttpResponse(CORPO_JSON, content_type='application/json')
+        response['ETag'] = '"abc"'
+
+        response = _middleware(response)(self._get())
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), CORPO_JSON)
+        self.assertEqual(response['Content-Length'], str(len(response.content)))
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(response['ETag'], 'W/"abc"')
+
+    def test_abaixo_do_minimo_nao_comprime(self):
+        response = HttpResponse(b'{"ok": true}', content_type='application/json')
+        response = _middleware(response)(self._get())
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    @override_settings(GPP_COMPRESSION_CONTENT_TYPES=('application/json',))
+    def test_tipo_fora_da_lista_nao_comprime(self):
+        response = HttpResponse(b'x' * 5000, content_type='application/pdf')
+        response = _middleware(response)(self._get())
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response.content, b'x' * 5000)
+
+    def test_html_nao_comprime_por_padrao(self):
+        """Páginas HTML (com token CSRF) ficam fora do gzip por causa do BREACH"""
+        corpo = b'<input name="csrfmiddlewaretoken" value="x">' * 200
+        response = HttpResponse(corpo, content_type='text/html; charset=utf-8')
+        response = _middleware(response)(self._get())
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response.content, corpo)
+
+    @override_settings(GPP_COMPRESSION_ENABLED=False)
+    def test_desligado(self):
+        response = HttpResponse(CORPO_JSON, content_type='application/json')
+        response = _middleware(response)(self._get())
+        self.assertEqual(response.content, CORPO_JSON)
+
+    def test_cliente_sem_gzip(self):
+        for cabecalho in ('', 'br', 'gzip;q=0', 'identity'):
+            response = HttpResponse(CORPO_JSON, content_type='application/json')
+            response = _middleware(response)(self._get(cabecalho))
+            self.assertFalse(response.has_header('Content-Encoding'), cabecalho)
+
+    def test_aceita_gzip(self):
+        self.assertTrue(aceita_gzip(self._get('gzip;q=0.5')))
+        self.assertTrue(aceita_gzip(self._get('*')))
+        self.assertFalse(aceita_gzip(self._get('*, gzip;q=0')))
+
+    def test_fluxo_comprimido_por_pedacos(self):
+        pedacos = [b'[', b','.join([b'{"cpf": "000.000.000-00"}'] * 500), b']']
+        response = StreamingHttpResponse(iter(pedacos), content_type='application/json')
+
+        response = _middleware(response)(self._get())
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        corpo = b''.join(response.streaming_content)
+        self.assertEqual(gzip.decompress(corpo), b''.join(pedacos))
+
+
+class PrecompressaoOrganogramaTest(TestCase):
+    """Hierarquia de versões processadas servida do cache comprimido"""
+
+    databases = {'default', 'gpp_plataform_db'}
+
+    @classmethod
+    def setUpTestData(cls):
+        GeradorDadosSinteticos(EscalaSintetica(
+            patriarcas=1, profundidade=4, largura=3, lotacoes=1, acoes=1, usuarios=1
+        )).gerar()
+        cls.versao = TblOrganogramaVersao.objects.get()
+        cls.url = f'/api/v1/carga/organograma/{cls.versao.pk}/hierarquia/'
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient(HTTP_ACCEPT_ENCODING='gzip')
+        self.client.force_authenticate(user=self.versao.id_patriarca.id_usuario_criacao)
+
+    def test_acerto_sem_queries_da_view(self):
+        primeira = self.client.get(self.url)
+        self.assertEqual(primeira['Content-Encoding'], 'gzip')
+        esperado = json.loads(gzip.decompress(primeira.content))
+
+        with CaptureQueriesContext(connection) as consultas:
+            segunda = self.client.get(self.url)
+
+        self.assertEqual(segunda['Content-Encoding'], 'gzip')
+        self.assertEqual(json.loads(gzip.decompress(segunda.content)), esperado)
+        self.assertTrue(segunda.has_header('ETag'))
+        self.assertFalse(any('tblorgaounidade' in q['sql'] for q in consultas.captured_queries))
+
+    def test_etag_e_cliente_sem_gzip(self):
+        self.client.get(self.url)
+        etag = self.client.get(self.url)['ETag']
+
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        cliente = APIClient()
+        cliente.force_authenticate(user=self.versao.id_patriarca.id_usuario_criacao)
+        response = cliente.get(self.url)
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response.json()['organograma_id'], self.versao.pk)
+
+    def test_acerto_respeita_queryset_da_view(self):
+        """O filtro do queryset e o 404 valem também para o acerto"""
+        self.client.get(self.url)
+        outro_patriarca = self.versao.id_patriarca_id + 1000
+
+        self.assertEqual(self.client.get(f'{self.url}?patriarca={outro_patriarca}').status_code, 404)
+        self.assertEqual(
+            self.client.get(f'{self.url}?patriarca={self.versao.id_patriarca_id}').status_code, 200
+        )
+
+    def test_versao_nao_processada_nao_vai_para_cache(self):
+        TblOrganogramaVersao.objects.filter(pk=self.versao.pk).update(
+            str_status_processamento='EM_PROCESSAMENTO'
+        )
+        self.client.get(self.url)
+        self.assertIsNone(cache.get(precompressao.chave('carga:organograma-hierarquia', self.versao.pk)))
+
+    def test_alteracao_de_orgao_invalida(self):
+        self.client.get(self.url)
+        chave = precompressao.chave('carga:organograma-hierarquia', self.versao.pk)
+        self.assertIsNotNone(cache.get(chave))
+
+        orgao = TblOrgaoUnidade.objects.filter(id_organograma_versao=self.versao).first()
+        orgao.str_nome = 'Unidade Renomeada'
+        orgao.save()
+
+        self.assertIsNone(cache.get(chave))
+        corpo = json.loads(gzip.decompress(self.client.get(self.url).content))
+        self.assertIn('Unidade Renomeada', json.dumps(corpo, ensure_ascii=False))
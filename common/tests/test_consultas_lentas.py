@@ -0,0 +1,104 @@
+"""
+Testes do log de queries lentas.
+"""
+
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+
+from common.middleware.consultas_lentas import ConsultasLentasMiddleware
+from common.models import ConsultaLenta
+from common.services import consultas_lentas
+from common.services.consultas_lentas import FORA_DE_REQUISICAO, fingerprint, normalizar_sql
+
+
+class NormalizarSqlTest(SimpleTestCase):
+
+    def test_literais_e_listas(self):
+        self.assertEqual(
+            normalizar_sql("SELECT t1.col2 FROM tbl WHERE id IN (%s, %s,  %s)\n AND nome = 'O''Brien' LIMIT 21"),
+            'SELECT t1.col2 FROM tbl WHERE id IN (...) AND nome = ? LIMIT ?',
+        )
+
+    def test_linhas_de_insert(self):
+        self.assertEqual(
+            normalizar_sql('INSERT INTO "t" ("a", "b") VALUES (%s, %s), (%s, %s) RETURNING "t"."id"'),
+            'INSERT INTO "t" ("a", "b") VALUES (...) RETURNING "t"."id"',
+        )
+
+    def test_mesmo_fingerprint_para_parametros_diferentes(self):
+        a = normalizar_sql('SELECT * FROM "tbl" WHERE "id" IN (%s, %s) LIMIT 10')
+        b = normalizar_sql('SELECT * FROM "tbl" WHERE "id" IN (%s) LIMIT 5')
+        self.assertEqual(fingerprint(a), fingerprint(b))
+
+
+@override_settings(GPP_SLOW_QUERY_MS=20)
+class ConsultasLentasTest(TestCase):
+
+    def setUp(self):
+        consultas_lentas.registro.limpar()
+        self.addCleanup(consultas_lentas.registro.limpar)
+
+    def _query_lenta(self):
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_sleep(0.03)')
+
+    def test_fora_de_requisicao(self):
+        with self.assertLogs('common.services.consultas_lentas', 'WARNING'):
+            self._query_lenta()
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')  # rápida: não entra
+
+        [(chave, agregado)] = consultas_lentas.registro.agregados.items()
+        self.assertEqual(chave[1:], (FORA_DE_REQUISICAO, FORA_DE_REQUISICAO))
+        self.assertEqual(agregado.sql, 'SELECT pg_sleep(?)')
+        self.assertGreaterEqual(agregado.tempo_max_ms, 20)
+        self.assertIn('test_consultas_lentas.py', agregado.pilha)
+
+    def test_atribuida_a_view_e_aplicacao(self):
+        def view(request):
+            request.resolver_match = type('Match', (), {'view_name': 'carga:relatorio'})()
+            request.app_context = {'code': 'CARGA_ORG_LOT'}
+            self._query_lenta()
+            return HttpResponse()
+
+        with self.assertLogs('common.services.consultas_lentas', 'WARNING') as logs:
+            ConsultasLentasMiddleware(view)(RequestFactory().get('/api/v1/carga/relatorio/'))
+
+        [chave] = consultas_lentas.registro.agregados
+        self.assertEqual(chave[1:], ('carga:relatorio', 'CARGA_ORG_LOT'))
+        self.assertIn('[carga:relatorio / CARGA_ORG_LOT]', logs.output[0])
+
+    def test_flush_soma_na_tabela(self):
+        with self.assertLogs('common.services.consultas_lentas', 'WARNING'):
+            self._query_lenta()
+            self.assertEqual(consultas_lentas.registro.flush(forcar=True), 1)
+            self._query_lenta()
+            self._query_lenta()
+            consultas_lentas.registro.flush(forcar=True)
+
+        linha = ConsultaLenta.objects.get()
+        self.assertEqual(linha.intexecucoes, 3)
+        self.assertEqual(linha.strview, FORA_DE_REQUISICAO)
+        self.assertGreaterEqual(linha.flttempototalms, 60)
+        self.assertIn('test_consultas_lentas.py', linha.strpilha)
+
+        saida = StringIO()
+        call_command('consultas_lentas', '--pilha', stdout=saida)
+        self.assertIn(linha.strfingerprint, saida.getvalue())
+        self.assertIn('SELECT pg_sleep(?)', saida.getvalue())
+
+    def test_gravar_ao_sair(self):
+        """Comandos não passam pelo middleware: a saída do processo grava o resto"""
+        with self.assertLogs('common.services.consultas_lentas', 'WARNING'):
+            self._query_lenta()
+        consultas_lentas.gravar_ao_sair()
+        self.assertFalse(ConsultaLenta.objects.exists())  # desligado nos testes
+
+        with self.settings(GPP_SLOW_QUERY_FLUSH_AO_SAIR=True):
+            consultas_lentas.gravar_ao_sair()
+        self.assertEqual(ConsultaLenta.objects.get().intexecucoes, 1)
+        self.assertEqual(consultas_lentas.registro.agregados, {})
@@ -0,0 +1,127 @@
+"""
+Testes do gerador de dados sintéticos e do benchmark de endpoints.
+"""
+
+import io
+import random
+import uuid
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from accounts.models import User, UserRole
+from acoes_pngi.models import Acoes, RelacaoAcaoUsuarioResponsavel
+from carga_org_lot.models import TblLotacao, TblOrgaoUnidade, TblPatriarca
+from common.services.benchmark import comparar, executar_benchmark, percentil
+from common.services.dados_sinteticos import (
+    EMAIL_BENCHMARK,
+    EscalaSintetica,
+    GeradorDadosSinteticos,
+    gerar_cpf,
+)
+
+
+ESCALA = EscalaSintetica(
+    patriarcas=2, profundidade=3, largura=2, lotacoes=301, acoes=15, usuarios=20
+)
+
+
+class DadosSinteticosTest(TestCase):
+    """
+    Geração em escala reduzida: volumes, determinismo, limpeza e benchmark.
+    """
+
+    databases = {'default', 'gpp_plataform_db'}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.gerador = GeradorDadosSinteticos(ESCALA, seed=7)
+        cls.resumo = cls.gerador.gerar()
+
+    def test_volumes_gerados(self):
+        """Gera os volumes pedidos, com lotações via COPY"""
+        self.assertEqual(self.resumo['usuarios'], 20)
+        self.assertEqual(TblPatriarca.objects.filter(str_sigla_patriarca__startswith='SINT_').count(), 2)
+        self.assertEqual(TblLotacao.objects.count(), 301)
+        self.assertEqual(Acoes.objects.filter(strapelido__startswith='SINT_').count(), 15)
+        self.assertTrue(RelacaoAcaoUsuarioResponsavel.objects.exists())
+        self.assertEqual(
+            UserRole.objects.filter(user__email=EMAIL_BENCHMARK).count(), 2
+        )
+        niveis = set(TblOrgaoUnidade.objects.values_list('int_nivel_hierarquia', flat=True))
+        self.assertEqual(niveis, {1, 2, 3})
+
+        lotacao = TblLotacao.objects.filter(flg_valido=True).first()
+        self.assertLessEqual(lotacao.id_orgao_lotacao.int_nivel_hierarquia, 2)
+        self.assertEqual(len(lotacao.str_cpf), 14)
+
+    def test_cpf_deterministico_e_valido(self):
+        """Mesma semente gera os mesmos CPFs, com dígitos verificadores corretos"""
+        primeiro = [gerar_cpf(random.Random(1)) for _ in range(3)]
+        segundo = [gerar_cpf(random.Random(1)) for _ in range(3)]
+        self.assertEqual(primeiro, segundo)
+        self.assertEqual(gerar_cpf(random.Random(3)), gerar_cpf(random.Random(3)))
+
+        digitos = [int(d) for d in primeiro[0] if d.isdigit()]
+        soma = sum(d * p for d, p in zip(digitos[:9], range(10, 1, -1)))
+        self.assertEqual(digitos[9], (soma * 10) % 11 % 10)
+        self.assertNotEqual(gerar_cpf(random.Random(1), valido=False), primeiro[0])
+
+    def test_senha_fora_do_codigo(self):
+        """Senha aleatória só para o benchmark; os demais não fazem login"""
+        self.assertTrue(self.gerador.senha_gerada)
+        self.assertGreaterEqual(len(self.gerador.senha), 20)
+        self.assertNotEqual(GeradorDadosSinteticos(ESCALA, seed=7).senha, self.gerador.senha)
+        self.assertTrue(User.objects.get(email=EMAIL_BENCHMARK).check_password(self.gerador.senha))
+        outro = User.objects.filter(email__startswith='usuario').first()
+        self.assertFalse(outro.has_usable_password())
+
+    def test_comando_exige_debug(self):
+        """Sem DEBUG, o comando só roda com --permitir-em-producao"""
+        with self.assertRaises(CommandError):
+            call_command('gerar_dados_sinteticos', '--limpar')
+        self.assertTrue(GeradorDadosSinteticos.existe())
+        call_command('gerar_dados_sinteticos', '--limpar', '--permitir-em-producao', stdout=io.StringIO())
+        self.assertFalse(GeradorDadosSinteticos.existe())
+
+    def test_limpar(self):
+        """limpar() remove apenas os dados marcados"""
+        outro = User.objects.create_user(email='real@example.com', password='x', name='Real')
+        real = TblPatriarca.objects.first()
+        real.pk, real.id_externo_patriarca = None, uuid.uuid4()
+        real.str_sigla_patriarca, real.id_usuario_criacao = 'SINTRA', outro
+        real.save()
+        GeradorDadosSinteticos.limpar()
+
+        self.assertFalse(GeradorDadosSinteticos.existe())
+        self.assertEqual(TblLotacao.objects.count(), 0)
+        self.assertFalse(Acoes.objects.filter(strapelido__startswith='SINT').exists())
+        self.assertTrue(User.objects.filter(pk=outro.pk).exists())
+        self.assertEqual(list(TblPatriarca.objects.values_list('str_sigla_patriarca', flat=True)), ['SINTRA'])
+
+    def test_benchmark(self):
+        """O benchmark mede todos os endpoints e o relatório é comparável"""
+        relatorio = executar_benchmark(iteracoes=2, aquecimento=0, senha=self.gerador.senha)
+
+        self.assertIn('commit', relatorio)
+        self.assertEqual(
+            set(relatorio['endpoints']),
+            {
+                'login', 'carga_dashboard_stats', 'carga_lotacao_registros',
+                'carga_lotacao_registros_pagina_final', 'carga_organograma_hierarquia',
+                'acoes_list', 'acoes_detail',
+            },
+        )
+        for nome, medida in relatorio['endpoints'].items():
+            self.assertEqual(medida['status'], [200], nome)
+            self.assertGreater(medida['queries'], 0, nome)
+            self.assertLessEqual(medida['p50_ms'], medida['p95_ms'])
+
+        linhas = comparar(relatorio, relatorio)
+        self.assertTrue(all(linha['p95_var_pct'] == 0 for linha in linhas))
+
+    def test_percentil(self):
+        valores = list(range(1, 101))
+        self.assertEqual(percentil(valores, 50), 50)
+        self.assertEqual(percentil(valores, 95), 95)
@@ -0,0 +1,146 @@
+"""
+Testes do roteamento de leituras para réplicas (common.db_router).
+
+O alias 'gpp_plataform_db' (espelho de 'default' nos testes) faz o papel de
+réplica.
+"""
+
+from unittest.mock import patch
+
+from django.db import transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+from acoes_pngi.db_router import AcoesPNGIRouter
+from acoes_pngi.models import Acoes
+from carga_org_lot.db_router import CargaOrgLotRouter
+from carga_org_lot.models import TblPatriarca
+from common import db_router
+from common.middleware.replicas import COOKIE_PRIMARIO, ReplicaRoutingMiddleware
+
+
+REPLICA = 'gpp_plataform_db'
+
+
+@override_settings(GPP_DB_REPLICAS=[REPLICA])
+class ReplicaRouterTest(TestCase):
+    """
+    Escolha do banco de leitura pelos routers das apps.
+    """
+
+    databases = {'default', 'gpp_plataform_db'}
+
+    def setUp(self):
+        db_router.limpar_atrasos()
+        self.tokens = db_router.iniciar_requisicao()
+        self.router = AcoesPNGIRouter()
+
+    def tearDown(self):
+        db_router.encerrar_requisicao(self.tokens)
+
+    def test_leitura_na_replica(self):
+        """Sem escrita nem transação, leituras vão para a réplica (atraso 0)"""
+        self.assertEqual(self.router.db_for_read(Acoes), REPLICA)
+        self.assertEqual(CargaOrgLotRouter().db_for_read(TblPatriarca), REPLICA)
+        self.assertEqual(self.router.db_for_write(Acoes), 'default')
+
+    @override_settings(GPP_DB_REPLICAS=[])
+    def test_sem_replicas(self):
+        self.assertEqual(self.router.db_for_read(Acoes), 'default')
+
+    def test_leitura_apos_escrita_no_primario(self):
+        """Depois de uma escrita no contexto, as leituras ficam no primário"""
+        self.router.db_for_write(Acoes)
+        self.assertEqual(self.router.db_for_read(Acoes), 'default')
+
+    def test_transacao_aberta(self):
+        with transaction.atomic():
+            self.assertEqual(self.router.db_for_read(Acoes), 'default')
+        self.assertEqual(self.router.db_for_read(Acoes), REPLICA)
+
+    def test_opt_out(self):
+        """primario() e @usar_primario forçam o primário"""
+        with db_router.primario():
+            self.assertEqual(self.router.db_for_read(Acoes), 'default')
+
+        @db_router.usar_primario
+        def view(request):
+            return self.router.db_for_read(Acoes)
+
+        self.assertEqual(view(None), 'default')
+        self.assertTrue(db_router.view_usa_primario(view, 'GET'))
+        self.assertEqual(self.router.db_for_read(Acoes), REPLICA)
+
+    def test_atraso_de_replicacao(self):
+        """Réplica atrasada ou fora do ar é ignorada até a próxima medição"""
+        with patch.object(db_router, 'medir_atraso', return_value=60.0):
+            self.assertEqual(self.router.db_for_read(Acoes), 'default')
+
+        db_router.limpar_atrasos()
+        with patch.object(db_router, 'medir_atraso', return_value=None) as medir:
+            self.assertEqual(self.router.db_for_read(Acoes), 'default')
+            self.assertEqual(self.router.db_for_read(Acoes), 'default')
+        self.assertEqual(medir.call_count, 1)
+
+    def test_relacao_entre_primario_e_replica(self):
+        primario, replica = Acoes(), Acoes()
+        primario._state.db, replica._state.db = 'default', REPLICA
+        self.assertTrue(self.router.allow_relation(primario, replica))
+
+
+@override_settings(GPP_DB_REPLICAS=[REPLICA])
+class ReplicaRoutingMiddlewareTest(TestCase):
+    """
+    Estado por requisição e cookie de permanência no primário.
+    """
+
+    databases = {'default', 'gpp_plataform_db'}
+
+    def setUp(self):
+        db_router.limpar_atrasos()
+        self.factory = RequestFactory()
+        self.router = AcoesPNGIRouter()
+
+    def _middleware(self, escrever=False):
+        def view(request):
+            if escrever:
+                self.router.db_for_write(Acoes)
+            return HttpResponse(self.router.db_for_read(Acoes))
+        return ReplicaRoutingMiddleware(view)
+
+    def test_escrita_grava_cookie(self):
+        response = self._middleware(escrever=True)(self.factory.get('/'))
+        self.assertEqual(response.content, b'default')
+        self.assertIn(COOKIE_PRIMARIO, response.cookies)
+
+        response = self._middleware()(self.factory.get('/'))
+        self.assertEqual(response.content, REPLICA.encode())
+        self.assertNotIn(COOKIE_PRIMARIO, response.cookies)
+
+    def test_cookie_mantem_primario(self):
+        request = self.factory.get('/')
+        request.COOKIES[COOKIE_PRIMARIO] = '9999999999'
+        self.assertEqual(self._middleware()(request).content, b'default')
+
+        request = self.factory.get('/')
+        request.COOKIES[COOKIE_PRIMARIO] = '1'
+        self.assertEqual(self._middleware()(request).content, REPLICA.encode())
+
+    def test_metodo_nao_seguro(self):
+        self.assertEqual(self._middleware()(self.factory.post('/')).content, b'default')
+
+    def test_process_view_com_opt_out(self):
+        class View:
+            usar_banco_primario = True
+
+        def view_func(request):
+            return None
+        view_func.cls = View
+
+        middleware = self._middleware()
+        tokens = db_router.iniciar_requisicao()
+        try:
+            middleware.process_view(self.factory.get('/'), view_func, (), {})
+            self.assertEqual(self.router.db_for_read(Acoes), 'default')
+        finally:
+            db_router.encerrar_requisicao(tokens)
@@ -0,0 +1,39 @@
+"""
+Testes do boot sem acesso ao banco e do perfil de inicialização.
+"""
+
+from django.core.handlers.wsgi import WSGIHandler
+from django.test import SimpleTestCase, TestCase
+
+from common.services.inicializacao import agrupar_por_pacote, ler_importtime
+
+
+SAIDA_IMPORTTIME = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     django.utils.version
+import time:       300 |        420 |   django.utils
+import time:       500 |        920 | django
+import time:      2000 |       2000 | requests
+"""
+
+
+class BootSemQueriesTest(TestCase):
+
+    def test_construcao_dos_middlewares(self):
+        with self.assertNumQueries(0):
+            WSGIHandler()
+
+
+class LerImporttimeTest(SimpleTestCase):
+
+    def test_linhas(self):
+        modulos = ler_importtime(SAIDA_IMPORTTIME)
+
+        self.assertEqual([m.modulo for m in modulos],
+                         ['django.utils.version', 'django.utils', 'django', 'requests'])
+        self.assertEqual((modulos[0].proprio_us, modulos[0].acumulado_us, modulos[0].nivel), (120, 120, 2))
+        self.assertEqual(modulos[2].nivel, 0)
+
+    def test_agrupar_por_pacote(self):
+        pacotes = agrupar_por_pacote(ler_importtime(SAIDA_IMPORTTIME))
+        self.assertEqual(pacotes, {'requests': 2000, 'django': 920})
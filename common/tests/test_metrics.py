@@ -0,0 +1,125 @@
+"""
+Testes do RequestMetricsMiddleware e do endpoint /metrics.
+"""
+
+import os
+import tempfile
+import time
+
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+
+from common.services.metrics import MetricsRegistry, coletar, registry, render_prometheus
+
+
+User = get_user_model()
+
+
+class RequestMetricsMiddlewareTest(TestCase):
+    """
+    Testes da coleta de métricas por view e aplicação.
+    """
+
+    databases = {'default', 'gpp_plataform_db'}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='metrics@example.com', password='x', name='Metrics')
+        cls.staff = User.objects.create_user(
+            email='metrics-staff@example.com', password='x', name='Staff', is_staff=True
+        )
+
+    def setUp(self):
+        registry.limpar()
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _serie(self, nome, view):
+        for (n, labels), serie in registry.histogramas.items():
+            if n == nome and dict(labels).get('view') == view:
+                return dict(labels), serie
+        self.fail(f'Série {nome} para {view} não registrada')
+
+    def test_registra_queries_e_rotulos(self):
+        """Requisição gera histogramas rotulados por view e app"""
+        self.client.get('/api/v1/acoes_pngi/eixos/')
+
+        labels, queries = self._serie('gpp_db_queries_per_request', 'acoes_pngi_api:eixo-list')
+        self.assertEqual(labels['app'], 'ACOES_PNGI')
+        self.assertGreaterEqual(queries[-1], 1)
+        self._serie('gpp_http_response_size_bytes', 'acoes_pngi_api:eixo-list')
+
+    def test_endpoint_prometheus(self):
+        """/metrics expõe histogramas e contadores no formato texto"""
+        self.client.get('/api/v1/acoes_pngi/eixos/')
+        self.client.force_login(self.staff)
+        response = self.client.get('/metrics')
+
+        self.assertEqual(response.status_code, 200)
+        texto = response.content.decode()
+        self.assertIn('# TYPE gpp_http_request_duration_seconds histogram', texto)
+        self.assertIn('view="acoes_pngi_api:eixo-list"', texto)
+        self.assertIn('le="+Inf"', texto)
+        self.assertIn('gpp_http_requests_total{', texto)
+
+    @override_settings(GPP_METRICS_TOKEN='segredo')
+    def test_endpoint_exige_token(self):
+        """Com GPP_METRICS_TOKEN, /metrics exige Bearer token"""
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer segredo')
+        self.assertEqual(response.status_code, 200)
+
+    def test_endpoint_sem_token_exige_staff(self):
+        """Sem GPP_METRICS_TOKEN, /metrics só atende staff (ou DEBUG)"""
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        with override_settings(DEBUG=True):
+            self.assertEqual(self.client.get('/metrics').status_code, 200)
+        self.client.force_login(self.staff)
+        self.assertEqual(self.client.get('/metrics').status_code, 200)
+
+    def test_agrega_snapshots_de_workers(self):
+        """Snapshots de vários processos no diretório compartilhado são somados"""
+        with tempfile.TemporaryDirectory() as diretorio, override_settings(GPP_METRICS_DIR=diretorio):
+            outro_worker = MetricsRegistry()
+            outro_worker._arquivo = f'{diretorio}/metrics_99999_0.json'
+            outro_worker.incrementar('gpp_http_requests_total', (('view', 'x'),), 3)
+            outro_worker.flush(forcar=True)
+            registry.incrementar('gpp_http_requests_total', (('view', 'x'),), 2)
+
+            total = coletar()
+
+        self.assertEqual(total.contadores[('gpp_http_requests_total', (('view', 'x'),))], 5)
+
+    @override_settings(GPP_METRICS_SNAPSHOT_TTL=60)
+    def test_remove_snapshots_expirados(self):
+        """Snapshot de worker encerrado sai da soma e do diretório após o TTL"""
+        with tempfile.TemporaryDirectory() as diretorio, override_settings(GPP_METRICS_DIR=diretorio):
+            morto = MetricsRegistry()
+            morto._arquivo = f'{diretorio}/metrics_99998_0.json'
+            morto.incrementar('gpp_http_requests_total', (('view', 'x'),), 3)
+            morto.flush(forcar=True)
+            antigo = time.time() - 120
+            os.utime(morto._arquivo, (antigo, antigo))
+            registry.incrementar('gpp_http_requests_total', (('view', 'x'),), 2)
+
+            total = coletar()
+            existe = os.path.exists(morto._arquivo)
+
+        self.assertEqual(total.contadores[('gpp_http_requests_total', (('view', 'x'),))], 2)
+        self.assertFalse(existe)
+
+    def test_overhead_de_registro(self):
+        """Registrar uma requisição custa poucos microssegundos"""
+        registro = MetricsRegistry()
+        labels = (('view', 'v'), ('app', 'a'))
+        inicio = time.perf_counter()
+        for _ in range(10000):
+            registro.observar('gpp_http_request_duration_seconds', labels, 0.03)
+            registro.observar('gpp_db_queries_per_request', labels, 4)
+        media = (time.perf_counter() - inicio) / 10000
+
+        self.assertLess(media, 0.0001)
+        self.assertIn('gpp_db_queries_per_request_count{view="v",app="a"} 10000', render_prometheus(registro))
@@ -54,6 +54,15 @@ class AppContextMiddlewareTest(TestCase):
         self.factory = RequestFactory()
         self.middleware = AppContextMiddleware(dummy_get_response)
     
+    def test_construcao_sem_queries(self):
+        """O cache de aplicações só é carregado na primeira requisição"""
+        with self.assertNumQueries(0):
+            middleware = AppContextMiddleware(dummy_get_response)
+        
+        with self.assertNumQueries(1):
+            middleware(self.factory.get('/api/v1/carga/'))
+            middleware(self.factory.get('/api/v1/portal/'))
+    
     def test_detect_acoes_pngi_api(self):
         """Testa detecção de Ações PNGI via API"""
         request = self.factory.get('/api/v1/acoes_pngi/eixos/')
@@ -0,0 +1,129 @@
+"""
+Testes do perfilamento sob demanda.
+"""
+
+import time
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from common.middleware.perfilamento import PerfilamentoMiddleware
+
+
+def funcao_lenta():
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1')
+    time.sleep(0.05)
+
+
+def _nomes(arvore):
+    for no in arvore:
+        yield no['funcao']
+        yield from _nomes(no['filhos'])
+
+
+@override_settings(GPP_PROFILING_ENABLED=True)
+class PerfilamentoTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user(
+            email='staff@example.com', password='x', name='Staff', is_staff=True
+        )
+        cls.comum = User.objects.create_user(email='comum@example.com', password='x', name='Comum')
+
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+
+    def _executar(self, modo='1', usuario=None):
+        def view(request):
+            funcao_lenta()
+            return HttpResponse('ok')
+
+        request = self.factory.get('/api/v1/carga/relatorio/', HTTP_X_GPP_PROFILE=modo)
+        request.user = usuario or self.staff
+        return PerfilamentoMiddleware(view)(request)
+
+    def _relatorio(self, response):
+        return cache.get(f"gpp:perfil:relatorio:{response['X-GPP-Profile-Id']}")
+
+    def test_deterministico(self):
+        relatorio = self._relatorio(self._executar('1'))
+
+        self.assertEqual(relatorio['modo'], 'deterministico')
+        self.assertEqual(relatorio['usuario'], 'staff@example.com')
+        self.assertEqual(relatorio['queries']['total'], 1)
+        self.assertEqual(relatorio['queries']['linha_do_tempo'][0]['sql'], 'SELECT 1')
+        self.assertTrue(any('funcao_lenta' in f['funcao'] for f in relatorio['top_funcoes']))
+        self.assertTrue(any('funcao_lenta' in nome for nome in _nomes(relatorio['arvore'])))
+
+    def test_amostragem(self):
+        relatorio = self._relatorio(self._executar('amostragem'))
+
+        self.assertEqual(relatorio['modo'], 'amostragem')
+        self.assertGreater(relatorio['amostras'], 0)
+        self.assertTrue(any('funcao_lenta' in nome for nome in _nomes(relatorio['arvore'])))
+
+    def test_nao_staff_nao_e_perfilado(self):
+        response = self._executar(usuario=self.comum)
+        self.assertFalse(response.has_header('X-GPP-Profile-Id'))
+
+    @override_settings(GPP_PROFILING_ENABLED=False)
+    def test_desligado(self):
+        self.assertFalse(self._executar().has_header('X-GPP-Profile-Id'))
+
+    @override_settings(GPP_PROFILING_MAX_PER_MINUTE=1)
+    def test_limite_por_minuto(self):
+        self.assertTrue(self._executar().has_header('X-GPP-Profile-Id'))
+        response = self._executar()
+        self.assertFalse(response.has_header('X-GPP-Profile-Id'))
+        self.assertEqual(response['X-GPP-Profile'], 'limite')
+
+    def test_relatorio_pela_api(self):
+        client = APIClient()
+        client.force_login(self.staff)
+        response = client.get('/perfil/inexistente', HTTP_X_GPP_PROFILE='1')
+        self.assertEqual(response.status_code, 404)
+
+        relatorio = client.get(f"/perfil/{response['X-GPP-Profile-Id']}")
+        self.assertEqual(relatorio.status_code, 200)
+        self.assertEqual(relatorio.json()['view'], 'perfil')
+
+        outro = APIClient()
+        outro.force_authenticate(self.comum)
+        self.assertEqual(outro.get(f"/perfil/{response['X-GPP-Profile-Id']}").status_code, 403)
+
+    def test_token_nao_staff_nao_e_perfilado(self):
+        client = APIClient()
+        client.force_authenticate(self.comum)  # autenticado só na view (DRF)
+        response = client.get('/perfil/qualquer', HTTP_X_GPP_PROFILE='1')
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(response.has_header('X-GPP-Profile-Id'))
+
+        token = Token.objects.create(user=self.comum)
+        response = APIClient().get(
+            '/perfil/qualquer', HTTP_X_GPP_PROFILE='1', HTTP_AUTHORIZATION=f'Token {token.key}'
+        )
+        self.assertFalse(response.has_header('X-GPP-Profile-Id'))
+
+    def test_token_staff_e_perfilado(self):
+        token = Token.objects.create(user=self.staff)
+        response = APIClient().get(
+            '/perfil/qualquer', HTTP_X_GPP_PROFILE='1', HTTP_AUTHORIZATION=f'Token {token.key}'
+        )
+        self.assertEqual(response.status_code, 404)
+        self.assertTrue(response.has_header('X-GPP-Profile-Id'))
+
+    @override_settings(GPP_PROFILING_MAX_PER_MINUTE=1)
+    def test_anonimo_nao_gasta_o_limite(self):
+        for _ in range(3):
+            response = self._executar(usuario=AnonymousUser())
+            self.assertFalse(response.has_header('X-GPP-Profile'))
+        self.assertTrue(self._executar().has_header('X-GPP-Profile-Id'))
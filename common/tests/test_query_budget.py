@@ -0,0 +1,72 @@
+"""
+Testes do orçamento de queries (common.utils.query_budget).
+"""
+
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+
+from common.utils import query_budget as budget
+from common.utils.query_budget import QueryBudgetExceeded, query_budget
+
+
+User = get_user_model()
+
+
+class QueryBudgetTest(TestCase):
+    """
+    Testes do limite de queries e da detecção de N+1.
+    """
+
+    databases = {'default', 'gpp_plataform_db'}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [
+            User.objects.create_user(email=f'budget{n}@example.com', password='x', name=f'U{n}')
+            for n in range(6)
+        ]
+
+    def test_dentro_do_orcamento(self):
+        """Trecho dentro do limite não acusa violação"""
+        with query_budget(max_queries=1, modo='raise') as orcamento:
+            list(User.objects.filter(email__startswith='budget'))
+        self.assertEqual(orcamento.total, 1)
+
+    def test_orcamento_estourado(self):
+        """Exceder o limite levanta QueryBudgetExceeded com a pilha"""
+        with self.assertRaises(QueryBudgetExceeded) as contexto:
+            with query_budget(max_queries=1, modo='raise', nome='teste'):
+                User.objects.count()
+                User.objects.exists()
+
+        self.assertIn('[teste] 2 queries executadas, orçamento de 1', str(contexto.exception))
+        self.assertIn('test_query_budget.py', str(contexto.exception))
+
+    def test_detecta_n_mais_1(self):
+        """Mesmo SELECT com parâmetros diferentes acusa N+1"""
+        # N+1 proposital: fora da detecção global do runner (--query-budget)
+        with self.assertRaises(QueryBudgetExceeded) as contexto:
+            with query_budget(n_mais_1=5, modo='raise'):
+                for user in self.users:
+                    User.objects.get(pk=user.pk)
+
+        self.assertIn('Possível N+1: SQL repetido 6x', str(contexto.exception))
+
+    test_detecta_n_mais_1.query_budget_ignorar = True
+
+    def test_mesmos_parametros_nao_e_n_mais_1(self):
+        """Repetir exatamente a mesma consulta não é N+1"""
+        with query_budget(n_mais_1=3, modo='raise'):
+            for _ in range(5):
+                User.objects.filter(pk=self.users[0].pk).exists()
+
+    def test_modo_collect_e_decorator(self):
+        """No modo collect a violação é registrada sem interromper"""
+        @query_budget(max_queries=0, modo='collect')
+        def consulta():
+            return User.objects.count()
+
+        antes = len(budget.violacoes)
+        self.assertEqual(consulta(), len(self.users))
+        self.assertEqual(len(budget.violacoes), antes + 1)
+        self.assertIn('consulta', budget.violacoes.pop().nome)
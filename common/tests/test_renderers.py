@@ -0,0 +1,106 @@
+"""
+Testes do renderer/parser JSON rápidos e da resposta JSON em fluxo.
+"""
+
+import io
+import json
+import uuid
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+from django.test import SimpleTestCase
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from common.parsers import FastJSONParser
+from common.renderers import FastJSONRenderer, StreamingJSONResponse, stream_json_list
+from common.services.benchmark import comparar_serializacao
+
+
+PAYLOAD = {
+    'id': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+    'criado_em': datetime(2026, 3, 1, 12, 30, 15, 123456, tzinfo=dt_timezone.utc),
+    'data': date(2026, 3, 1),
+    'hora': time(8, 15, 30, 500000),
+    'duracao': timedelta(hours=1, seconds=5),
+    'valor': Decimal('1234.50'),
+    'rotulo': gettext_lazy('Ativo'),
+    'texto': 'Órgão linha',
+    7: 'chave inteira',
+    'lista': [1, 2.5, None, True, {'aninhado': 'ção'}],
+}
+
+
+class FastJSONRendererTest(SimpleTestCase):
+    """
+    Mesma saída do JSONRenderer do DRF.
+    """
+
+    def test_saida_identica_ao_drf(self):
+        self.assertEqual(FastJSONRenderer().render(PAYLOAD), JSONRenderer().render(PAYLOAD))
+
+    def test_indentacao_usa_drf(self):
+        renderizado = FastJSONRenderer().render(
+            {'a': 1}, 'application/json; indent=4', {}
+        )
+        self.assertEqual(renderizado, b'{\n    "a": 1\n}')
+
+    def test_inteiro_grande_usa_drf(self):
+        dados = {'n': 2 ** 70}
+        self.assertEqual(FastJSONRenderer().render(dados), JSONRenderer().render(dados))
+
+    def test_none(self):
+        self.assertEqual(FastJSONRenderer().render(None), b'')
+
+
+class FastJSONParserTest(SimpleTestCase):
+
+    def test_parse_igual_ao_drf(self):
+        corpo = JSONRenderer().render({k: v for k, v in PAYLOAD.items() if k != 7})
+        self.assertEqual(
+            FastJSONParser().parse(io.BytesIO(corpo)),
+            JSONParser().parse(io.BytesIO(corpo)),
+        )
+
+    def test_json_invalido(self):
+        for corpo in (b'{"a":', b'{"a": NaN}'):
+            with self.assertRaises(ParseError):
+                FastJSONParser().parse(io.BytesIO(corpo))
+
+
+class StreamingJSONTest(SimpleTestCase):
+    """
+    Listas emitidas em lotes formam o mesmo documento.
+    """
+
+    def test_lista_com_envelope(self):
+        itens = [{'n': n, 'em': date(2026, 1, 1) + timedelta(days=n)} for n in range(7)]
+        pedacos = list(stream_json_list(iter(itens), {'total': 7}, lote=3))
+
+        self.assertGreater(len(pedacos), 3)
+        self.assertEqual(
+            json.loads(b''.join(pedacos)),
+            json.loads(JSONRenderer().render({'total': 7, 'results': itens})),
+        )
+
+    def test_lista_vazia_e_serializar(self):
+        self.assertEqual(b''.join(stream_json_list([])), b'[]')
+        self.assertEqual(
+            json.loads(b''.join(stream_json_list(range(3), serializar=lambda n: {'n': n}))),
+            [{'n': 0}, {'n': 1}, {'n': 2}],
+        )
+
+    def test_resposta(self):
+        response = StreamingJSONResponse(range(2), envelope={'pagina': 1}, chave='itens')
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual(json.loads(b''.join(response)), {'pagina': 1, 'itens': [0, 1]})
+
+    def test_benchmark_serializacao(self):
+        relatorio = comparar_serializacao(tamanho_mb=0.05, repeticoes=1)
+        self.assertEqual(
+            set(relatorio['medidas']),
+            {'render_drf', 'render_fast', 'render_streaming', 'parse_drf', 'parse_fast'},
+        )
+        self.assertGreater(relatorio['servidores'], 0)
@@ -0,0 +1,122 @@
+"""
+Cache de corpos pré-comprimidos para recursos imutáveis.
+
+Versões de organograma processadas, por exemplo, não mudam: a árvore é
+montada e comprimida uma vez e as requisições seguintes recebem o gzip
+guardado, sem consultas ao banco nem nova compressão.
+
+    class OrganogramaVersaoViewSet(viewsets.ModelViewSet):
+        @action(detail=True, methods=['get'])
+        @precomprimido('carga:organograma-hierarquia')
+        def hierarquia(self, request, pk=None):
+            organograma = self.get_object()
+            request.recurso_imutavel = organograma.str_status_processamento == 'PROCESSADO'
+            ...
+
+O decorator chama view.get_object() antes de olhar o cache: o filtro do
+queryset (ex.: ?patriarca=), as permissões de objeto e o 404 de registros
+excluídos valem também para o acerto, ao custo de uma consulta pela chave
+primária. No acerto, responde direto do cache, com ETag e 304 para
+If-None-Match; a view reaproveita o objeto já carregado. Na falha,
+a view executa normalmente; se ela marcar request.recurso_imutavel, o
+CompressionMiddleware guarda o corpo comprimido. Alterações na origem devem
+chamar invalidar() (ver carga_org_lot.signals).
+
+Configurações:
+- GPP_COMPRESSION_CACHE: alias do cache (padrão 'default')
+- GPP_COMPRESSION_CACHE_TIMEOUT: segundos (padrão 86400)
+"""
+
+import functools
+import gzip
+import hashlib
+import logging
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+
+logger = logging.getLogger(__name__)
+
+
+PREFIXO = 'gpp:precomp'
+
+
+def _cache():
+    return caches[getattr(settings, 'GPP_COMPRESSION_CACHE', 'default')]
+
+
+def timeout() -> int:
+    return getattr(settings, 'GPP_COMPRESSION_CACHE_TIMEOUT', 86400)
+
+
+def chave(nome: str, identificador) -> str:
+    return f'{PREFIXO}:{nome}:{identificador}'
+
+
+def guardar(chave_cache: str, corpo_gzip: bytes, content_type: str) -> None:
+    etag = '"' + hashlib.sha1(corpo_gzip).hexdigest() + '"'
+    _cache().set(
+        chave_cache,
+        {'corpo': corpo_gzip, 'content_type': content_type, 'etag': etag},
+        timeout(),
+    )
+
+
+def invalidar(nome: str, identificador) -> None:
+    _cache().delete(chave(nome, identificador))
+
+
+def resposta_em_cache(chave_cache: str, request) -> Optional[HttpResponse]:
+    """Monta a resposta a partir do cache, ou None se não houver entrada."""
+    from common.middleware.compression import aceita_gzip
+
+    entrada = _cache().get(chave_cache)
+    if entrada is None:
+        return None
+
+    if entrada['etag'] in request.META.get('HTTP_IF_NONE_MATCH', ''):
+        response = HttpResponseNotModified()
+    elif aceita_gzip(request):
+        response = HttpResponse(entrada['corpo'], content_type=entrada['content_type'])
+        response['Content-Encoding'] = 'gzip'
+    else:
+        response = HttpResponse(
+            gzip.decompress(entrada['corpo']), content_type=entrada['content_type']
+        )
+    response['ETag'] = entrada['etag']
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
+
+
+def precomprimido(nome: str, parametro: str = 'pk'):
+    """
+    Decorator para actions de detalhe de ViewSets (ou views com o id em
+    kwargs[parametro]). Só responde do cache quando a negociação do DRF
+    escolheu JSON.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(view, request, *args, **kwargs):
+            identificador = kwargs.get(parametro)
+            renderer = getattr(request, 'accepted_renderer', None)
+            if identificador is None or getattr(renderer, 'format', None) != 'json':
+                return func(view, request, *args, **kwargs)
+
+            if hasattr(view, 'get_object'):
+                objeto = view.get_object()
+                view.get_object = lambda: objeto
+
+            chave_cache = chave(nome, identificador)
+            response = resposta_em_cache(chave_cache, request)
+            if response is not None:
+                return response
+
+            response = func(view, request, *args, **kwargs)
+            if getattr(request, 'recurso_imutavel', False):
+                request._request.chave_precompressao = chave_cache
+            return response
+        return wrapper
+    return decorator
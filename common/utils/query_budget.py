@@ -0,0 +1,207 @@
+"""
+Orçamento de queries (query budget) e detecção de N+1.
+
+Uso em testes (context manager):
+
+    with query_budget(max_queries=3):
+        client.get('/api/v1/carga/organogramas/1/hierarquia/')
+
+Uso em views (decorator), declarando o máximo por endpoint:
+
+    @query_budget(max_queries=5)
+    def minha_view(request): ...
+
+    class MeuViewSet(viewsets.ModelViewSet):
+        @query_budget(max_queries=3, nome='meu-list')
+        def list(self, request, *args, **kwargs): ...
+
+Além do limite total, o orçamento acusa N+1: o mesmo SELECT executado
+`n_mais_1` vezes ou mais com parâmetros diferentes (padrão 5).
+
+O que acontece numa violação depende do modo:
+- 'raise': levanta QueryBudgetExceeded (AssertionError), com as pilhas
+- 'collect': registra em `violacoes` para relatório posterior (test runner)
+- 'log': registra um warning
+- 'off': não instrumenta (sem custo)
+O modo vem de `configurar()` (usado pelo GPPTestRunner) ou, fora dos testes,
+da setting GPP_QUERY_BUDGET_MODE (padrão 'off').
+"""
+
+import functools
+import logging
+import os
+import traceback
+from collections import defaultdict
+from contextlib import ExitStack
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+MODOS = ('raise', 'collect', 'log', 'off')
+N_MAIS_1_PADRAO = 5
+
+_modo_global: Optional[str] = None
+violacoes: List['Violacao'] = []
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Orçamento de queries estourado ou N+1 detectado."""
+
+
+@dataclass
+class Violacao:
+    nome: str
+    motivo: str
+    pilhas: List[str] = field(default_factory=list)
+
+    def formatar(self) -> str:
+        partes = [f'[{self.nome}] {self.motivo}']
+        for pilha in self.pilhas:
+            partes.append(pilha)
+        return '\n'.join(partes)
+
+
+def configurar(modo: Optional[str]) -> None:
+    """Define o modo global (sobrepõe a setting). None volta ao padrão."""
+    global _modo_global
+    if modo is not None and modo not in MODOS:
+        raise ValueError(f'Modo inválido: {modo}')
+    _modo_global = modo
+
+
+def modo_atual() -> str:
+    return _modo_global or getattr(settings, 'GPP_QUERY_BUDGET_MODE', 'off')
+
+
+def _pilha_do_projeto() -> str:
+    """Pilha de chamadas limitada aos arquivos do projeto."""
+    base = str(settings.BASE_DIR)
+    este_arquivo = os.path.abspath(__file__)
+    quadros = [
+        q for q in traceback.extract_stack()[:-2]
+        if q.filename.startswith(base)
+        and 'site-packages' not in q.filename
+        and not q.filename.endswith('manage.py')
+        and os.path.abspath(q.filename) != este_arquivo
+    ]
+    return ''.join(traceback.format_list(quadros[-8:]))
+
+
+class _Registro:
+    """execute_wrapper que guarda SQL, parâmetros e pilha de cada query."""
+
+    def __init__(self):
+        self.total = 0
+        self.por_sql: Dict[str, List] = defaultdict(list)
+
+    def __call__(self, execute, sql, params, many, context):
+        self.total += 1
+        chave_params = repr(params)
+        self.por_sql[sql].append((chave_params, _pilha_do_projeto()))
+        return execute(sql, params, many, context)
+
+    def repeticoes(self, limite: int):
+        """SELECTs executados ao menos `limite` vezes com parâmetros distintos."""
+        for sql, execucoes in self.por_sql.items():
+            if not sql.lstrip().upper().startswith('SELECT'):
+                continue
+            if len(execucoes) >= limite and len({p for p, _ in execucoes}) > 1:
+                yield sql, execucoes
+
+
+class QueryBudget:
+    """
+    Context manager / decorator que limita as queries de um trecho de código.
+    """
+
+    def __init__(
+        self,
+        max_queries: Optional[int] = None,
+        n_mais_1: Optional[int] = N_MAIS_1_PADRAO,
+        nome: Optional[str] = None,
+        modo: Optional[str] = None,
+    ):
+        self.max_queries = max_queries
+        self.n_mais_1 = n_mais_1
+        self.nome = nome
+        self.modo = modo
+        self._stack: Optional[ExitStack] = None
+        self._registro: Optional[_Registro] = None
+
+    def __enter__(self):
+        self._modo_efetivo = self.modo or modo_atual()
+        if self._modo_efetivo == 'off':
+            return self
+        self._registro = _Registro()
+        self._stack = ExitStack()
+        for alias in connections:
+            self._stack.enter_context(connections[alias].execute_wrapper(self._registro))
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._stack is None:
+            return False
+        self._stack.close()
+        self._stack = None
+        if exc_type is None:
+            self.verificar()
+        return False
+
+    @property
+    def total(self) -> int:
+        return self._registro.total if self._registro else 0
+
+    def verificar(self) -> List[Violacao]:
+        nome = self.nome or 'query_budget'
+        encontradas = []
+        registro = self._registro
+
+        if self.max_queries is not None and registro.total > self.max_queries:
+            pilhas = [
+                f'--- {sql[:200]}\n{execucoes[0][1]}'
+                for sql, execucoes in registro.por_sql.items()
+            ]
+            encontradas.append(Violacao(
+                nome,
+                f'{registro.total} queries executadas, orçamento de {self.max_queries}',
+                pilhas[:10],
+            ))
+
+        if self.n_mais_1:
+            for sql, execucoes in registro.repeticoes(self.n_mais_1):
+                encontradas.append(Violacao(
+                    nome,
+                    f'Possível N+1: SQL repetido {len(execucoes)}x com parâmetros diferentes: {sql[:200]}',
+                    [execucoes[0][1]],
+                ))
+
+        if encontradas:
+            self._reportar(encontradas)
+        return encontradas
+
+    def _reportar(self, encontradas: List[Violacao]) -> None:
+        if self._modo_efetivo == 'raise':
+            raise QueryBudgetExceeded('\n\n'.join(v.formatar() for v in encontradas))
+        if self._modo_efetivo == 'collect':
+            violacoes.extend(encontradas)
+        else:
+            for violacao in encontradas:
+                logger.warning(violacao.formatar())
+
+    def __call__(self, func):
+        nome = self.nome or f'{func.__module__}.{func.__qualname__}'
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            budget = QueryBudget(self.max_queries, self.n_mais_1, nome, self.modo)
+            with budget:
+                return func(*args, **kwargs)
+        return wrapper
+
+
+query_budget = QueryBudget
@@ -1,3 +1,56 @@
-from django.shortcuts import render
+"""
+Views compartilhadas da plataforma.
+"""
 
-# Create your views here.
+import hmac
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from django.views.decorators.http import require_GET
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+
+from common.services import perfilamento
+from common.services.metrics import render_prometheus
+
+
+@require_GET
+def metrics_view(request):
+    """
+    GET /metrics
+
+    Métricas de requisições no formato texto do Prometheus.
+    Exige o header "Authorization: Bearer <GPP_METRICS_TOKEN>" ou uma sessão
+    de staff; sem token configurado, só fica aberto com DEBUG.
+    """
+    token = getattr(settings, 'GPP_METRICS_TOKEN', None)
+    recebido = request.headers.get('Authorization', '').removeprefix('Bearer ').strip()
+    autorizado = (
+        (token and hmac.compare_digest(recebido, token))
+        or request.user.is_staff
+        or (not token and settings.DEBUG)
+    )
+    if not autorizado:
+        return HttpResponseForbidden('Token de métricas inválido')
+
+    return HttpResponse(
+        render_prometheus(),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def perfil_view(request, id_perfil):
+    """
+    GET /perfil/<id>
+
+    Relatório de uma requisição perfilada (ver common.middleware.perfilamento):
+    árvore de chamadas, funções mais custosas e linha do tempo das queries.
+    Apenas staff.
+    """
+    relatorio = perfilamento.obter(id_perfil)
+    if relatorio is None:
+        return Response({'detail': 'Perfil não encontrado ou expirado.'}, status=404)
+    return Response(relatorio)
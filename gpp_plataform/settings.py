@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
 from pathlib import Path
+from corsheaders.defaults import default_headers
 import sys
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -110,6 +111,10 @@ INSTALLED_APPS = [
     
 
 MIDDLEWARE = [
+    'common.middleware.metrics.RequestMetricsMiddleware',  # Primeiro: mede o tempo total
+    'common.middleware.replicas.ReplicaRoutingMiddleware',
+    'common.middleware.compression.CompressionMiddleware',  # Antes dos que alteram o corpo
+    'common.middleware.consultas_lentas.ConsultasLentasMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -119,6 +124,7 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'common.middleware.app_context.AppContextMiddleware',
+    'common.middleware.perfilamento.PerfilamentoMiddleware',  # Depois da autenticação
 ]
 
 ROOT_URLCONF = 'gpp_plataform.urls'
@@ -148,6 +154,22 @@ DATABASES = {
     }
 }
 
+# Réplica de leitura (opcional, ver common.db_router). Para testar localmente,
+# crie um segundo banco com o mesmo schema e defina GPP_DB_REPLICA_NAME.
+if os.getenv('GPP_DB_REPLICA_NAME'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': os.getenv('GPP_DB_REPLICA_NAME'),
+        'HOST': os.getenv('GPP_DB_REPLICA_HOST', DATABASES['default']['HOST']),
+        'PORT': os.getenv('GPP_DB_REPLICA_PORT', DATABASES['default']['PORT']),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+GPP_DB_REPLICAS = [alias for alias in DATABASES if alias.startswith('replica')]
+GPP_DB_REPLICA_STICKY_SECONDS = 5       # leituras no primário após uma escrita do cliente
+GPP_DB_REPLICA_MAX_LAG_SECONDS = 10     # réplica com atraso maior é ignorada
+GPP_DB_REPLICA_LAG_CHECK_INTERVAL = 5   # segundos entre medições do atraso
+
 DATABASE_ROUTERS = [
         'carga_org_lot.db_router.CargaOrgLotRouter',
         'acoes_pngi.db_router.AcoesPNGIRouter',
@@ -200,6 +222,16 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    # orjson quando instalado; mesma saída do JSONRenderer/JSONParser do DRF
+    'DEFAULT_RENDERER_CLASSES': [
+        'common.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'common.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
 # Configuração do SIMPLE_JWT
@@ -231,6 +263,9 @@ LOGOUT_REDIRECT_URL = '/login/'
 
 
 CORS_ALLOW_CREDENTIALS = True
+# Perfilamento sob demanda a partir do frontend (common.middleware.perfilamento)
+CORS_ALLOW_HEADERS = (*default_headers, 'x-gpp-profile')
+CORS_EXPOSE_HEADERS = ['X-GPP-Profile-Id']
 
 # Session Configuration
 SESSION_COOKIE_HTTPONLY = True
@@ -254,15 +289,94 @@ PORTAL_PORT = os.getenv('PORTAL_PORT', '8000')
 PORTAL_SERVICE_EMAIL = os.getenv('PORTAL_SERVICE_EMAIL', '')
 PORTAL_SERVICE_PASSWORD = os.getenv('PORTAL_SERVICE_PASSWORD', '')
 
-# Cache para tokens (já existe, mas certifique-se de ter configurado)
-if 'CACHES' not in locals():
-    CACHES = {
-        'default': {
-            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-            'LOCATION': 'gpp-plataform-cache',
-            'TIMEOUT': 3600,  # 1 hora
+# Cache em dois níveis (common.cache): LRU por processo na frente de um cache
+# compartilhado pelos workers, com invalidação via LISTEN/NOTIFY do PostgreSQL.
+# GPP_CACHE_COMPARTILHADO: 'db' (exige `python manage.py createcachetable`) ou
+# 'arquivo' (GPP_CACHE_DIR; para desenvolvimento e máquinas sem PostgreSQL)
+GPP_CACHE_COMPARTILHADO = os.getenv('GPP_CACHE_COMPARTILHADO', 'db')
+
+CACHES = {
+    'default': {
+        'BACKEND': 'common.cache.TwoTierCache',
+        'LOCATION': 'default',
+        'TIMEOUT': 3600,  # 1 hora
+        'OPTIONS': {
+            'COMPARTILHADO': 'compartilhado',
+            'LOCAL_MAX_ENTRIES': 5000,
+            'LOCAL_MAX_BYTES': 64 * 2**20,
+            'LOCAL_TIMEOUT': 60,
+            'NOTIFY_DATABASE': 'default' if GPP_CACHE_COMPARTILHADO == 'db' else None,
+            'NOTIFY_CHANNEL': 'gpp_cache',
+            'SINGLE_FLIGHT_TIMEOUT': 30,
+        },
+    },
+    'compartilhado': (
+        {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'gpp_cache',
+            'TIMEOUT': 3600,
+            'OPTIONS': {'MAX_ENTRIES': 100000},
         }
-    }
+        if GPP_CACHE_COMPARTILHADO == 'db' else
+        {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.getenv('GPP_CACHE_DIR', str(BASE_DIR / '.cache')),
+            'TIMEOUT': 3600,
+        }
+    ),
+}
+
+# Métricas de requisição (common.middleware.metrics, exposto em /metrics)
+# GPP_METRICS_DIR deve ser um diretório compartilhado pelos workers (ex.: gunicorn)
+GPP_METRICS_ENABLED = os.getenv('GPP_METRICS_ENABLED', 'true').lower() == 'true'
+GPP_METRICS_DIR = os.getenv('GPP_METRICS_DIR') or None
+GPP_METRICS_FLUSH_INTERVAL = 5
+GPP_METRICS_SNAPSHOT_TTL = 3600
+# Sem token, /metrics só atende staff (ou qualquer um com DEBUG)
+GPP_METRICS_TOKEN = os.getenv('GPP_METRICS_TOKEN') or None
+
+# Orçamento de queries por endpoint (common.utils.query_budget)
+# 'log' em desenvolvimento; nos testes o GPPTestRunner usa 'raise'
+GPP_QUERY_BUDGET_MODE = 'log' if DEBUG else 'off'
+
+# Log de queries lentas por view/aplicação (common.services.consultas_lentas)
+GPP_SLOW_QUERY_ENABLED = os.getenv('GPP_SLOW_QUERY_ENABLED', 'true').lower() == 'true'
+GPP_SLOW_QUERY_MS = int(os.getenv('GPP_SLOW_QUERY_MS', '500'))
+GPP_SLOW_QUERY_FLUSH_INTERVAL = 60   # segundos entre gravações em tblconsultalenta
+GPP_SLOW_QUERY_STACK_DEPTH = 8
+GPP_SLOW_QUERY_FLUSH_AO_SAIR = True    # grava o que sobrou na saída do processo (comandos, workers)
+
+# Perfilamento sob demanda para staff (common.middleware.perfilamento):
+# header X-GPP-Profile: 1|amostragem; relatório em /perfil/<id>
+GPP_PROFILING_ENABLED = os.getenv('GPP_PROFILING_ENABLED', 'false').lower() == 'true'
+GPP_PROFILING_MAX_PER_MINUTE = 10     # soma de todos os workers
+GPP_PROFILING_TTL = 3600              # segundos que o relatório fica disponível
+GPP_PROFILING_SAMPLE_INTERVAL_MS = 5
+
+# Compressão gzip das respostas (common.middleware.compression) e cache de
+# corpos pré-comprimidos de recursos imutáveis (common.utils.precompressao)
+GPP_COMPRESSION_ENABLED = os.getenv('GPP_COMPRESSION_ENABLED', 'true').lower() == 'true'
+GPP_COMPRESSION_MIN_SIZE = 1024   # bytes
+GPP_COMPRESSION_LEVEL = 6         # 1 (rápido) a 9 (menor)
+GPP_COMPRESSION_CACHE_TIMEOUT = 86400
+
+# Envio das cargas à API externa (carga_org_lot.services.envio_api)
+API_EXTERNA_URL = os.getenv('API_EXTERNA_URL', '')
+API_EXTERNA_CLIENT_ID = os.getenv('API_EXTERNA_CLIENT_ID', '')
+API_EXTERNA_CLIENT_SECRET = os.getenv('API_EXTERNA_CLIENT_SECRET', '')
+CARGA_ORG_LOT_ENVIO_WORKERS = 8          # envios em andamento por chamada
+CARGA_ORG_LOT_ENVIO_POR_HOST = 4         # requisições simultâneas por host, no processo
+CARGA_ORG_LOT_ENVIO_TENTATIVAS = 4
+CARGA_ORG_LOT_ENVIO_BACKOFF_BASE = 0.5   # segundos; dobra a cada tentativa (com jitter)
+CARGA_ORG_LOT_ENVIO_BACKOFF_MAX = 30
+CARGA_ORG_LOT_ENVIO_TIMEOUT = 30
+CARGA_ORG_LOT_FILA_EXECUCOES = 5         # execuções do enviar_cargas --pendentes por registro antes de ERRO
+CARGA_ORG_LOT_FILA_EXPIRACAO = 3600      # segundos; EM_ENVIO há mais tempo (execução interrompida) volta à fila
+
+# Retenção das versões de carga (carga_org_lot.services.retencao)
+CARGA_ORG_LOT_RETENCAO_VERSOES = 3       # mais recentes por patriarca; as ativas sempre ficam
+CARGA_ORG_LOT_EXPURGO_LOTE = 5000        # linhas por DELETE (uma transação por lote)
+CARGA_ORG_LOT_EXPURGO_PAUSA = 0.2        # segundos entre os lotes
 
 # Logging
 LOGGING = {
@@ -318,6 +432,18 @@ if 'test' in sys.argv:
         'CHARSET': 'UTF8',
     }
     
+    # Sem réplicas nos testes: os testes de common.db_router usam o espelho
+    # gpp_plataform_db via override_settings
+    GPP_DB_REPLICAS = []
+    
+    # Sem thread de LISTEN presa ao banco de teste; common.tests.test_cache
+    # cria a sua e a encerra
+    CACHES['default']['OPTIONS']['NOTIFY_DATABASE'] = None
+    
+    # Na saída do processo o banco de teste já foi destruído e a conexão
+    # voltou a apontar para o de desenvolvimento
+    GPP_SLOW_QUERY_FLUSH_AO_SAIR = False
+    
     # Acelerar testes
     PASSWORD_HASHERS = [
         'django.contrib.auth.hashers.MD5PasswordHasher',
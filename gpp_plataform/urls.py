@@ -5,11 +5,15 @@ Organização:
 - /api/v1/auth/ -> APIs de autenticação (JWT + Session)
 - /api/v1/<app>/ -> APIs REST para consumo do Next.js
 - /<app>/ -> Views tradicionais Django (templates HTML)
+- /metrics -> Métricas Prometheus
+- /perfil/<id> -> Relatório de perfilamento sob demanda (staff)
 """
 
 from django.contrib import admin
 from django.urls import path, include
 
+from common.views import metrics_view, perfil_view
+
 urlpatterns = [
     # =========================================================================
     # DJANGO ADMIN
@@ -17,6 +21,15 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     
     
+    # =========================================================================
+    # MÉTRICAS - Prometheus (ver common.middleware.metrics)
+    # =========================================================================
+    path('metrics', metrics_view, name='metrics'),
+    
+    # Perfilamento sob demanda (ver common.middleware.perfilamento)
+    path('perfil/<str:id_perfil>', perfil_view, name='perfil'),
+    
+    
     # =========================================================================
     # APIs REST - Autenticação (para Next.js)
     # Prefixo: /api/v1/auth/